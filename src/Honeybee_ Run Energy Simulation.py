@@ -52,6 +52,8 @@ Provided by Honeybee 0.0.63
         +++++++++++++++: ...
         meshSettings_: Optional mesh settings for your geometry from any one of the native Grasshopper mesh setting components.  These will be used to change the meshing of curved surfaces before they are run through EnergyPlus (note that meshing of curved surfaces is done since Energyplus is not able to calculate heat flow through non-planar surfaces).  Default Grasshopper meshing is used if nothing is input here but you may want to decrease your calculation time by changing it to Coarse or increase your curvature definition (and calculation time) by making it finer.
         additionalStrings_: THIS OPTION IS JUST FOR ADVANCED USERS OF ENERGYPLUS.  You can input additional text strings here that you would like written into the IDF.  The strings input here should be complete EnergyPlus objects that are correctly formatted.  You can input as many objects as you like in a list.  This input can be used to write objects into the IDF that are not currently supported by Honeybee.
+        writeSQLite_: Set to "True" to have EnergyPlus also write the results into an SQLite file next to the CSV result file.  The result reader components will read the results from the SQLite file, when it is available, which is much faster than reading large CSV files.  The default is set to "False".
+        zoneMultipliers_: Set to "True" to write identical zones as a single zone with an EnergyPlus zone multiplier.  Zones are identical if they have the same program, schedules, loads, HVAC, constructions and the same geometry and orientation (e.g. the zones of the typical floors of a tower).  This can reduce the simulation time of repetitive buildings significantly.  Interzone surfaces between the zones that are written and the zones that are removed are set to adiabatic.  The result reader components will read the results of the zone that is written for each of the zones that it represents.  The default is set to "False".
     Returns:
         report: Check here to see a report of the EnergyPlus run, including errors.
         idfFileAddress: The file path of the IDF file that has been generated on your machine.
@@ -62,7 +64,7 @@ Provided by Honeybee 0.0.63
 """
 ghenv.Component.Name = "Honeybee_ Run Energy Simulation"
 ghenv.Component.NickName = 'runEnergySimulation'
-ghenv.Component.Message = 'VER 0.0.63\nJUL_24_2018'
+ghenv.Component.Message = 'VER 0.0.63\nOCT_18_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "10 | Energy | Energy"
@@ -80,11 +82,16 @@ import Grasshopper.Kernel as gh
 import math
 import shutil
 import collections
-import subprocess
 import copy
 
 rc.Runtime.HostUtils.DisplayOleAlerts(False)
 
+# zoneMultipliers_ and writeSQLite_ are not inputs of the component yet
+try: zoneMultipliers_
+except: zoneMultipliers_ = False
+try: writeSQLite_
+except: writeSQLite_ = False
+
 
 class WriteIDF(object):
     # Add all HBcontext surfaces from both HBContext_ and HB generator here so that if user connects the same
@@ -1225,6 +1232,10 @@ class WriteIDF(object):
     def requestVarDict(self):
         return '\nOutput:VariableDictionary,\n' + \
         '\t' + 'regular;                 !- Key Field' + '\n'
+    
+    def requestSQLite(self):
+        return '\nOutput:SQLite,\n' + \
+        '\t' + 'SimpleAndTabular;        !- Option Type' + '\n'
         
     def EarthTube(self,zone):
         if zone.ETschedule.upper().endswith('CSV'):
@@ -1516,35 +1527,20 @@ def checkUnits():
 
 class RunIDF(object):
     
-    def writeBatchFile(self, workingDir, idfFileName, epwFileAddress, EPDirectory = 'C:\\EnergyPlusV8-1-0', runInBackground = False):
+    def runEnergyPlus(self, workingDir, idfFileName, epwFileAddress, EPDirectory, runInBackground = False):
+        """Run the idf file through EnergyPlus without a batch file and return the return code."""
+        hb_processRunner = sc.sticky["honeybee_ProcessRunner"]
         
-        workingDrive = workingDir[:2]
-        
-        if idfFileName.EndsWith('.idf'):  shIdfFileName = idfFileName.replace('.idf', '')
+        if idfFileName.lower().endswith('.idf'):  shIdfFileName = idfFileName[:-4]
         else: shIdfFileName = idfFileName
         
-        if not workingDir.EndsWith('\\'): workingDir = workingDir + '\\'
-        
-        fullPath = workingDir + shIdfFileName
-        folderName = workingDir.replace( (workingDrive + '\\'), '')
-        batchStr = workingDrive + '\ncd\\' +  folderName + '\n"' + EPDirectory + \
-                '\\Epl-run" ' + fullPath + ' ' + fullPath + ' idf ' + epwFileAddress + ' EP N nolimit N N 0 Y'
-        
-        batchFileAddress = fullPath +'.bat'
-        batchfile = open(batchFileAddress, 'w')
-        batchfile.write(batchStr)
-        batchfile.close()
-        
-        #execute the batch file
-        if runInBackground:		
-            self.runCmd(batchFileAddress)		
-        else:		
-            os.system(batchFileAddress)		
+        fullPath = os.path.join(workingDir, shIdfFileName)
+        runner = hb_processRunner(workingDir, logFile = fullPath + '.log', showWindow = not runInBackground)
+        return runner.runEnergyPlus(EPDirectory, fullPath + '.idf', epwFileAddress, fullPath)
     
-    def runCmd(self, batchFileAddress, shellKey = True):
-        batchFileAddress.replace("\\", "/")		
-        p = subprocess.Popen(["cmd /c ", batchFileAddress], shell=shellKey, stdout=subprocess.PIPE, stderr=subprocess.PIPE)		
-        out, err = p.communicate()
+    def writeBatchFile(self, workingDir, idfFileName, epwFileAddress, EPDirectory = 'C:\\EnergyPlusV8-1-0', runInBackground = False):
+        # kept for the components that still call writeBatchFile. EnergyPlus runs directly.
+        return self.runEnergyPlus(workingDir, idfFileName, epwFileAddress, EPDirectory, runInBackground)
 
 
 sc.sticky["honeybee_WriteIDF"] = WriteIDF
@@ -1630,6 +1626,7 @@ def main(north, epwFileAddress, EPParameters, analysisPeriod, HBZones, HBContext
     hb_EPScheduleAUX = sc.sticky["honeybee_EPScheduleAUX"]()
     hb_EPPar = sc.sticky["honeybee_EPParameters"]()
     hb_EPObjectsAux = sc.sticky["honeybee_EPObjectsAUX"]()
+    hb_IDFWriter = sc.sticky["honeybee_IDFWriter"]
     
     northAngle, northVector = lb_preparation.angle2north(north)
     stMonth, stDay, stHour, endMonth, endDay, endHour = lb_preparation.readRunPeriod(analysisPeriod, True)
@@ -1667,8 +1664,17 @@ def main(north, epwFileAddress, EPParameters, analysisPeriod, HBZones, HBContext
     reEvaluate = hb_reEvaluateHBZones(thermalZonesPyClasses, meshSettings)
     reEvaluate.evaluateZones()
     
+    # write identical zones as a single zone with a multiplier
+    zoneMultipliers = sc.sticky["honeybee_ZoneMultipliers"](thermalZonesPyClasses)
+    if zoneMultipliers_:
+        thermalZonesPyClasses = zoneMultipliers.collapse()
+        print zoneMultipliers
+    # the file is also removed if there are no zones with a multiplier
+    zoneMultipliers.writeMultipliersFile(workingDir)
+    
     idfFileFullName = workingDir + "\\" + idfFileName
-    idfFile = open(idfFileFullName, "w")
+    # objects are collected in memory and the file is written once it is closed
+    idfFile = hb_IDFWriter(idfFileFullName)
     
     ################## HEADER ###################
     print "[1 of 8] Writing simulation parameters..."
@@ -1754,19 +1760,19 @@ def main(north, epwFileAddress, EPParameters, analysisPeriod, HBZones, HBContext
             idfFile.write(hb_writeIDF.EPHoliday(hol, count))
     
     # for now I write all the type limits but it can be cleaner
-    scheduleTypeLimits = set([key.upper() for key in sc.sticky["honeybee_ScheduleTypeLimitsLib"].keys()])
+    scheduleTypeLimits = sorted(set([key.upper() for key in sc.sticky["honeybee_ScheduleTypeLimitsLib"].keys()]))
     
     for scheduleTypeLimit in scheduleTypeLimits:
-        try: idfFile.write(hb_writeIDF.EPSCHStr(scheduleTypeLimit))
+        try: idfFile.writeObject(hb_writeIDF.EPSCHStr(scheduleTypeLimit))
         except: pass
     
     # Geometry rules
     idfFile.write(hb_writeIDF.EPGeometryRules())
 
-    EPConstructionsCollection = []
-    EPMaterialCollection = []
-    EPScheduleCollection = []
-    shdCntrlCollection = []
+    EPConstructionsCollection = idfFile.getCollection("Construction")
+    EPMaterialCollection = idfFile.getCollection("Material")
+    EPScheduleCollection = idfFile.getCollection("Schedule")
+    shdCntrlCollection = idfFile.getCollection("WindowProperty:ShadingControl")
     
     # Shading Surfaces
     if HBContext and HBContext[0]!=None:
@@ -1788,7 +1794,7 @@ def main(north, epwFileAddress, EPParameters, analysisPeriod, HBZones, HBContext
                 if comments == "csv":
                     # create a new schedule object based on file
                     # and write it to idf
-                    idfFile.write(hb_writeIDF.EPSCHStr(schedule))
+                    idfFile.writeObject(hb_writeIDF.EPSCHStr(schedule))
                 else:
                     # collect shchedule name
                     EPScheduleCollection.append(schedule.upper())
@@ -1816,7 +1822,7 @@ def main(north, epwFileAddress, EPParameters, analysisPeriod, HBZones, HBContext
         
     #################  BODY #####################
     print "[3 of 8] Writing geometry..."
-    ZoneCollectionBasedOnSchAndLoads = {} # This will be used to create zoneLists
+    ZoneCollectionBasedOnSchAndLoads = collections.OrderedDict() # This will be used to create zoneLists
     
     
     # write idf file
@@ -1831,7 +1837,7 @@ def main(north, epwFileAddress, EPParameters, analysisPeriod, HBZones, HBContext
         # create a unique key based on schedules and loads
         # zones with similar keys will be grouped
         key = ",".join(schedules.values() + loads.values())
-        if key not in ZoneCollectionBasedOnSchAndLoads.keys():
+        if key not in ZoneCollectionBasedOnSchAndLoads:
             ZoneCollectionBasedOnSchAndLoads[key] = []
         
         ZoneCollectionBasedOnSchAndLoads[key].append(zone)
@@ -1877,12 +1883,12 @@ def main(north, epwFileAddress, EPParameters, analysisPeriod, HBZones, HBContext
                                 if windowShading not in shdCntrlCollection:
                                     values = hb_EPObjectsAux.getEPObjectDataByName(windowShading)
                                     if not values[4][0].endswith('.CSV'):
-                                        idfFile.write(hb_EPObjectsAux.getEPObjectsStr(windowShading))
+                                        idfFile.writeObject(hb_EPObjectsAux.getEPObjectsStr(windowShading))
                                     else:
                                         newSchedName = os.path.basename(values[4][0]).replace('.CSV', '')
                                         initStr = hb_EPObjectsAux.getEPObjectsStr(windowShading)
                                         finStr = initStr.replace(values[4][0], newSchedName)
-                                        idfFile.write(finStr)
+                                        idfFile.writeObject(finStr)
                                     
                                     if values[2][0] != '':
                                         # Iniitalize for construction (for switchable glazing).
@@ -2165,19 +2171,19 @@ def main(north, epwFileAddress, EPParameters, analysisPeriod, HBZones, HBContext
     for mat in EPMaterialCollection:
         materialStr = hb_writeIDF.EPMaterialStr(mat.upper())
         if materialStr:
-            idfFile.write(materialStr)
+            idfFile.writeObject(materialStr)
     
     # Write constructions
     for cnstr in EPConstructionsCollection:
         constructionStr, materials = hb_writeIDF.EPConstructionStr(cnstr)
         if constructionStr:
-            idfFile.write(constructionStr)
+            idfFile.writeObject(constructionStr)
             #Check for materials.
             for mat in materials:
                 if not mat.upper() in EPMaterialCollection:
                     materialStr = hb_writeIDF.EPMaterialStr(mat.upper())
                     if materialStr:
-                        idfFile.write(materialStr)
+                        idfFile.writeObject(materialStr)
                         EPMaterialCollection.append(mat.upper())
     
     ################ BODYII #####################
@@ -2219,7 +2225,7 @@ def main(north, epwFileAddress, EPParameters, analysisPeriod, HBZones, HBContext
         scheduleValues, comments = hb_EPScheduleAUX.getScheduleDataByName(schedule, ghenv.Component)
         if comments == "csv":
             # create a new schedule object based on file
-            idfFile.write(hb_writeIDF.EPSCHStr(schedule))
+            idfFile.writeObject(hb_writeIDF.EPSCHStr(schedule))
             
             # I need to also change the name of the schedule
             # when I write the objects! Maybe I should have added them
@@ -2227,7 +2233,7 @@ def main(north, epwFileAddress, EPParameters, analysisPeriod, HBZones, HBContext
             pass
             
         elif scheduleValues!=None:
-            idfFile.write(hb_writeIDF.EPSCHStr(schedule))
+            idfFile.writeObject(hb_writeIDF.EPSCHStr(schedule))
             
             if scheduleValues[0].lower() == "schedule:year":
                 numOfWeeklySchedules = int((len(scheduleValues)-2)/5)
@@ -2341,6 +2347,10 @@ def main(north, epwFileAddress, EPParameters, analysisPeriod, HBZones, HBContext
     # request an output variable dictionary.
     idfFile.write(hb_writeIDF.requestVarDict())
     
+    # request the results in an SQLite file.
+    if writeSQLite_:
+        idfFile.write(hb_writeIDF.requestSQLite())
+    
     # write the outputs requested by the user.
     if simulationOutputs:
         print "[8 of 8] Writing outputs..."
@@ -2379,13 +2389,18 @@ def main(north, epwFileAddress, EPParameters, analysisPeriod, HBZones, HBContext
     rddFileName = None
     if runEnergyPlus:
         print "Analysis is running!..."
-        # write the batch file
-        hb_runIDF.writeBatchFile(workingDir, idfFileName, epwFileAddress, sc.sticky["honeybee_folders"]["EPPath"], runEnergyPlus > 1)
+        # run the idf file through EnergyPlus
+        hb_runIDF.runEnergyPlus(workingDir, idfFileName, epwFileAddress, sc.sticky["honeybee_folders"]["EPPath"], runEnergyPlus > 1)
         resultFileFullName = idfFileFullName.replace('.idf', '.csv')
         eioFileFullName = idfFileFullName.replace('.idf', '.eio')
         performanceSummaryReport = idfFileFullName.replace('.idf', 'Table.html');
         rddFileName = idfFileFullName.replace('.idf', '.rdd')
         studyFolder = originalWorkingDir
+        if writeSQLite_:
+            sqlFileFullName = idfFileFullName.replace('.idf', '.sql')
+            print "Results are also written to " + sqlFileFullName
+            # the readers only read the file so the index is added here once
+            sc.sticky["honeybee_EPSQLResultReader"].createIndex(sqlFileFullName)
         try:
             test = open(workingDir + '\eplusout.csv', 'r')
             test.close()
@@ -27,6 +27,7 @@ Use this component to dump Honeybee objects to a file on your system.
 You can use load Honeybee objects to load the file to Grasshopper.
 WARNING: This component does not write custom schedules or materials within the file but it does write the names of the constructions and schedules.
 Accordingly, to properly load objects agian, you must connect the full strings of these objects to a "Add to EnergyPlus Library" component in any GH cript that loads the HBZones from the file.
+Objects are written as separate indexed records with planar geometries stored as vertex loops so the load component can load a subset of them (e.g. the zones of a single floor).
 
 -
 Provided by Honeybee 0.0.63
@@ -53,7 +54,6 @@ try: ghenv.Component.AdditionalHelpFromDocStrings = "6"
 except: pass
 
 
-import cPickle as pickle
 import scriptcontext as sc
 import Grasshopper.Kernel as gh
 import os
@@ -66,6 +66,7 @@ def dumpHBObjects(HBObjects, fileName, workingDir=None):
     hb_ConstrLib = sc.sticky ["honeybee_constructionLib"]
     hb_EPScheduleAUX = sc.sticky["honeybee_EPScheduleAUX"]()
     hb_EPObjectsAux = sc.sticky["honeybee_EPObjectsAUX"]()
+    hb_HBObjectsFile = sc.sticky["honeybee_HBObjectsFile"]
     if workingDir == None:
         workingDir = sc.sticky["Honeybee_DefaultFolder"] 
     if not fileName.upper().endswith('.HB.'):
@@ -371,10 +372,8 @@ def dumpHBObjects(HBObjects, fileName, workingDir=None):
         assert id in keys,\
             " InputError: Adjacent object %s is not in the list of HBObjects."%name
     
-    HBData = {'ids':ids, 'objs': objs}
-    with open(filePath, "wb") as outf:
-        pickle.dump(HBData, outf)
-        print "Saved file to %s"%filePath
+    hb_HBObjectsFile(filePath).write(ids, objs)
+    print "Saved file to %s"%filePath
     return filePath
 
 
@@ -70,7 +70,7 @@ Provided by Honeybee 0.0.63
 
 ghenv.Component.Name = "Honeybee_Energy Shade Benefit Evaluator"
 ghenv.Component.NickName = 'EnergyShadeBenefit'
-ghenv.Component.Message = 'VER 0.0.63\nJAN_20_2018'
+ghenv.Component.Message = 'VER 0.0.63\nOCT_18_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "10 | Energy | Energy"
@@ -81,7 +81,6 @@ except: pass
 
 import rhinoscriptsyntax as rs
 import Rhino as rc
-import collections
 import System.Threading.Tasks as tasks
 import System
 import scriptcontext as sc
@@ -537,159 +536,95 @@ def checkSkyResolution(skyResolution, allDataDict, analysisPeriod, latitude, lon
     return allDataDict, finalSunVecs
 
 
-def nonparallel_projection(analysisMesh, sunLines, windowTestPts):
-    #Intersect the sun lines with the test mesh
-    faceInt = []
-    for face in range(analysisMesh.Faces.Count): faceInt.append([])
+def projectSunVectors(analysisMesh, windowTestPts, sunVectors):
+    #Cast a ray from each window test point along each sun vector and find the cell of the shade mesh that it hits.
+    #Each face of the shade is added to the ray caster as a separate mesh so that the index of the hit mesh is the index of the cell.
+    meshRayCaster = sc.sticky["honeybee_MeshRayCaster"]
+    vertices, faces = meshRayCaster.meshToData(analysisMesh)
+    shadeCaster = meshRayCaster([(vertices, [face]) for face in faces])
+    directions = meshRayCaster.prepareDirections(sunVectors)
     
-    for ptCount, pt in enumerate(windowTestPts):
-        try:
-            for hour, sunLine in enumerate(sunLines[ptCount]):
-                if sunLine != 0:
-                    intPt, i = rc.Geometry.Intersect.Intersection.MeshLine(analysisMesh, sunLine)
-                    if len(intPt)!=0: faceInt[i[0]].append(hour)
-                else: pass
-        except Exception, e:
-            print `e`
-    
-    return faceInt
-
-
-def parallel_projection(analysisMesh, sunLines, windowTestPts):
-    #Intersect the sun lines with the test mesh using parallel processing
-    faceInt = []
-    for face in range(analysisMesh.Faces.Count): faceInt.append([]) #place holder for result
-    
-    def intersect(i):
-        try:
-            for hour, sunLine in enumerate(sunLines[i]):
-                if sunLine != 0:
-                    intPt, indx = rc.Geometry.Intersect.Intersection.MeshLine(analysisMesh, sunLine)
-                    if len(intPt)!=0: faceInt[indx[0]].append(hour)
-                else: pass
-        except Exception, e:
-            print `e`
-    
-    tasks.Parallel.ForEach(range(len(windowTestPts)), intersect)
-    
-    return faceInt
-
-
-def valCalc(percentBlocked, ECool, EBeam, cellArea, extraDivisor):
-    #Multiply the Energy by the Percentage Blocked by the Shade
-    ECoolPercent = [a*b for a,b in zip(ECool,percentBlocked)]
-    EBeamPercent = [a*b for a,b in zip(EBeam,percentBlocked)]
-    
-    #Calculate the Thermal Effect of the Shade
-    NegBeam = []
-    for item in EBeamPercent:
-        NegBeam.append(item*(-1))
-    
-    BeamEffectCool = [item1 for item1, item2 in zip(EBeamPercent , ECoolPercent) if item1 < item2]
-    DeltaCool1 = sum(BeamEffectCool)
-    
-    BeamEffectHeat = [item1 for item1, item2 in zip(NegBeam , ECoolPercent) if item1 > item2]
-    DeltaHeat1 = sum(BeamEffectHeat)
-    
-    BeamEffectMid = [item1 for item1, item2, item3 in zip(ECoolPercent , EBeamPercent , NegBeam) if item1 < item2 and item1 > item3]
-    DeltaMidCoolList = []
-    DeltaMidHeatList = []
-    for item in BeamEffectMid:
-        if item > 0: DeltaMidCoolList.append(item)
-        else: DeltaMidHeatList.append(item)
-    
-    DeltaMidCool = sum(DeltaMidCoolList)
-    DeltaMidHeat = sum(DeltaMidHeatList)
-    
-    deltaCooling = DeltaCool1 + DeltaMidCool
-    deltaHeating = DeltaHeat1 + DeltaMidHeat
-    
-    netEffecting = deltaCooling + deltaHeating
-    
-    #Normalize the effects by the area of the cell such that there is a consistent metric between cells of different areas.
-    coolEffect = (deltaCooling/cellArea)
-    heatEffect = (deltaHeating/cellArea)
-    netEffect = (netEffecting/cellArea)
-    
-    #If the sky resolution is greater than 4, divide the result by the number of additional timesteps that have been added.
-    if extraDivisor != 0:
-        coolEffect = coolEffect/extraDivisor
-        heatEffect = heatEffect/extraDivisor
-        netEffect = netEffect/extraDivisor
-    
-    return coolEffect, heatEffect, netEffect
-
-def evaluateShade(coolingLoad, heatingLoad, beamGain, analysisMesh, analysisAreas, windowMesh, windowTestPts, sunVectors, skyResolution):
-    #Determine the length to make the sun lines based on the scale of the bounding box around the input geometry.
-    def joinMesh(meshList):
-        joinedMesh = rc.Geometry.Mesh()
-        for m in meshList: joinedMesh.Append(m)
-        return joinedMesh
-    
-    joinedMesh = joinMesh([analysisMesh, windowMesh])
-    
-    boundBox = rc.Geometry.Mesh.GetBoundingBox(joinedMesh, rc.Geometry.Plane.WorldXY)
-    
-    #Multiply the largest dimension of the bounding box by 2 to ensure that the lines are definitely long enough to intersect the shade.
-    lineLength = (max(boundBox.Max - boundBox.Min)) * 2
-    
-    #Generate the sun lines for intersection and discount the vector if it intersects a context.
-    sunLines = []
+    #Discount the vectors that are blocked by the context.
+    contextCaster = None
     if context_:
         contextMeshes = []
         for brep in context_:
             contextMeshes.extend(rc.Geometry.Mesh.CreateFromBrep(brep, rc.Geometry.MeshingParameters.Default))
-        contextMesh = joinMesh(contextMeshes)
-    else: pass
+        contextCaster = meshRayCaster([meshRayCaster.meshToData(mesh) for mesh in contextMeshes])
+    
+    #Each point gets its own list of (cell, sun vector) hits so the points can be projected in parallel.
+    pointHits = [None] * len(windowTestPts)
+    
+    def project(ptCount):
+        pt = windowTestPts[ptCount]
+        origin = (pt.X, pt.Y, pt.Z)
+        hits = []
+        for vecCount, direction in enumerate(directions):
+            if contextCaster != None and contextCaster.isBlocked(origin, direction): continue
+            cell = shadeCaster.traverse(origin[0], origin[1], origin[2], direction)[0]
+            if cell != -1: hits.append((cell, vecCount))
+        pointHits[ptCount] = hits
+    
+    #If parallel is true, then project the points in parallel.
+    if parallel_ == True:
+        tasks.Parallel.ForEach(range(len(windowTestPts)), project)
+    else:
+        for ptCount in range(len(windowTestPts)): project(ptCount)
     
-    for pt in windowTestPts: sunLines.append([]) 
+    #Build a sparse cells x sun vectors matrix with the number of test points that see each sun vector through each cell.
+    hitMatrix = [{} for face in faces]
+    for hits in pointHits:
+        for cell, vecCount in hits:
+            cellHits = hitMatrix[cell]
+            cellHits[vecCount] = cellHits.get(vecCount, 0) + 1
     
-    for ptCount, pt in enumerate(windowTestPts):
-        for vec in sunVectors:
-            if context_:
-                if rc.Geometry.Intersect.Intersection.MeshRay(contextMesh, rc.Geometry.Ray3d(pt, vec)) < 0:
-                    sunLines[ptCount].append(rc.Geometry.Line(pt, lineLength * vec))
-                else: sunLines[ptCount].append(0)
-            else:
-                sunLines[ptCount].append(rc.Geometry.Line(pt, lineLength * vec))
-            
+    return hitMatrix
+
+
+def getEffectWeights(ECool, EBeam):
+    #Calculate the cooling and heating effect of fully shading the window for each sun vector.
+    #The effect of shading part of the window is the same weight multiplied by the percent blocked.
+    coolWeights = []
+    heatWeights = []
+    for eCool, eBeam in zip(ECool, EBeam):
+        coolWeight, heatWeight = 0, 0
+        if eBeam < eCool: coolWeight += eBeam
+        if -eBeam > eCool: heatWeight += -eBeam
+        if eCool < eBeam and eCool > -eBeam:
+            if eCool > 0: coolWeight += eCool
+            else: heatWeight += eCool
+        coolWeights.append(coolWeight)
+        heatWeights.append(heatWeight)
     
-    #If parallel is true, then run the intersection through the parallel function.  If not, run it through the normal function.
-    if parallel_ == True:
-        faceInt = parallel_projection(analysisMesh, sunLines, windowTestPts)
-    else:
-        faceInt = nonparallel_projection(analysisMesh, sunLines, windowTestPts)
-    
-    #Convert the Number Of Intersections for Each Mesh Face into a Percent of Sun Blocked by Each Mesh Face for Each Hour of the Year.
-    percentBlocked = []
-    for face in range(analysisMesh.Faces.Count):
-        percentBlocked.append(len(sunVectors) *[0])
-    
-    testPtsCount = len(windowTestPts) 
-    # for each mesh surface,
-    for faceCount, faceData in enumerate(faceInt):
-        # check the number of intersections for each hour
-        counter= collections.Counter(faceData)
-        
-        for hour in counter.keys():
-             # store the result in the new percentBlocked list
-             percentBlocked[faceCount][hour] = counter[hour]/testPtsCount
+    return coolWeights, heatWeights
+
+
+def evaluateShade(coolingLoad, heatingLoad, beamGain, analysisMesh, analysisAreas, windowTestPts, sunVectors, skyResolution):
+    #Find how many of the window test points see each sun vector through each cell of the shade.
+    hitMatrix = projectSunVectors(analysisMesh, windowTestPts, sunVectors)
     
     #Calculate ECool and EBeam, which signify the cooling energy at stake and the solar energy at stake respectively.
     ECool = [a-b for a,b in zip(coolingLoad,heatingLoad)]
     EBeam = beamGain
+    coolWeights, heatWeights = getEffectWeights(ECool, EBeam)
     
-    #Compare the percent blocked for each hour with the temperatre at that hour in relation to the balance point in order to determine the net value of shading.
+    #If the sky resolution is greater than 4, divide the result by the number of additional timesteps that have been added.
     if skyResolution > 4: extraDivisor = (math.pow(2, (skyResolution-4)))
-    else: extraDivisor = 0
+    else: extraDivisor = 1
+    testPtsCount = float(len(windowTestPts))
+    
+    #Multiply the percent of the sun blocked by each cell with the weights of the sun vectors.
+    #Normalize the effects by the area of the cell such that there is a consistent metric between cells of different areas.
     shadeHelpfulness = []
     shadeHarmfulness = []
     shadeNetEffect = []
-    for cellCount, cell in enumerate(percentBlocked):
-        shadeHelp, shadeHarm, shadeNet = valCalc(cell, ECool, EBeam, analysisAreas[cellCount], extraDivisor)
-        shadeHelpfulness.append(shadeHelp)
-        shadeHarmfulness.append(shadeHarm)
-        shadeNetEffect.append(shadeNet)
+    for cellCount, cellHits in enumerate(hitMatrix):
+        deltaCooling = sum(count * coolWeights[vecCount] for vecCount, count in cellHits.iteritems()) / testPtsCount
+        deltaHeating = sum(count * heatWeights[vecCount] for vecCount, count in cellHits.iteritems()) / testPtsCount
+        divisor = analysisAreas[cellCount] * extraDivisor
+        shadeHelpfulness.append(deltaCooling / divisor)
+        shadeHarmfulness.append(deltaHeating / divisor)
+        shadeNetEffect.append((deltaCooling + deltaHeating) / divisor)
     
     return shadeHelpfulness, shadeHarmfulness, shadeNetEffect
 
@@ -722,14 +657,13 @@ def main(allDataDict, sunVectors, skyResolution, legendPar, lb_preparation, lb_v
             heatingLoad = allDataDict[path]["heatingFinal"]
             beamGain = allDataDict[path]["beamFinal"]
             
-            windowMesh = rc.Geometry.Mesh.CreateFromBrep(allDataDict[path]["windowSrf"])[0]
             windowPoints = allDataDict[path]["windowPts"]
             
             for shadeCount, shadeMesh in enumerate(allDataDict[path]["shadeMesh"]):
                 totalShadeGeo.append(shadeMesh)
                 shadeMeshListInit[windowCount].append(shadeMesh)
                 shadeMeshAreas = allDataDict[path]["shadeMeshAreas"][shadeCount]
-                shadeHelpfulness, shadeHarmfulness, shadeNetEffect = evaluateShade(coolingLoad, heatingLoad, beamGain, shadeMesh, shadeMeshAreas, windowMesh, windowPoints, sunVectors, skyResolution)
+                shadeHelpfulness, shadeHarmfulness, shadeNetEffect = evaluateShade(coolingLoad, heatingLoad, beamGain, shadeMesh, shadeMeshAreas, windowPoints, sunVectors, skyResolution)
                 
                 
                 for item in shadeNetEffect: totalNetEffect.append(item)
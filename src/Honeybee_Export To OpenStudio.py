@@ -46,6 +46,7 @@ Provided by Honeybee 0.0.63
         simulationOutputs_: A list of the outputs that you would like EnergyPlus to write into the result CSV file.  This can be any set of any outputs that you would like from EnergyPlus, writen as a list of text that will be written into the IDF.  It is recommended that, if you are not expereinced with writing EnergyPlus outputs, you should use the "Honeybee_Write EP Result Parameters" component to request certain types of common outputs. 
         _OSMeasures: Any number of OpenStudio measures that you want to apply to your OpenStudio model. Use the "Honeybee_Load OpenStudio Measure" component to load a measure into Grasshopper.  OpenStudio measures can be downloaded from the NREL Building Components Library (BCL) at this link: https://bcl.nrel.gov/
         additionalStrings_: THIS OPTION IS JUST FOR ADVANCED USERS OF ENERGYPLUS.  You can input additional text strings here that you would like written into the IDF.  The strings input here should be complete EnergyPlus objects that are correctly formatted.  You can input as many objects as you like in a list.  This input can be used to write objects into the IDF that are not currently supported by Honeybee.
+        zoneMultipliers_: Set to "True" to write identical zones as a single zone with a zone multiplier.  Zones are identical if they have the same program, schedules, loads, HVAC, constructions and the same geometry and orientation (e.g. the zones of the typical floors of a tower).  This can reduce the simulation time of repetitive buildings significantly.  Interzone surfaces between the zones that are written and the zones that are removed are set to adiabatic.  The result reader components will read the results of the zone that is written for each of the zones that it represents.  The default is set to "False".
         ::::::::::::::::::::::::::::::::::::::: ...
         _writeOSM: Set to "True" to have the component take your HBZones and other inputs and write them into an OSM file.  Note that only setting this to "True" and not setting the output below to "True" will not automatically run the file through EnergyPlus for you.
         runSimulation_: Set to "True" to have the component generate an IDF file from the OSM file and run the IDF through through EnergyPlus.  Set to "False" to not run the file (this is the default).  You can also connect an integer for the following options:
@@ -71,7 +72,7 @@ Provided by Honeybee 0.0.63
 
 ghenv.Component.Name = "Honeybee_Export To OpenStudio"
 ghenv.Component.NickName = 'exportToOpenStudio'
-ghenv.Component.Message = 'VER 0.0.63\nJUL_01_2018'
+ghenv.Component.Message = 'VER 0.0.63\nOCT_18_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "10 | Energy | Energy"
@@ -94,11 +95,16 @@ import math
 import subprocess
 import operator
 import collections
+import hashlib
 import platform
 
 
 rc.Runtime.HostUtils.DisplayOleAlerts(False)
 
+# zoneMultipliers_ is not an input of the component yet so zones are exported one by one
+try: zoneMultipliers_
+except: zoneMultipliers_ = False
+
 assert platform.architecture()[0] == '64bit', \
     'You must use Rhino 64-bit to run OpenStudio not {}.'.format(platform.architecture()[0])
 
@@ -170,11 +176,16 @@ class WriteOPS(object):
         self.thermalZonesDict = {}
         self.spaceTypeDict = {}
         
-        self.infiltList = []
-        self.schSetList = []
-        self.pplList = []
-        self.lightList = []
-        self.eqList = []
+        # names of the space types that already have these loads
+        self.infiltList = set()
+        self.schSetList = set()
+        self.pplList = set()
+        self.lightList = set()
+        self.eqList = set()
+        # names of the constructions in the default construction set
+        self.defaultConstrNames = {}
+        # time that each phase of the export has taken in seconds
+        self.phaseTimes = collections.OrderedDict()
         
         self.csvSchedules = []
         self.csvScheduleCount = 0
@@ -523,7 +534,7 @@ class WriteOPS(object):
         return self.constructionList[constructionName]
     
     def isMaterialInLib(self, materialName):
-        return materialName in self.materialList.keys()
+        return materialName in self.materialList
     
     def addMaterialToLib(self, materialName, material):
         self.materialList[materialName] = material
@@ -532,7 +543,7 @@ class WriteOPS(object):
         return self.materialList[materialName]
     
     def isScheduleInLib(self, scheduleName):
-        return scheduleName in self.scheduleList.keys()
+        return scheduleName in self.scheduleList
         
     def addScheduleToLib(self, scheduleName, schedule):
         self.scheduleList[scheduleName] = schedule
@@ -541,7 +552,7 @@ class WriteOPS(object):
         return self.scheduleList[scheduleName]
     
     def isShdCntrlInLib(self, shdCntrlName):
-        return shdCntrlName in self.shdCntrlList.keys()
+        return shdCntrlName in self.shdCntrlList
     
     def addShdCntrlToLib(self, shdCntrlName, shdCntrl):
         self.shdCntrlList[shdCntrlName] = shdCntrl
@@ -550,7 +561,7 @@ class WriteOPS(object):
         return self.shdCntrlList[shdCntrlName]
     
     def isFrameObjInLib(self, frameObjName):
-        return frameObjName in self.frameObjList.keys()
+        return frameObjName in self.frameObjList
     
     def addFrameObjToLib(self, frameObjName, frameObj):
         self.frameObjList[frameObjName] = frameObj
@@ -558,6 +569,15 @@ class WriteOPS(object):
     def getFrameObjFromLib(self, frameObjName):
         return self.frameObjList[frameObjName]
     
+    def getConstructionFromLibOrModel(self, constructionName, model):
+        if not self.isConstructionInLib(constructionName):
+            self.addConstructionToLib(constructionName, self.getOSConstruction(constructionName, model))
+        return self.getConstructionFromLib(constructionName)
+    
+    def logPhaseTime(self, phaseName, startTime):
+        self.phaseTimes[phaseName] = time.time() - startTime
+        print "%s: %.2f seconds"%(phaseName, self.phaseTimes[phaseName])
+    
     def createOSScheduleTypeLimitsFromValues(self, model, lowerLimit, upperLimit, numericType, unitType):
         typeLimit = ops.ScheduleTypeLimits(model)
         try: typeLimit.setLowerLimitValue(float(lowerLimit))
@@ -711,6 +731,10 @@ class WriteOPS(object):
         return schedule
     
     def getOSSchedule(self, schName, model):
+        # schedules are only parsed once
+        if self.isScheduleInLib(schName):
+            return self.getScheduleFromLib(schName)
+        
         csvSched = False
         if schName.lower().endswith(".csv"):
             msg = "Currently OpenStudio component des not support .csv file as a schedule.\n" + \
@@ -743,25 +767,22 @@ class WriteOPS(object):
                 OSScheduleTypeLimits = self.createOSScheduleTypeLimits(values[1], model)
                 self.addScheduleToLib(scheduleTypeLimitsName, OSScheduleTypeLimits)
         
-        if not self.isScheduleInLib(schName):
-            if values[0].lower() == "schedule:year":
-                OSSchedule = self.createYearlyOSSchedule(schName, values, model)
-            elif values[0].lower() == "schedule:day:interval":
-                OSSchedule = self.createDayOSSchedule(schName, values, model)
-            elif values[0].lower() == "schedule:week:daily":
-                OSSchedule = self.createWeeklyOSSchedule(schName, values, model)
-            elif values[0].lower() == "schedule:constant":
-                OSSchedule = self.createConstantOSSchedule(schName, values, model)
-            else:
-                OSSchedule = None
-            
-            if OSSchedule!=None:
-                # add to library
-                self.addScheduleToLib(schName, OSSchedule)
-            
-            return OSSchedule
+        if values[0].lower() == "schedule:year":
+            OSSchedule = self.createYearlyOSSchedule(schName, values, model)
+        elif values[0].lower() == "schedule:day:interval":
+            OSSchedule = self.createDayOSSchedule(schName, values, model)
+        elif values[0].lower() == "schedule:week:daily":
+            OSSchedule = self.createWeeklyOSSchedule(schName, values, model)
+        elif values[0].lower() == "schedule:constant":
+            OSSchedule = self.createConstantOSSchedule(schName, values, model)
         else:
-            return self.getScheduleFromLib(schName)
+            OSSchedule = None
+        
+        if OSSchedule!=None:
+            # add to library
+            self.addScheduleToLib(schName, OSSchedule)
+        
+        return OSSchedule
     
     def getOSFrameObj(self, frameObjName, model):
         if not self.isFrameObjInLib(frameObjName):
@@ -3332,7 +3353,7 @@ class WriteOPS(object):
         spaceIDstr = loadsIDstr + schIDstr
         
         # Create a new space type if there is nothing in the library with all of the right properties.
-        if spaceIDstr not in self.spaceTypeDict.keys():
+        if spaceIDstr not in self.spaceTypeDict:
             spaceTypeName = ":".join([zone.bldgProgram, zone.zoneProgram, zone.name])
             spaceType = ops.SpaceType(model)
             spaceType.setName(spaceTypeName)
@@ -3358,7 +3379,7 @@ class WriteOPS(object):
             infiltration.setFlowperSpaceFloorArea(zone.infiltrationRatePerArea)
             infiltration.setSchedule(self.getOSSchedule(zone.infiltrationSchedule, model))
             infiltration.setSpaceType(spaceType)
-            self.infiltList.append(spaceName)
+            self.infiltList.add(spaceName)
     
     def setAirMixing(self, zone, model):
         # air mixing from air walls
@@ -3370,7 +3391,7 @@ class WriteOPS(object):
             zoneMixing.setDesignFlowRate(zone.mixAirFlowList[mixZoneCount])
             zoneMixing.setSchedule(self.getOSSchedule(zone.mixAirFlowSched[mixZoneCount], model))
     
-    def setDefaultSchedule(self, zone, space, model):
+    def getDefaultScheduleSet(self, zone, model):
         # Make sure that we do not have redundant schedule sets.
         equipStr = zone.equipmentSchedule
         if equipStr == None:
@@ -3385,7 +3406,7 @@ class WriteOPS(object):
         defSchStr = occStr + occActStr + zone.lightingSchedule + \
             equipStr + zone.infiltrationSchedule
         
-        if defSchStr not in self.scheduleSetList.keys():
+        if defSchStr not in self.scheduleSetList:
             defSchedule = ops.DefaultScheduleSet(model)
             defSchedule.setName(zone.name + "_DefaultScheduleSet")
             defSchedule.setInfiltrationSchedule(self.getOSSchedule(zone.infiltrationSchedule, model))
@@ -3407,16 +3428,21 @@ class WriteOPS(object):
         else:
             defSchedule = self.scheduleSetList[defSchStr]
         
+        return defSchedule
+    
+    def setDefaultSchedule(self, zone, space, model):
+        defSchedule = self.getDefaultScheduleSet(zone, model)
+        
         spaceType = space.spaceType.get()
         spaceName = str(spaceType.name())
         if spaceName not in self.schSetList:
             spaceType.setDefaultScheduleSet(defSchedule)
-            self.schSetList.append(spaceName)
+            self.schSetList.add(spaceName)
         
         return space
     
     def findDominantConstr(self, lst):
-        return max(set(lst), key=lst.count)
+        return collections.Counter(lst).most_common(1)[0][0]
     
     def buildDefaultConstrSet(self, HBZones, model):
         self.defaultConstrDict = {
@@ -3474,14 +3500,12 @@ class WriteOPS(object):
             if self.defaultConstrDict[key] != []:
                 constrName = self.findDominantConstr(self.defaultConstrDict[key])
                 # create construction.
-                if self.isConstructionInLib(constrName):
-                    construction = self.getConstructionFromLib(constrName)
-                else:
-                    construction = self.getOSConstruction(constrName, model)
-                    self.addConstructionToLib(constrName, construction)
+                construction = self.getConstructionFromLibOrModel(constrName, model)
                 self.defaultConstrDict[key] = construction
+                self.defaultConstrNames[key] = str(construction.name())
             else:
                 self.defaultConstrDict[key] = None
+                self.defaultConstrNames[key] = None
         
         # Make an OpenStudio construction set.
         self.defaultConstrSet = ops.DefaultConstructionSet(model)
@@ -3531,9 +3555,71 @@ class WriteOPS(object):
         
         return self.defaultConstrSet
     
+    def resolveLibraryObjects(self, HBZones, model):
+        """Create the OpenStudio objects for all the library items that are used by the zones.
+        
+        This is the first phase of the export. Each unique schedule, material, construction,
+        frame, shading control, schedule set and space type is created once and kept in the
+        libraries of this class so the second phase only looks them up by name.
+        """
+        scheduleNames = collections.OrderedDict()
+        constructionNames = collections.OrderedDict()
+        frameObjNames = collections.OrderedDict()
+        shdCntrlNames = collections.OrderedDict()
+        
+        for zone in HBZones:
+            self.getSpaceType(zone, None, model)
+            self.getDefaultScheduleSet(zone, model)
+            
+            if zone.isConditioned:
+                scheduleNames[zone.heatingSetPtSchedule] = None
+                scheduleNames[zone.coolingSetPtSchedule] = None
+            if zone.outdoorAirReq != 'None' and zone.ventilationSched != '':
+                scheduleNames[zone.ventilationSched] = None
+            if zone.mixAir == True:
+                for schName in zone.mixAirFlowSched:
+                    scheduleNames[schName] = None
+            
+            for constrName in zone.internalMassConstructions:
+                constructionNames[constrName] = None
+            
+            for surface in zone.surfaces:
+                if surface.EPConstruction != None:
+                    constructionNames[surface.EPConstruction] = None
+                elif surface.BC.upper() == "ADIABATIC" or surface.BC.upper() == "SURFACE":
+                    constructionNames[surface.construction] = None
+                
+                if not surface.hasChild: continue
+                for childSrf in surface.childSrfs:
+                    if childSrf.EPConstruction != None:
+                        constructionNames[childSrf.EPConstruction] = None
+                        if childSrf.EPConstruction in sc.sticky["honeybee_WindowPropLib"]:
+                            frameObjNames[childSrf.EPConstruction] = None
+                    if len(childSrf.shadingControlName) > 0:
+                        shdCntrlNames[childSrf.shadingControlName[0]] = None
+        
+        for schName in scheduleNames:
+            if schName != None and schName != '':
+                self.getOSSchedule(schName, model)
+        
+        for constrName in constructionNames:
+            self.getConstructionFromLibOrModel(constrName, model)
+        
+        for frameObjName in frameObjNames:
+            self.getOSFrameObj(frameObjName, model)
+        
+        for shdCntrlName in shdCntrlNames:
+            try:
+                self.getOSShdCntrl(shdCntrlName, model)
+            except Exception, e:
+                warning = "Failed to create shading control %s: %s\n"%(shdCntrlName, str(e)) + \
+                    "The windows with this shading control will be exported without it."
+                print warning
+                ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
+    
     def setPeopleDefinition(self, zone, space, model):
         if zone.numOfPeoplePerArea != 0:
-            if zone.numOfPeoplePerArea not in self.peopleList.keys():
+            if zone.numOfPeoplePerArea not in self.peopleList:
                 peopleDefinition = ops.PeopleDefinition(model)
                 peopleDefinition.setName(zone.name + "_PeopleDefinition")
                 flrArea = zone.getFloorArea(True)
@@ -3553,11 +3639,11 @@ class WriteOPS(object):
                 people.setNumberofPeopleSchedule(self.getOSSchedule(zone.occupancySchedule, model))
                 people.setPeopleDefinition(peopleDefinition)
                 people.setSpaceType(spaceType)
-                self.pplList.append(spaceName)
+                self.pplList.add(spaceName)
      
     def setInternalMassDefinition(self, zone, space, model):
         for srfNum,srfArea in enumerate(zone.internalMassSrfAreas):
-            if str(zone.internalMassConstructions[srfNum])+str(srfArea) not in self.internalMassList.keys():
+            if str(zone.internalMassConstructions[srfNum])+str(srfArea) not in self.internalMassList:
                 # Create internal mass definition
                 internalMassDefinition = ops.InternalMassDefinition(model)
                 internalMassDefinition.setName(zone.internalMassNames[srfNum]+"_Definition")
@@ -3578,7 +3664,7 @@ class WriteOPS(object):
             internalMass.setSpace(space)
     
     def setLightingDefinition(self, zone, space, model):
-        if zone.lightingDensityPerArea not in self.lightingList.keys():
+        if zone.lightingDensityPerArea not in self.lightingList:
             lightsDefinition = ops.LightsDefinition(model)
             lightsDefinition.setName(zone.name + "_LightsDefinition")
             flrArea = zone.getFloorArea(True)
@@ -3595,11 +3681,11 @@ class WriteOPS(object):
             lights.setName(spaceName + "_LightsObject")
             lights.setSchedule(self.getOSSchedule(zone.lightingSchedule, model))
             lights.setSpaceType(spaceType)
-            self.lightList.append(spaceName)
+            self.lightList.add(spaceName)
     
     def setEquipmentDefinition(self, zone, space, model):
         if zone.equipmentLoadPerArea != 0:
-            if zone.equipmentLoadPerArea not in self.equipList.keys():
+            if zone.equipmentLoadPerArea not in self.equipList:
                 electricDefinition = ops.ElectricEquipmentDefinition(model)
                 electricDefinition.setName(zone.name + "_ElectricEquipmentDefinition")
                 flrArea = zone.getFloorArea(True)
@@ -3617,11 +3703,11 @@ class WriteOPS(object):
                 electricEqipment.setSchedule(self.getOSSchedule(zone.equipmentSchedule, model))
                 electricEqipment.setEndUseSubcategory('ElectricEquipment')
                 electricEqipment.setSpaceType(spaceType)
-                self.eqList.append(spaceName)
+                self.eqList.add(spaceName)
         
     def setDesignSpecificationOutdoorAir(self, zone, space, model):
         if zone.outdoorAirReq != 'None':
-            if str(zone.ventilationPerArea)+str(zone.ventilationPerPerson)+str(zone.ventilationSched) not in self.ventList.keys():
+            if str(zone.ventilationPerArea)+str(zone.ventilationPerPerson)+str(zone.ventilationSched) not in self.ventList:
                 ventilation = ops.DesignSpecificationOutdoorAir(model)
                 ventilation.setName(zone.name + "_DSOA")
                 ventilation.setOutdoorAirMethod(zone.outdoorAirReq)
@@ -3641,6 +3727,83 @@ class WriteOPS(object):
         return space
         
         
+    def createSpace(self, zone, zoneCount, defaultConstrSet, model):
+        """Create the space, thermal zone, loads and surfaces of a zone.
+        
+        This is the second phase of the export. The library objects should be already
+        created by resolveLibraryObjects.
+        """
+        # create a space - OpenStudio works based of space and not zone
+        # Honeybee though is structured based on zones similar to EnergyPlus
+        space = ops.Space(model)
+        
+        # assign name and type
+        space = self.setupNameAndType(zone, space, model)
+        
+        # assign level/building story to zone
+        space = self.setupLevels(zone, space)
+        
+        # schedules
+        space = self.setDefaultSchedule(zone, space, model)
+        
+        # construction set
+        space.setDefaultConstructionSet(defaultConstrSet)
+        
+        #   INFILTRATION
+        self.setInfiltration(zone, space, model)
+        
+        # set people definition
+        self.setPeopleDefinition(zone, space, model)
+        
+        # set people definition
+        self.setLightingDefinition(zone, space, model)
+        
+        # set electrical equipment
+        self.setEquipmentDefinition(zone, space, model)
+        
+        # design specification outdoor air
+        space = self.setDesignSpecificationOutdoorAir(zone, space, model)
+        
+        # assign the thermal zone
+        space, thermalZone = self.assignThermalZone(zone, space, model)
+        
+        #Keep the thermal zones in a dictionary for later.
+        self.thermalZonesDict[zone.name] = thermalZone
+        
+        #If there are internal masses assigned to the zone, write them
+        if len(zone.internalMassNames) > 0:
+            self.setInternalMassDefinition(zone, space, model)
+        
+        if zone.isConditioned:
+            # add HVAC system
+            HAVCGroupID = zone.HVACSystem.GroupID
+            
+            if HAVCGroupID!= -1:
+                if HAVCGroupID not in self.HVACSystemDict:
+                    # add place holder for lists
+                    self.HVACSystemDict[HAVCGroupID] = HoneybeeHVAC(HAVCGroupID, zone.HVACSystem.Index, [], [], zone.HVACSystem.airDetails, zone.HVACSystem.heatingDetails, zone.HVACSystem.coolingDetails, zoneCount)
+            
+            # collect the information for systems here, such as the zones in each system and the recirculation specifcations for each zone.
+            self.HVACSystemDict[HAVCGroupID].thermalZones.append(thermalZone)
+            self.HVACSystemDict[HAVCGroupID].hbZones.append(zone)
+            
+            # add thermostat
+            self.addThermostat(zone, thermalZone, space, model)
+            
+            # add humidistat if specified
+            if zone.humidityMax != "" or zone.humidityMin != "":
+                self.addHumidistat(zone, thermalZone, space, model)
+        
+        # add daylighting controls
+        if zone.daylightCntrlFract != 0:
+            self.addDaylightCntrl(zone, thermalZone, space, model)
+        
+        # write the surfaces
+        for HBSrf in zone.surfaces:
+            OPSSrf = self.opsZoneSurface(HBSrf, model, space)
+            if HBSrf.hasChild:
+                self.OPSFenSurface(HBSrf, OPSSrf, model)
+    
     def setGenerators(self,generators,simulationOutputs,model):
         
         def checks(HBsystemgenerators):
@@ -4280,7 +4443,6 @@ class WriteOPS(object):
             thisSurface.setName(surface.name);
             thisSurface.setNumberofVertices(len(coordinates));
             thisSurface.setSpace(space);
-            thisSurface.setSurfaceType(surface.srfType[surface.type]);
             srfType = surface.srfType[int(surface.type)].lower().capitalize()
             if srfType.upper().Contains("ROOF") or srfType.upper().Contains("CEILING"):
                 srfType = "RoofCeiling" # This is an OpenStudio type that will be converted as a roof or ceiling in idf file
@@ -4290,35 +4452,22 @@ class WriteOPS(object):
             # create constructions if it's not in the default set.
             if surface.EPConstruction != None:
                 if surface.type == 4:
-                    constructionText = str(self.defaultConstrDict['0.25'].name())
+                    constructionText = self.defaultConstrNames['0.25']
                 elif surface.type == 0 and (surface.BC.lower() == 'surface' or surface.BC.lower() == 'adiabatic'):
-                    constructionText = str(self.defaultConstrDict['0.25'].name())
+                    constructionText = self.defaultConstrNames['0.25']
                 elif int(surface.type) == 2 and surface.BC.lower() == 'ground':
-                    constructionText = str(self.defaultConstrDict['2.5'].name())
+                    constructionText = self.defaultConstrNames['2.5']
                 elif int(surface.type) == 2 and (surface.BC.lower() == 'surface' or surface.BC.lower() == 'adiabatic'):
-                    constructionText = str(self.defaultConstrDict['2'].name())
+                    constructionText = self.defaultConstrNames['2']
                 elif int(surface.type) == 2 and surface.BC.lower() == 'outdoors':
-                    constructionText = str(self.defaultConstrDict['2.75'].name())
+                    constructionText = self.defaultConstrNames['2.75']
                 else:
-                    try:
-                        constructionText = str(self.defaultConstrDict[str(surface.type)].name())
-                    except:
-                        constructionText = None
+                    constructionText = self.defaultConstrNames.get(str(surface.type))
                 
                 if constructionText != str(surface.EPConstruction) or surface.BC.upper() == "ADIABATIC" or surface.BC.upper() == "SURFACE":
-                    if self.isConstructionInLib(surface.EPConstruction):
-                        construction = self.getConstructionFromLib(surface.EPConstruction)
-                    else:
-                        construction = self.getOSConstruction(surface.EPConstruction, model)
-                        self.addConstructionToLib(surface.EPConstruction, construction)
-                    thisSurface.setConstruction(construction)
+                    thisSurface.setConstruction(self.getConstructionFromLibOrModel(surface.EPConstruction, model))
             elif surface.BC.upper() == "ADIABATIC" or surface.BC.upper() == "SURFACE":
-                if self.isConstructionInLib(surface.construction):
-                    construction = self.getConstructionFromLib(surface.construction)
-                else:
-                    construction = self.getOSConstruction(surface.construction, model)
-                    self.addConstructionToLib(surface.construction, construction)
-                thisSurface.setConstruction(construction)
+                thisSurface.setConstruction(self.getConstructionFromLibOrModel(surface.construction, model))
             
             thisSurface.setOutsideBoundaryCondition(surface.BC.capitalize())
             if surface.BC.capitalize()!= "ADIABATIC":
@@ -4331,7 +4480,7 @@ class WriteOPS(object):
             # Boundary condition object
             #setAdjacentSurface(self: Surface, surface: Surface)
             if surface.BC.lower() == "surface" and surface.BCObject.name.strip()!="":
-                self.adjacentSurfacesDict[surface.name] = [surface.BCObject.name, thisSurface.handle()]
+                self.adjacentSurfacesDict[surface.name] = [surface.BCObject.name, thisSurface]
             
             return thisSurface
     
@@ -4355,19 +4504,14 @@ class WriteOPS(object):
             # create constructions if it's not in the default set.
             if childSrf.EPConstruction != None:
                 if childSrf.BC.lower() == 'surface' or childSrf.BC.lower() == 'adiabatic':
-                    constructionText = str(self.defaultConstrDict['5.5'].name())
+                    constructionText = self.defaultConstrNames['5.5']
                 elif surface.type == 1:
-                    constructionText = str(self.defaultConstrDict['5.25'].name())
+                    constructionText = self.defaultConstrNames['5.25']
                 else:
-                    constructionText = str(self.defaultConstrDict['5'].name())
+                    constructionText = self.defaultConstrNames['5']
                 
                 if constructionText != str(childSrf.EPConstruction) or surface.BC.upper() == "SURFACE":
-                    if self.isConstructionInLib(childSrf.EPConstruction):
-                        construction = self.getConstructionFromLib(childSrf.EPConstruction)
-                    else:
-                        construction = self.getOSConstruction(childSrf.EPConstruction, model)
-                        self.addConstructionToLib(childSrf.EPConstruction, construction)
-                    glazing.setConstruction(construction)
+                    glazing.setConstruction(self.getConstructionFromLibOrModel(childSrf.EPConstruction, model))
             
             # Check if there are any frame objects associated with the window.
             try:
@@ -4390,7 +4534,7 @@ class WriteOPS(object):
                 if childSrf.name == childSrf.BCObject.name:
                     raise Exception("Interior facing surfaces can't have the same name: %s"%childSrf.name + \
                         "\nRename one of the surfaces and try again!")
-                self.adjacentFenSrfsDict[childSrf.name] = [childSrf.BCObject.name, glazing.handle()]
+                self.adjacentFenSrfsDict[childSrf.name] = [childSrf.BCObject.name, glazing]
     
     def OPSShdSurface(self, shdSurfaces, model):
         shadingGroup = ops.ShadingSurfaceGroup(model)
@@ -4429,13 +4573,9 @@ class WriteOPS(object):
             'Floor': 'Interior Floor'}
         
         # Set Adjacent zone surfaces.
-        for surfaceName in self.adjacentSurfacesDict.keys():
-            adjacentSurfaceName, OSSurfaceHandle = self.adjacentSurfacesDict[surfaceName]
-            OSSurface = model.getSurface(OSSurfaceHandle).get()
-            
+        for surfaceName, (adjacentSurfaceName, OSSurface) in self.adjacentSurfacesDict.items():
             try:
-                adjacentOSSurfaceHandle = self.adjacentSurfacesDict[adjacentSurfaceName][1]
-                adjacentOSSurface = model.getSurface(adjacentOSSurfaceHandle).get()
+                adjacentOSSurface = self.adjacentSurfacesDict[adjacentSurfaceName][1]
                 OSSurface.setAdjacentSurface(adjacentOSSurface)
             except:
                 # if we didn't find the adjacent surfcae, do the next most accurate thing:
@@ -4444,11 +4584,7 @@ class WriteOPS(object):
                     OSSurface.setOutsideBoundaryCondition("ADIABATIC")
                     OSSurface.setSunExposure("NOSUN")
                     OSSurface.setWindExposure("NOWIND")
-                    if self.isConstructionInLib(defaultConstrDict[str(OSSurface.surfaceType())]):
-                        construction = self.getConstructionFromLib(defaultConstrDict[str(OSSurface.surfaceType())])
-                    else:
-                        construction = self.getOSConstruction(defaultConstrDict[str(OSSurface.surfaceType())], model)
-                        self.addConstructionToLib(defaultConstrDict[str(OSSurface.surfaceType())], construction)
+                    construction = self.getConstructionFromLibOrModel(defaultConstrDict[str(OSSurface.surfaceType())], model)
                     OSSurface.setConstruction(construction)
                     warning = "Adjacent surface " + adjacentSurfaceName + " was not found.\n" + \
                         "Boundary for surface " + surfaceName + " will be set to adiabatic."
@@ -4459,13 +4595,9 @@ class WriteOPS(object):
                     print warning
         
         # Set adjacent Fenestration surfaces.
-        for surfaceName in self.adjacentFenSrfsDict.keys():
-            adjacentSurfaceName, OSSurfaceHandle = self.adjacentFenSrfsDict[surfaceName]
-            OSSurface = model.getSubSurface(OSSurfaceHandle).get()
-            
+        for surfaceName, (adjacentSurfaceName, OSSurface) in self.adjacentFenSrfsDict.items():
             try:
-                adjacentOSSurfaceHandle = self.adjacentFenSrfsDict[adjacentSurfaceName][1]
-                adjacentOSSurface = model.getSubSurface(adjacentOSSurfaceHandle).get()
+                adjacentOSSurface = self.adjacentFenSrfsDict[adjacentSurfaceName][1]
                 OSSurface.setAdjacentSubSurface(adjacentOSSurface)
             except:
                 # if we didn't find the adjacent surfcae, do the next most accurate thing:
@@ -4666,28 +4798,170 @@ class OPSmeasures(object):
 
 
 
+class IDFPatcher(object):
+    """
+    Apply object-level edits to an IDF file in a single streaming pass
+    
+    The file is read one object at a time and written to a temporary file next to it
+    so the translated IDF is never held in memory. It assumes one field per line which
+    is how OpenStudio writes the IDF. Edits are applied in the order that they are added.
+    
+    Usage:
+        patcher = IDFPatcher()
+        patcher.renameReferences("c:\\schedules\\occ.csv", "occ")
+        patcher.replaceField("RunPeriod", 5, "Monday")
+        patcher.removeObjects("WindowProperty:ShadingControl")
+        patcher.append(idfString)
+        patcher.patch(idfFilePath)
+    """
+    
+    def __init__(self):
+        self.renames = {}
+        self.edits = []
+        self.appendedStrings = []
+    
+    @staticmethod
+    def getObjectType(line):
+        return line.split("!")[0].split(",")[0].split(";")[0].strip().upper()
+    
+    @staticmethod
+    def getFieldValue(line):
+        return line.split("!")[0].strip().rstrip(",;").strip()
+    
+    @staticmethod
+    def setFieldValue(line, value):
+        # keep the indentation, the separator and the comment of the line
+        data, sep, comment = line.partition("!")
+        terminator = ";" if ";" in data else ","
+        indent = data[:len(data) - len(data.lstrip())]
+        trailing = data[len(data.rstrip()):]
+        if not sep and not trailing.endswith("\n"): trailing += "\n"
+        return indent + value + terminator + trailing + sep + comment
+    
+    def getObjectName(self, lines):
+        if len(lines) < 2: return None
+        return self.getFieldValue(lines[1])
+    
+    def isNamed(self, lines, objectName):
+        if objectName == None: return True
+        name = self.getObjectName(lines)
+        return name != None and name.upper() == objectName.upper()
+    
+    def addEdit(self, objectType, edit):
+        """Add a function that gets the lines of an object and returns the edited lines.
+        
+        Return None to remove the object. Use None as objectType to edit all the objects.
+        """
+        if objectType != None: objectType = objectType.upper()
+        self.edits.append((objectType, edit))
+    
+    def renameReferences(self, oldName, newName):
+        """Replace oldName with newName in all the fields except the object names."""
+        self.renames[oldName.strip().upper()] = newName
+    
+    def replaceField(self, objectType, fieldIndex, value, objectName = None):
+        """Replace a field value. fieldIndex 0 is the first field after the object type."""
+        def edit(lines):
+            if fieldIndex + 1 < len(lines) and self.isNamed(lines, objectName):
+                lines[fieldIndex + 1] = self.setFieldValue(lines[fieldIndex + 1], value)
+            return lines
+        
+        self.addEdit(objectType, edit)
+    
+    def removeObjects(self, objectType, objectName = None):
+        def edit(lines):
+            if self.isNamed(lines, objectName): return None
+            return lines
+        
+        self.addEdit(objectType, edit)
+    
+    def append(self, idfString):
+        self.appendedStrings.append(idfString)
+    
+    def renameObjectReferences(self, lines):
+        for count in range(2, len(lines)):
+            newName = self.renames.get(self.getFieldValue(lines[count]).upper())
+            if newName != None:
+                lines[count] = self.setFieldValue(lines[count], newName)
+        return lines
+    
+    def writeObject(self, lines, outf):
+        objectType = self.getObjectType(lines[0])
+        if self.renames: lines = self.renameObjectReferences(lines)
+        for editType, edit in self.edits:
+            if editType != None and editType != objectType: continue
+            lines = edit(lines)
+            if lines == None: return
+        outf.writelines(lines)
+    
+    def patch(self, idfFilePath):
+        idfFilePath = str(idfFilePath)
+        tempPath = idfFilePath + ".tmp"
+        with open(idfFilePath, "r") as inf:
+            with open(tempPath, "w") as outf:
+                objLines = []
+                for line in inf:
+                    data = line.split("!")[0]
+                    if not objLines and data.strip() == "":
+                        # blank lines and comments between the objects
+                        outf.write(line)
+                        continue
+                    objLines.append(line)
+                    if ";" in data:
+                        self.writeObject(objLines, outf)
+                        objLines = []
+                
+                # an object without a terminator is left as it is
+                outf.writelines(objLines)
+                for idfString in self.appendedStrings:
+                    outf.write(idfString)
+        
+        os.remove(idfFilePath)
+        os.rename(tempPath, idfFilePath)
+
 class EPFeaturesNotInOS(object):
     def __init__(self, workingDir):
         self.fileBasedSchedules = {}
         self.schedTypLims = []
         self.workingDir = workingDir
     
+    @staticmethod
+    def getCSVScheduleName(scheduleName):
+        # find file name and use it as schedule name
+        return "_".join(os.path.basename(scheduleName.strip()).split(".")[:-1])
+    
+    @staticmethod
+    def getFileHash(filePath):
+        md5 = hashlib.md5()
+        with open(filePath, "rb") as inf:
+            for chunk in iter(lambda: inf.read(1048576), ""):
+                md5.update(chunk)
+        return md5.hexdigest()
+    
+    def copyIfChanged(self, sourcePath, targetPath):
+        # schedule files are only copied if their content has changed
+        if os.path.normcase(os.path.abspath(sourcePath)) == os.path.normcase(os.path.abspath(targetPath)):
+            return
+        if os.path.isfile(targetPath) and os.path.getsize(sourcePath) == os.path.getsize(targetPath) \
+            and self.getFileHash(sourcePath) == self.getFileHash(targetPath):
+            return
+        shutil.copyfile(sourcePath, targetPath)
+    
     def createCSVSchedString(self, scheduleName):
         # check if the schedule is already created
-        if scheduleName.upper() in self.fileBasedSchedules.keys(): return "\n"
+        if scheduleName.upper() in self.fileBasedSchedules: return "\n"
         # set up default values
         schTypeLimitStr = "\n"
         schTypeLimitName = "Fraction"
         numOfHours = 8760
         
         # create schedule object based on file
-        # find file name and use it as schedule name
         scheduleFileName = os.path.basename(scheduleName)
-        scheduleObjectName = "_".join(scheduleFileName.split(".")[:-1])
+        scheduleObjectName = self.getCSVScheduleName(scheduleName)
         
         # copy schedule file into working dir
         scheduleNewAddress = os.path.join(self.workingDir, scheduleFileName)
-        shutil.copyfile(scheduleName, scheduleNewAddress)
+        self.copyIfChanged(scheduleName, scheduleNewAddress)
         
         # put them as key, value so I can find the new name when write schedule
         self.fileBasedSchedules[scheduleName.upper()] = scheduleObjectName
@@ -4915,72 +5189,36 @@ class RunOPS(object):
     
     
     def writeNonOSFeatures(self, idfFilePath, HBZones, simParameters, workingDir):
-        # Go through the lines of the exiting IDF and find and references to CSV schedules.
-        wrongLineTrigger = True
-        fi = open(str(idfFilePath),'r')
-        fi.seek(0)
-        lines=[]
-        foundCSVSchedules = []
-        for lineCount, line in enumerate(fi):
-            if 'Schedule:' in line:
-                lines.append(line)
-                wrongLineTrigger = True
-            elif 'CSV' in line or 'csv' in line:
-                origName = line.split(',')[0]
-                if origName == line:
-                    origName = line.split(';')[0]
-                newName = origName.split('\\')[-1].split('.')[0]
-                if origName not in foundCSVSchedules:
-                    foundCSVSchedules.append(origName)
-                if wrongLineTrigger ==True: lines.append(line)
-                else: lines.append(line.replace(origName, newName))
-            elif wrongLineTrigger == True:
-                wrongLineTrigger = False
-                lines.append(line)
-            else:
-                lines.append(line)
-        fi.close()
+        # All the edits are collected first and applied to the IDF in one pass.
+        idfPatcher = IDFPatcher()
+        otherFeatureClass = EPFeaturesNotInOS(workingDir)
+        
+        # Point the references to CSV schedules to the Schedule:File objects.
+        # The placeholder schedules keep their original names.
+        for schedule in self.csvSchedules + self.additionalcsvSchedules:
+            idfPatcher.renameReferences(schedule, otherFeatureClass.getCSVScheduleName(schedule))
         
         #Write in any CSV schedules.
-        otherFeatureClass = EPFeaturesNotInOS(workingDir)
         for schedule in self.csvSchedules:
-            lines.append(otherFeatureClass.createCSVSchedString(schedule))
+            idfPatcher.append(otherFeatureClass.createCSVSchedString(schedule))
         for schedule in self.additionalcsvSchedules:
-            lines.append(otherFeatureClass.createCSVSchedString(schedule))
+            idfPatcher.append(otherFeatureClass.createCSVSchedString(schedule))
         
         # If a start day of the week is specified, change it.
-        counter = 0
-        swapTrigger = False
-        for lCount, line in enumerate(lines):
-            if 'RunPeriod,' in line:
-                swapTrigger = True
-            if swapTrigger == True:
-                counter += 1
-            if counter == 7:
-                if simParameters[8] != None:
-                    lines[lCount] = simParameters[8] + ',\n'
-                else:
-                    lines[lCount] = "UseWeatherFile" + ',\n'
+        if simParameters[8] != None:
+            idfPatcher.replaceField("RunPeriod", 5, simParameters[8])
+        else:
+            idfPatcher.replaceField("RunPeriod", 5, "UseWeatherFile")
         
         # Write in any Holidays.
         if simParameters[7] != []:
             for count, hol in enumerate(simParameters[7]):
-                lines.append(otherFeatureClass.EPHoliday(hol, count))
+                idfPatcher.append(otherFeatureClass.EPHoliday(hol, count))
         
         # Replace any incorrect shading control objects.
         if self.replaceShdCntrl == True:
             # Remove shading control objects from the file.
-            newLines = []
-            winPropTrigger = False
-            for line in lines:
-                if 'WindowProperty:ShadingControl,' in line:
-                    winPropTrigger = True
-                elif winPropTrigger == True and ';' in line:
-                    winPropTrigger = False
-                elif winPropTrigger == True: pass
-                else:
-                    newLines.append(line)
-            lines = newLines
+            idfPatcher.removeObjects("WindowProperty:ShadingControl")
             
             for shdCntrlItem in self.shadeCntrlToReplace:
                 # Add correct shading control objects to file.
@@ -4996,88 +5234,60 @@ class RunOPS(object):
                 
                 shdCntrlStrList = shdCntrlStr.split(shdCntrlName)
                 shdCntrlStr = shdCntrlStrList[0] + str(shdCntrlItem[1]) + shdCntrlStrList[1]
-                lines.append(shdCntrlStr)
+                idfPatcher.append(shdCntrlStr)
         
         # Connect any water source VRFs to their plant loops.
         if self.waterSourceVRFs != {}:
-            VRFs2Find = self.waterSourceVRFs.keys()
+            vrfNames = dict((VRF.upper(), VRF) for VRF in self.waterSourceVRFs)
+            branchNames = dict((self.waterSourceVRFs[VRF]['branch'].upper(), VRF) for VRF in self.waterSourceVRFs)
+            
             # Connect any VRFs to the right plant loop.
-            # Delete the adiabatic pipe placeholders.
+            def connectVRF(lines):
+                VRF = vrfNames.get((idfPatcher.getObjectName(lines) or "").upper())
+                if VRF == None: return lines
+                for count, line in enumerate(lines):
+                    if idfPatcher.getFieldValue(line) == 'AirCooled' and count + 2 < len(lines):
+                        lines[count] = idfPatcher.setFieldValue(line, 'WaterCooled')
+                        lines[count + 1] = idfPatcher.setFieldValue(lines[count + 1], self.waterSourceVRFs[VRF]['inlet'])
+                        lines[count + 2] = idfPatcher.setFieldValue(lines[count + 2], self.waterSourceVRFs[VRF]['outlet'])
+                        break
+                return lines
+            
             # Change the ground source branch to refernce the VRF.
-            for VRF in VRFs2Find:
-                vrfFound = False
-                condenCount = 0
-                pipeFound = False
-                pipeName = self.waterSourceVRFs[VRF]['pipe']
-                pipeCount = 0
-                branchFound = False
-                branchName = self.waterSourceVRFs[VRF]['branch']
-                branchCount = 0
+            def connectBranch(lines):
+                VRF = branchNames.get((idfPatcher.getObjectName(lines) or "").upper())
+                if VRF == None: return lines
                 for count, line in enumerate(lines):
-                    if VRF in line:
-                        vrfFound = True
-                    elif vrfFound == True and ';' in line:
-                        vrfFound = False
-                    elif vrfFound == True and 'AirCooled' in line:
-                        lines[count] = 'WaterCooled,\n'
-                        condenCount = 1
-                    elif vrfFound == True and condenCount == 1:
-                        lines[count] = self.waterSourceVRFs[VRF]['inlet'] + ',\n'
-                        condenCount = 2
-                    elif vrfFound == True and condenCount == 2:
-                        lines[count] = self.waterSourceVRFs[VRF]['outlet'] + ',\n'
-                        condenCount = 0
-                    elif 'Pipe:Adiabatic,\n' in line:
-                        pipeFound = True
-                    elif pipeFound == True and pipeName in line:
-                        lines[count-1] = '\n'
-                        lines[count] = '\n'
-                        pipeCount = 1
-                    elif pipeCount == 1:
-                        lines[count] = '\n'
-                        pipeCount = 2
-                    elif pipeCount == 2:
-                        lines[count] = '\n'
-                        pipeCount = 0
-                        pipeFound = False
-                    elif pipeFound == True and ';' in line:
-                        pipeFound = False
-                    elif 'Branch,\n' in line:
-                        branchFound = True
-                    elif branchFound == True and branchName in line:
-                        branchCount = 1
-                    elif branchCount == 1 and 'Pipe:Adiabatic' in line:
-                        lines[count] = '  AirConditioner:VariableRefrigerantFlow,\n'
-                        branchCount = 2
-                    elif branchCount == 2:
-                        lines[count] = '  ' + VRF + ',\n'
-                        branchCount = 0
-                        branchFound = False
-                    elif branchFound == True and ';' in line:
-                        branchFound = False
+                    if idfPatcher.getFieldValue(line) == 'Pipe:Adiabatic' and count + 1 < len(lines):
+                        lines[count] = idfPatcher.setFieldValue(line, 'AirConditioner:VariableRefrigerantFlow')
+                        lines[count + 1] = idfPatcher.setFieldValue(lines[count + 1], VRF)
+                        break
+                return lines
+            
+            idfPatcher.addEdit("AirConditioner:VariableRefrigerantFlow", connectVRF)
+            idfPatcher.addEdit("Branch", connectBranch)
+            
+            # Delete the adiabatic pipe placeholders.
+            for VRF in self.waterSourceVRFs:
+                idfPatcher.removeObjects("Pipe:Adiabatic", self.waterSourceVRFs[VRF]['pipe'])
         
         # Write in any requested natural ventilation objects.
         # Find any natural ventilation objects on the Zones.
-        natVentStrings = []
         for zone in HBZones:
             if zone.natVent == True:
                 for natVentCount, natVentObj in enumerate(zone.natVentType):
                     if natVentObj == 1 or natVentObj == 2:
-                        natVentStrings.append(otherFeatureClass.EPNatVentSimple(zone, natVentCount))
+                        idfPatcher.append(otherFeatureClass.EPNatVentSimple(zone, natVentCount))
                     elif natVentObj == 3:
-                        natVentStrings.append(otherFeatureClass.EPNatVentFan(zone, natVentCount))
-        # Write the natural ventilation objects into the IDF.
-        if len(natVentStrings) > 0:
-            for line in natVentStrings:
-                lines.append(line)
+                        idfPatcher.append(otherFeatureClass.EPNatVentFan(zone, natVentCount))
         
         # Add EarthTubes
         for zone in HBZones:
             if zone.earthtube == True:
-                lines.append(otherFeatureClass.EarthTube(zone))
+                idfPatcher.append(otherFeatureClass.EarthTube(zone))
                 if zone.ETschedule != 'Always On Discrete':
                     if zone.ETschedule.upper().endswith('.CSV'):
-                        lines.append(otherFeatureClass.createCSVSchedString(zone.ETschedule))
+                        idfPatcher.append(otherFeatureClass.createCSVSchedString(zone.ETschedule))
                     else:
                         warning = 'Please use a CSV schedule for earth tubes. Other schedules are not supported at the moment.'
                         print warning
@@ -5086,47 +5296,34 @@ class RunOPS(object):
         # Write in any window spectral data.
         if self.windowSpectralData != {}:
             # First, I have to write in the name of the spectral data on the glass materials.
-            glazTrigger = False
-            matName = None
-            for lcount, line in enumerate(lines):
-                if 'WindowMaterial:Glazing' in line:
-                    glazTrigger = True
-                elif line == '\n':
-                    glazTrigger = False
-                elif glazTrigger == True and '!- Name' in line:
-                    matName = line.split(',')[0].strip()
-                elif glazTrigger == True and '!- Window Glass Spectral Data Set Name' in line:
-                    lines[lcount] = '  ' + self.windowSpectralData[matName] + ',     !- Window Glass Spectral Data Set Name\n'
+            def setSpectralData(lines):
+                matName = idfPatcher.getObjectName(lines)
+                if matName in self.windowSpectralData and len(lines) > 3:
+                    lines[3] = idfPatcher.setFieldValue(lines[3], self.windowSpectralData[matName])
+                return lines
+            
+            idfPatcher.addEdit("WindowMaterial:Glazing", setSpectralData)
             for matName in self.windowSpectralData.keys():
                 spectDatStr = self.hb_EPObjectsAux.getEPObjectsStr(self.windowSpectralData[matName])
-                lines.append(spectDatStr)
+                idfPatcher.append(spectDatStr)
         
         # Write in a request for the surface names in the .eio file.
-        lines.append('\nOutput:Surfaces:List,\n')
-        lines.append('\t' + 'Details;                 !- Report Type' + '\n')
+        idfPatcher.append('\nOutput:Surfaces:List,\n')
+        idfPatcher.append('\t' + 'Details;                 !- Report Type' + '\n')
         
         # Write any additional strings.
         if additionalStrings_ != []:
-            lines.append("\n")
+            idfPatcher.append("\n")
             for string in additionalStrings_:
                 if ":" in string and not '!' in string:
-                    lines.append("\n")
-                    lines.append("\n")
-                    lines.append(string)
+                    idfPatcher.append("\n\n" + string)
                 elif "!" not in string:
-                    lines.append("\n")
-                    lines.append("\n")
-                    lines.append(string)
-                    lines.append("\n")
+                    idfPatcher.append("\n\n" + string + "\n")
                 else:
-                    lines.append(string)
-                    lines.append("\n")
-            lines.append("\n")
+                    idfPatcher.append(string + "\n")
+            idfPatcher.append("\n")
         
-        fiw = open(str(idfFilePath),'w')
-        for line in lines:
-            fiw.write(line)
-        fiw.close()
+        idfPatcher.patch(idfFilePath)
     
     def runAnalysis(self, osmFile, runEnergyPlus, idfFileP=None, idfFold=None):
         # Preparation
@@ -5354,89 +5551,32 @@ def main(HBZones, HBContext, north, epwWeatherFile, analysisPeriod, simParameter
     reEvaluate = hb_reEvaluateHBZones(HBZones, None, "UpperLeftCorner")
     reEvaluate.evaluateZones()
     
+    # write identical zones as a single zone with a multiplier
+    zoneMultipliers = sc.sticky["honeybee_ZoneMultipliers"](HBZones)
+    if zoneMultipliers_:
+        HBZones = zoneMultipliers.collapse()
+        print zoneMultipliers
+    
     # generate stories
     hb_writeOPS.generateStories(HBZones, model)
     
     # build a default construction set from the connected zones.
     defaultConstrSet = hb_writeOPS.buildDefaultConstrSet(HBZones, model)
     
+    # phase 1: create the schedules, materials, constructions and space types once
+    phaseStart = time.time()
+    hb_writeOPS.resolveLibraryObjects(HBZones, model)
+    hb_writeOPS.logPhaseTime("Library objects", phaseStart)
+    
     #Make a list of schedules to keep track of what needs to be written into the model.
     additionalSchedList = []
     additionalcsvSchedules = []
     
+    # phase 2: create the spaces and their surfaces and report the progress every 250 zones
+    phaseStart = time.time()
+    progressStep = 250
     for zoneCount, zone in enumerate(HBZones):
-        # create a space - OpenStudio works based of space and not zone
-        # Honeybee though is structured based on zones similar to EnergyPlus
-        space = ops.Space(model)
-        
-        # assign name and type
-        space = hb_writeOPS.setupNameAndType(zone, space, model)
-        
-        # assign level/building story to zone
-        space = hb_writeOPS.setupLevels(zone, space)
-        
-        # schedules
-        space = hb_writeOPS.setDefaultSchedule(zone, space, model)
-        
-        # construction set
-        space.setDefaultConstructionSet(defaultConstrSet)
-        
-        #   INFILTRATION
-        hb_writeOPS.setInfiltration(zone, space, model)
-        
-        # set people definition
-        hb_writeOPS.setPeopleDefinition(zone, space, model)
-        
-        # set people definition
-        hb_writeOPS.setLightingDefinition(zone, space, model)
-        
-        # set electrical equipment
-        hb_writeOPS.setEquipmentDefinition(zone, space, model)
-        
-        # design specification outdoor air
-        space = hb_writeOPS.setDesignSpecificationOutdoorAir(zone, space, model)
-        
-        # assign the thermal zone
-        space, thermalZone = hb_writeOPS.assignThermalZone(zone, space, model)
-        
-        #Keep the thermal zones in a dictionary for later.
-        hb_writeOPS.thermalZonesDict[zone.name] = thermalZone
-        
-        #If there are internal masses assigned to the zone, write them
-        if len(zone.internalMassNames) > 0:
-            for massCount, massName in enumerate(zone.internalMassNames):
-               hb_writeOPS.setInternalMassDefinition(zone, space, model)
-        
-        if zone.isConditioned:
-            # add HVAC system
-            HAVCGroupID = zone.HVACSystem.GroupID
-            
-            if HAVCGroupID!= -1:
-                if HAVCGroupID not in hb_writeOPS.HVACSystemDict.keys():
-                    # add place holder for lists
-                    hb_writeOPS.HVACSystemDict[HAVCGroupID] = HoneybeeHVAC(HAVCGroupID, zone.HVACSystem.Index, [], [], zone.HVACSystem.airDetails, zone.HVACSystem.heatingDetails, zone.HVACSystem.coolingDetails, zoneCount)
-            
-            # collect the information for systems here, such as the zones in each system and the recirculation specifcations for each zone.
-            hb_writeOPS.HVACSystemDict[HAVCGroupID].thermalZones.append(thermalZone)
-            hb_writeOPS.HVACSystemDict[HAVCGroupID].hbZones.append(zone)
-            
-            # add thermostat
-            hb_writeOPS.addThermostat(zone, thermalZone, space, model)
-            
-            # add humidistat if specified
-            if zone.humidityMax != "" or zone.humidityMin != "":
-                hb_writeOPS.addHumidistat(zone, thermalZone, space, model)
-        
-        # add daylighting controls
-        if zone.daylightCntrlFract != 0:
-            hb_writeOPS.addDaylightCntrl(zone, thermalZone, space, model)
-        
-        # write the surfaces
-        for HBSrf in zone.surfaces:
-            OPSSrf = hb_writeOPS.opsZoneSurface(HBSrf, model, space)
-            if HBSrf.hasChild:
-                    hb_writeOPS.OPSFenSurface(HBSrf, OPSSrf, model)
-                    
+        hb_writeOPS.createSpace(zone, zoneCount, defaultConstrSet, model)
         
         #Check other schedules.
         if zone.natVent == True:
@@ -5445,6 +5585,10 @@ def main(HBZones, HBContext, north, epwWeatherFile, analysisPeriod, simParameter
                     if ventObj.upper().endswith('.CSV'): additionalcsvSchedules.append(ventObj)
                     else: additionalSchedList.append(ventObj)
                 elif 'ALWAYS ON' not in additionalSchedList: additionalSchedList.append('ALWAYS ON')
+        
+        if (zoneCount + 1) % progressStep == 0 or zoneCount + 1 == len(HBZones):
+            print "%d of %d zones are written to the model."%(zoneCount + 1, len(HBZones))
+    hb_writeOPS.logPhaseTime("Spaces and surfaces", phaseStart)
     
     #Add and extra schedules pulled off of the zones.
     for schedName in additionalSchedList:
@@ -5541,6 +5685,8 @@ def main(HBZones, HBContext, north, epwWeatherFile, analysisPeriod, simParameter
             csvScheduleCount, additionalcsvSchedules, shadeCntrlToReplace, replaceShdCntrl, windowSpectralData, waterSourceVRFs)
         
         idfFile, resultFile = hb_runOPS.runAnalysis(fname, runIt, idfFileP, idfFold)
+        # the file is also removed if there are no zones with a multiplier
+        zoneMultipliers.writeMultipliersFile(os.path.dirname(idfFile))
         if runIt < 3:
             try:
                 errorFileFullName = idfFile.replace('.idf', '.err')
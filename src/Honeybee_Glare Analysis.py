@@ -62,14 +62,28 @@ except: pass
 import scriptcontext as sc
 import Grasshopper.Kernel as gh
 import os
-import subprocess
 import math
 
-def runCmdAndGetTheResults(command, shellKey = True):
-    p = subprocess.Popen(["cmd", command], shell=shellKey, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    out, err = p.communicate()
-    # p.kill()
-    return out, err
+def runCmdAndGetTheResults(commands, stdout = None):
+    """Run Radiance executables directly and return stdout and stderr.
+    
+    commands is an argument list or a list of argument lists for a pipeline. The
+    first argument of each command is the name of a Radiance executable.
+    """
+    hb_processRunner = sc.sticky["honeybee_ProcessRunner"]
+    hb_folders = sc.sticky["honeybee_folders"]
+    
+    if isinstance(commands[0], basestring): commands = [commands]
+    commands = [[hb_processRunner.findExecutable(args[0], hb_folders["RADPath"]) or args[0]] + args[1:] \
+                for args in commands]
+    
+    runner = hb_processRunner(env = hb_processRunner.radianceEnvironment(hb_folders["RADPath"], hb_folders["RADLibPath"]))
+    try:
+        returncode, out, err = runner.run(commands, stdout = stdout)
+    except OSError, e:
+        # executable is not found
+        return "", str(e)
+    return out or "", err
 
 def readGlareResults(glareRes):
     resultDict = {}
@@ -165,7 +179,7 @@ def main(HDRImagePath, taskPosition, taskPositionAngle):
     
     # try to find evalglare and check the version
     
-    out, err = runCmdAndGetTheResults("/c " + hb_RADPath + "\evalglare -v")
+    out, err = runCmdAndGetTheResults(["evalglare", "-v"])
     msg = "Failed to find evalglare.exe.\n" + \
               "Make sure you have evalglare 1.x.x installed at " + hb_RADPath +\
               "You can download evalglare from: \n" + \
@@ -208,8 +222,7 @@ def main(HDRImagePath, taskPosition, taskPositionAngle):
     notes += msg + "\n"
     
     # check size and proportion of the image
-    command = '/c ' + hb_RADPath + '\getinfo -d ' + HDRImagePath
-    out, err = runCmdAndGetTheResults(command)
+    out, err = runCmdAndGetTheResults(["getinfo", "-d", HDRImagePath])
 
     try:
         # image size
@@ -241,10 +254,9 @@ def main(HDRImagePath, taskPosition, taskPositionAngle):
         proportion = max(x,y)/800
         resizedImage = ".".join(HDRImagePath.split(".")[:-1]) + "_resized." + HDRImagePath.split(".")[-1]
         
-        pflitLine = "/c " + hb_RADPath + "\pfilt -x /" + str(proportion) + " -y /" + str(proportion) + \
-                  " " + HDRImagePath +" > " + resizedImage
+        pfiltArgs = ["pfilt", "-x", "/" + str(proportion), "-y", "/" + str(proportion), HDRImagePath]
 
-        out, err = runCmdAndGetTheResults(pflitLine)
+        out, err = runCmdAndGetTheResults(pfiltArgs, stdout = resizedImage)
         
         x = x/proportion
         y = y/proportion
@@ -253,16 +265,16 @@ def main(HDRImagePath, taskPosition, taskPositionAngle):
     glareCheckImage = ".".join(HDRImagePath.split(".")[:-1]) + "_chkFile." + HDRImagePath.split(".")[-1]
     glareNoTextImage = ".".join(HDRImagePath.split(".")[:-1]) + "_noText." + HDRImagePath.split(".")[-1]
     # run the analysis
-    evalGlareLine = "/c " + hb_RADPath + "\evalglare -c " +  glareNoTextImage + " " + HDRImagePath
+    evalGlareArgs = ["evalglare", "-c", glareNoTextImage, HDRImagePath]
     
-    glareRes, err = runCmdAndGetTheResults(evalGlareLine)
+    glareRes, err = runCmdAndGetTheResults(evalGlareArgs)
     
     if "error: no valid view specified" in err.strip():
         
         # since I use pcomp to merge images HDR image doesn't have HDR view information
         # adding default Honeybee view information for fish-eye camera
-        evalGlareLine = "/c " + hb_RADPath + "\evalglare -vth -vv 180 -vh 180 -c " +  glareNoTextImage + " " + HDRImagePath
-        glareRes, err = runCmdAndGetTheResults(evalGlareLine)
+        evalGlareArgs = ["evalglare", "-vth", "-vv", "180", "-vh", "180", "-c", glareNoTextImage, HDRImagePath]
+        glareRes, err = runCmdAndGetTheResults(evalGlareArgs)
         
     notes += "Results for the image:\n" + glareRes + "\n"
     
@@ -275,10 +287,11 @@ def main(HDRImagePath, taskPosition, taskPositionAngle):
     
     textHeight = x / 28
     if textHeight < 8: textHeight = 8
-    addNumbersLine = "/c " + hb_RADPath + r"\psign -h " + str(textHeight) + " -cb 0 0 0 -cf 1 1 1 DGP=" + str(DGP) +" This view has "+ str(DGPComfortRange(DGP))+ " | " + \
-                     hb_RADPath + r"\pcompos " + glareNoTextImage + " 0 0 - " + str(textHeight/2) + " " + str(y) + " > " + glareCheckImage
+    addNumbersPipeline = [["psign", "-h", str(textHeight), "-cb", "0", "0", "0", "-cf", "1", "1", "1",
+                           "DGP=" + str(DGP) + " This view has " + str(DGPComfortRange(DGP))],
+                          ["pcompos", glareNoTextImage, "0", "0", "-", str(textHeight/2), str(y)]]
     
-    runCmdAndGetTheResults(addNumbersLine)
+    runCmdAndGetTheResults(addNumbersPipeline, stdout = glareCheckImage)
     
     if possibleNotice!=None: notes += "Notice: " + possibleNotice + "\n"
     
@@ -292,20 +305,19 @@ def main(HDRImagePath, taskPosition, taskPositionAngle):
         yPixle = int(taskPY * y) # 0,0 coordinate for evalglare located at top left
         taskPA = math.radians(taskPositionAngle)
         
-        TArguments = " ".join([str(xPixle), str(yPixle), "%.3f"%taskPA])
+        TArguments = [str(xPixle), str(yPixle), "%.3f"%taskPA]
         
-        evalGlareTaskPLine = "/c " + hb_RADPath + "\evalglare -c " +  glareTaskPNoText + " -T " + \
-        TArguments + " " + HDRImagePath
+        evalGlareTaskPArgs = ["evalglare", "-c", glareTaskPNoText, "-T"] + TArguments + [HDRImagePath]
         
-        glareTaskRes, err = runCmdAndGetTheResults(evalGlareTaskPLine)
+        glareTaskRes, err = runCmdAndGetTheResults(evalGlareTaskPArgs)
         notes += "Results for the task position:\n" + glareTaskRes + "\n"
         
         if err.strip() == "error: no valid view specified":
             # since I use pcomp to merge images HDR image doesn't have HDR view information
             # adding default Honeybee view information for fish-eye camera
-            evalGlareTaskPLine = "/c " + hb_RADPath + "\evalglare -vth -vv 180 -vh 180 -c " +  glareTaskPNoText + " -T " + \
-            TArguments + " " + HDRImagePath
-            glareTaskRes, err = runCmdAndGetTheResults(evalGlareTaskPLine)        
+            evalGlareTaskPArgs = ["evalglare", "-vth", "-vv", "180", "-vh", "180", "-c", glareTaskPNoText, "-T"] + \
+            TArguments + [HDRImagePath]
+            glareTaskRes, err = runCmdAndGetTheResults(evalGlareTaskPArgs)        
         
         taskPGlareResultDict, possibleNotice = readGlareResults(glareTaskRes)
         
@@ -313,10 +325,11 @@ def main(HDRImagePath, taskPosition, taskPositionAngle):
         DGP = taskPGlareResultDict['dgp']
         DGI = taskPGlareResultDict['dgi']
         
-        addNumbersTLine = "/c " + hb_RADPath + r"\psign -h " + str(textHeight) + " -cb 0 0 0 -cf 1 1 1 DGP=" + str(DGP) + " This view has " + str(DGPComfortRange(DGP))+ " | "+ \
-                     hb_RADPath + r"\pcompos " + glareTaskPNoText + " 0 0 - " + str(textHeight/2) + " " + str(y) + " > " + glareTaskPCheckImage
+        addNumbersTPipeline = [["psign", "-h", str(textHeight), "-cb", "0", "0", "0", "-cf", "1", "1", "1",
+                                "DGP=" + str(DGP) + " This view has " + str(DGPComfortRange(DGP))],
+                               ["pcompos", glareTaskPNoText, "0", "0", "-", str(textHeight/2), str(y)]]
     
-        runCmdAndGetTheResults(addNumbersTLine)
+        runCmdAndGetTheResults(addNumbersTPipeline, stdout = glareTaskPCheckImage)
         
         if possibleNotice!=None: notes += "Notice: " + possibleNotice + "\n"
         
@@ -44,7 +44,7 @@ Provided by Honeybee 0.0.63
 
 ghenv.Component.Name = "Honeybee_GrizzlyBear"
 ghenv.Component.NickName = 'grizzlyBear'
-ghenv.Component.Message = 'VER 0.0.63\nJAN_20_2018'
+ghenv.Component.Message = 'VER 0.0.63\nOCT_18_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "13 | WIP"
@@ -59,6 +59,8 @@ import re
 import logging
 import Grasshopper.Kernel as gh
 import datetime
+import time
+import collections
 
 gbXMLLibFolder = "C:\\gbXML"
 
@@ -138,6 +140,14 @@ if gbXMLIsReady:
 
 class WritegbXML(object):
     
+    # schedule patterns are compiled once instead of for every schedule layer
+    SCHEDULETYPE = re.compile('(.*)(:)(.*)')
+    TEMPERATURETYPE = re.compile('(Temperature)(\d*)')
+    WEEKNAME = re.compile('(Week Name)(.*)')
+    BRACKETEDNAME = re.compile('(.*)({)(.*)(})')
+    DAYSCHEDULE = re.compile('(.*)(Schedule:)(.*)')
+    TIMEOFDAY = re.compile('(\d+)(:)(\d+)')
+    
     def __init__(self, location, zipCode):
         # import location
         locationStr = _location.split('\n')
@@ -189,23 +199,6 @@ class WritegbXML(object):
             logging.info('point3d List successfully converted to MemSafe Coord List.')
         return memsafelist
     
-    #required to count up the shades in case they are meshed
-    def getShadeCount(self,shades):
-        shdct = 0
-        for surfnum,shade in enumerate(shades):
-                
-                #coordinateList contains all the shade points for all shades
-                coordinatesList = shade.extractPoints()
-                #print coordinatesList
-                try:
-                    len(coordinatesList[0][0])
-                    print 'meshed surface'
-                    for subcount,ss in enumerate(coordinatesList):
-                        shdct+=1
-                except:
-                    shdct+=1
-        return shdct
-    
     #takes a Honeybee space, finds the floor, then finds its area
     def findZoneFloorArea(self,surfaces):
         logging.debug('Finding floor area of all surfaces.')
@@ -340,7 +333,7 @@ class WritegbXML(object):
                 numberOfLayers = len(scheduleData.keys())
                 scheduleStr = scheduleData[0] + ",\n"
                 #break this down with a regex to figure out if it is a year, or what 
-                m = re.match('(.*)(:)(.*)',scheduleData[0])
+                m = self.SCHEDULETYPE.match(scheduleData[0])
                 if m:
                     if (m.group(3) == "Year"):
                         logging.info('Found a regex match for year:'+m.group(3))
@@ -357,7 +350,7 @@ class WritegbXML(object):
                             if(d == '- Schedule Type Limits Name'):
                                 #assign schedule type
 
-                                mt = re.match('(Temperature)(\d*)',scheduleData[layer][0])
+                                mt = self.TEMPERATURETYPE.match(scheduleData[layer][0])
                                 if mt:
                                     stype = mt.group(1)
                                     stype = stype.strip()
@@ -365,29 +358,29 @@ class WritegbXML(object):
                                 else:
                                     stype = scheduleData[layer][0]
                                     yrs.type = wgb.assignScheduleTypes(stype)
-                            elif (re.match("(- Start Month)(.*)",d)):
+                            elif d.startswith("- Start Month"):
                                 logging.info('Found Startmonth of honeybee object string.')
                                 startdate = scheduleData[layer][0]+'-'
-                            elif (re.match("(- Start Day)(.*)",d)):
+                            elif d.startswith("- Start Day"):
                                 startdate = startdate + scheduleData[layer][0]
                                 marr.append(startdate)
-                            elif (re.match("(- End Month)(.*)",d)):
+                            elif d.startswith("- End Month"):
                                 logging.info('Found Endmonth of honeybee object string')
                                 enddate = scheduleData[layer][0]+'-'
-                            elif (re.match("(- End Day)(.*)",d)):
+                            elif d.startswith("- End Day"):
                                 enddate = enddate + scheduleData[layer][0]
                                 marr.append(enddate)
                                 mar = copy.deepcopy(marr)
                                 yrarr.append(mar)
                                 marr=[]
-                            elif(re.match('(.*)(:)(.*)',scheduleData[layer][1])):
-                                m = re.match('(.*)(:)(.*)',scheduleData[layer][1])
-                                wk = re.match('(Week Name)(.*)',m.group(3))
+                            elif(self.SCHEDULETYPE.match(scheduleData[layer][1])):
+                                m = self.SCHEDULETYPE.match(scheduleData[layer][1])
+                                wk = self.WEEKNAME.match(m.group(3))
                                 if wk:
                                     logging.info('Found weekly sch id associated with start and stops.')
                                     wknum = wk.group(2)
                                     
-                                    wks = re.match('(.*)({)(.*)(})',scheduleData[layer][0])
+                                    wks = self.BRACKETEDNAME.match(scheduleData[layer][0])
                                     if wks:
                                         ws=gbx.WeekScheduleId()
                                         #print wks.group(3)
@@ -458,7 +451,7 @@ class WritegbXML(object):
                         logging.info('Match for monthly schedule found in hb.')
                         wksch = gbx.WeekSchedule()
                         gb.WeekSchedule[ct] = wksch
-                        wknm = re.match('(.*)({)(.*)(})',scheduleName)
+                        wknm = self.BRACKETEDNAME.match(scheduleName)
                         
                         if wknm:
                             logging.info('Found the week name of Honeybee obj.')
@@ -473,7 +466,7 @@ class WritegbXML(object):
                             nmct = []
                             d = scheduleData[layer][1]
                             sn = scheduleData[layer][0]
-                            m = re.match('(.*)(Schedule:)(.*)',d)
+                            m = self.DAYSCHEDULE.match(d)
                             if m:
                                 logging.info('Week schedule information found.')
                                 day = str.rstrip(m.group(1)).replace('- ','')
@@ -557,7 +550,7 @@ class WritegbXML(object):
                             d = scheduleData[layer][1]
                             if(d == 'Schedule Type Limits Name'):
                                 #assign schedule type
-                                mt = re.match('(Temperature)(\d*)',scheduleData[layer][0])
+                                mt = self.TEMPERATURETYPE.match(scheduleData[layer][0])
                                 if mt:
                                     stype = mt.group(1)
                                 else:
@@ -565,12 +558,12 @@ class WritegbXML(object):
                                 stype = stype.strip()
                                 dysch.type = wgb.assignScheduleTypes(stype)
                                 
-                            elif (re.match("(Time)(.*)",d)):
+                            elif d.startswith("Time"):
                                 logging.info('found time in hb object for day schedule')
                                 startdate = scheduleData[layer][0]
                                 #this works fine for this particular convention
                                 val = scheduleData[layer+1][0]
-                                t = re.match('(\d+)(:)(\d+)',startdate)
+                                t = self.TIMEOFDAY.match(startdate)
                                 if t:
                                     curtime = int(t.group(1))
                                    
@@ -644,6 +637,11 @@ class WritegbXML(object):
             return gbx.dayTypeEnum.WeekendOrHoliday
 
 
+    def logPhaseTime(self, phaseName, startTime):
+        msg = "%s: %.2f seconds"%(phaseName, time.time() - startTime)
+        logging.info(msg)
+        print msg
+    
     def writegbNode(self):
         logging.debug('Writing gb node.')
         gb = gbx.gbXML()
@@ -658,7 +656,7 @@ class WritegbXML(object):
         logging.info('First node gb written successfully.')
         return gb
     
-    def makeSpace(self,zone,totalarea, uniqueSched,rhinolevels):
+    def makeSpace(self,zone,totalarea,rhinolevels):
         
         logging.debug('Making gb spaces from hb zones.')
         space = gbx.Space()
@@ -697,17 +695,7 @@ class WritegbXML(object):
             if m:
                 loadict[m.group(1)] = m.group(3)
         #get schedules from honeybee
-        logging.info('Extracting zone schedules')
-        scheds = zone.getCurrentSchedules()
-        intsched = scheds.split('\n')
-        schedict = {}
-        for s,sched in enumerate(intsched):
-            if s == 0: continue
-            f = re.match(r'(.*)(:)(.*)',sched)
-            if f:
-                schedict[f.group(1)] = f.group(3)
-        
-        uniqueSched = wgb.makeUniqueSched(schedict)
+        schedict = wgb.getZoneSchedules(zone)
         #Equipments Load Per Area
         ep = gbx.EquipPowerPerArea()
         ep.unit = gbx.powerPerAreaUnitEnum.WattPerSquareMeter
@@ -765,8 +753,6 @@ class WritegbXML(object):
         psched=psched.replace('\'','')
         psched=psched.strip()
         space.peopleScheduleIdRef = psched.replace(" ","_")
-        if(psched in uniqueSched): logging.info('the schedule is not unique:'+psched)
-        else: uniqueSched.append(psched)
 
         #heatingSetPtSchedule
         #coolingSetPtSchedule
@@ -775,20 +761,28 @@ class WritegbXML(object):
         lsched = lsched.replace('\'','')
         lsched = lsched.strip()
         space.lightScheduleIdRef = lsched.replace(" ","_")
-        if(lsched in uniqueSched): logging.info('the schedule is not unique:'+lsched)
-        else: uniqueSched.append(lsched)
 
         #equipmentSchedule
         esched = schedict['equipmentSchedule']
         esched = esched.replace('\'','')
         esched = esched.strip()
         space.equipmentScheduleIdRef = esched.replace(" ","_")
-        if(esched in uniqueSched): logging.info('the schedule is not unique:'+esched)
-        else: uniqueSched.append(esched)
         #infiltrationSchedule
         
         
-        return space,totalarea,uniqueSched,rhinoLevels
+        return space,totalarea,rhinolevels
+        
+    def getZoneSchedules(self,zone):
+        logging.info('Extracting zone schedules')
+        scheds = zone.getCurrentSchedules()
+        intsched = scheds.split('\n')
+        schedict = {}
+        for s,sched in enumerate(intsched):
+            if s == 0: continue
+            f = re.match(r'(.*)(:)(.*)',sched)
+            if f:
+                schedict[f.group(1)] = f.group(3)
+        return schedict
         
     def makeUniqueSched(self,schedict):
         logging.debug('Filtering out only unique schedules so they are not duplicated.')
@@ -862,7 +856,7 @@ class WritegbXML(object):
                     coordinatesList = [coordinatesList]
                 #add to list of 'found' interior surfaces the first time
                 if surface.BC.lower() == "surface":
-                    sharedint.append(surface.BCObject.name)
+                    sharedint.add(surface.BCObject.name)
                     
                 #memsafelist = wgb.point3DListtoMemorySafeCoordList(sb,coordinatesList)
                 #pg = gbx.BasicSerialization.makegbPlanarGeom(memsafelist)
@@ -907,11 +901,11 @@ class WritegbXML(object):
         logging.info('Space boundaries created.')
         return space,sharedint, uniquesurfcount,HBsurfaces
 
-    def writeSurfaces(self,cmp,hbsurfacetypes,uniquesurfcount,usedconstructions,usedopening,tsc):
+    #yields the gb surfaces one by one so they can be streamed to the file
+    def iterSurfaces(self,cmp,hbsurfacetypes):
         logging.debug('Writing gb surfaces.')
-        cmp.Surface = gbx.BasicSerialization.defSurfaceArray(tsc)
         print  'writing surfaces'
-      
+        usedopening = {}
         gbxmlSpaces = cmp.Buildings[0].Spaces
         openingct = 0
         surfnum = 0
@@ -966,7 +960,6 @@ class WritegbXML(object):
                 #this is a hack to get around honeybee's nested surface
                 surface.surfaceType = wgb.mapSurfaceTypes(hbsurface.type)
                 surface.constructionIdRef = "OpenStudio_"+hbsurface.construction.replace(" ","_")
-                usedconstructions.append(hbsurface.construction)
                 surface.Name = hbsurface.name
                 
                 #make adjacent space identifications, which depend on surf type
@@ -1036,20 +1029,26 @@ class WritegbXML(object):
                 CAD.id = str(uuid.uuid4())
                 surface.CADObjectId = CAD
 
-                cmp.Surface[surfnum] = surface
+                yield surface
                 sbcount += 1
                 surfnum += 1
         #write shading devices
         
-        cmp.Surface = wgb.makeShdSurface(HBContext,cmp.Surface, surfnum)
+        for surface in self.iterShdSurfaces(HBContext, surfnum):
+            yield surface
         logging.info('Making surfaces completed.')
-        return cmp,usedconstructions,usedopening
+    
+    def writeSurfaces(self,cmp,hbsurfacetypes):
+        surfaces = list(self.iterSurfaces(cmp,hbsurfacetypes))
+        cmp.Surface = gbx.BasicSerialization.defSurfaceArray(len(surfaces))
+        for surfnum,surface in enumerate(surfaces):
+            cmp.Surface[surfnum] = surface
+        return cmp
         
-    def makeShdSurface(self, shades, surfaceList,index):
+    def iterShdSurfaces(self, shades, index):
         print 'making shades', shades
         logging.debug('Making shading surfaces.')
         #this has to be here because I may have to make both meshed and unmeshed shadings
-        totalcount = 0+index
         for surfnum,shade in enumerate(shades):
             surfnum = surfnum+index
             #coordinateList contains all the shade points for all shades
@@ -1109,8 +1108,7 @@ class WritegbXML(object):
                     #this should only occur if the surface is totaly new (bad idea)
                     CAD.id = str(uuid.uuid4())
                     surface.CADObjectId = CAD
-                    surfaceList[totalcount] = surface
-                    totalcount+=1
+                    yield surface
                     
             except:
                 surface = gbx.Surface()
@@ -1160,10 +1158,7 @@ class WritegbXML(object):
                 #this should only occur if the surface is totaly new (bad idea)
                 CAD.id = str(uuid.uuid4())
                 surface.CADObjectId = CAD
-                surfaceList[totalcount] = surface
-                totalcount+=1
-                
-        return surfaceList
+                yield surface
 
 
     def makegbOpening(self,hbwindows,parentsurfacename,usedopening,openingct):
@@ -1626,6 +1621,141 @@ class WritegbXML(object):
     
 
 
+class gbXMLRegistry(object):
+    """
+    Unique schedules, constructions and openings of the exported zones
+    
+    The registries are filled in one pass over the zones before any gbXML object is made.
+    Constructions and schedules are then written once and the surfaces can be streamed to
+    the file without collecting them first. Shared interior surfaces are found in the same
+    pass and only the first surface of each pair is written.
+    
+    Usage:
+        registry = gbXMLRegistry(sc.sticky["honeybee_EPScheduleAUX"]())
+        for zone in HBZones:
+            registry.addZone(zone, wgb.makeUniqueSched(wgb.getZoneSchedules(zone)))
+        registry.resolveSchedules()
+    """
+    
+    def __init__(self, hb_EPScheduleAUX):
+        self.hb_EPScheduleAUX = hb_EPScheduleAUX
+        # schedule name: schedule type (Year, Daily or Interval)
+        self.schedules = collections.OrderedDict()
+        self.constructions = collections.OrderedDict()
+        self.openings = collections.OrderedDict()
+        self.sharedInteriorSurfaces = set()
+    
+    def addSchedule(self, scheduleName):
+        scheduleName = scheduleName.strip('.')
+        if scheduleName not in self.schedules:
+            self.schedules[scheduleName] = None
+    
+    def addZone(self, zone, schedules):
+        for schedule in schedules:
+            self.addSchedule(schedule)
+        
+        for surface in zone.surfaces:
+            if surface.name in self.sharedInteriorSurfaces: continue
+            if surface.BC.lower() == "surface":
+                self.sharedInteriorSurfaces.add(surface.BCObject.name)
+            
+            self.constructions[surface.construction] = None
+            if surface.hasChild:
+                for window in surface.childSrfs:
+                    self.openings[window.construction] = None
+    
+    def resolveSchedules(self):
+        """Add the schedules that are referenced inside other schedules and find the types."""
+        scheduleNames = self.schedules.keys()
+        for schedule in scheduleNames:
+            scheduleValues, comments = self.hb_EPScheduleAUX.getScheduleDataByName(schedule, ghenv.Component)
+            if not scheduleValues:
+                logging.debug('There are no schedules in the honeybee hive.')
+                continue
+            
+            m = WritegbXML.SCHEDULETYPE.match(scheduleValues[0])
+            if m: self.schedules[schedule] = m.group(3)
+            
+            # collect all the schedule items inside the schedule
+            # and the schedules which are referenced inside other schedules
+            for value in scheduleValues[1:]:
+                if scheduleValues[0] == "Schedule:Week:Daily" or value.startswith("Schedule:"):
+                    if value.strip('.') not in self.schedules:
+                        self.addSchedule(value)
+                        scheduleNames.append(value.strip('.'))
+    
+    def getScheduleCount(self, scheduleType):
+        return len([s for s in self.schedules.values() if s == scheduleType])
+
+
+class gbXMLStreamWriter(object):
+    """
+    Write a gbXML file with the campus surfaces streamed into the file
+    
+    The gbXML object is serialized without the surfaces. Surfaces are serialized one by one
+    into the Campus node as they are made so they are never held in memory together.
+    
+    Usage:
+        gbXMLStreamWriter(filepath).write(gb, wgb.iterSurfaces(cmp, HBsurfaces))
+    """
+    
+    def __init__(self, filePath):
+        self.filePath = filePath
+    
+    def write(self, gb, surfaces):
+        # serialize everything but the surfaces into an xml document
+        gb.Campus.Surface = None
+        doc = System.Xml.XmlDocument()
+        docWriter = doc.CreateNavigator().AppendChild()
+        System.Xml.Serialization.XmlSerializer(gb.GetType()).Serialize(docWriter, gb)
+        docWriter.Close()
+        
+        root = doc.DocumentElement
+        settings = System.Xml.XmlWriterSettings()
+        settings.Indent = True
+        settings.Encoding = System.Text.UTF8Encoding(False)
+        writer = System.Xml.XmlWriter.Create(self.filePath, settings)
+        try:
+            writer.WriteStartDocument()
+            writer.WriteStartElement(root.Prefix, root.LocalName, root.NamespaceURI)
+            for attribute in root.Attributes:
+                attribute.WriteTo(writer)
+            for node in root.ChildNodes:
+                if node.LocalName == "Campus":
+                    self.writeCampus(node, surfaces, writer)
+                else:
+                    node.WriteTo(writer)
+            writer.WriteEndElement()
+            writer.WriteEndDocument()
+        finally:
+            writer.Close()
+    
+    def writeCampus(self, campus, surfaces, writer):
+        surfaceRoot = System.Xml.Serialization.XmlRootAttribute("Surface")
+        surfaceRoot.Namespace = campus.NamespaceURI
+        surfaceSerializer = System.Xml.Serialization.XmlSerializer(clr.GetClrType(gbx.Surface), surfaceRoot)
+        namespaces = System.Xml.Serialization.XmlSerializerNamespaces()
+        namespaces.Add("", campus.NamespaceURI)
+        
+        writer.WriteStartElement(campus.Prefix, campus.LocalName, campus.NamespaceURI)
+        for attribute in campus.Attributes:
+            attribute.WriteTo(writer)
+        
+        # surfaces come right after the buildings in gbXML schema
+        children = list(campus.ChildNodes)
+        surfaceIndex = len(children)
+        for count, node in enumerate(children):
+            if node.LocalName == "Building": surfaceIndex = count + 1
+        
+        for node in children[:surfaceIndex]:
+            node.WriteTo(writer)
+        for surface in surfaces:
+            surfaceSerializer.Serialize(writer, surface, namespaces)
+        for node in children[surfaceIndex:]:
+            node.WriteTo(writer)
+        writer.WriteEndElement()
+
+
 if gbXMLIsReady and _location and _writegbXML and _workingDir:
         #try:
         #instantiate gbXML object
@@ -1650,13 +1780,25 @@ if gbXMLIsReady and _location and _writegbXML and _workingDir:
                 HBContext = []
                 
 
-        #a list to store shared interior surfaces
-        sharedint = []
+        # phase 1: find the unique schedules, constructions, openings and shared interior surfaces
+        phaseStart = time.time()
+        registry = gbXMLRegistry(sc.sticky["honeybee_EPScheduleAUX"]())
+        for zone in HBZones:
+            if zone.hasNonPlanarSrf or zone.hasInternalEdge:
+                zone.prepareNonPlanarZone(1)
+            registry.addZone(zone, wgb.makeUniqueSched(wgb.getZoneSchedules(zone)))
+        registry.resolveSchedules()
+        wgb.logPhaseTime("Registries", phaseStart)
+        
+        #a set to store shared interior surfaces
+        sharedint = registry.sharedInteriorSurfaces
         #variable to store unique surface count
         uniquesurfcount = 0
         #store the surface objects as they are declared by honeybee
         HBsurfaces = {}
         
+        # phase 2: spaces
+        phaseStart = time.time()
         # initiate gbXML parent node
         gb = wgb.writegbNode()
         #create campus
@@ -1681,15 +1823,10 @@ if gbXMLIsReady and _location and _writegbXML and _workingDir:
             cmp.Buildings[bcount].Spaces = gbx.prod.makeSpaceArray(len(HBZones))
             #this is the total area of all spaces, to be applied elsewhere
             totalarea = 0
-            uniqueSched = []
             rhinoLevels = []
             for zonecounter, zone in enumerate(HBZones):
-                
-                if zone.hasNonPlanarSrf or zone.hasInternalEdge:
-                    zone.prepareNonPlanarZone(1)
-                
-                # create a space, calculate total area, find all unique schedules
-                space,totalarea,uniqueSched,rhinoLevels = wgb.makeSpace(zone,totalarea, uniqueSched,rhinoLevels)
+                # create a space, calculate total area
+                space,totalarea,rhinoLevels = wgb.makeSpace(zone,totalarea,rhinoLevels)
                 
                 space = wgb.writeShellGeo(zone.surfaces, space)
                 cid = gbx.CADObjectId()
@@ -1700,91 +1837,37 @@ if gbXMLIsReady and _location and _writegbXML and _workingDir:
                 cmp.Buildings[bcount].Spaces[zonecounter] = space
             cmp.Buildings[bcount].Area = totalarea
             cmp.Buildings[bcount] = wgb.makegbXMLevels(rhinoLevels,cmp.Buildings[bcount])
-            
-
-        #createsurface elements, keep track of all constructions and openings
-        usedconstructions = []
-        usedopening = {}
-        #whether surfaces are meshed or not has already been determined
-        
-        shadecount = wgb.getShadeCount(HBContext)
-        print "number of shades", shadecount
-        totsurfct = len(HBsurfaces) + shadecount
-        cmp,usedconstructions,usedopening = wgb.writeSurfaces(cmp,HBsurfaces,uniquesurfcount,usedconstructions,usedopening, totsurfct)
-
-        #write only unique constructions and openings
-        uniqueconst = set(usedconstructions)
-        uniqueopens = set(usedopening.values())
-        wgb.writeConstructions(uniqueopens,uniqueconst)
+        wgb.logPhaseTime("Spaces", phaseStart)
         
-        #write only the unique schedules
-        hb_EPScheduleAUX = sc.sticky["honeybee_EPScheduleAUX"]()
+        # phase 3: write only unique constructions and openings
+        phaseStart = time.time()
+        wgb.writeConstructions(registry.openings.keys(),registry.constructions.keys())
         
         #make schedules
-        #schedule count
-        schct = 0
-        #week schedule count
-        wschct = 0
-        #daily schedule count
-        dschct = 0
-        for schedule in uniqueSched:
-            schedule = schedule.strip('.')
-            scheduleValues, comments = hb_EPScheduleAUX.getScheduleDataByName(schedule, ghenv.Component)
-            if not scheduleValues:
-                logging.debug('There are no schedules in the honeybee hive.')
-                continue
-                
-            m = re.match('(.*)(:)(.*)', scheduleValues[0])
-            if m:
-                
-                if m.group(3) == "Year":
-                    schct += 1
-                elif m.group(3) == "Daily":
-                    wschct += 1
-                elif m.group(3) == "Interval":
-                    dschct += 1
-                    
-            # collect all the schedule items inside the schedule
-            if scheduleValues[0] == "Schedule:Week:Daily":
-                for value in scheduleValues[1:]:
-                    if value not in uniqueSched:
-                        uniqueSched.append(value)
-            # add schedules which are referenced inside other schedules to the list
-            for value in scheduleValues[1:]:
-                if value.startswith("Schedule:") and value not in uniqueSched:
-                    uniqueSched.append(value)
-        scharr = gbx.BasicSerialization.setScheduleArray(schct)
+        scharr = gbx.BasicSerialization.setScheduleArray(registry.getScheduleCount("Year"))
         gb.Schedule = scharr
         
-        wkarr = gbx.BasicSerialization.setWeekScheduleArray(wschct)
+        wkarr = gbx.BasicSerialization.setWeekScheduleArray(registry.getScheduleCount("Daily"))
         gb.WeekSchedule = wkarr
-        dayarr = gbx.BasicSerialization.setDayScheduleArray(dschct)
+        dayarr = gbx.BasicSerialization.setDayScheduleArray(registry.getScheduleCount("Interval"))
         gb.DaySchedule = dayarr
         sct = 0
         wct = 0
         dct = 0
         wknms = []
         
-        for schedule in uniqueSched:
-            # print schedule
-            schedule = schedule.strip('.')
-            
-            scheduleValues, comments = hb_EPScheduleAUX.getScheduleDataByName(schedule, ghenv.Component)
-            if scheduleValues!=None:
-                m = re.match('(.*)(:)(.*)', scheduleValues[0])
-                if m:
-                    
-                    if m.group(3) == "Year":
-                        gb = wgb.EPSCHStr(gb, schedule, sct,wknms)
-                        sct += 1
-                    elif m.group(3) == "Daily":
-                        gb = wgb.EPSCHStr(gb, schedule, wct,wknms)
-                        wct += 1
-                        
-                    elif m.group(3) == "Interval":
-                        gb = wgb.EPSCHStr(gb, schedule, dct,wknms)
-                        dct += 1
-
+        for schedule, scheduleType in registry.schedules.items():
+            if scheduleType == "Year":
+                gb = wgb.EPSCHStr(gb, schedule, sct,wknms)
+                sct += 1
+            elif scheduleType == "Daily":
+                gb = wgb.EPSCHStr(gb, schedule, wct,wknms)
+                wct += 1
+            elif scheduleType == "Interval":
+                gb = wgb.EPSCHStr(gb, schedule, dct,wknms)
+                dct += 1
+        wgb.logPhaseTime("Constructions and schedules", phaseStart)
+        
         #except NameError, e:
         #    logging.error(sys.exc_info()[0])
         #    print `e`
@@ -1800,5 +1883,15 @@ if gbXMLIsReady and _location and _writegbXML and _workingDir:
         except:
             logging.info('there likely is not a filename.  using default.')
             filepath=_workingDir + "test.xml"
-        res = gbx.BasicSerialization.CreateXML(filepath,gb)
+        
+        # phase 4: surfaces are made and written to the file one by one
+        phaseStart = time.time()
+        try:
+            gbXMLStreamWriter(filepath).write(gb, wgb.iterSurfaces(cmp,HBsurfaces))
+        except Exception, e:
+            logging.error('Failed to stream the surfaces to the gbxml file:' + str(e))
+            print 'Failed to stream the surfaces. Writing the whole gbXML at once.\n' + str(e)
+            cmp = wgb.writeSurfaces(cmp,HBsurfaces)
+            res = gbx.BasicSerialization.CreateXML(filepath,gb)
+        wgb.logPhaseTime("Surfaces", phaseStart)
         resultFileAddress = filepath
@@ -47,7 +47,7 @@ Provided by Honeybee 0.0.63
 
 ghenv.Component.Name = "Honeybee_Honeybee"
 ghenv.Component.NickName = 'Honeybee'
-ghenv.Component.Message = 'VER 0.0.63\nJUN_29_2018'
+ghenv.Component.Message = 'VER 0.0.63\nOCT_18_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.icon
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "00 | Honeybee"
@@ -72,16 +72,33 @@ import System.Threading.Tasks as tasks
 import System
 import time
 import itertools
+import operator
+import collections
 import datetime
 import json
 import copy
 import urllib2 as urllib
 import cPickle as pickle
 import subprocess
+import threading
+import Queue
 import uuid
 import re
 import random
 import zipfile
+import hashlib
+import array
+import struct
+try:
+    import mmap
+except ImportError:
+    # older IronPython builds don't ship mmap
+    mmap = None
+try:
+    import sqlite3
+except ImportError:
+    # IronPython.SQLite is not installed
+    sqlite3 = None
 
 try:
     System.Net.ServicePointManager.SecurityProtocol = System.Net.SecurityProtocolType.Tls12
@@ -384,7 +401,7 @@ class PrepareTemplateEPLibFiles(object):
     """
     Download Template files and check for available libraries for EnergyPlus
     """
-    def __init__(self, downloadTemplate = False, workingDir = None):
+    def __init__(self, downloadTemplate = False, workingDir = None, librarySnapshot = None):
         
         if not workingDir: workingDir = sc.sticky["Honeybee_DefaultFolder"]
         if not sc.sticky.has_key("honeybee_constructionLib"): sc.sticky ["honeybee_constructionLib"] = {}
@@ -398,6 +415,7 @@ class PrepareTemplateEPLibFiles(object):
         
         self.downloadTemplate = downloadTemplate
         self.workingDir = workingDir
+        self.librarySnapshot = librarySnapshot
         self.failureMsg = ""
         
     def downloadFile(self, url, workingDir):
@@ -405,6 +423,19 @@ class PrepareTemplateEPLibFiles(object):
         client = System.Net.WebClient()
         client.DownloadFile(url, localFilePath)
     
+    def loadOpenStudioStandards(self, filepath):
+        if self.librarySnapshot != None:
+            openStudioStandardLib = self.librarySnapshot.getSection("OpenStudioStandards", [filepath])
+            if openStudioStandardLib != None: return openStudioStandardLib
+        
+        with open(filepath) as jsondata:
+            openStudioStandardLib = json.load(jsondata)
+        
+        if self.librarySnapshot != None:
+            self.librarySnapshot.setSection("OpenStudioStandards", [filepath], openStudioStandardLib)
+        
+        return openStudioStandardLib
+    
     def cleanHBLib(self):
         sc.sticky ["honeybee_constructionLib"] = {}
         sc.sticky ["honeybee_materialLib"] = {}
@@ -479,8 +510,7 @@ class PrepareTemplateEPLibFiles(object):
             # load the json file
             filepath = os.path.join(workingDir, 'OpenStudio_Standards.json')
             try:
-                with open(filepath) as jsondata:
-                    openStudioStandardLib = json.load(jsondata)
+                openStudioStandardLib = self.loadOpenStudioStandards(filepath)
                 
                 sc.sticky ["honeybee_OpenStudioStandardsFile"] = openStudioStandardLib
                 print "Standard template file is loaded from %s"%filepath
@@ -535,9 +565,260 @@ class PrepareTemplateEPLibFiles(object):
         return libFilePaths
 
 
+class hb_IDFTokenizer(object):
+    """
+    Streaming, single pass tokenizer for EnergyPlus idf files
+    
+    The file is read line by line. Comments are removed and objects are split on
+    commas and semicolons so objects with no next line, several objects in one line
+    and files with no trailing new line are all supported.
+    
+    Every object is indexed by (class name, upper-cased name) with the start and end
+    offset of the object in the file. Fields are only decoded for the classes that
+    are requested. Fields of other objects can be decoded later with getObject.
+    
+    Usage:
+        tokenizer = hb_IDFTokenizer(r"c:\ladybug\OpenStudioMasterTemplate.idf")
+        for className, fields in tokenizer.tokenize(["Construction", "Material"]):
+            # fields is a list of [value, comment, line number]
+            pass
+        fields = tokenizer.getObject("Construction", "Exterior Wall")
+    """
+    
+    def __init__(self, filePath = None):
+        self.filePath = filePath
+        self.index = {}
+        self.classNames = {}
+    
+    @staticmethod
+    def getShortKey(className):
+        return className.split(":")[0].strip().upper()
+    
+    def isRequested(self, className, shortKeys):
+        if shortKeys == None: return True
+        return self.getShortKey(className) in shortKeys
+    
+    def tokenizeLines(self, lines, shortKeys = None, startOffset = 0):
+        """Tokenize an iterable of lines and yield (className, fields) for requested classes.
+        
+        Args:
+            lines: An iterable of lines (e.g. an open file).
+            shortKeys: A list of class names (the part before ":") to decode.
+                Set to None to decode all the objects.
+            startOffset: Offset of the first line in the file.
+        """
+        if shortKeys != None: shortKeys = set(self.getShortKey(key) for key in shortKeys)
+        
+        offset = startOffset
+        objStart = None
+        fields = [] # [value, comment, line number]
+        currentValue = []
+        className = None
+        decode = True
+        index = self.index
+        classNames = self.classNames
+        
+        for lineCount, line in enumerate(lines):
+            lineLength = len(line)
+            if "!" in line:
+                code, comment = line.split("!", 1)
+                comment = comment.rstrip()
+            else:
+                code, comment = line, ""
+            
+            codeStr = code.strip()
+            if codeStr == "":
+                offset += lineLength
+                continue
+            
+            if codeStr[-1] in ",;" and "," not in codeStr[:-1] and ";" not in codeStr[:-1]:
+                # most of the lines only have one field
+                segments = (codeStr[:-1], codeStr[-1])
+                position = len(code) - len(code.lstrip())
+            else:
+                segments = re.split(r"([,;])", code)
+                position = 0
+            
+            lastFieldInLine = None
+            for segment in segments:
+                if segment != "," and segment != ";":
+                    if segment.strip() != "":
+                        if objStart == None:
+                            objStart = offset + position
+                        currentValue.append(segment.strip())
+                    position += len(segment)
+                    continue
+                
+                position += 1
+                if objStart == None: objStart = offset + position - 1
+                value = " ".join(currentValue)
+                currentValue = []
+                
+                if className == None:
+                    className = value
+                    decode = self.isRequested(className, shortKeys)
+                    fields = []
+                else:
+                    lastFieldInLine = [value, "", lineCount]
+                    fields.append(lastFieldInLine)
+                
+                if segment == ";":
+                    # end of the object
+                    if lastFieldInLine != None: lastFieldInLine[1] = comment
+                    name = fields[0][0].upper() if len(fields) != 0 else ""
+                    index[(className.upper(), name)] = (objStart, offset + position)
+                    classNames.setdefault(className.upper(), []).append(name)
+                    if decode:
+                        yield className, fields
+                    className = None
+                    objStart = None
+                    fields = []
+                    lastFieldInLine = None
+            
+            if lastFieldInLine != None: lastFieldInLine[1] = comment
+            offset += lineLength
+    
+    def tokenize(self, shortKeys = None):
+        """Tokenize the file. See tokenizeLines for the arguments."""
+        if not os.path.isfile(self.filePath):
+            raise ValueError("Can't find %s."%self.filePath)
+        
+        self.index = {}
+        self.classNames = {}
+        # open in binary mode so the offsets are the same as the file offsets
+        with open(self.filePath, "rb") as idfFile:
+            for EPObject in self.tokenizeLines(idfFile, shortKeys):
+                yield EPObject
+    
+    def tokenizeString(self, idfString, shortKeys = None):
+        return self.tokenizeLines(idfString.splitlines(True), shortKeys)
+    
+    def getObjectNames(self, className):
+        return self.classNames.get(className.upper(), [])
+    
+    def hasObject(self, className, name):
+        return (className.upper(), name.upper()) in self.index
+    
+    def getObject(self, className, name):
+        """Decode the fields of a single object from the file using the index."""
+        try:
+            start, end = self.index[(className.upper(), name.upper())]
+        except KeyError:
+            return None
+        
+        with open(self.filePath, "rb") as idfFile:
+            idfFile.seek(start)
+            objectStr = idfFile.read(end - start)
+        
+        # use a new tokenizer so the index of this file doesn't change
+        for EPObject in hb_IDFTokenizer().tokenizeString(objectStr):
+            return EPObject[1]
+
+
+class hb_IDFNameCollection(object):
+    """
+    An ordered collection of EnergyPlus object names
+    
+    Names are compared case-insensitively with a set so membership checks are
+    O(1). Iterating over the collection also visits the names that are appended
+    during the iteration (e.g. day schedules of a week schedule).
+    """
+    
+    def __init__(self, names = None):
+        self.names = []
+        self.keys = set()
+        if names != None:
+            for name in names: self.append(name)
+    
+    def __contains__(self, name):
+        return name.upper() in self.keys
+    
+    def append(self, name):
+        """Add the name to the collection. Returns False if it is already added."""
+        key = name.upper()
+        if key in self.keys: return False
+        self.keys.add(key)
+        self.names.append(name)
+        return True
+    
+    def __iter__(self):
+        count = 0
+        while count < len(self.names):
+            yield self.names[count]
+            count += 1
+    
+    def __len__(self):
+        return len(self.names)
+
+
+class hb_IDFWriter(object):
+    """
+    Collect the strings of an idf file and write the file in one buffered pass
+    
+    Strings are kept in the order that they are written. Objects that are written
+    with writeObject are deduplicated by their content so a construction,
+    material or schedule is only written once no matter how many times it is
+    requested. Named collections (e.g. constructions or schedules that should be
+    written later) are available through getCollection.
+    
+    The class can be used as a file so current code can write to it and the idf
+    file is written once close is called.
+    
+    Usage:
+        idfFile = hb_IDFWriter(r"c:\ladybug\test\EnergyPlus\test.idf")
+        EPScheduleCollection = idfFile.getCollection("Schedule")
+        idfFile.write(zoneStr)
+        idfFile.writeObject(constructionStr)
+        idfFile.close()
+    """
+    
+    BUFFERSIZE = 1048576
+    
+    def __init__(self, filePath):
+        self.filePath = filePath
+        self.chunks = []
+        self.objects = set()
+        self.collections = {}
+        self.closed = False
+    
+    def getCollection(self, name):
+        """Return the named collection. It will be created if it doesn't exist."""
+        if name not in self.collections:
+            self.collections[name] = hb_IDFNameCollection()
+        return self.collections[name]
+    
+    def write(self, text):
+        if text: self.chunks.append(text)
+    
+    def writelines(self, lines):
+        for line in lines: self.write(line)
+    
+    def writeObject(self, objStr):
+        """Write an EnergyPlus object if an object with the same content is not written already.
+        
+        Returns True if the object is written.
+        """
+        if not objStr: return False
+        key = objStr.strip()
+        if key in self.objects: return False
+        self.objects.add(key)
+        self.chunks.append(objStr)
+        return True
+    
+    def close(self):
+        """Write the file."""
+        if self.closed: return self.filePath
+        with open(self.filePath, "w", self.BUFFERSIZE) as idfFile:
+            idfFile.writelines(self.chunks)
+        self.chunks = []
+        self.closed = True
+        return self.filePath
+
+
 class HB_GetEPLibraries:
     
     def __init__(self):
+        self.tokenizers = {}
         self.libraries = {
             "Material": {},
             "WindowMaterial": {},
@@ -579,8 +860,11 @@ class HB_GetEPLibraries:
         
         if isMatFile == False:
             print "Loading EP materials, constructions, schedules and material properties from %s"%EPfile
-            EPObjects = self.getEnergyPlusObjectsFromFile(EPfile)
-            self.loadEPConstructionsMaterialsAndSchedules(EPObjects, cleanCurrentLib)
+            # single pass over the file. The tokenizer keeps an index of all the
+            # objects in the file which can be used to decode the other objects.
+            tokenizer = hb_IDFTokenizer(EPfile)
+            self.loadEPObjects(tokenizer.tokenize(self.getLibraryKeys()), cleanCurrentLib)
+            self.tokenizers[EPfile] = tokenizer
         else:
             print "Loading THERM materials from %s"%EPfile
             self.getThermObjectsFromFile(EPfile)
@@ -600,72 +884,53 @@ class HB_GetEPLibraries:
             "MaterialProperty": {}
             }
             
-    # TODO: Support parsing for files with no next line
-    # TODO: Check if keys can be case insensitive
     # TODO: Create EPObjects and not dictionaries
     def loadEPConstructionsMaterialsAndSchedules(self, EPObjectsString, cleanCurrentLib = True):
+        tokenizer = hb_IDFTokenizer()
+        EPObjects = tokenizer.tokenizeString("\n".join(EPObjectsString), self.getLibraryKeys())
+        self.loadEPObjects(EPObjects, cleanCurrentLib)
+    
+    def getLibraryKeys(self):
+        return [key for key in self.libraries.keys() if key != "ThermMaterial"]
+    
+    def loadEPObjects(self, EPObjects, cleanCurrentLib = True):
+        """Load (className, fields) tuples from hb_IDFTokenizer to the libraries."""
         if cleanCurrentLib: self.cleanHBLibs()
         
-        for EPObjectStr in EPObjectsString:
-            rawLines = EPObjectStr.strip().split("\n")
-            lines = []
-            for line in rawLines:
-                if line.strip() == '' or line.startswith('!'): continue
-                lines.append(line)
+        for className, fields in EPObjects:
+            if len(fields) == 0: continue
             
-            if not lines:
-                continue
+            name = fields[0][0].upper()
             
-            if lines[0].startswith('MaterialProperty:GlazingSpectralData'):
+            if className.startswith('MaterialProperty:GlazingSpectralData'):
                 key = 'MaterialProperty:GlazingSpectralData'
                 shortKey = 'MaterialProperty'
-                name = lines[1].split(",")[0].strip().upper()
                 self.libraries[shortKey][name] = dict() # create an empty dictonary
                 self.libraries[shortKey][name][0] = key
-                # store the data into the dictionary
-                for lineCount, line in enumerate(lines):
-                    objValue = line.split("!")[0].strip()
-                    try: objDescription = line.split("!")[1].strip()
-                    except:  objDescription = ""
-                    if lineCount == 0:
-                        self.libraries[shortKey][name][lineCount] = objValue[:-1]
-                    elif lineCount == 1:
-                        pass # name is already there as the key
-                    elif objValue.endswith(","):
-                        self.libraries[shortKey][name][lineCount-1] = objValue[:-1], objDescription
-                    elif objValue.endswith(";"):
-                        self.libraries[shortKey][name][lineCount-1] = objValue[:-1], objDescription
+                # spectral data has several values in each line. keep them together.
+                count = 0
+                lastLine = None
+                for value, comment, lineNumber in fields[1:]:
+                    if lineNumber != lastLine:
+                        count += 1
+                        lastLine = lineNumber
+                        self.libraries[shortKey][name][count] = value, comment.strip()
+                    else:
+                        lineValue = self.libraries[shortKey][name][count][0]
+                        self.libraries[shortKey][name][count] = lineValue + "," + value, comment.strip()
             else:
-                if len(lines) < 2: continue
-                
-                if lines[0].split(",")[0].strip().isupper():
-                    key = lines[0].split(",")[0].strip().title()
+                if className.isupper():
+                    key = className.title()
                 else:
-                    key = lines[0].split(",")[0].strip()
+                    key = className
                 shortKey = key.split(":")[0]
                 
-                name = lines[1].split(",")[0].strip().upper()
-                values = lines[2:]
-                # it's a two line object such as Any Number scheduleTypeLimit
-                if values == []:
-                    name = lines[1].split(";")[0].strip().upper() # name is the last input
-                    
                 if shortKey in self.libraries:
                     self.libraries[shortKey][name] = dict() # create an empty dictonary
                     self.libraries[shortKey][name][0] = key
                     
-                    count = 1
-                    delimiter = ","
-                    for value in values:
-                        if not len(value.strip()): continue #pass empty lines
-                        if count==len(values): delimiter = ";"
-                        v = value.split(delimiter)[0].strip() # find the  value
-                        if value.find("!")!= -1:
-                            c = value.split("!")[-1].rstrip() # find the  value
-                        else:
-                            c = ""
-                        self.libraries[shortKey][name][count] = v, c
-                        count += 1
+                    for count, field in enumerate(fields[1:]):
+                        self.libraries[shortKey][name][count + 1] = field[0], field[1]
     
     def report(self): 
         # Report findings
@@ -750,6 +1015,158 @@ class HB_GetEPLibraries:
                         self.libraries["ThermMaterial"][matName]["RGBColor"] = System.Drawing.ColorTranslator.FromHtml("#" + matPropLine[-2])
                     except: pass
 
+class hb_LibrarySnapshot(object):
+    """
+    Versioned on-disk snapshot of the parsed Honeybee libraries
+    
+    Each library is saved as a section with the list of source files that it has been
+    parsed from. A section is only loaded back if all the source files are unchanged.
+    The files are checked by modified time and size first and by their md5 hash if the
+    time stamp has changed (e.g. the file is downloaded again with the same content).
+    Otherwise the library should be parsed again and updated in the snapshot.
+    
+    File structure:
+        MAGIC, version, pickled dictionary of sections
+    
+    Usage:
+        snapshot = hb_LibrarySnapshot(sc.sticky["Honeybee_DefaultFolder"])
+        EPLibraries = snapshot.getSection("EP", libFilePaths)
+        if EPLibraries == None:
+            # parse the files and update the snapshot
+            snapshot.setSection("EP", libFilePaths, EPLibraries)
+        snapshot.save()
+    """
+    
+    FILENAME = "HoneybeeLibraries.hbsnap"
+    MAGIC = "HBLIBSNP"
+    VERSION = 1
+    
+    def __init__(self, workingDir = None, honeybeeVersion = None):
+        if not workingDir: workingDir = sc.sticky["Honeybee_DefaultFolder"]
+        self.filePath = os.path.join(workingDir, self.FILENAME)
+        # snapshot will be invalid once Honeybee is updated
+        self.honeybeeVersion = honeybeeVersion
+        self.sections = {}
+        self.isChanged = False
+        self.load()
+    
+    def load(self):
+        self.sections = {}
+        if not os.path.isfile(self.filePath): return
+        try:
+            with open(self.filePath, "rb") as inf:
+                if inf.read(len(self.MAGIC)) != self.MAGIC: return
+                version, = struct.unpack("<i", inf.read(4))
+                if version != self.VERSION: return
+                data = pickle.load(inf)
+        except Exception, e:
+            print "Failed to read library snapshot. Libraries will be loaded from the source files.\n%s"%str(e)
+            return
+        
+        if data.get("honeybeeVersion") == self.honeybeeVersion:
+            self.sections = data["sections"]
+    
+    def save(self):
+        if not self.isChanged: return
+        tempPath = self.filePath + ".tmp"
+        try:
+            with open(tempPath, "wb") as outf:
+                outf.write(self.MAGIC)
+                outf.write(struct.pack("<i", self.VERSION))
+                pickle.dump({"honeybeeVersion": self.honeybeeVersion,
+                             "sections": self.sections}, outf, 2)
+            
+            if os.path.isfile(self.filePath): os.remove(self.filePath)
+            os.rename(tempPath, self.filePath)
+            self.isChanged = False
+        except Exception, e:
+            print "Failed to save library snapshot to %s\n%s"%(self.filePath, str(e))
+    
+    @staticmethod
+    def getFileHash(filePath):
+        md5 = hashlib.md5()
+        with open(filePath, "rb") as inf:
+            for chunk in iter(lambda: inf.read(1048576), ""):
+                md5.update(chunk)
+        return md5.hexdigest()
+    
+    def getSourcesStamp(self, sourceFiles):
+        # path, modified time, size and hash for each source file
+        stamp = []
+        for sourceFile in sourceFiles:
+            stat = os.stat(sourceFile)
+            stamp.append((os.path.normcase(os.path.abspath(sourceFile)), stat.st_mtime,
+                          stat.st_size, self.getFileHash(sourceFile)))
+        return stamp
+    
+    def isUpToDate(self, sectionName, sourceFiles):
+        if sectionName not in self.sections: return False
+        
+        savedStamp = self.sections[sectionName]["sources"]
+        if len(savedStamp) != len(sourceFiles): return False
+        
+        for sourceFile, (path, mtime, size, fileHash) in zip(sourceFiles, savedStamp):
+            if os.path.normcase(os.path.abspath(sourceFile)) != path: return False
+            if not os.path.isfile(sourceFile): return False
+            
+            stat = os.stat(sourceFile)
+            if stat.st_size != size: return False
+            if stat.st_mtime == mtime: continue
+            # file is touched. check the content
+            if self.getFileHash(sourceFile) != fileHash: return False
+        
+        return True
+    
+    def getSection(self, sectionName, sourceFiles):
+        """Return the saved data for a section or None if any of the sources has changed."""
+        if not self.isUpToDate(sectionName, sourceFiles): return None
+        return self.sections[sectionName]["data"]
+    
+    def setSection(self, sectionName, sourceFiles, data):
+        try:
+            self.sections[sectionName] = {"sources": self.getSourcesStamp(sourceFiles),
+                                          "data": data}
+            self.isChanged = True
+        except Exception, e:
+            # source file is missing. The section will be parsed next time
+            print "Failed to add %s libraries to the snapshot.\n%s"%(sectionName, str(e))
+    
+    # Radiance materials and THERM colors are not picklable. Save them as values.
+    @staticmethod
+    def radMaterialsToData(radMaterialLibrary):
+        return dict((name, (radMaterial.type, radMaterial.modifier, radMaterial.values))
+                    for name, radMaterial in radMaterialLibrary.items())
+    
+    @staticmethod
+    def dataToRadMaterials(data):
+        return dict((name, RADMaterialAux.RadianceMaterial(name, matType, values, modifier))
+                    for name, (matType, modifier, values) in data.items())
+    
+    @staticmethod
+    def EPLibrariesToData(libraries):
+        data = dict(libraries)
+        thermMaterials = {}
+        for matName, matProp in libraries["ThermMaterial"].items():
+            matProp = dict(matProp)
+            if isinstance(matProp.get("RGBColor"), System.Drawing.Color):
+                matProp["RGBColor"] = matProp["RGBColor"].ToArgb()
+            thermMaterials[matName] = matProp
+        data["ThermMaterial"] = thermMaterials
+        return data
+    
+    @staticmethod
+    def dataToEPLibraries(data):
+        libraries = dict(data)
+        thermMaterials = {}
+        for matName, matProp in data["ThermMaterial"].items():
+            matProp = dict(matProp)
+            if isinstance(matProp.get("RGBColor"), int):
+                matProp["RGBColor"] = System.Drawing.Color.FromArgb(matProp["RGBColor"])
+            thermMaterials[matName] = matProp
+        libraries["ThermMaterial"] = thermMaterials
+        return libraries
+
+
 def checkUnits():
     units = sc.doc.ModelUnitSystem
     if `units` == 'Rhino.UnitSystem.Meters': conversionFactor = 1.00
@@ -1636,6 +2053,979 @@ class hb_MSHToRAD(object):
     
         return matFile, radFile
 
+class hb_ProcessRunner(object):
+    """
+    Run EnergyPlus, Radiance and Daysim executables directly
+    
+    Commands are argument lists and are started without a batch file or a
+    cmd/sh hop so the same code runs on Windows and Linux. A command can be a
+    pipeline (e.g. rtrace | rcalc) which is passed as a list of argument lists.
+    Input and output redirections are file paths and are streamed in binary
+    chunks so images can be piped too. stderr of all the processes is streamed
+    line by line to an optional log file while the processes are running.
+    Radiance and Daysim commands are collected in a hb_CommandScript and run
+    with runScript.
+    
+    Args:
+        workingDir: Default working directory for the processes.
+        env: Optional dictionary of environment variables which will be added
+            to the current environment (e.g. the result of radianceEnvironment).
+        logFile: Optional path to a log file. stderr lines will be appended to this file.
+        showWindow: Set to True to open a command window for each process on Windows.
+    """
+    
+    CHUNKSIZE = 65536
+    # flag to hide the console window on Windows
+    CREATE_NO_WINDOW = 0x08000000
+    
+    def __init__(self, workingDir = None, env = None, logFile = None, showWindow = False):
+        self.workingDir = workingDir
+        self.env = env
+        self.logFile = logFile
+        self.showWindow = showWindow
+        self.lock = threading.Lock()
+        self.processes = []
+        self.cancelled = False
+    
+    @staticmethod
+    def findExecutable(name, folder = None):
+        """Return the full path to an executable in a folder (or a list of folders)
+        or on the system PATH.
+        
+        .exe will be added to the name on Windows. None will be returned if the
+        executable can't be found.
+        """
+        names = [name]
+        if os.name == "nt" and not os.path.splitext(name)[1]:
+            names.insert(0, name + ".exe")
+        
+        if isinstance(folder, basestring): folders = [folder]
+        else: folders = list(folder or [])
+        folders.extend(path.strip('"') for path in os.environ.get("PATH", "").split(os.pathsep))
+        for path in folders:
+            for exeName in names:
+                exePath = os.path.join(path, exeName)
+                if os.path.isfile(exePath): return exePath
+        return None
+    
+    @staticmethod
+    def getEnvironment(binFolders = None, rayPath = None, env = None):
+        """Return a copy of the environment with binFolders added to PATH and
+        RAYPATH set to rayPath folders."""
+        newEnv = dict(os.environ) if env == None else dict(env)
+        if binFolders:
+            newEnv["PATH"] = os.pathsep.join(list(binFolders) + [newEnv.get("PATH", "")])
+        if rayPath:
+            newEnv["RAYPATH"] = os.pathsep.join(["."] + list(rayPath))
+        return newEnv
+    
+    @staticmethod
+    def radianceEnvironment(RADPath, RADLibPath, DSPath = None, DSLibPath = None):
+        """Environment for Radiance and Daysim executables."""
+        binFolders = [folder for folder in (RADPath, DSPath) if folder]
+        rayPath = [folder for folder in (RADLibPath, DSPath, DSLibPath) if folder]
+        return hb_ProcessRunner.getEnvironment(binFolders, rayPath)
+    
+    @staticmethod
+    def energyPlusArgs(EPDirectory, idfFilePath, epwFilePath, outputBase = None):
+        """Arguments to run an idf file through EnergyPlus.
+        
+        Output files will be named as outputBase.csv, outputBase.err, outputBase.eio,
+        outputBaseTable.html, etc. Default is the idf file path without extension.
+        EnergyPlus command line (8.3 and later) is used when it is available and
+        Epl-run is used for older versions.
+        """
+        if outputBase == None: outputBase = os.path.splitext(idfFilePath)[0]
+        outputFolder, prefix = os.path.split(outputBase)
+        
+        version = re.search(r"V(\d+)-(\d+)", os.path.basename(os.path.normpath(EPDirectory)))
+        hasCLI = version == None or (int(version.group(1)), int(version.group(2))) >= (8, 3)
+        eplRun = os.path.join(EPDirectory, "Epl-run.bat")
+        
+        if hasCLI or os.name != "nt" or not os.path.isfile(eplRun):
+            executable = hb_ProcessRunner.findExecutable("energyplus", EPDirectory)
+            if executable == None:
+                raise ValueError("Failed to find EnergyPlus executable in %s."%EPDirectory)
+            return [executable, "-w", epwFilePath, "-d", outputFolder, "-p", prefix, \
+                    "-s", "C", "-x", "-r", idfFilePath]
+        else:
+            return [eplRun, outputBase, outputBase, "idf", epwFilePath, \
+                    "EP", "N", "nolimit", "N", "N", "0", "Y"]
+    
+    def log(self, line):
+        if self.logFile == None: return
+        with self.lock:
+            with open(self.logFile, "a") as logFile:
+                logFile.write(line)
+    
+    def pump(self, source, target, closeTarget = True):
+        """Copy data from a process output to a process input or a file."""
+        try:
+            while True:
+                data = source.read(self.CHUNKSIZE)
+                if not data: break
+                target.write(data)
+        finally:
+            if closeTarget:
+                try: target.close()
+                except Exception: pass
+    
+    def streamErrors(self, process, args, errors):
+        name = os.path.basename(args[0])
+        for line in iter(process.stderr.readline, ""):
+            errors.append(line)
+            self.log("[%s] %s"%(name, line))
+        process.stderr.close()
+    
+    def run(self, commands, stdin = None, stdout = None, input = None, cwd = None, env = None):
+        """Run a command or a pipeline of commands and wait for them to finish.
+        
+        Args:
+            commands: An argument list or a list of argument lists for a pipeline.
+            stdin: Optional path to a file which will be passed to the first command.
+            stdout: Optional path to a file for the output of the last command.
+                If None, output will be returned.
+            input: Optional string that will be passed to the first command.
+            cwd: Working directory. Default is the working directory of the runner.
+            env: Optional environment variables. Default is the environment of the runner.
+        Returns:
+            returncode (the first non-zero return code in the pipeline), output
+            of the last command (None if stdout is set) and stderr of all the commands.
+        """
+        if isinstance(commands[0], basestring): commands = [commands]
+        commands = [[str(arg) for arg in args] for args in commands]
+        
+        if cwd == None: cwd = self.workingDir
+        if env == None: env = self.env
+        if env != None: env = dict(os.environ, **env)
+        
+        kwargs = {"cwd": cwd, "env": env, "stderr": subprocess.PIPE, "stdout": subprocess.PIPE}
+        if os.name == "nt" and not self.showWindow:
+            kwargs["creationflags"] = self.CREATE_NO_WINDOW
+        
+        self.log("> %s\n"%" | ".join(subprocess.list2cmdline(args) for args in commands))
+        
+        processes = []
+        threads = []
+        errors = []
+        inputFile = None
+        outputFile = None
+        output = []
+        try:
+            for count, args in enumerate(commands):
+                hasInput = count != 0 or stdin != None or input != None
+                processes.append(subprocess.Popen(args, stdin = subprocess.PIPE if hasInput else None, **kwargs))
+            with self.lock: self.processes.extend(processes)
+            
+            # connect the processes
+            if stdin != None:
+                inputFile = open(stdin, "rb")
+                threads.append(threading.Thread(target = self.pump, args = (inputFile, processes[0].stdin)))
+            elif input != None:
+                def writeInput(process = processes[0]):
+                    try: process.stdin.write(input)
+                    finally: process.stdin.close()
+                threads.append(threading.Thread(target = writeInput))
+            
+            for process, nextProcess in zip(processes[:-1], processes[1:]):
+                threads.append(threading.Thread(target = self.pump, args = (process.stdout, nextProcess.stdin)))
+            
+            if stdout != None:
+                outputFile = open(stdout, "wb")
+                threads.append(threading.Thread(target = self.pump, args = (processes[-1].stdout, outputFile, False)))
+            else:
+                def collectOutput(process = processes[-1]):
+                    output.append(process.stdout.read())
+                threads.append(threading.Thread(target = collectOutput))
+            
+            for process, args in zip(processes, commands):
+                threads.append(threading.Thread(target = self.streamErrors, args = (process, args, errors)))
+            
+            for thread in threads:
+                thread.daemon = True
+                thread.start()
+            
+            returncodes = [process.wait() for process in processes]
+            for thread in threads: thread.join()
+        finally:
+            if inputFile != None: inputFile.close()
+            if outputFile != None: outputFile.close()
+            with self.lock:
+                for process in processes: self.processes.remove(process)
+        
+        returncode = next((code for code in returncodes if code != 0), 0)
+        return returncode, None if stdout != None else "".join(output), "".join(errors)
+    
+    def runEnergyPlus(self, EPDirectory, idfFilePath, epwFilePath, outputBase = None):
+        """Run an idf file through EnergyPlus and return the return code."""
+        args = self.energyPlusArgs(EPDirectory, idfFilePath, epwFilePath, outputBase)
+        cwd = os.path.dirname(outputBase or idfFilePath) or None
+        if self.showWindow:
+            # let EnergyPlus write the progress to its own window
+            kwargs = {"cwd": cwd}
+            if self.env != None: kwargs["env"] = dict(os.environ, **self.env)
+            return subprocess.Popen(args, **kwargs).wait()
+        return self.run(args, cwd = cwd)[0]
+    
+    def cancel(self):
+        """Kill the running processes and stop the script that is running."""
+        self.cancelled = True
+        with self.lock:
+            for process in self.processes:
+                try: process.kill()
+                except Exception: pass
+    
+    def runScript(self, script):
+        """Run the commands of a hb_CommandScript one after the other.
+        
+        Like a batch file all the commands will run and the return code of the
+        last command will be returned. The script stops if the runner is cancelled.
+        """
+        self.cancelled = False
+        self.log("> %s\n"%(script.batchFileName or "script"))
+        
+        returncode = 0
+        for command in script.commands:
+            if self.cancelled: return -1
+            if command["remove"] != None:
+                if os.path.isfile(command["remove"]): os.remove(command["remove"])
+                continue
+            
+            commands = [list(args) for args in command["commands"]]
+            for args in commands:
+                args[0] = self.findExecutable(args[0], script.binFolders) or args[0]
+            
+            returncode, output, errors = self.run(commands, command["stdin"], command["stdout"], \
+                                                  cwd = command["cwd"], env = script.env)
+            if output: self.log(output)
+        
+        return returncode
+
+
+class hb_CommandScript(object):
+    """
+    A list of commands that run one after the other through hb_ProcessRunner
+    
+    Radiance and Daysim writers add the commands as argument lists with their
+    input and output files. The same commands can be written to a batch file
+    which is only kept so the commands can be checked or ran by hand.
+    
+    Args:
+        batchFileName: Path to the batch file for the commands.
+        cwd: Default working directory for the commands.
+        env: Environment for the commands (e.g. hb_ProcessRunner.radianceEnvironment).
+        binFolders: Folders to find the executables in before the system PATH.
+        header: Lines at the start of the batch file (e.g. SET RAYPATH).
+    
+    Usage:
+        script = hb_CommandScript(batchFileName, subWorkingDir, env, [RADPath])
+        script.addCommand(["oconv", "-f", "sky.rad", "scene.rad"], stdout = "scene.oct")
+        script.write()
+        hb_ProcessRunner(logFile = logFile).runScript(script)
+    """
+    
+    def __init__(self, batchFileName, cwd = None, env = None, binFolders = None, header = ""):
+        self.batchFileName = batchFileName
+        self.cwd = cwd
+        self.env = env
+        self.binFolders = [folder for folder in (binFolders or []) if folder]
+        self.header = header
+        self.commands = []
+    
+    def getPath(self, filePath, cwd):
+        if filePath == None or cwd == None: return filePath
+        return os.path.join(cwd, filePath)
+    
+    def addCommand(self, commands, stdin = None, stdout = None, cwd = None):
+        """Add an argument list or a pipeline of argument lists.
+        
+        stdin and stdout are file paths. Relative paths are relative to the
+        working directory of the command.
+        """
+        if isinstance(commands[0], basestring): commands = [commands]
+        if cwd == None: cwd = self.cwd
+        self.commands.append({"commands": [[str(arg) for arg in args] for args in commands],
+                              "stdin": self.getPath(stdin, cwd), "stdout": self.getPath(stdout, cwd),
+                              "cwd": cwd, "remove": None,
+                              "line": hb_CommandScript.commandLine(commands, stdin, stdout)})
+    
+    def removeFile(self, filePath, cwd = None):
+        if cwd == None: cwd = self.cwd
+        self.commands.append({"commands": None, "stdin": None, "stdout": None, "cwd": cwd,
+                              "remove": self.getPath(filePath, cwd), \
+                              "line": "del " + subprocess.list2cmdline([filePath]) + "\n"})
+    
+    @staticmethod
+    def commandLine(commands, stdin = None, stdout = None):
+        """Return the commands as a line of a batch file."""
+        if isinstance(commands[0], basestring): commands = [commands]
+        line = " | ".join(subprocess.list2cmdline([str(arg) for arg in args]) for args in commands)
+        if stdin != None: line += " < " + subprocess.list2cmdline([stdin])
+        if stdout != None: line += " > " + subprocess.list2cmdline([stdout])
+        return line + "\n"
+    
+    def write(self):
+        """Write the commands to the batch file."""
+        with open(self.batchFileName, "w") as batchFile:
+            batchFile.write(self.header)
+            cwd = None
+            for command in self.commands:
+                if command["cwd"] != None and command["cwd"] != cwd:
+                    cwd = command["cwd"]
+                    if os.path.splitdrive(cwd)[0]: batchFile.write(os.path.splitdrive(cwd)[0] + "\n")
+                    batchFile.write("cd " + cwd + "\n")
+                batchFile.write(command["line"])
+
+
+class hb_Job(object):
+    """A single command or batch file that runs through hb_JobScheduler.
+    
+    command can be a path to a batch file, an argument list which will be
+    executed directly without a shell (see hb_ProcessRunner) or a function that
+    runs the job and returns the return code. cancel is an optional function
+    which stops a function job once it is timed out.
+    """
+    
+    def __init__(self, command, name = None, workingDir = None, timeout = None, retries = 0, env = None, cancel = None):
+        self.command = command
+        if name == None:
+            name = os.path.basename(command[0] if isinstance(command, list) else str(command))
+        self.name = name
+        self.workingDir = workingDir
+        self.env = env
+        self.cancel = cancel
+        self.timeout = timeout
+        self.retries = retries
+        
+        self.status = "pending" # pending, running, done, failed, timeout
+        self.returncode = None
+        self.attempts = 0
+        self.startTime = None
+        self.endTime = None
+        self.stdoutFile = None
+        self.stderrFile = None
+        self.error = None
+    
+    def getDuration(self):
+        if self.startTime == None or self.endTime == None: return None
+        return self.endTime - self.startTime
+    
+    def __repr__(self):
+        return "Job: %s [%s]"%(self.name, self.status)
+
+
+class hb_JobScheduler(object):
+    """
+    Run a number of commands (e.g. Radiance or Daysim batch files) with a bounded
+    number of parallel processes.
+    
+    Each worker waits on its own process so there is no polling. Each job can
+    have a timeout and a number of retries and the stdout and stderr of each run
+    can be written to log files next to the batch file. A callback will be called
+    with the job once it is finished.
+    
+    Args:
+        maxPRuns: Maximum number of jobs that run in parallel.
+        shell: Set to True if you do NOT want to see the cmd window.
+        captureOutput: Write stdout and stderr to log files next to the commands.
+            Default is True if shell is True.
+        timeout: Default timeout in seconds for the jobs (None for no timeout).
+        retries: Default number of times that a failed job will be re-ran.
+        callback: A function that will be called with the job when it is finished.
+    """
+    
+    def __init__(self, maxPRuns = 1, shell = False, captureOutput = None, \
+                 timeout = None, retries = 0, callback = None):
+        try: maxPRuns = int(maxPRuns)
+        except: maxPRuns = 1
+        self.maxPRuns = max(1, maxPRuns)
+        self.shell = shell
+        self.captureOutput = shell if captureOutput == None else captureOutput
+        self.timeout = timeout
+        self.retries = retries
+        self.callback = callback
+        self.jobs = []
+        self.startTime = None
+        self.endTime = None
+        self.lock = threading.Lock()
+    
+    def addJob(self, command, name = None, workingDir = None, timeout = None, retries = None, env = None, cancel = None):
+        if timeout == None: timeout = self.timeout
+        if retries == None: retries = self.retries
+        job = hb_Job(command, name, workingDir, timeout, retries, env, cancel)
+        self.jobs.append(job)
+        return job
+    
+    def killProcess(self, process):
+        try:
+            if os.name == "nt":
+                # kill the batch file and all the processes that it has started
+                subprocess.call(["taskkill", "/F", "/T", "/PID", str(process.pid)], \
+                                stdout = subprocess.PIPE, stderr = subprocess.PIPE)
+            else:
+                process.kill()
+        except Exception:
+            pass
+    
+    def runOnce(self, job):
+        """Run the job once and wait for it to finish."""
+        stdout, stderr = None, None
+        # function jobs write their own logs
+        if self.captureOutput and not callable(job.command):
+            if isinstance(job.command, list):
+                logBase = os.path.join(job.workingDir or os.getcwd(), job.name).replace("\\", "/")
+            else:
+                logBase = os.path.splitext(str(job.command).replace("\\", "/"))[0]
+            job.stdoutFile = logBase + ".out.log"
+            job.stderrFile = logBase + ".err.log"
+            stdout = open(job.stdoutFile, "w")
+            stderr = open(job.stderrFile, "w")
+        
+        timedOut = []
+        try:
+            env = dict(os.environ, **job.env) if job.env != None else None
+            if callable(job.command):
+                wait, kill = job.command, job.cancel
+            else:
+                if isinstance(job.command, list):
+                    # run the executable directly
+                    process = subprocess.Popen(job.command, cwd = job.workingDir, env = env, \
+                                               stdout = stdout, stderr = stderr)
+                else:
+                    process = subprocess.Popen(job.command.replace("\\", "/"), cwd = job.workingDir, env = env, \
+                                               shell = self.shell, stdout = stdout, stderr = stderr)
+                wait, kill = process.wait, lambda: self.killProcess(process)
+            
+            timer = None
+            if job.timeout:
+                def onTimeout():
+                    timedOut.append(True)
+                    if kill != None: kill()
+                timer = threading.Timer(job.timeout, onTimeout)
+                timer.start()
+            
+            try:
+                returncode = wait()
+            finally:
+                if timer != None: timer.cancel()
+        finally:
+            if stdout != None: stdout.close()
+            if stderr != None: stderr.close()
+        
+        return returncode, len(timedOut) != 0
+    
+    def runJob(self, job):
+        job.status = "running"
+        job.startTime = time.time()
+        
+        while True:
+            job.attempts += 1
+            try:
+                job.returncode, timedOut = self.runOnce(job)
+                job.error = None
+            except Exception, e:
+                job.returncode, timedOut = None, False
+                job.error = str(e)
+            
+            if job.returncode == 0 and not timedOut:
+                job.status = "done"
+                break
+            
+            job.status = "timeout" if timedOut else "failed"
+            if job.attempts > job.retries: break
+        
+        job.endTime = time.time()
+        
+        if self.callback != None:
+            try:
+                with self.lock:
+                    self.callback(job)
+            except Exception, e:
+                print "Callback failed for %s: %s"%(job.name, str(e))
+    
+    def worker(self, jobsQueue):
+        while True:
+            try:
+                job = jobsQueue.get_nowait()
+            except Queue.Empty:
+                return
+            self.runJob(job)
+    
+    def run(self):
+        """Run all the pending jobs and wait for them to finish."""
+        pendingJobs = [job for job in self.jobs if job.status == "pending"]
+        if len(pendingJobs) == 0: return self.jobs
+        
+        jobsQueue = Queue.Queue()
+        for job in pendingJobs: jobsQueue.put(job)
+        
+        self.startTime = time.time()
+        
+        if self.maxPRuns == 1 or len(pendingJobs) == 1:
+            # no need for extra threads
+            self.worker(jobsQueue)
+        else:
+            workers = []
+            for count in range(min(self.maxPRuns, len(pendingJobs))):
+                workerThread = threading.Thread(target = self.worker, args = (jobsQueue,))
+                workerThread.daemon = True
+                workerThread.start()
+                workers.append(workerThread)
+            
+            for workerThread in workers: workerThread.join()
+        
+        self.endTime = time.time()
+        return self.jobs
+    
+    def isSuccessful(self):
+        return all(job.status == "done" for job in self.jobs)
+    
+    def getReport(self):
+        """Return status and timing for each job as a list of dictionaries."""
+        report = []
+        for job in self.jobs:
+            report.append({"name": job.name,
+                           "command": job.command,
+                           "status": job.status,
+                           "returncode": job.returncode,
+                           "attempts": job.attempts,
+                           "duration": job.getDuration(),
+                           "stdout": job.stdoutFile,
+                           "stderr": job.stderrFile,
+                           "error": job.error})
+        return report
+    
+    def __str__(self):
+        lines = []
+        for job in self.getReport():
+            duration = "%.2f s"%job["duration"] if job["duration"] != None else "-"
+            lines.append("%s: %s in %s (attempts: %d, return code: %s)"%(job["name"], \
+                         job["status"], duration, job["attempts"], job["returncode"]))
+        if self.startTime != None and self.endTime != None:
+            lines.append("Total time: %.2f s"%(self.endTime - self.startTime))
+        return "\n".join(lines)
+
+class hb_EPBatchRunner(object):
+    """
+    Run a batch of EnergyPlus simulations with a bounded number of processes
+    
+    Each IDF and EPW pair runs in its own folder inside the batch folder. Runs
+    are hashed using the content of the IDF, the EPW and the command and a run
+    is skipped if the manifest has a completed run with the same hash. The
+    manifest is a json file in the batch folder that is updated once each run is
+    finished so the batch can be continued after a crash.
+    
+    Args:
+        batchFolder: Folder for the run folders and the manifest.
+        EPDirectory: EnergyPlus folder. Default is the folder that is found by Honeybee.
+        maxPRuns: Maximum number of simulations that run in parallel. Default
+            is the number of processors minus one.
+        commandTemplate: An optional command to replace EnergyPlus (e.g. a stub
+            for testing). By default EnergyPlus runs directly through hb_ProcessRunner. {idf}, {epw}, {base}, {runFolder} and {EPDirectory}
+            will be replaced with the path to the IDF and EPW files in the run
+            folder, the path for the output files without extension, the run
+            folder and the EnergyPlus folder. Outputs should be written to
+            {base}.csv, {base}.err, etc.
+        timeout: Optional timeout in seconds for each simulation.
+        retries: Number of times that a failed simulation will be re-ran.
+        shell: Set to True if you do NOT want to see the cmd window.
+    """
+    
+    MANIFEST = "manifest.json"
+    RESULTEXTENSIONS = ("csv", "err", "eio", "rdd", "sql", "html", "eso")
+    
+    def __init__(self, batchFolder, EPDirectory = None, maxPRuns = None, commandTemplate = None, \
+                 timeout = None, retries = 0, shell = True):
+        self.batchFolder = batchFolder
+        if EPDirectory == None:
+            EPDirectory = sc.sticky["honeybee_folders"]["EPPath"]
+        self.EPDirectory = EPDirectory
+        if maxPRuns == None:
+            maxPRuns = System.Environment.ProcessorCount - 1
+        self.maxPRuns = max(1, int(maxPRuns))
+        self.commandTemplate = commandTemplate
+        self.timeout = timeout
+        self.retries = retries
+        self.shell = shell
+        
+        self.manifestPath = os.path.join(batchFolder, self.MANIFEST)
+        self.runs = []
+        self.fileHashes = {}
+        self.lock = threading.Lock()
+        
+        if not os.path.isdir(batchFolder): os.makedirs(batchFolder)
+        self.manifest = self.readManifest()
+    
+    def readManifest(self):
+        if not os.path.isfile(self.manifestPath): return {"runs": {}}
+        try:
+            with open(self.manifestPath, "r") as inf:
+                return json.load(inf)
+        except Exception, e:
+            print "Failed to read %s. A new manifest will be created: %s"%(self.manifestPath, str(e))
+            return {"runs": {}}
+    
+    def writeManifest(self):
+        # write to a temp file first so a crash won't leave a broken manifest
+        tempPath = self.manifestPath + ".tmp"
+        with open(tempPath, "w") as outf:
+            json.dump(self.manifest, outf, indent = 2, sort_keys = True)
+        if os.path.isfile(self.manifestPath): os.remove(self.manifestPath)
+        os.rename(tempPath, self.manifestPath)
+    
+    def getFileHash(self, filePath):
+        # weather files are usually shared between the runs
+        if filePath in self.fileHashes: return self.fileHashes[filePath]
+        md5 = hashlib.md5()
+        with open(filePath, "rb") as inf:
+            for chunk in iter(lambda: inf.read(1048576), ""):
+                md5.update(chunk)
+        self.fileHashes[filePath] = md5.hexdigest()
+        return self.fileHashes[filePath]
+    
+    def getRunHash(self, idfFilePath, epwFilePath):
+        md5 = hashlib.md5()
+        md5.update(self.getFileHash(idfFilePath))
+        md5.update(self.getFileHash(epwFilePath))
+        md5.update(self.commandTemplate or "EnergyPlus")
+        return md5.hexdigest()
+    
+    def getResultFiles(self, base):
+        resultFiles = {}
+        for ext in self.RESULTEXTENSIONS:
+            if os.path.isfile(base + "." + ext):
+                resultFiles[ext] = base + "." + ext
+        return resultFiles
+    
+    @staticmethod
+    def summarizeErrFile(errFilePath, maxMessages = 5):
+        """Count warnings, severe and fatal errors in an EnergyPlus .err file."""
+        summary = {"warnings": 0, "severe": 0, "fatal": 0, "completed": False, "messages": []}
+        if errFilePath == None or not os.path.isfile(errFilePath): return summary
+        
+        with open(errFilePath, "r") as errFile:
+            for line in errFile:
+                if "** Warning **" in line:
+                    summary["warnings"] += 1
+                elif "** Severe  **" in line:
+                    summary["severe"] += 1
+                    if 'CheckControllerListOrder' in line: continue
+                    if len(summary["messages"]) < maxMessages: summary["messages"].append(line.strip())
+                elif "**  Fatal  **" in line:
+                    summary["fatal"] += 1
+                    if len(summary["messages"]) < maxMessages: summary["messages"].append(line.strip())
+                elif "EnergyPlus Completed Successfully" in line:
+                    summary["completed"] = True
+        return summary
+    
+    def addRun(self, idfFilePath, epwFilePath, name = None):
+        """Add an IDF and EPW pair to the batch.
+        
+        A pair with the same content as a run which is already in the batch won't
+        be added again and the same run will be returned.
+        
+        Returns:
+            A dictionary for the run which will be updated once the batch runs.
+        """
+        if name == None: name = os.path.splitext(os.path.basename(idfFilePath))[0]
+        runHash = self.getRunHash(idfFilePath, epwFilePath)
+        for run in self.runs:
+            if run["hash"] == runHash: return run
+        
+        runFolder = os.path.join(self.batchFolder, "%s_%s"%(name, runHash[:8]))
+        run = {"name": name, "idf": idfFilePath, "epw": epwFilePath, "hash": runHash,
+               "runFolder": runFolder, "base": os.path.join(runFolder, name),
+               "status": "pending", "returncode": None, "attempts": 0,
+               "startTime": None, "duration": None, "err": None, "results": {}}
+        self.runs.append(run)
+        return run
+    
+    def isCompleted(self, run):
+        prevRun = self.manifest["runs"].get(run["hash"])
+        if prevRun == None or prevRun["status"] not in ("done", "cached"): return False
+        # make sure results are still there
+        return all(os.path.isfile(path) for path in prevRun["results"].values())
+    
+    def prepareRun(self, run):
+        """Copy the inputs to the run folder and return the command for the run."""
+        runFolder = run["runFolder"]
+        if os.path.isdir(runFolder):
+            # remove the results of a failed or an interrupted run
+            shutil.rmtree(runFolder, ignore_errors = True)
+        os.makedirs(runFolder)
+        
+        idfPath = run["base"] + ".idf"
+        epwPath = os.path.join(runFolder, os.path.basename(run["epw"]))
+        shutil.copy(run["idf"], idfPath)
+        shutil.copy(run["epw"], epwPath)
+        
+        if self.commandTemplate == None:
+            return hb_ProcessRunner.energyPlusArgs(self.EPDirectory, idfPath, epwPath, run["base"])
+        
+        command = self.commandTemplate.format(idf = idfPath, epw = epwPath, base = run["base"],
+                                              runFolder = runFolder, EPDirectory = self.EPDirectory)
+        
+        if os.name == "nt":
+            batchFilePath = os.path.join(runFolder, "run.bat")
+            batchStr = "%s\ncd \"%s\"\n%s\n"%(runFolder[:2], runFolder, command)
+        else:
+            batchFilePath = os.path.join(runFolder, "run.sh")
+            batchStr = "#!/bin/sh\ncd \"%s\"\n%s\n"%(runFolder, command)
+        
+        with open(batchFilePath, "w") as batchFile:
+            batchFile.write(batchStr)
+        if os.name != "nt": os.chmod(batchFilePath, 0755)
+        
+        return batchFilePath
+    
+    def onJobFinished(self, job):
+        """Update the run and the manifest once a simulation is finished."""
+        run = job.run
+        run["returncode"] = job.returncode
+        run["attempts"] = job.attempts
+        run["startTime"] = job.startTime
+        run["duration"] = job.getDuration()
+        run["results"] = self.getResultFiles(run["base"])
+        run["err"] = self.summarizeErrFile(run["results"].get("err"))
+        if job.status == "done" and run["err"]["fatal"] != 0:
+            run["status"] = "failed"
+        else:
+            run["status"] = job.status
+        
+        self.manifest["runs"][run["hash"]] = run
+        self.writeManifest()
+    
+    def run(self):
+        """Run the batch and return the list of runs."""
+        scheduler = hb_JobScheduler(self.maxPRuns, shell = self.shell, timeout = self.timeout, \
+                                    retries = self.retries, callback = self.onJobFinished)
+        
+        for run in self.runs:
+            if self.isCompleted(run):
+                prevRun = self.manifest["runs"][run["hash"]]
+                run.update(dict((key, prevRun[key]) for key in \
+                    ("runFolder", "base", "returncode", "attempts", "startTime", "duration", "err", "results")))
+                run["status"] = "cached"
+                continue
+            
+            try:
+                command = self.prepareRun(run)
+            except Exception, e:
+                run["status"] = "failed"
+                run["err"] = {"messages": ["Failed to prepare the run: %s"%str(e)]}
+                continue
+            
+            job = scheduler.addJob(command, name = run["name"], workingDir = run["runFolder"])
+            job.run = run
+        
+        try:
+            scheduler.run()
+        finally:
+            self.manifest["batchFolder"] = self.batchFolder
+            self.manifest["lastRun"] = [run["hash"] for run in self.runs]
+            self.writeManifest()
+        
+        return self.runs
+    
+    def __str__(self):
+        lines = []
+        for run in self.runs:
+            duration = "%.2f s"%run["duration"] if run["duration"] != None else "-"
+            lines.append("%s: %s in %s"%(run["name"], run["status"], duration))
+            if run["err"] != None:
+                for message in run["err"].get("messages", []):
+                    lines.append("    " + message)
+        lines.append("Manifest: %s"%self.manifestPath)
+        return "\n".join(lines)
+
+
+class hb_RADExportCache(object):
+    """
+    Content-hash cache for Radiance export of a study folder
+    
+    Radiance strings for each surface and the test points for each cpu are saved as
+    fragments with a key which is the hash of the inputs that are used to generate them.
+    Compiled files such as the octree are copied to the cache folder after the run and
+    are copied back to the study folder if the hash of their input files is unchanged.
+    
+    The cache is saved next to the study folder (e.g. gridBasedSimulation_cache) since
+    prepareWorkingDir cleans the study folder before each run.
+    
+    Usage:
+        exportCache = hb_RADExportCache(subWorkingDir)
+        radStr = exportCache.getFragment(key)
+        if radStr == None:
+            radStr = writer(surface)
+            exportCache.setFragment(key, radStr)
+        # run the analysis and then
+        exportCache.storePendingFiles()
+        exportCache.save()
+    """
+    
+    FRAGMENTSFILE = "radFragments.hbcache"
+    MANIFESTFILE = "manifest.json"
+    MAGIC = "HBRADCAC"
+    VERSION = 1
+    
+    def __init__(self, subWorkingDir):
+        self.cacheFolder = os.path.normpath(subWorkingDir) + "_cache"
+        self.fragments = {}
+        self.usedKeys = set()
+        self.manifest = {}
+        self.pendingFiles = []
+        self.isChanged = False
+        self.hits = 0
+        self.misses = 0
+        self.load()
+    
+    def load(self):
+        self.fragments = {}
+        self.manifest = {}
+        fragmentsFile = os.path.join(self.cacheFolder, self.FRAGMENTSFILE)
+        manifestFile = os.path.join(self.cacheFolder, self.MANIFESTFILE)
+        try:
+            if os.path.isfile(fragmentsFile):
+                with open(fragmentsFile, "rb") as inf:
+                    if inf.read(len(self.MAGIC)) == self.MAGIC and \
+                        struct.unpack("<i", inf.read(4))[0] == self.VERSION:
+                        self.fragments = pickle.load(inf)
+            
+            if os.path.isfile(manifestFile):
+                with open(manifestFile, "r") as inf:
+                    self.manifest = json.load(inf)
+        except Exception, e:
+            print "Failed to read Radiance export cache. All the files will be exported.\n%s"%str(e)
+            self.fragments = {}
+            self.manifest = {}
+    
+    def save(self):
+        if not self.isChanged: return
+        
+        # only keep the fragments that are used in the latest export
+        self.fragments = dict((key, self.fragments[key]) for key in self.usedKeys \
+                              if key in self.fragments)
+        
+        fragmentsFile = os.path.join(self.cacheFolder, self.FRAGMENTSFILE)
+        tempPath = fragmentsFile + ".tmp"
+        try:
+            if not os.path.isdir(self.cacheFolder): os.makedirs(self.cacheFolder)
+            
+            with open(tempPath, "wb") as outf:
+                outf.write(self.MAGIC)
+                outf.write(struct.pack("<i", self.VERSION))
+                pickle.dump(self.fragments, outf, 2)
+            
+            if os.path.isfile(fragmentsFile): os.remove(fragmentsFile)
+            os.rename(tempPath, fragmentsFile)
+            
+            with open(os.path.join(self.cacheFolder, self.MANIFESTFILE), "w") as outf:
+                json.dump(self.manifest, outf)
+            
+            self.isChanged = False
+        except Exception, e:
+            print "Failed to save Radiance export cache to %s\n%s"%(self.cacheFolder, str(e))
+    
+    @staticmethod
+    def getHash(*items):
+        md5 = hashlib.md5()
+        for item in items:
+            md5.update(str(item))
+            md5.update("|")
+        return md5.hexdigest()
+    
+    @staticmethod
+    def getGeometryKey(geometry):
+        """Return a string from the vertices and the mid point of the edges of a Brep or Mesh.
+        
+        It is much faster than extracting the sorted points for the Radiance polygons and
+        the mid points of the edges separate curved surfaces with the same vertices.
+        """
+        if geometry == None: return "None"
+        values = []
+        try:
+            for vertex in geometry.Vertices:
+                pt = vertex.Location
+                values.extend((pt.X, pt.Y, pt.Z))
+            for edge in geometry.Edges:
+                pt = edge.PointAt(edge.Domain.Mid)
+                values.extend((pt.X, pt.Y, pt.Z))
+        except AttributeError:
+            # mesh
+            values = []
+            for pt in geometry.Vertices:
+                values.extend((pt.X, pt.Y, pt.Z))
+        
+        return array.array("d", values).tostring()
+    
+    def getSurfaceKey(self, surface, writerName):
+        keyItems = [writerName]
+        for srf in [surface] + list(getattr(surface, "childSrfs", [])):
+            keyItems.extend((srf.name, srf.RadMaterial, getattr(srf, "construction", None), \
+                             getattr(srf, "type", None), srf.isPlanar, \
+                             getattr(srf, "isChild", None), srf.hasChild, \
+                             getattr(srf, "hasInternalEdge", None), \
+                             self.getGeometryKey(srf.geometry), \
+                             self.getGeometryKey(getattr(srf, "punchedGeometry", None))))
+        
+        return self.getHash(*keyItems)
+    
+    def getFragment(self, key):
+        self.usedKeys.add(key)
+        fragment = self.fragments.get(key)
+        if fragment == None: self.misses += 1
+        else: self.hits += 1
+        return fragment
+    
+    def setFragment(self, key, fragment):
+        self.usedKeys.add(key)
+        self.fragments[key] = fragment
+        self.isChanged = True
+    
+    def getFileKey(self, filePaths, *items):
+        """Return a key from the name, size and content of a list of input files."""
+        keyItems = list(items)
+        for filePath in filePaths:
+            if not filePath or not os.path.isfile(filePath):
+                keyItems.append(filePath)
+                continue
+            stat = os.stat(filePath)
+            keyItems.extend((os.path.basename(filePath), stat.st_size, \
+                             hb_LibrarySnapshot.getFileHash(filePath)))
+        
+        return self.getHash(*keyItems)
+    
+    def restoreFile(self, fileName, key, targetFolder):
+        """Copy a cached file to target folder if it is generated from the same inputs."""
+        cachedFile = os.path.join(self.cacheFolder, fileName)
+        if self.manifest.get(fileName) != key or not os.path.isfile(cachedFile):
+            return False
+        try:
+            shutil.copyfile(cachedFile, os.path.join(targetFolder, fileName))
+            return True
+        except Exception, e:
+            print "Failed to copy %s from the cache.\n%s"%(fileName, str(e))
+            return False
+    
+    def addPendingFile(self, filePath, key):
+        """Add a file which will be generated by the batch files to be stored after the run."""
+        self.pendingFiles.append((filePath, key))
+    
+    def storePendingFiles(self):
+        for filePath, key in self.pendingFiles:
+            if not os.path.isfile(filePath): continue
+            fileName = os.path.basename(filePath)
+            try:
+                if not os.path.isdir(self.cacheFolder): os.makedirs(self.cacheFolder)
+                shutil.copyfile(filePath, os.path.join(self.cacheFolder, fileName))
+                self.manifest[fileName] = key
+                self.isChanged = True
+            except Exception, e:
+                print "Failed to add %s to the cache.\n%s"%(fileName, str(e))
+        self.pendingFiles = []
+    
+    def __str__(self):
+        return "Radiance export cache: %d fragment(s) reused, %d fragment(s) exported."%(self.hits, self.misses)
+
 class hb_WriteRAD(object):
     
     def __init__(self, component = ghenv.Component):
@@ -1656,9 +3046,12 @@ class hb_WriteRAD(object):
         self.hb_DSCore = hb_folders["DSCorePath"]
         self.hb_DSLibPath = hb_folders["DSLibPath"]
         
+        # commands for each batch file that is written by writeBatchFiles
+        self.commandScripts = {}
         
     def writeRADAndMaterialFiles(self, originalHBObjects, subWorkingDir, radFileName, \
-                                 analysisRecipe, meshParameters, exportInteriorWalls):
+                                 analysisRecipe, meshParameters, exportInteriorWalls, \
+                                 exportCache = None):
         
         # initiate RAD Parameters
         if analysisRecipe.radParameters==None:
@@ -1721,21 +3114,15 @@ class hb_WriteRAD(object):
                         # collect the custom material informations
                         if srf.RadMaterial!=None:
                             customRADMat, customMixFunRadMat = self.hb_RADMaterialAUX.addRADMatToDocumentDict(srf, customRADMat, customMixFunRadMat)
-                        # write the surfaces
-                        if srf.isPlanar and len(srf.childSrfs)<2:
-                            geoRadFile.write(self.RADSurface(srf))
-                        else:
-                            geoRadFile.write(self.RADNonPlanarSurface(srf))
-                        
                         if srf.hasChild:
                             # collect the custom material informations
                             for childSrf in srf.childSrfs:
                                 
                                 if childSrf.RadMaterial!=None:
                                     customRADMat, customMixFunRadMat = self.hb_RADMaterialAUX.addRADMatToDocumentDict(childSrf, customRADMat, customMixFunRadMat)
-                            
-                            if not srf.isPlanar or len(srf.childSrfs) > 1:
-                                geoRadFile.write(self.RADNonPlanarChildSurface(srf))
+                        
+                        # write the surfaces
+                        geoRadFile.write(self.getCachedRADStr(srf, self.zoneSurfaceToRAD, exportCache))
                             
                             
                 elif HBObj.objectType == "HBSurface":
@@ -1764,13 +3151,7 @@ class hb_WriteRAD(object):
                                     self.component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, msg)
                                     return -1                    
 
-                    if HBObj.isPlanar and (not HBObj.isChild and len(HBObj.childSrfs)<2):
-                        # check for rad material
-                        geoRadFile.write(self.RADSurface(HBObj))
-                    else:
-                        geoRadFile.write(self.RADNonPlanarSurface(HBObj))
-                        if not HBObj.isChild and HBObj.hasChild:
-                            geoRadFile.write(self.RADNonPlanarChildSurface(HBObj))
+                    geoRadFile.write(self.getCachedRADStr(HBObj, self.surfaceToRAD, exportCache))
                 
                 elif HBObj.objectType == "HBIES":
                     IESCount += 1
@@ -1930,7 +3311,7 @@ class hb_WriteRAD(object):
     
         return radFileFullName, materialFileName
     
-    def writeTestPtFile(self, subWorkingDir, radFileName, numOfCPUs, analysisRecipe):
+    def writeTestPtFile(self, subWorkingDir, radFileName, numOfCPUs, analysisRecipe, exportCache = None):
         
         if analysisRecipe.type == 0: return [], [] #image-based simulation
         
@@ -1979,20 +3360,33 @@ class hb_WriteRAD(object):
         
         testPtsEachCPU = []
         
+        ptsKey = None
+        if exportCache != None:
+            coordinates = array.array("d")
+            for pt, v in itertools.izip(flattenTestPoints, flattenPtsNormals):
+                coordinates.extend((pt.X, pt.Y, pt.Z, v.X, v.Y, v.Z))
+            ptsKey = exportCache.getHash(coordinates.tostring(), lenOfPts)
+        
         for cpuCount in range(numOfCPUs):
             # write pts file
-            ptsForThisCPU = []
             ptsFileName = os.path.join(subWorkingDir, radFileName + '_' + `cpuCount` + '.pts')
+            startIndex, endIndex = sum(lenOfPts[:cpuCount]), sum(lenOfPts[:cpuCount+1])
+            ptsForThisCPU = flattenTestPoints[startIndex:endIndex]
             
-            ptsFile = open(ptsFileName, "w")
-
-            for ptCount in range(sum(lenOfPts[:cpuCount]), sum(lenOfPts[:cpuCount+1])):
-                ptsFile.write(self.hb_writeRADAUX.testPtsStr(flattenTestPoints[ptCount], flattenPtsNormals[ptCount]))
-                ptsForThisCPU.append(flattenTestPoints[ptCount])
-
-            ptsFile.close()
+            ptsStr = None
+            if ptsKey != None:
+                ptsStr = exportCache.getFragment(ptsKey + "_" + `cpuCount`)
+            
+            if ptsStr == None:
+                ptsStr = "".join(self.hb_writeRADAUX.testPtsStr(pt, v) for pt, v in \
+                                 itertools.izip(ptsForThisCPU, flattenPtsNormals[startIndex:endIndex]))
+                if ptsKey != None:
+                    exportCache.setFragment(ptsKey + "_" + `cpuCount`, ptsStr)
+            
+            with open(ptsFileName, "w") as ptsFile:
+                ptsFile.write(ptsStr)
             
-            testPtsEachCPU.append(ptsForThisCPU)        
+            testPtsEachCPU.append(ptsForThisCPU)
             
         return testPtsEachCPU, lenOfPts
     
@@ -2000,7 +3394,7 @@ class hb_WriteRAD(object):
                         radFileFullName, materialFileName, \
                         numOfCPUs, testPtsEachCPU, \
                         lenOfPts, analysisRecipe, additionalRadFiles, \
-                        readyOCTFile = None, runOverture = True):
+                        readyOCTFile = None, runOverture = True, exportCache = None):
         
         batchFiles = []
         fileNames = [] # list of only names of the files
@@ -2045,34 +3439,28 @@ class hb_WriteRAD(object):
                       self.hb_DSLibPath + ";\nPATH=" + self.hb_RADPath + ";" + \
                       self.hb_DSPath + ";" + self.hb_DSLibPath + ";$PATH\n"
             
+            DSEnv = hb_ProcessRunner.radianceEnvironment(self.hb_RADPath, self.hb_RADLibPath, \
+                                                         self.hb_DSPath, self.hb_DSLibPath)
+            DSBinFolders = [self.hb_DSPath, self.hb_RADPath]
+            
             heaFileName = os.path.join(subWorkingDir, radFileName + '_0.hea')
             
             initBatchFileName = os.path.join(subWorkingDir, radFileName + '_InitDS.bat')
             
-            initBatchFile = open(initBatchFileName, "w")
-            initBatchFile.write(pathStr)
+            initScript = hb_CommandScript(initBatchFileName, self.hb_DSPath, DSEnv, DSBinFolders, pathStr)
             
+            weaFileName = subWorkingDir + "\\" + self.lb_preparation.removeBlankLight(locName)
+            initScript.addCommand(["epw2wea", weaFileName + '.epw', weaFileName + '.wea'])
             
-            xformCmds = []
             if additionalRadFiles and northAngleRotation != 0:
                 # rotate additional radiance files:
-                cmdbase = 'xform -rz -%f {} > {}' % northAngleRotation
-                
                 for count, adfile in enumerate(additionalRadFiles):
                     target = adfile[:-4] + '_' + str(northAngleRotation) + adfile[-4:]
-                    xformCmds.append(cmdbase.format(adfile, target))
+                    initScript.addCommand(["xform", "-rz", "-%f"%northAngleRotation, adfile], stdout = target)
                     additionalRadFiles[count] = target
             
-            initBatchStr =  os.path.splitdrive(self.hb_DSPath)[0] + '\n' + \
-                            'CD ' + self.hb_DSPath + '\n' + \
-                            'epw2wea  ' + subWorkingDir + "\\" + self.lb_preparation.removeBlankLight(locName) + '.epw ' + subWorkingDir + "\\" +  self.lb_preparation.removeBlankLight(locName) + '.wea\n'
-                            
-            if xformCmds:
-                initBatchStr += ':: Rotate additional files if any\n' + '\n'.join(xformCmds) + '\n'
-            
-            initBatchStr += ':: 1. Generate Daysim version of Radiance Files\n' + \
-                            'radfiles2daysim ' + heaFileName + ' -m -g\n'
-            
+            # 1. Generate Daysim version of Radiance Files
+            initScript.addCommand(["radfiles2daysim", heaFileName, "-m", "-g"])
             
             # rotate scene if angle is not 0!
             #if northAngleRotation!=0:
@@ -2081,12 +3469,10 @@ class hb_WriteRAD(object):
             #    'rotate_scene ' + heaFileName + '\n'
             
             if runAnnualGlare:
-                initBatchStr += \
-                ':: 2. Generate Values for annual glare\n' + \
-                'gen_dgp_profile ' + heaFileName
-                
-            initBatchFile.write(initBatchStr)
-            initBatchFile.close()
+                # 2. Generate Values for annual glare
+                initScript.addCommand(["gen_dgp_profile", heaFileName])
+            
+            self.addScript(initScript)
             
             # annual glare only needs one headeing file and will run on a single cpu
             if runAnnualGlare: # and onlyAnnualGlare:
@@ -2137,26 +3523,21 @@ class hb_WriteRAD(object):
                     DSResultFilesAddress.append(os.path.join(subWorkingDir, radFileName + '_' + `cpuCount` + '.ill'))
                     # 3.  write the batch file
                     DSBatchFileName = os.path.join(subWorkingDir, radFileName + '_' + `cpuCount` + '_DS.bat')
-                    DSBatchFile = open(DSBatchFileName, "w")
                     
                     fileNames.append(DSBatchFileName.split("\\")[-1])
                     
                     heaFileName = os.path.join(subWorkingDir, radFileName + '_' + `cpuCount` + '.hea')
                     
-                    #SET PATH = " + subWorkingDir + "\n" + workingDrive +"\n"
-                    DSBatchFile.write(pathStr)
+                    DSScript = hb_CommandScript(DSBatchFileName, subWorkingDir, DSEnv, DSBinFolders, pathStr)
                     
-                    DSBatchStr = ':: Calculate Daylight Coefficient File (*.dc)\n' + \
-                                'gen_dc ' + heaFileName + ' -dif\n' + \
-                                'gen_dc ' + heaFileName + ' -dir\n' + \
-                                'gen_dc ' + heaFileName + ' -paste\n' + \
-                                '\n' + \
-                                ':: Generate Illuminance Files (*.ill)\n' + \
-                                'ds_illum  ' + heaFileName + '\n'
+                    # Calculate Daylight Coefficient File (*.dc)
+                    for step in ("-dif", "-dir", "-paste"):
+                        DSScript.addCommand(["gen_dc", heaFileName, step])
                     
-                    DSBatchFile.write(DSBatchStr)
-                                
-                    DSBatchFile.close()        
+                    # Generate Illuminance Files (*.ill)
+                    DSScript.addCommand(["ds_illum", heaFileName])
+                    
+                    self.addScript(DSScript)
                     
                     batchFiles.append(DSBatchFileName)
         
@@ -2183,37 +3564,49 @@ class hb_WriteRAD(object):
                 OCTFileName = (".").join(os.path.basename(readyOCTFile).split(".")[:-1])
             
         
-        # create the batch file that initiate the simulation
-        with open(initBatchFileName, "w") as batchFile:
-            # write the path string (I should check radiance to be installed on the system
-            pathStr = "SET RAYPATH=.;" + self.hb_RADLibPath + "\nPATH=" + self.hb_RADPath + ";$PATH\n"
-            batchFile.write(pathStr)
-            
-            batchFile.write(os.path.splitdrive(subWorkingDir)[0]  + "\n")
-            batchFile.write("cd " + subWorkingDir + "\n")
-            
-            # write OCT file
-            # 3.2. oconv line
-            sceneRadFiles = [materialFileName, radSkyFileName, radFileFullName]
-            
-            if additionalRadFiles:
-                for additionalFile in additionalRadFiles:
-                    if additionalFile!=None:
-                        sceneRadFiles.append(additionalFile)
-                
-            OCTLine = self.hb_writeRADAUX.oconvLine(OCTFileName, sceneRadFiles)
-            if readyOCTFile ==None: batchFile.write(OCTLine)
+        # write the path string for the batch files (I should check radiance to be installed on the system
+        pathStr = "SET RAYPATH=.;" + self.hb_RADLibPath + "\nPATH=" + self.hb_RADPath + ";$PATH\n"
+        RADEnv = hb_ProcessRunner.radianceEnvironment(self.hb_RADPath, self.hb_RADLibPath)
+        
+        # create the commands that initiate the simulation
+        initScript = hb_CommandScript(initBatchFileName, subWorkingDir, RADEnv, [self.hb_RADPath], pathStr)
+        
+        # write OCT file
+        # 3.2. oconv line
+        sceneRadFiles = [materialFileName, radSkyFileName, radFileFullName]
+        
+        if additionalRadFiles:
+            for additionalFile in additionalRadFiles:
+                if additionalFile!=None:
+                    sceneRadFiles.append(additionalFile)
             
-            if analysisRecipe.type == 0:
-                # add overture line in case it is an image-based analysis
-                view = sc.doc.Views.ActiveView.ActiveViewport.Name
-                
-                viewLine = self.hb_writeRADAUX.exportView(view, analysisRecipe.radParameters, analysisRecipe.cameraType, imageSize = [64, 64])
-                        
-                # write rpict lines
-                overtureLine = self.hb_writeRADAUX.overtureLine(viewLine, OCTFileName, view, analysisRecipe.radParameters, int(analysisRecipe.type))
-                if runOverture: batchFile.write(overtureLine)
+        OCTArgs, OCTFile = self.hb_writeRADAUX.oconvArgs(OCTFileName, sceneRadFiles)
+        
+        if readyOCTFile ==None and exportCache != None:
+            # reuse the octree from the last run if the scene files are not changed
+            OCTKey = exportCache.getFileKey(sceneRadFiles, hb_CommandScript.commandLine(OCTArgs, stdout = OCTFile))
+            if exportCache.restoreFile(OCTFile, OCTKey, subWorkingDir):
+                print "Scene is not changed. %s is copied from the cache."%OCTFile
+                readyOCTFile = os.path.join(subWorkingDir, OCTFile)
+            else:
+                exportCache.addPendingFile(os.path.join(subWorkingDir, OCTFile), OCTKey)
+        
+        if readyOCTFile ==None: initScript.addCommand(OCTArgs, stdout = OCTFile)
+        
+        if analysisRecipe.type == 0:
+            # add overture line in case it is an image-based analysis
+            view = sc.doc.Views.ActiveView.ActiveViewport.Name
             
+            viewLine = self.hb_writeRADAUX.exportView(view, analysisRecipe.radParameters, analysisRecipe.cameraType, imageSize = [64, 64])
+                    
+            # write rpict lines
+            overtureArgs, unfFile = self.hb_writeRADAUX.overtureArgs(viewLine, OCTFileName, view, analysisRecipe.radParameters, int(analysisRecipe.type))
+            if runOverture:
+                initScript.addCommand(overtureArgs, stdout = unfFile)
+                initScript.removeFile(unfFile)
+        
+        self.addScript(initScript)
+        
         if analysisRecipe.type == 0:
             # write view files
             if len(self.rhinoViewNames)==0:
@@ -2235,11 +3628,7 @@ class hb_WriteRAD(object):
                 batchFiles.append(batchFileName)
                 
                 fileNames.append(batchFileName.split("\\")[-1])
-                batchFile = open(batchFileName, "w")
-                # write path files
-                batchFile.write(pathStr)
-                batchFile.write(os.path.splitdrive(subWorkingDir)[0] + "\n")
-                batchFile.write("cd " + subWorkingDir + "\n")
+                script = hb_CommandScript(batchFileName, subWorkingDir, RADEnv, [self.hb_RADPath], pathStr)
                 
                 # calculate vs and vl for thi cpu
                 try: vs = (((cpuCount%nXDiv)/(nXDiv-1)) - 0.5) * (nXDiv - 1)
@@ -2263,36 +3652,24 @@ class hb_WriteRAD(object):
                                                               analysisRecipe.imageSize, analysisRecipe.sectionPlane, \
                                                               nXDiv, nYDiv, vs, vl)
                     
-                    # write rpict lines
-                    RPICTLines = self.hb_writeRADAUX.rpictLine(viewLine, OCTFileName, view, analysisRecipe.radParameters, int(analysisRecipe.simulationType), cpuCount)
-                    batchFile.write(RPICTLines)                    
-                    
-                # close the file
-                batchFile.close()
-                
-                # PCOMP to merge images into a single HDR
-                pcompFileName = os.path.join(subWorkingDir, radFileName + '_PCOMP.bat')
-                                
-                with open(pcompFileName, "w") as pcompFile:
-                    
-                    # write path files
-                    pcompFile.write(pathStr)
-                    pcompFile.write(os.path.splitdrive(subWorkingDir)[0] + "\n")
-                    pcompFile.write("cd " + subWorkingDir + "\n")
-                    
-                    for mergedName, pieces in HDRPieces.items():
-                        
-                        pcomposLine = "pcompos -a " + `nXDiv` + " "
-                        # pieces.reverse()
-                        for piece in pieces:
-                            pcomposLine += piece.replace('.HDR', '.unf') + " "
-                        pcomposLine += " > " + mergedName.replace('.HDR', '_temp.HDR') + "\n"
-                        
-                        pcompFile.write(pcomposLine)
-                    
-                        pfiltLine = "pfilt -r .6 -x /2 -y /2 {} > {}\n" \
-                            .format(mergedName.replace('.HDR', '_temp.HDR'), mergedName)
-                        pcompFile.write(pfiltLine)
+                    # write rpict lines
+                    RPICTArgs, unfFile = self.hb_writeRADAUX.rpictArgs(viewLine, OCTFileName, view, analysisRecipe.radParameters, int(analysisRecipe.simulationType), cpuCount)
+                    script.addCommand(RPICTArgs, stdout = unfFile)
+                
+                self.addScript(script)
+            
+            # PCOMP to merge images into a single HDR
+            pcompFileName = os.path.join(subWorkingDir, radFileName + '_PCOMP.bat')
+            pcompScript = hb_CommandScript(pcompFileName, subWorkingDir, RADEnv, [self.hb_RADPath], pathStr)
+            
+            for mergedName, pieces in HDRPieces.items():
+                # pieces.reverse()
+                pcompScript.addCommand(["pcompos", "-a", `nXDiv`] + [piece.replace('.HDR', '.unf') for piece in pieces], \
+                                       stdout = mergedName.replace('.HDR', '_temp.HDR'))
+                pcompScript.addCommand(["pfilt", "-r", ".6", "-x", "/2", "-y", "/2", mergedName.replace('.HDR', '_temp.HDR')], \
+                                       stdout = mergedName)
+            
+            self.addScript(pcompScript)
             
             return initBatchFileName, batchFiles, fileNames, pcompFileName, HDRFileAddress
                         
@@ -2307,82 +3684,82 @@ class hb_WriteRAD(object):
                 RADResultFilesAddress.append(os.path.join(subWorkingDir, radFileName + '_' + `cpuCount` + '.res'))
                 
                 fileNames.append(batchFileName.split("\\")[-1])
-                batchFile = open(batchFileName, "w")
-                # write path files
-                batchFile.write(pathStr)
-                batchFile.write(os.path.splitdrive(subWorkingDir)[0] + "\n")
-                batchFile.write("cd " + subWorkingDir + "\n")
+                script = hb_CommandScript(batchFileName, subWorkingDir, RADEnv, [self.hb_RADPath], pathStr)
                 
                 # 3.4. add rtrace lin
-                RTRACELine = self.hb_writeRADAUX.rtraceLine(radFileName, OCTFileName, analysisRecipe.radParameters, int(analysisRecipe.simulationType), cpuCount)
-                batchFile.write(RTRACELine)
+                RTRACEArgs, ptsFile, resFile = self.hb_writeRADAUX.rtraceArgs(radFileName, OCTFileName, analysisRecipe.radParameters, int(analysisRecipe.simulationType), cpuCount)
+                script.addCommand(RTRACEArgs, stdin = ptsFile, stdout = resFile)
                 
-                # close the file
-                batchFile.close()
+                self.addScript(script)
             
             
             return initBatchFileName, batchFiles, fileNames, pcompFileName, RADResultFilesAddress
+    
+    def addScript(self, script):
+        """Write the batch file of a command script and keep the script to run it."""
+        script.write()
+        self.commandScripts[script.batchFileName] = script
         
-    def executeBatchFiles(self, batchFileNames, maxPRuns = None, shell = False, waitingTime = 0.5):
+    def executeBatchFiles(self, batchFileNames, maxPRuns = None, shell = False, waitingTime = 0.5, \
+                          timeout = None, retries = 0):
     
         """Run a number of batch files in parallel and
             wait to end of the analysis.
+            
+            The commands of the batch files that are written by writeBatchFiles run
+            directly through hb_ProcessRunner and their output is written next to the
+            batch file in a .log file. Other batch files run through the shell.
     
             Args:
                 batchFileNames: List of batch files
                 maxPRuns: max number of files to be ran in parallel (default = 0)
-                shell: set to True if you do NOT want to see the cmd window while the analysis is runnig
+                shell: set to True if you do NOT want to see the cmd window for the
+                    batch files that are not written by writeBatchFiles.
+                waitingTime: Not used anymore. Jobs don't poll. It is kept so older components don't break.
+                timeout: Optional timeout in seconds for each batch file
+                retries: Number of times that a failed batch file will be re-ran
+            
+            Returns:
+                The job scheduler which includes status and timing for each batch file.
         """
-    
-        if not maxPRuns : maxPRuns = 1
-        maxPRuns = int(maxPRuns)
-        total = len(batchFileNames)
         
-        if maxPRuns < 1: maxPRuns = 1
-        if maxPRuns > total: maxPRuns = total
-        
-        running = 0
-        done = False
-        jobs = []
-        pid = 0
+        scheduler = hb_JobScheduler(maxPRuns, shell = shell, timeout = timeout, retries = retries)
+        for batchFileName in batchFileNames:
+            script = self.commandScripts.get(batchFileName)
+            if script == None:
+                scheduler.addJob(batchFileName, workingDir = os.path.dirname(batchFileName) or None)
+                continue
+            
+            # run the commands directly. The batch file is only written to be checked by hand.
+            logFile = os.path.splitext(batchFileName)[0] + ".log"
+            runner = hb_ProcessRunner(script.cwd, logFile = logFile)
+            job = scheduler.addJob(lambda runner = runner, script = script: runner.runScript(script), \
+                                   name = os.path.basename(batchFileName), workingDir = script.cwd, \
+                                   cancel = runner.cancel)
+            job.stderrFile = logFile
         
         try:
-            while not done:
-                if running < maxPRuns and pid < total:
-                    # execute the files
-                    jobs.append(subprocess.Popen(batchFileNames[pid].replace("\\", "/") , shell = shell))
-                    pid+=1
-                    time.sleep(waitingTime)
-                
-                # count how many jobs are running and how many are done
-                running = 0
-                finished = 0
-                for job in jobs:
-                    if job.poll() is None:
-                        #one job is still running
-                        running += 1
-                    else:
-                        finished += 1
-        
-                if running == maxPRuns:
-                    # wait for half a second
-                    #print "waiting..."
-                    time.sleep(waitingTime)
+            scheduler.run()
+        except Exception, e:
+            print "Something went wrong: %s"%str(e)
         
-                if finished ==  total:
-                    done = True
+        for job in scheduler.jobs:
+            if job.status != "done":
+                print "%s %s after %d attempt(s). Return code: %s"%(job.name, job.status, job.attempts, job.returncode)
         
-        except Exception, e:
-            print "Something went wrong: %s"%str(e) 
+        return scheduler
     
     def runBatchFiles(self, initBatchFileName, batchFileNames, fileNames, \
                       pcompBatchFile, waitingTime, runInBackground = False):
         
-        self.executeBatchFiles([initBatchFileName], maxPRuns = 1, shell = runInBackground, waitingTime = waitingTime)
-        self.executeBatchFiles(batchFileNames, maxPRuns = len(batchFileNames), shell = runInBackground, waitingTime = waitingTime)
+        self.executeBatchFiles([initBatchFileName], maxPRuns = 1, shell = runInBackground)
+        scheduler = self.executeBatchFiles(batchFileNames, maxPRuns = len(batchFileNames), shell = runInBackground)
         
         if pcompBatchFile!="":
-            os.system(pcompBatchFile) # put all the files together
+            # put all the files together
+            self.executeBatchFiles([pcompBatchFile], maxPRuns = 1, shell = runInBackground)
+        
+        return scheduler
         
     def collectResults(self, subWorkingDir, radFileName, numOfCPUs, analysisRecipe, expectedResultFiles):
         
@@ -2455,6 +3832,41 @@ class hb_WriteRAD(object):
             time.sleep(1)
             return RADResultFilesAddress
         
+    def zoneSurfaceToRAD(self, surface):
+        # surface of a zone and its child surfaces
+        if surface.isPlanar and len(surface.childSrfs)<2:
+            return self.RADSurface(surface)
+        
+        radStr = self.RADNonPlanarSurface(surface)
+        if surface.hasChild:
+            radStr += self.RADNonPlanarChildSurface(surface)
+        return radStr
+    
+    def surfaceToRAD(self, surface):
+        # Honeybee surface and its child surfaces
+        if surface.isPlanar and (not surface.isChild and len(surface.childSrfs)<2):
+            return self.RADSurface(surface)
+        
+        radStr = self.RADNonPlanarSurface(surface)
+        if not surface.isChild and surface.hasChild:
+            radStr += self.RADNonPlanarChildSurface(surface)
+        return radStr
+    
+    def getCachedRADStr(self, surface, writer, exportCache = None):
+        """Return the Radiance string for a surface from the export cache if the surface is not changed.
+        
+        The key should be calculated before calling the writer as the writers change the surface.
+        """
+        if exportCache == None: return writer(surface)
+        
+        key = exportCache.getSurfaceKey(surface, writer.__name__)
+        radStr = exportCache.getFragment(key)
+        if radStr == None:
+            radStr = writer(surface)
+            exportCache.setFragment(key, radStr)
+        
+        return radStr
+    
     def shiftList(self, list, number = 1):
         newList = []
         newList.extend(list[-number:])
@@ -3080,90 +4492,73 @@ class hb_WriteRADAUX(object):
             
         return view + " "
     
-    def oconvLine(self, octFileName, radFilesList):
+    def oconvArgs(self, octFileName, radFilesList):
+        """Return oconv arguments and the octree file for a list of scene files."""
         # sence files
         r = 1024 * 2
-        senceFiles = ""
-        for address in radFilesList: senceFiles = senceFiles + address.replace("\\" , "/") + " "
-        
-        line = "oconv -r " + str(r) + " -f " +  senceFiles + " > " + octFileName + ".oct\n"
-        
-        return line
+        args = ["oconv", "-r", str(r), "-f"] + [address.replace("\\" , "/") for address in radFilesList]
+        return args, octFileName + ".oct"
     
-    def overtureLine(self, view, projectName, viewName, radParameters, analysisType = 0):
+    def oconvLine(self, octFileName, radFilesList):
+        args, octFile = self.oconvArgs(octFileName, radFilesList)
+        return hb_CommandScript.commandLine(args, stdout = octFile)
+    
+    @staticmethod
+    def additionalRadArgs(radParameters):
+        args = []
+        if radParameters.has_key("additional"):
+            for par in radParameters["additional"]:
+                args.extend(("-%s"%par).split())
+        return args
+    
+    def rpictBaseArgs(self, view, ambFile, radParameters, analysisType = 0):
+        if analysisType==2:
+            # luminance (cd)
+            args = ["rpict"]
+        else:
+            # illuminance (lux) or radiation analysis
+            args = ["rpict", "-i"]
+        
+        args.extend(["-t", "10"] + view.split() + ["-af", ambFile,
+                     "-ps", str(radParameters["_ps_"]), "-pt", str(radParameters["_pt_"]),
+                     "-pj", str(radParameters["_pj_"]), "-dj", str(radParameters["_dj_"]),
+                     "-ds", str(radParameters["_ds_"]), "-dt", str(radParameters["_dt_"]),
+                     "-dc", str(radParameters["_dc_"]), "-dr", str(radParameters["_dr_"]),
+                     "-dp", str(radParameters["_dp_"]), "-st", str(radParameters["_st_"]),
+                     "-ab", `radParameters["_ab_"]`,
+                     "-ad", `radParameters["_ad_"]`, "-as", `radParameters["_as_"]`,
+                     "-ar", `radParameters["_ar_"]`, "-aa", '%.3f'%radParameters["_aa_"],
+                     "-lr", `radParameters["_lr_"]`, "-lw", '%.3f'%radParameters["_lw_"],
+                     "-av", "0", "0", "0"])
+        args.extend(self.additionalRadArgs(radParameters))
+        return args
+    
+    def overtureArgs(self, view, projectName, viewName, radParameters, analysisType = 0):
+        """Return rpict arguments and the output file for the overture run that fills the ambient file."""
         octFile = projectName + ".oct"
         ambFile = projectName + ".amb" #amb file is view independent and can be used globally
         unfFile = projectName + ".unf" 
         
-        if analysisType==0:
-            # illuminance (lux)
-            line0 = "rpict -i "
-        elif analysisType==2:
-            # luminance (cd)
-            line0 = "rpict "
-        else:
-            # radiation analysis
-            line0 = "rpict -i "
-        
-        line1_1 = "-t 10 "+ \
-                view + " -af " + ambFile +  " " + \
-                " -ps " + str(radParameters["_ps_"]) + " -pt " + str(radParameters["_pt_"]) + \
-                " -pj " + str(radParameters["_pj_"]) + " -dj " + str(radParameters["_dj_"]) + \
-                " -ds " + str(radParameters["_ds_"]) + " -dt " + str(radParameters["_dt_"]) + \
-                " -dc " + str(radParameters["_dc_"]) + " -dr " + str(radParameters["_dr_"]) + \
-                " -dp " + str(radParameters["_dp_"]) + " -st " + str(radParameters["_st_"])  + \
-                " -ab " + `radParameters["_ab_"]` + \
-                " -ad " + `radParameters["_ad_"]` + " -as " +  `radParameters["_as_"]` + \
-                " -ar " + `radParameters["_ar_"]` + " -aa " +  '%.3f'%radParameters["_aa_"] + \
-                " -lr " + `radParameters["_lr_"]`  + " -lw " + '%.3f'%radParameters["_lw_"] + " -av 0 0 0 "
-                
-        line1_2 = " "
-        if radParameters.has_key("additional"):
-            for par in radParameters["additional"]:
-                line1_2 += "-%s  "%par
-        
-        line1_3 = octFile + " > " + unfFile + "\n"
-        
-        line2 = "del " + unfFile + "\n"
-        
-        return line0 + line1_1 + line1_2 + line1_3 + line2
-
-    def rpictLine(self, view, projectName, viewName, radParameters, analysisType = 0, cpuCount = 0):
+        args = self.rpictBaseArgs(view, ambFile, radParameters, analysisType) + [octFile]
+        return args, unfFile
+    
+    def overtureLine(self, view, projectName, viewName, radParameters, analysisType = 0):
+        args, unfFile = self.overtureArgs(view, projectName, viewName, radParameters, analysisType)
+        return hb_CommandScript.commandLine(args, stdout = unfFile) + "del " + unfFile + "\n"
+    
+    def rpictArgs(self, view, projectName, viewName, radParameters, analysisType = 0, cpuCount = 0):
+        """Return rpict arguments and the output file for a piece of the image."""
         octFile = projectName + ".oct"
         ambFile = projectName + ".amb" #amb file is view independent and can be used globally
         unfFile = projectName + "_" + viewName + "_" + `cpuCount` + ".unf" 
-        outputFile = projectName + "_" + viewName + "_" + `cpuCount` + ".HDR"
-        
-        if analysisType==0:
-            # illuminance (lux)
-            line0 = "rpict -i "
-        elif analysisType==2:
-            # luminance (cd)
-            line0 = "rpict "
-        else:
-            # radiation analysis
-            line0 = "rpict -i "
-        
-        line1_1 = "-t 10 "+ \
-                view + " -af " + ambFile +  " " + \
-                " -ps " + str(radParameters["_ps_"]) + " -pt " + str(radParameters["_pt_"]) + \
-                " -pj " + str(radParameters["_pj_"]) + " -dj " + str(radParameters["_dj_"]) + \
-                " -ds " + str(radParameters["_ds_"]) + " -dt " + str(radParameters["_dt_"]) + \
-                " -dc " + str(radParameters["_dc_"]) + " -dr " + str(radParameters["_dr_"]) + \
-                " -dp " + str(radParameters["_dp_"]) + " -st " + str(radParameters["_st_"])  + \
-                " -ab " + `radParameters["_ab_"]` + \
-                " -ad " + `radParameters["_ad_"]` + " -as " +  `radParameters["_as_"]` + \
-                " -ar " + `radParameters["_ar_"]` + " -aa " +  '%.3f'%radParameters["_aa_"] + \
-                " -lr " + `radParameters["_lr_"]`  + " -lw " + '%.3f'%radParameters["_lw_"] + " -av 0 0 0 "
-        
-        line1_2 = " "
-        if radParameters.has_key("additional"):
-            for par in radParameters["additional"]:
-                line1_2 += "-%s  "%par
-        
-        line1_3 = " -e error.log " + octFile + " > " + unfFile + "\n"
         
-        return line0 + line1_1 + line1_2 + line1_3
+        args = self.rpictBaseArgs(view, ambFile, radParameters, analysisType) + \
+               ["-e", "error.log", octFile]
+        return args, unfFile
+    
+    def rpictLine(self, view, projectName, viewName, radParameters, analysisType = 0, cpuCount = 0):
+        args, unfFile = self.rpictArgs(view, projectName, viewName, radParameters, analysisType, cpuCount)
+        return hb_CommandScript.commandLine(args, stdout = unfFile)
         
         
     def falsecolorLine(self, projectName, viewName):
@@ -3172,34 +4567,31 @@ class hb_WriteRADAUX(object):
            "ra_gif " + projectName + "_" + viewName + "_FalseColored.pic " + projectName + "_" + viewName + "_FalseColored.gif\n"
         return line
 
-    def rtraceLine(self, projectName, octFileName, radParameters, simulationType = 0, cpuCount = 0):
+    def rtraceArgs(self, projectName, octFileName, radParameters, simulationType = 0, cpuCount = 0):
+        """Return rtrace arguments, the points file and the result file for a cpu."""
         ptsFile = projectName + "_" + str(cpuCount) + ".pts"
         outputFile = projectName + "_" + str(cpuCount) + ".res"
-        if simulationType == 0:
-            line0 = "rtrace -I "
-        elif simulationType == 2:
-            line0 = "rtrace "
+        if simulationType == 2:
+            args = ["rtrace"]
         else:
             # print "Fix this for radiation analysis"
-            line0 = "rtrace -I "
-            
-        line1_1 = " -h -dp " + str(radParameters["_dp_"]) + \
-                " -ds " + str(radParameters["_ds_"]) + " -dt " + str(radParameters["_dt_"]) + \
-                " -dc " + str(radParameters["_dc_"]) + " -dr " + str(radParameters["_dr_"]) + \
-                " -st " + str(radParameters["_st_"]) + " -lr " + str(radParameters["_lr_"]) + \
-                " -lw " + str(radParameters["_lw_"]) + " -ab " + str(radParameters["_ab_"]) + \
-                " -ad " + str(radParameters["_ad_"]) + " -as " + str(radParameters["_as_"]) + \
-                " -ar " + str(radParameters["_ar_"]) + " -aa " + str(radParameters["_aa_"])
-        
-        line1_2 = " "
-        if radParameters.has_key("additional"):
-            for par in radParameters["additional"]:
-                line1_2 += "-%s  "%par
+            args = ["rtrace", "-I"]
             
-        line1_3 = " -e error.log " + octFileName + ".oct < " + ptsFile + \
-                  " > " + outputFile + "\n"
+        args.extend(["-h", "-dp", str(radParameters["_dp_"]),
+                     "-ds", str(radParameters["_ds_"]), "-dt", str(radParameters["_dt_"]),
+                     "-dc", str(radParameters["_dc_"]), "-dr", str(radParameters["_dr_"]),
+                     "-st", str(radParameters["_st_"]), "-lr", str(radParameters["_lr_"]),
+                     "-lw", str(radParameters["_lw_"]), "-ab", str(radParameters["_ab_"]),
+                     "-ad", str(radParameters["_ad_"]), "-as", str(radParameters["_as_"]),
+                     "-ar", str(radParameters["_ar_"]), "-aa", str(radParameters["_aa_"])])
+        args.extend(self.additionalRadArgs(radParameters))
+        args.extend(["-e", "error.log", octFileName + ".oct"])
         
-        return line0 + line1_1 + line1_2 + line1_3
+        return args, ptsFile, outputFile
+    
+    def rtraceLine(self, projectName, octFileName, radParameters, simulationType = 0, cpuCount = 0):
+        args, ptsFile, outputFile = self.rtraceArgs(projectName, octFileName, radParameters, simulationType, cpuCount)
+        return hb_CommandScript.commandLine(args, ptsFile, outputFile)
         
     def testPtsStr(self, testPoint, ptsNormal):
         return  '%.4f'%testPoint.X + '\t' + \
@@ -3211,18 +4603,14 @@ class hb_WriteRADAUX(object):
         
 
     def readRadiationResult(self, resultFile):
-        result = []
-        resultFile = open(resultFile,"r")
-        for line in resultFile: result.append(float(line.split('	')[0])*179)
-        return result
+        columns = CalculateGridBasedDLAnalysisResults.readColumns(resultFile, 1)
+        if len(columns) == 0: return []
+        return [value * 179 for value in columns[0]]
     
     def readDLResult(self, resultFile):
-        result = []
-        resultFile = open(resultFile,"r")
-        for line in resultFile:
-            R, G, B = line.split('	')[0:3]
-            result.append( 179 * (.265 * float(R) + .67 * float(G) + .065 * float(B)))
-        return result
+        columns = CalculateGridBasedDLAnalysisResults.readColumns(resultFile)
+        if len(columns) == 0: return []
+        return list(CalculateGridBasedDLAnalysisResults.RGBToIlluminance(*columns[0:3]))
     
     def isSrfAirWall(self, HBSrf):
         # This can be tricky since some of interior walls may or may not be air walls
@@ -3617,6 +5005,998 @@ class hb_ReadAnnualResultsAux(object):
         
         return illFiles
 
+class hb_IllResultStore(object):
+    """
+    Binary hour x sensor store for a set of Daysim .ill files
+    
+    A set is the list of .ill files for one shading state as they are sorted by
+    hb_ReadAnnualResultsAux.sortIllFiles (one file for each cpu). The files are
+    converted once to a float32 matrix next to the first .ill file. The matrix
+    is memory-mapped on read so the values for a single hour or a single point
+    can be sliced out without parsing the text files again.
+    The store will be re-generated if any of the .ill files has been changed.
+    
+    File structure:
+        MAGIC, version, number of hours, number of points, header length,
+        json header (points in each file, byteorder, source files), float32 data
+    """
+    
+    EXTENSION = ".hbill"
+    MAGIC = "HBILLBIN"
+    VERSION = 1
+    
+    def __init__(self, illFiles, storePath = None):
+        self.illFiles = [os.path.abspath(illFile) for illFile in illFiles]
+        if storePath == None:
+            storePath = os.path.splitext(self.illFiles[0])[0] + self.EXTENSION
+        self.storePath = storePath
+        
+        self.hoursCount = 0
+        self.ptsCount = 0
+        self.ptsCountInEachFile = []
+        self.dataOffset = 0
+        self.needsByteSwap = False
+        self.storeFile = None
+        self.storeMap = None
+        
+        if not self.isUpToDate():
+            self.convert()
+        
+        self.open()
+    
+    def getSourcesStamp(self):
+        # path, modified time and size for each .ill file
+        stamp = []
+        for illFile in self.illFiles:
+            stat = os.stat(illFile)
+            stamp.append([illFile, int(stat.st_mtime), stat.st_size])
+        return stamp
+    
+    def readHeader(self, storeFile):
+        if storeFile.read(len(self.MAGIC)) != self.MAGIC:
+            raise ValueError("%s is not a valid Honeybee ill store."%self.storePath)
+        version, hoursCount, ptsCount, headerLength = struct.unpack("<4i", storeFile.read(16))
+        header = json.loads(storeFile.read(headerLength))
+        header["version"] = version
+        header["hours"] = hoursCount
+        header["points"] = ptsCount
+        header["dataOffset"] = self.getDataOffset(headerLength)
+        return header
+    
+    def getDataOffset(self, headerLength):
+        # keep the data 4-byte aligned
+        offset = len(self.MAGIC) + 16 + headerLength
+        return offset + (4 - offset % 4) % 4
+    
+    def isUpToDate(self):
+        if not os.path.isfile(self.storePath): return False
+        try:
+            with open(self.storePath, "rb") as storeFile:
+                header = self.readHeader(storeFile)
+        except Exception:
+            return False
+        
+        if header["version"] != self.VERSION or header["hours"] == 0: return False
+        
+        return header["sources"] == self.getSourcesStamp()
+    
+    @staticmethod
+    def parseIllLine(line):
+        # each line starts with month, day and hour followed by one value for each sensor
+        return line.split()[3:]
+    
+    def convert(self):
+        """Convert the .ill files to the binary store in a single pass."""
+        self.close()
+        
+        sourceFiles = [open(illFile, "r") for illFile in self.illFiles]
+        tempPath = self.storePath + ".tmp"
+        
+        try:
+            # find number of points in each file from the first line
+            ptsCountInEachFile = []
+            for sourceFile in sourceFiles:
+                firstLine = sourceFile.readline()
+                while firstLine.startswith("#"):
+                    firstLine = sourceFile.readline()
+                ptsCountInEachFile.append(len(self.parseIllLine(firstLine)))
+                sourceFile.seek(0)
+            
+            ptsCount = sum(ptsCountInEachFile)
+            
+            headerStr = json.dumps({"pointsPerFile": ptsCountInEachFile,
+                                    "byteorder": sys.byteorder,
+                                    "sources": self.getSourcesStamp()})
+            
+            dataOffset = self.getDataOffset(len(headerStr))
+            
+            with open(tempPath, "wb") as storeFile:
+                # number of hours will be updated once all the lines are written
+                storeFile.write(self.MAGIC)
+                storeFile.write(struct.pack("<4i", self.VERSION, 0, ptsCount, len(headerStr)))
+                storeFile.write(headerStr)
+                storeFile.write("\x00" * (dataOffset - storeFile.tell()))
+                
+                hoursCount = 0
+                for lines in itertools.izip(*sourceFiles):
+                    if lines[0].startswith("#") or lines[0].strip() == "": continue
+                    values = []
+                    for line in lines:
+                        values.extend(self.parseIllLine(line))
+                    
+                    if len(values) != ptsCount:
+                        raise ValueError("Number of values for hour %d doesn't match the number of points [%d]."%(hoursCount + 1, ptsCount))
+                    
+                    array.array("f", map(float, values)).tofile(storeFile)
+                    hoursCount += 1
+                
+                storeFile.seek(len(self.MAGIC) + 4)
+                storeFile.write(struct.pack("<i", hoursCount))
+        finally:
+            for sourceFile in sourceFiles: sourceFile.close()
+        
+        if os.path.isfile(self.storePath): os.remove(self.storePath)
+        os.rename(tempPath, self.storePath)
+    
+    def open(self):
+        if self.storeFile != None: return
+        self.storeFile = open(self.storePath, "rb")
+        header = self.readHeader(self.storeFile)
+        self.hoursCount = header["hours"]
+        self.ptsCount = header["points"]
+        self.ptsCountInEachFile = header["pointsPerFile"]
+        self.dataOffset = header["dataOffset"]
+        self.needsByteSwap = header["byteorder"] != sys.byteorder
+        
+        if mmap != None:
+            try:
+                self.storeMap = mmap.mmap(self.storeFile.fileno(), 0, access = mmap.ACCESS_READ)
+            except Exception:
+                # seek and read from the file instead
+                self.storeMap = None
+    
+    def close(self):
+        if self.storeMap != None:
+            self.storeMap.close()
+            self.storeMap = None
+        if self.storeFile != None:
+            self.storeFile.close()
+            self.storeFile = None
+    
+    def readBytes(self, offset, length):
+        if self.storeMap != None:
+            return self.storeMap[offset:offset + length]
+        self.storeFile.seek(offset)
+        return self.storeFile.read(length)
+    
+    def toFloats(self, byteStr):
+        values = array.array("f")
+        values.fromstring(byteStr)
+        if self.needsByteSwap: values.byteswap()
+        return values.tolist()
+    
+    def getHourValues(self, HOY, startPt = 0, endPt = None):
+        """Return the values of all the points (or a range of points) for an hour of the year."""
+        if not 1 <= HOY <= self.hoursCount:
+            raise ValueError("HOY should be between 1 and %d."%self.hoursCount)
+        if endPt == None: endPt = self.ptsCount
+        offset = self.dataOffset + ((HOY - 1) * self.ptsCount + startPt) * 4
+        return self.toFloats(self.readBytes(offset, (endPt - startPt) * 4))
+    
+    def getPointValues(self, ptIndex):
+        """Return the annual values for a single point."""
+        if not 0 <= ptIndex < self.ptsCount:
+            raise ValueError("Point index should be between 0 and %d."%(self.ptsCount - 1))
+        rowSize = self.ptsCount * 4
+        offset = self.dataOffset + ptIndex * 4
+        byteStr = "".join([self.readBytes(offset + hour * rowSize, 4) for hour in xrange(self.hoursCount)])
+        return self.toFloats(byteStr)
+
+class hb_EPResultReader(object):
+    """
+    Header-indexed reader for EnergyPlus result .csv files
+    
+    The header is parsed once into an index by (key, variable, frequency). On the first
+    read the values are converted to a column-major float64 store next to the csv file
+    so each column can be read without splitting the rows of the csv file again. Empty
+    cells (e.g. monthly outputs in an hourly file) are saved as NaN.
+    The store will be re-generated if the csv file has been changed.
+    
+    If the simulation has also written the results to an SQLite file the values are
+    read from the sql file instead (see hb_EPSQLResultReader). The header is the same
+    as the header of the csv file but each column only has the values for its own
+    reporting frequency. Rows of columns with different reporting frequencies don't
+    line up in the sql file so they are read from the csv file.
+    
+    If identical zones have been written as a single zone with a multiplier (see
+    hb_ZoneMultipliers) the columns of that zone are also added for each zone that it
+    represents.
+    
+    File structure:
+        MAGIC, version, number of rows, number of columns, header length,
+        json header (column names, byteorder, source file), float64 data
+    
+    Usage:
+        reader = hb_EPResultReader(r"c:\ladybug\test\EnergyPlus\test.csv")
+        colIndex = reader.getColumnIndex("ZONE_1", "Zone Mean Air Temperature", "Hourly")
+        temperature = reader.getColumn(colIndex)
+    """
+    
+    EXTENSION = ".hbcsv"
+    MAGIC = "HBEPCSVB"
+    VERSION = 1
+    
+    def __init__(self, csvFile, storePath = None, useSQLite = True):
+        self.csvFile = os.path.abspath(csvFile)
+        if storePath == None:
+            storePath = os.path.splitext(self.csvFile)[0] + self.EXTENSION
+        self.storePath = storePath
+        
+        self.header = []
+        self.columns = []
+        self.index = {}
+        self.rowsCount = 0
+        self.dataOffset = 0
+        self.needsByteSwap = False
+        # columns will be kept in memory if the store can't be written
+        self.data = None
+        # dictionary index in the sql file for each column
+        self.sqlReader = None
+        self.sqlIndices = []
+        # reader of the csv file for the rows of columns with different frequencies
+        self.csvReader = None
+        # index of the source column for the columns of the zones that are represented
+        # by a zone with a multiplier
+        self.aliases = {}
+        
+        if not (useSQLite and self.loadHeaderFromSQL()):
+            if not self.loadHeader():
+                self.convert()
+        
+        self.addZoneMultiplierColumns()
+        self.indexHeader()
+    
+    def loadHeaderFromSQL(self):
+        if not hb_EPSQLResultReader.isAvailable(): return False
+        sqlFile = hb_EPSQLResultReader.getSQLFile(self.csvFile)
+        if sqlFile == None: return False
+        
+        sqlReader = hb_EPSQLResultReader(sqlFile)
+        try:
+            variables = sqlReader.getVariables()
+        except Exception, e:
+            print "Failed to read %s. Results will be read from the csv file.\n%s"%(sqlFile, str(e))
+            return False
+        finally:
+            sqlReader.close()
+        
+        self.sqlReader = sqlReader
+        self.header = ["Date/Time"] + [sqlReader.getColumnName(*variable[1:]) for variable in variables]
+        self.sqlIndices = [None] + [variable[0] for variable in variables]
+        return True
+    
+    @staticmethod
+    def parseColumnName(column):
+        """Split a column name to (key, variable, units, frequency).
+        
+        e.g. ZONE_1:Zone Mean Air Temperature [C](Hourly) > ZONE_1, Zone Mean Air Temperature, C, Hourly
+        """
+        column = column.strip()
+        frequency = ""
+        if column.endswith(")") and "(" in column:
+            column, frequency = column[:-1].rsplit("(", 1)
+        units = ""
+        if "[" in column:
+            column, units = column.rsplit("[", 1)
+            units = units.split("]")[0]
+        if ":" in column:
+            key, variable = column.rsplit(":", 1)
+        else:
+            key, variable = "", column
+        return key.strip(), variable.strip(), units.strip(), frequency.strip()
+    
+    def addZoneMultiplierColumns(self):
+        """Add a copy of the columns of each zone with a multiplier for the zones that it represents.
+        
+        e.g. ZONE_1 IDEAL LOADS AIR SYSTEM:Zone Ideal Loads Supply Air Total Cooling Energy [J](Hourly)
+        is also added as ZONE_2 IDEAL LOADS AIR SYSTEM:Zone Ideal Loads Supply Air Total Cooling Energy [J](Hourly)
+        if ZONE_1 has been written to the model instead of ZONE_2.
+        """
+        groups = hb_ZoneMultipliers.readMultipliersFile(os.path.dirname(self.csvFile))
+        if len(groups) == 0: return
+        
+        groups = dict((name.upper(), removedZones) for name, removedZones in groups.items())
+        zoneColumns = collections.OrderedDict()
+        for columnCount, column in enumerate(self.header):
+            key = self.parseColumnName(column)[0].upper()
+            # the key is either the zone name or starts with the zone name and a space
+            names = [key] + [key[:charCount] for charCount, char in enumerate(key) if char == " "]
+            for name in names:
+                if name in groups:
+                    if name not in zoneColumns: zoneColumns[name] = []
+                    zoneColumns[name].append(columnCount)
+                    break
+        
+        for name, columns in zoneColumns.items():
+            for removedZone in groups[name]:
+                for columnCount in columns:
+                    self.aliases[len(self.header)] = columnCount
+                    self.header.append(removedZone.upper() + self.header[columnCount].strip()[len(name):])
+                    if self.sqlReader != None: self.sqlIndices.append(self.sqlIndices[columnCount])
+    
+    def indexHeader(self):
+        self.columns = [self.parseColumnName(column) for column in self.header]
+        self.index = {}
+        for columnCount, (key, variable, units, frequency) in enumerate(self.columns):
+            self.index[(key.upper(), variable.upper(), frequency.upper())] = columnCount
+    
+    def getColumnIndex(self, key, variable, frequency = None):
+        """Return index of the column for key, variable and frequency or None if it's not in the file."""
+        if frequency != None:
+            return self.index.get((key.upper(), variable.upper(), frequency.upper()))
+        
+        for columnCount, column in enumerate(self.columns):
+            if column[0].upper() == key.upper() and column[1].upper() == variable.upper():
+                return columnCount
+    
+    def findColumns(self, variable, frequency = None):
+        """Return indices of all the columns for a variable."""
+        return [columnCount for columnCount, column in enumerate(self.columns) \
+                if column[1].upper() == variable.upper() and \
+                (frequency == None or column[3].upper() == frequency.upper())]
+    
+    def getSourcesStamp(self):
+        stat = os.stat(self.csvFile)
+        return [self.csvFile, int(stat.st_mtime), stat.st_size]
+    
+    def getDataOffset(self, headerLength):
+        # keep the data 8-byte aligned
+        offset = len(self.MAGIC) + 16 + headerLength
+        return offset + (8 - offset % 8) % 8
+    
+    def loadHeader(self):
+        if not os.path.isfile(self.storePath): return False
+        try:
+            with open(self.storePath, "rb") as storeFile:
+                if storeFile.read(len(self.MAGIC)) != self.MAGIC: return False
+                version, rowsCount, columnsCount, headerLength = struct.unpack("<4i", storeFile.read(16))
+                header = json.loads(storeFile.read(headerLength))
+        except Exception:
+            return False
+        
+        if version != self.VERSION or header["sources"] != self.getSourcesStamp(): return False
+        
+        self.header = header["header"]
+        self.rowsCount = rowsCount
+        self.dataOffset = self.getDataOffset(headerLength)
+        self.needsByteSwap = header["byteorder"] != sys.byteorder
+        return True
+    
+    def convert(self):
+        """Convert the csv file to the column-major binary store in a single pass."""
+        nan = float("nan")
+        with open(self.csvFile, "r") as csvFile:
+            self.header = csvFile.readline().rstrip("\r\n").split(",")
+            columnsCount = len(self.header)
+            data = [array.array("d") for column in xrange(columnsCount)]
+            
+            for line in csvFile:
+                if line.strip() == "": continue
+                values = line.rstrip("\r\n").split(",")
+                for columnCount in xrange(columnsCount):
+                    try:
+                        data[columnCount].append(float(values[columnCount]))
+                    except (ValueError, IndexError):
+                        # empty cell or Date/Time column
+                        data[columnCount].append(nan)
+        
+        self.rowsCount = len(data[0]) if columnsCount else 0
+        
+        headerStr = json.dumps({"header": self.header,
+                                "byteorder": sys.byteorder,
+                                "sources": self.getSourcesStamp()})
+        self.dataOffset = self.getDataOffset(len(headerStr))
+        self.needsByteSwap = False
+        
+        tempPath = self.storePath + ".tmp"
+        try:
+            with open(tempPath, "wb") as storeFile:
+                storeFile.write(self.MAGIC)
+                storeFile.write(struct.pack("<4i", self.VERSION, self.rowsCount, columnsCount, len(headerStr)))
+                storeFile.write(headerStr)
+                storeFile.write("\x00" * (self.dataOffset - storeFile.tell()))
+                for values in data:
+                    values.tofile(storeFile)
+            
+            if os.path.isfile(self.storePath): os.remove(self.storePath)
+            os.rename(tempPath, self.storePath)
+        except (IOError, OSError):
+            # read-only folder. keep the values in memory
+            self.data = data
+    
+    def getColumn(self, columnIndex):
+        """Return values of a column as an array of floats. Empty cells are NaN."""
+        if not 0 <= columnIndex < len(self.header):
+            raise ValueError("Column index should be between 0 and %d."%(len(self.header) - 1))
+        
+        if self.sqlReader != None: return self.getColumns([columnIndex])[columnIndex]
+        columnIndex = self.aliases.get(columnIndex, columnIndex)
+        if self.data != None: return self.data[columnIndex]
+        
+        values = array.array("d")
+        with open(self.storePath, "rb") as storeFile:
+            storeFile.seek(self.dataOffset + columnIndex * self.rowsCount * 8)
+            values.fromfile(storeFile, self.rowsCount)
+        if self.needsByteSwap: values.byteswap()
+        return values
+    
+    def getColumns(self, columnIndices):
+        """Return a dictionary of column index and values for a list of columns."""
+        if self.sqlReader == None:
+            return dict((columnIndex, self.getColumn(columnIndex)) for columnIndex in set(columnIndices))
+        
+        # read all the columns from the sql file with a single query
+        indices = [self.sqlIndices[columnIndex] for columnIndex in set(columnIndices)]
+        try:
+            values = self.sqlReader.getValuesByIndex([index for index in indices if index != None])
+        finally:
+            self.sqlReader.close()
+        
+        return dict((columnIndex, values.get(self.sqlIndices[columnIndex], array.array("d"))) \
+                    for columnIndex in set(columnIndices))
+    
+    def getCSVReader(self):
+        # the csv file is only converted once the values of the sql file can't be used
+        if self.csvReader == None:
+            self.csvReader = hb_EPResultReader(self.csvFile, self.storePath, useSQLite = False)
+        return self.csvReader
+    
+    def iterRows(self, columnIndices):
+        """Iterate over rows for a list of columns.
+        
+        Each row is a dictionary of column index and value. Empty cells are None.
+        """
+        columnIndices = sorted(set(columnIndices))
+        frequencies = set(self.columns[columnIndex][3].upper() for columnIndex in columnIndices)
+        if self.sqlReader != None and len(frequencies) > 1:
+            # rows of the sql file only line up for a single reporting frequency
+            csvReader = self.getCSVReader()
+            csvIndices = dict((columnIndex, csvReader.getColumnIndex(self.columns[columnIndex][0], \
+                               self.columns[columnIndex][1], self.columns[columnIndex][3])) \
+                              for columnIndex in columnIndices)
+            for row in csvReader.iterRows([csvIndex for csvIndex in csvIndices.values() if csvIndex != None]):
+                yield dict((columnIndex, row[csvIndex] if csvIndex != None else None) \
+                           for columnIndex, csvIndex in csvIndices.items())
+            return
+        
+        columns = self.getColumns(columnIndices)
+        nan = float("nan")
+        for values in itertools.izip_longest(*[columns[columnIndex] for columnIndex in columnIndices], fillvalue = nan):
+            yield dict((columnIndex, value if value == value else None) \
+                       for columnIndex, value in itertools.izip(columnIndices, values))
+
+
+class hb_EPSQLResultReader(object):
+    """
+    Read EnergyPlus results from the SQLite output (Output:SQLite)
+    
+    Variables are looked up in ReportDataDictionary and the values are read from
+    ReportData with a single query for all the requested keys. ReportData is indexed
+    by variable once after the simulation by Run Energy Simulation (see createIndex)
+    and the readers never modify the sql file. Zone names and floor areas are read
+    from the Zones table instead of the .eio file.
+    Only the table structure of EnergyPlus 8.9 and later is supported.
+    
+    Usage:
+        sqlFile = hb_EPSQLResultReader.getSQLFile(r"c:\ladybug\test\EnergyPlus\test.csv")
+        reader = hb_EPSQLResultReader(sqlFile)
+        temperatures = reader.getValues("Zone Mean Air Temperature", frequency = "Hourly")
+        reader.close()
+    """
+    
+    # frequency names in sql file > csv file
+    FREQUENCIES = {"ZONE TIMESTEP": "TimeStep", "HVAC SYSTEM TIMESTEP": "Detailed",
+                   "HOURLY": "Hourly", "DAILY": "Daily", "MONTHLY": "Monthly",
+                   "RUN PERIOD": "RunPeriod", "ANNUAL": "Annual"}
+    
+    def __init__(self, sqlFile):
+        if sqlite3 == None:
+            raise ImportError("sqlite3 is not available in this version of IronPython.")
+        if not os.path.isfile(sqlFile):
+            raise ValueError("Can't find %s."%sqlFile)
+        self.sqlFile = sqlFile
+        self.connection = None
+    
+    @staticmethod
+    def isAvailable():
+        return sqlite3 != None
+    
+    @staticmethod
+    def getSQLFile(resultFile):
+        """Find the .sql file for a .csv file from the same run. Return None if there is no sql file.
+        
+        The sql file should be newer than the idf file so results of an older run
+        with Output:SQLite won't be used.
+        """
+        baseName = os.path.splitext(resultFile)[0]
+        sqlFile = baseName + ".sql"
+        idfFile = baseName + ".idf"
+        if not os.path.isfile(sqlFile) or not os.path.isfile(idfFile): return None
+        if os.path.getmtime(sqlFile) < os.path.getmtime(idfFile): return None
+        return sqlFile
+    
+    def connect(self):
+        if self.connection != None: return self.connection
+        self.connection = sqlite3.connect(self.sqlFile)
+        return self.connection
+    
+    def close(self):
+        # close the connection once the results are read. An open connection
+        # locks the file and EnergyPlus won't be able to overwrite it.
+        if self.connection != None:
+            self.connection.close()
+            self.connection = None
+    
+    @staticmethod
+    def createIndex(sqlFile):
+        """Index ReportData by variable and time. Return True if the index is created.
+        
+        EnergyPlus doesn't index ReportData by variable so without the index each
+        query scans the whole table. This should only be called by the component
+        that has ran the simulation right after EnergyPlus has written the file.
+        """
+        if sqlite3 == None or not os.path.isfile(sqlFile): return False
+        connection = sqlite3.connect(sqlFile)
+        try:
+            connection.execute("CREATE INDEX IF NOT EXISTS hbReportDataIndex " + \
+                               "ON ReportData (ReportDataDictionaryIndex, TimeIndex)")
+            connection.commit()
+            return True
+        except sqlite3.Error, e:
+            print "Failed to index the results in %s: %s"%(sqlFile, str(e))
+            return False
+        finally:
+            connection.close()
+    
+    def getZones(self):
+        """Return a list of (zone name, floor area) in the order of the zones in the file."""
+        cursor = self.connect().execute("SELECT ZoneName, FloorArea FROM Zones ORDER BY ZoneIndex")
+        return [(str(name), area) for name, area in cursor.fetchall()]
+    
+    def getZoneNames(self):
+        return [name for name, area in self.getZones()]
+    
+    def getZoneFloorAreas(self):
+        return [area for name, area in self.getZones()]
+    
+    def getFrequency(self, reportingFrequency):
+        return self.FREQUENCIES.get(reportingFrequency.upper(), reportingFrequency)
+    
+    def getVariables(self, variableName = None, frequency = None):
+        """Return a list of (index, key, variable, units, frequency) for the variables and meters in the file."""
+        cursor = self.connect().execute("SELECT ReportDataDictionaryIndex, KeyValue, Name, Units, ReportingFrequency " + \
+                                         "FROM ReportDataDictionary ORDER BY ReportDataDictionaryIndex")
+        variables = []
+        for index, key, name, units, reportingFrequency in cursor.fetchall():
+            if variableName != None and name.upper() != variableName.upper(): continue
+            reportingFrequency = self.getFrequency(reportingFrequency)
+            if frequency != None and reportingFrequency.upper() != frequency.upper(): continue
+            variables.append((index, str(key or ""), str(name), str(units or ""), reportingFrequency))
+        return variables
+    
+    @staticmethod
+    def getColumnName(key, variable, units, frequency):
+        """Return the name of the column for this variable in the csv file."""
+        if key == "": return "%s [%s](%s)"%(variable, units, frequency)
+        return "%s:%s [%s](%s)"%(key, variable, units, frequency)
+    
+    def getValuesByIndex(self, indices):
+        """Return a dictionary of dictionary index and values as an array of floats for a list of variables."""
+        values = dict((index, array.array("d")) for index in indices)
+        if len(values) == 0: return values
+        
+        query = "SELECT ReportData.ReportDataDictionaryIndex, ReportData.Value FROM ReportData " + \
+                "INNER JOIN Time ON ReportData.TimeIndex = Time.TimeIndex " + \
+                "WHERE ReportData.ReportDataDictionaryIndex IN (%s) "%",".join("?" * len(values)) + \
+                "AND (Time.WarmupFlag IS NULL OR Time.WarmupFlag = 0) " + \
+                "ORDER BY ReportData.ReportDataDictionaryIndex, ReportData.TimeIndex"
+        
+        for index, value in self.connect().execute(query, list(values.keys())):
+            values[index].append(value)
+        return values
+    
+    def getValues(self, variableName, keys = None, frequency = None):
+        """Return a dictionary of key and values as an array of floats for a variable."""
+        variables = self.getVariables(variableName, frequency)
+        if keys != None:
+            keys = [key.upper() for key in keys]
+            variables = [variable for variable in variables if variable[1].upper() in keys]
+        values = self.getValuesByIndex([variable[0] for variable in variables])
+        return dict((variable[1], values[variable[0]]) for variable in variables)
+
+
+class hb_ComfortMatrixFile(object):
+    """
+    Read and write hour x point comfort matrices
+    
+    A comfort matrix is the python matrix that comes out of the microclimate map
+    and thermal autonomy components. The first item is a header string
+    (e.g. 'Operative Temperature;(1, 1, 1);(12, 31, 24)') followed by one list
+    of values for each hour of the analysis.
+    The matrix can be written as a csv file or as a binary float64 file. The
+    binary file is written in bulk and is memory-mapped on read so single hours
+    can be loaded without reading the whole file. csv files are still supported
+    for both reading and writing.
+    
+    File structure:
+        MAGIC, version, number of rows, number of points, header length,
+        json header (header string, data type, analysis period, byteorder), float64 data
+    """
+    
+    EXTENSION = ".hbmtx"
+    MAGIC = "HBCMFMTX"
+    VERSION = 1
+    # added to the data type of the matrices that only have the totals of the analysis period
+    SUMMARYTAG = " (Summary)"
+    # number of values to be collected before writing them to the file
+    CHUNKSIZE = 262144
+    
+    def __init__(self, filePath):
+        self.filePath = filePath
+    
+    @classmethod
+    def isBinary(cls, filePath):
+        """Check if the file is a binary comfort matrix."""
+        try:
+            with open(filePath, "rb") as mtxFile:
+                return mtxFile.read(len(cls.MAGIC)) == cls.MAGIC
+        except Exception:
+            return False
+    
+    @staticmethod
+    def parseHeader(headerStr):
+        """Return data type and analysis period from a matrix header string."""
+        segments = headerStr.split(";")
+        return segments[0], segments[1:]
+    
+    @classmethod
+    def isSummary(cls, headerStr):
+        """Check if the matrix only has the totals of the analysis period instead of hourly values."""
+        return cls.parseHeader(str(headerStr))[0].endswith(cls.SUMMARYTAG)
+    
+    @staticmethod
+    def getValuesCount(matrix):
+        # rows might be lists or arrays
+        if len(matrix) < 2: return 0
+        return len(matrix[1])
+    
+    def getDataOffset(self, headerLength):
+        # keep the data 8-byte aligned
+        offset = len(self.MAGIC) + 16 + headerLength
+        return offset + (8 - offset % 8) % 8
+    
+    def readHeader(self, mtxFile):
+        if mtxFile.read(len(self.MAGIC)) != self.MAGIC:
+            raise ValueError("%s is not a valid Honeybee comfort matrix."%self.filePath)
+        version, rowsCount, ptsCount, headerLength = struct.unpack("<4i", mtxFile.read(16))
+        header = json.loads(mtxFile.read(headerLength))
+        header["version"] = version
+        header["rows"] = rowsCount
+        header["points"] = ptsCount
+        header["dataOffset"] = self.getDataOffset(headerLength)
+        return header
+    
+    def write(self, matrix, valuesCount = None):
+        """Write the matrix to a binary file.
+        
+        Args:
+            matrix: A comfort matrix with the header string as the first item.
+            valuesCount: Number of values to be written for each row. Default is
+                the number of values in the first row. Rows with more values will
+                be trimmed.
+        """
+        if valuesCount == None: valuesCount = self.getValuesCount(matrix)
+        dataType, analysisPeriod = self.parseHeader(str(matrix[0]))
+        
+        headerStr = json.dumps({"header": str(matrix[0]),
+                                "dataType": dataType,
+                                "analysisPeriod": analysisPeriod,
+                                "byteorder": sys.byteorder})
+        
+        dataOffset = self.getDataOffset(len(headerStr))
+        
+        with open(self.filePath, "wb") as mtxFile:
+            mtxFile.write(self.MAGIC)
+            mtxFile.write(struct.pack("<4i", self.VERSION, len(matrix) - 1, valuesCount, len(headerStr)))
+            mtxFile.write(headerStr)
+            mtxFile.write("\x00" * (dataOffset - mtxFile.tell()))
+            
+            values = array.array("d")
+            for rowCount, row in enumerate(matrix[1:]):
+                if len(row) < valuesCount:
+                    raise ValueError("Row %d of %s has %d values instead of %d."%(rowCount + 1, dataType, len(row), valuesCount))
+                if len(row) > valuesCount: row = row[:valuesCount]
+                values.extend(map(float, row))
+                
+                if len(values) >= self.CHUNKSIZE:
+                    mtxFile.write(values.tostring())
+                    values = array.array("d")
+            
+            mtxFile.write(values.tostring())
+        
+        return self.filePath
+    
+    def writeCSV(self, matrix, valuesCount = None):
+        """Write the matrix to a csv file. Rows with more values than valuesCount will be trimmed."""
+        if valuesCount == None: valuesCount = self.getValuesCount(matrix)
+        
+        with open(self.filePath, "wb") as csvFile:
+            csvFile.write(str(matrix[0]) + "\n")
+            lines = []
+            for row in matrix[1:]:
+                lines.append(",".join(map(str, row[:valuesCount])) + "\n")
+                if len(lines) == 1000:
+                    csvFile.write("".join(lines))
+                    lines = []
+            csvFile.write("".join(lines))
+        
+        return self.filePath
+    
+    @classmethod
+    def writeResultFiles(cls, workingDir, resultMtxs, writeCSV = False, valuesCount = None):
+        """Write a list of result matrices to binary matrix files or to csv files.
+        
+        Args:
+            workingDir: Folder to write the files in.
+            resultMtxs: A list of (fileName, matrix) tuples. fileName has no extension.
+                Matrices which are None are not written.
+            writeCSV: Set to True to write csv files instead of binary files.
+            valuesCount: Number of values to be written for each row. Default is
+                the number of values in the last row of the last matrix.
+        Returns:
+            A list of file paths with None for the matrices that are not written.
+        """
+        if valuesCount == None:
+            valuesCount = len([resultMtx for fileName, resultMtx in resultMtxs if resultMtx != None][-1][-1])
+        
+        resultFiles = []
+        for fileName, resultMtx in resultMtxs:
+            if resultMtx == None:
+                resultFiles.append(None)
+            elif writeCSV:
+                mtxFile = cls(os.path.join(workingDir, fileName + ".csv"))
+                resultFiles.append(mtxFile.writeCSV(resultMtx, valuesCount))
+            else:
+                mtxFile = cls(os.path.join(workingDir, fileName + cls.EXTENSION))
+                resultFiles.append(mtxFile.write(resultMtx, valuesCount))
+        
+        return resultFiles
+    
+    def toFloats(self, byteStr, needsByteSwap):
+        values = array.array("d")
+        values.fromstring(byteStr)
+        if needsByteSwap: values.byteswap()
+        return values.tolist()
+    
+    def read(self, rows = None):
+        """Read the matrix from a binary or a csv file.
+        
+        Args:
+            rows: An optional list of row indices (starting from 1 for the first
+                hour) to be loaded. Default is all the rows.
+        Returns:
+            A comfort matrix with the header string as the first item.
+        """
+        if not self.isBinary(self.filePath):
+            return self.readCSV(rows)
+        
+        with open(self.filePath, "rb") as mtxFile:
+            header = self.readHeader(mtxFile)
+            ptsCount = header["points"]
+            needsByteSwap = header["byteorder"] != sys.byteorder
+            matrix = [str(header["header"])]
+            
+            if rows == None:
+                mtxFile.seek(header["dataOffset"])
+                values = self.toFloats(mtxFile.read(header["rows"] * ptsCount * 8), needsByteSwap)
+                for rowCount in xrange(header["rows"]):
+                    matrix.append(values[rowCount * ptsCount:(rowCount + 1) * ptsCount])
+                return matrix
+            
+            mtxMap = None
+            if mmap != None:
+                try: mtxMap = mmap.mmap(mtxFile.fileno(), 0, access = mmap.ACCESS_READ)
+                except Exception: mtxMap = None
+            
+            try:
+                rowSize = ptsCount * 8
+                for row in rows:
+                    if not 1 <= row <= header["rows"]:
+                        raise ValueError("Row index should be between 1 and %d."%header["rows"])
+                    offset = header["dataOffset"] + (row - 1) * rowSize
+                    if mtxMap != None:
+                        byteStr = mtxMap[offset:offset + rowSize]
+                    else:
+                        mtxFile.seek(offset)
+                        byteStr = mtxFile.read(rowSize)
+                    matrix.append(self.toFloats(byteStr, needsByteSwap))
+            finally:
+                if mtxMap != None: mtxMap.close()
+        
+        return matrix
+    
+    def readCSV(self, rows = None):
+        matrix = []
+        if rows != None: rows = set(rows)
+        with open(self.filePath, "r") as csvFile:
+            for lineCount, line in enumerate(csvFile):
+                if lineCount == 0:
+                    matrix.append(line.split('\n')[0])
+                elif rows == None or lineCount in rows:
+                    matrix.append(map(float, line.split(',')))
+        return matrix
+
+
+class hb_ComfortMatrixAggregator(object):
+    """
+    Aggregate the hourly rows of a comfort matrix for each point
+    
+    Rows are streamed into the aggregator one at a time and the per-point sums
+    and occupied hour counts are updated in place, so the matrix never needs to
+    be copied or transposed. Values for each point are only collected when
+    percentiles are requested.
+    
+    Usage:
+        aggregator = hb_ComfortMatrixAggregator(pointsCount)
+        aggregator.addRows(comfResultsMtx, hb_ComfortMatrixAggregator.getRowIndices(HOYs))
+        values = aggregator.mean()
+    """
+    
+    def __init__(self, pointsCount, collectValues = False):
+        self.pointsCount = pointsCount
+        self.rowsCount = 0
+        self.sums = [0] * pointsCount
+        # points of thermal autonomy matrices are marked as occupied with integer values
+        self.occupiedCounts = [0] * pointsCount
+        self.values = [[] for pt in xrange(pointsCount)] if collectValues else None
+    
+    @staticmethod
+    def getRowIndices(HOYs, firstHOY = 1):
+        """Convert a list of HOYs to sorted row indices of a comfort matrix
+        that starts from firstHOY. Duplicate hours are only counted once.
+        """
+        return sorted(set(HOY - firstHOY + 1 for HOY in HOYs))
+    
+    def addRow(self, row):
+        """Add the values of one hour to the aggregation."""
+        if len(row) < self.pointsCount:
+            raise ValueError("Row has %d values instead of %d."%(len(row), self.pointsCount))
+        
+        self.sums = map(operator.add, self.sums, row)
+        self.occupiedCounts = map(lambda count, val: count + isinstance(val, int), self.occupiedCounts, row)
+        if self.values != None:
+            for values, val in itertools.izip(self.values, row): values.append(val)
+        self.rowsCount += 1
+    
+    def addRows(self, matrix, rows = None):
+        """Add rows of a comfort matrix.
+        
+        Args:
+            matrix: A comfort matrix with the header string as the first item.
+            rows: An optional iterable of row indices (1 for the first hour).
+                Only these rows will be visited. Default is all rows after the header.
+        """
+        if rows == None: rows = xrange(1, len(matrix))
+        for row in rows: self.addRow(matrix[row])
+    
+    def sum(self):
+        return list(self.sums)
+    
+    def mean(self):
+        if self.rowsCount == 0: return [0] * self.pointsCount
+        return [total / float(self.rowsCount) for total in self.sums]
+    
+    def percentOfOccupied(self, occupiedCounts = None):
+        """Divide the sum of each point by its occupied hours.
+        
+        Args:
+            occupiedCounts: Optional occupied hours for each point. Default is the
+                number of occupied hours found in the aggregated rows.
+        """
+        if occupiedCounts == None: occupiedCounts = self.occupiedCounts
+        return [total / float(count) if count else 0 for total, count in itertools.izip(self.sums, occupiedCounts)]
+    
+    def percentile(self, percent):
+        """Return the percentile of each point's values using linear interpolation.
+        
+        Args:
+            percent: A number between 0 and 100.
+        """
+        if self.values == None:
+            raise Exception("The aggregator should be created with collectValues = True to calculate percentiles.")
+        if self.rowsCount == 0: return [0] * self.pointsCount
+        
+        position = (self.rowsCount - 1) * percent / 100.0
+        lowIndex = int(math.floor(position))
+        highIndex = min(lowIndex + 1, self.rowsCount - 1)
+        fraction = position - lowIndex
+        
+        percentiles = []
+        for values in self.values:
+            values = sorted(values)
+            percentiles.append(values[lowIndex] + (values[highIndex] - values[lowIndex]) * fraction)
+        return percentiles
+
+
+class hb_PointZoneCache(object):
+    """
+    Cache the zone that contains each face of a view factor mesh
+    
+    The Indoor View Factor Calculator already knows which zone each test point
+    belongs to and registers it here. Components that need the same assignment
+    (e.g. Thermal Autonomy Analysis) look it up instead of testing every face
+    against every zone. If the assignment isn't cached it will be calculated
+    once and added to the cache. Assignments are stored in sc.sticky by a
+    fingerprint of the mesh vertices and the zone names and bounding boxes.
+    """
+    
+    def __init__(self):
+        if not sc.sticky.has_key("honeybee_PointZoneCacheData"):
+            sc.sticky["honeybee_PointZoneCacheData"] = {}
+        self.cache = sc.sticky["honeybee_PointZoneCacheData"]
+    
+    @staticmethod
+    def getKey(meshes, zoneBreps, zoneNames):
+        md5 = hashlib.md5()
+        for mesh in meshes:
+            md5.update("%d,%d;"%(mesh.Vertices.Count, mesh.Faces.Count))
+            md5.update(",".join("%.4f,%.4f,%.4f"%(pt.X, pt.Y, pt.Z) for pt in mesh.Vertices))
+        for zoneName, zoneBrep in itertools.izip(zoneNames, zoneBreps):
+            bbox = zoneBrep.GetBoundingBox(False)
+            md5.update(";%s,%.4f,%.4f,%.4f,%.4f,%.4f,%.4f"%(zoneName, bbox.Min.X, bbox.Min.Y, bbox.Min.Z, bbox.Max.X, bbox.Max.Y, bbox.Max.Z))
+        return md5.hexdigest()
+    
+    def register(self, meshes, zoneBreps, zoneNames, pointZoneNames):
+        """Add a known assignment to the cache.
+        
+        Args:
+            meshes: A flattened list of view factor meshes.
+            zoneBreps: Closed breps of the zones.
+            zoneNames: Names of the zones in the same order as zoneBreps.
+            pointZoneNames: Zone name for each mesh face. None for outdoor faces.
+        """
+        self.cache[self.getKey(meshes, zoneBreps, zoneNames)] = list(pointZoneNames)
+    
+    def getPointZones(self, meshes, zoneBreps, zoneNames, tolerance):
+        """Return the name of the zone that contains each face center of the meshes.
+        
+        Faces that are not inside any zone get None.
+        """
+        key = self.getKey(meshes, zoneBreps, zoneNames)
+        if key in self.cache: return self.cache[key]
+        
+        # only test the zones that their bounding box contains the point
+        zoneBoxes = []
+        for zoneBrep in zoneBreps:
+            bbox = zoneBrep.GetBoundingBox(False)
+            bbox.Inflate(tolerance)
+            zoneBoxes.append(bbox)
+        
+        pointZoneNames = []
+        for mesh in meshes:
+            for faceCount in xrange(mesh.Faces.Count):
+                centPt = mesh.Faces.GetFaceCenter(faceCount)
+                zoneName = None
+                for zoneCount, zoneBrep in enumerate(zoneBreps):
+                    if zoneBoxes[zoneCount].Contains(centPt) and zoneBrep.IsPointInside(centPt, tolerance, False):
+                        zoneName = zoneNames[zoneCount]
+                        break
+                pointZoneNames.append(zoneName)
+        
+        self.cache[key] = pointZoneNames
+        return pointZoneNames
+
+
 class hb_EnergySimulatioParameters(object):
     
     def readEPParams(self, EPParameters):
@@ -4258,6 +6638,10 @@ class EPObjectsAux(object):
         # add name to list
         #sc.sticky [HBLibrarieNames[key]]["List"].append(name)
         
+        if key == "Schedule" or key == "ScheduleTypeLimits":
+            # compiled schedules might be based on the old definition
+            hb_EPScheduleCompiler.invalidateCache()
+        
         return True, name
     
     def getEPObjectDataByName(self, objectName):
@@ -4352,6 +6736,233 @@ class EPObjectsAux(object):
             component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warningMsg)
             return
 
+class hb_EPScheduleCompiler(object):
+    """
+    Compile EnergyPlus schedules to a flat list of annual values
+    
+    Schedule:Year, Schedule:Week:Daily, Schedule:Week:Compact, Schedule:Day:Interval,
+    Schedule:Day:Hourly, Schedule:Compact and Schedule:Constant are compiled
+    to 8760 * timestep values. Compiled schedules are cached in sc.sticky by
+    name, start day of the week, timestep and the version of the schedule
+    library. The version is updated every time a schedule is added or
+    overwritten in the library which invalidates the cache.
+    
+    Args:
+        startDayOfTheWeek: 0 for Sunday to 6 for Saturday.
+        timestep: Number of values for each hour.
+    """
+    
+    DAYSINMONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+    WEEKDAYS = ('sunday', 'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday')
+    
+    def __init__(self, startDayOfTheWeek = 0, timestep = 1, component = None):
+        self.startDayOfTheWeek = int(startDayOfTheWeek)%7
+        self.timestep = int(timestep)
+        self.component = component
+        self.hb_EPScheduleAUX = EPScheduleAux()
+        
+        if not sc.sticky.has_key("honeybee_ScheduleCache"):
+            sc.sticky["honeybee_ScheduleCache"] = {}
+        if not sc.sticky.has_key("honeybee_ScheduleLibVersion"):
+            sc.sticky["honeybee_ScheduleLibVersion"] = 0
+    
+    @staticmethod
+    def invalidateCache():
+        """Call this function every time a schedule in the library is changed."""
+        version = sc.sticky["honeybee_ScheduleLibVersion"] if sc.sticky.has_key("honeybee_ScheduleLibVersion") else 0
+        sc.sticky["honeybee_ScheduleLibVersion"] = version + 1
+        sc.sticky["honeybee_ScheduleCache"] = {}
+    
+    def getCacheKey(self, schName, shape):
+        return (schName.upper(), shape, self.startDayOfTheWeek, self.timestep, \
+                sc.sticky["honeybee_ScheduleLibVersion"])
+    
+    def getDayOfYear(self, month, day):
+        return sum(self.DAYSINMONTH[:int(month) - 1]) + int(day)
+    
+    def getStepIndex(self, untilTime):
+        # convert hh:mm to index of the timestep in the day
+        hour, minute = untilTime.strip().split(":")[:2]
+        return int(round((int(hour) + int(minute) / 60.0) * self.timestep))
+    
+    def getScheduleData(self, schName):
+        values, comments = self.hb_EPScheduleAUX.getScheduleDataByName(schName.upper(), self.component)
+        if values == None or comments == "csv":
+            raise ValueError("Failed to find %s in the Honeybee schedule library."%schName)
+        return [str(value).strip() for value in values]
+    
+    def compile(self, schName):
+        """Return the values of the schedule for a year [8760 * timestep]."""
+        key = self.getCacheKey(schName, "year")
+        cache = sc.sticky["honeybee_ScheduleCache"]
+        if key not in cache:
+            values = self.getScheduleData(schName)
+            scheduleType = values[0].lower()
+            
+            if scheduleType == "schedule:year":
+                cache[key] = self.compileYear(values)
+            elif scheduleType == "schedule:compact":
+                cache[key] = self.compileCompact(values)
+            elif scheduleType == "schedule:constant":
+                cache[key] = [float(values[2])] * (8760 * self.timestep)
+            elif scheduleType.startswith("schedule:week"):
+                cache[key] = self.weekToYear(self.compileWeek(schName))
+            elif scheduleType.startswith("schedule:day"):
+                cache[key] = self.compileDay(schName) * 365
+            else:
+                raise ValueError("Honeybee doesn't support %s currently."%values[0])
+        
+        return cache[key]
+    
+    def compileDay(self, schName):
+        """Return the values of a day schedule [24 * timestep]."""
+        key = self.getCacheKey(schName, "day")
+        cache = sc.sticky["honeybee_ScheduleCache"]
+        if key in cache: return cache[key]
+        
+        values = self.getScheduleData(schName)
+        scheduleType = values[0].lower()
+        
+        if scheduleType == "schedule:day:hourly":
+            dayValues = []
+            for value in values[2:26]:
+                dayValues.extend([float(value)] * self.timestep)
+        elif scheduleType == "schedule:day:interval":
+            # type, type limits, interpolate, [until time, value]
+            dayValues = self.untilValuesToDay(values[3:])
+        elif scheduleType == "schedule:constant":
+            dayValues = [float(values[2])] * (24 * self.timestep)
+        else:
+            raise ValueError("%s is not a supported day schedule."%schName)
+        
+        cache[key] = dayValues
+        return dayValues
+    
+    def untilValuesToDay(self, untilValues):
+        dayValues = [0] * (24 * self.timestep)
+        startStep = 0
+        for count in range(0, len(untilValues) - 1, 2):
+            untilTime = untilValues[count]
+            if untilTime.lower().startswith("until:"): untilTime = untilTime.split(":", 1)[-1]
+            endStep = self.getStepIndex(untilTime)
+            value = float(untilValues[count + 1])
+            for step in range(startStep, min(endStep, len(dayValues))):
+                dayValues[step] = value
+            startStep = endStep
+        return dayValues
+    
+    def matchDayTypes(self, dayTypes, weekDayValues):
+        """Assign day values to days of the week based on compact keywords.
+        
+        weekDayValues is a list of 7 items (Sunday to Saturday) that will be updated.
+        """
+        for dayTypesStr, dayValues in dayTypes:
+            for dayType in dayTypesStr.lower().replace("for:", "").split():
+                if dayType == "alldays":
+                    daysIndex = range(7)
+                elif dayType == "weekdays":
+                    daysIndex = range(1, 6)
+                elif dayType == "weekends":
+                    daysIndex = [0, 6]
+                elif dayType == "allotherdays":
+                    daysIndex = [count for count in range(7) if weekDayValues[count] == None]
+                elif dayType in self.WEEKDAYS:
+                    daysIndex = [self.WEEKDAYS.index(dayType)]
+                else:
+                    # holidays, design days and custom days
+                    daysIndex = []
+                
+                for dayIndex in daysIndex:
+                    # first match wins
+                    if weekDayValues[dayIndex] == None:
+                        weekDayValues[dayIndex] = dayValues
+        
+        emptyDay = [0] * (24 * self.timestep)
+        for count in range(7):
+            if weekDayValues[count] == None: weekDayValues[count] = emptyDay
+        
+        return weekDayValues
+    
+    def compileWeek(self, schName):
+        """Return 7 day schedules from Sunday to Saturday."""
+        key = self.getCacheKey(schName, "week")
+        cache = sc.sticky["honeybee_ScheduleCache"]
+        if key in cache: return cache[key]
+        
+        values = self.getScheduleData(schName)
+        scheduleType = values[0].lower()
+        
+        if scheduleType == "schedule:week:daily":
+            weekValues = [self.compileDay(dayName) for dayName in values[1:8]]
+        elif scheduleType == "schedule:week:compact":
+            dayTypes = []
+            for count in range(1, len(values) - 1, 2):
+                dayTypes.append((values[count], self.compileDay(values[count + 1])))
+            weekValues = self.matchDayTypes(dayTypes, [None] * 7)
+        else:
+            raise ValueError("%s is not a supported week schedule."%schName)
+        
+        cache[key] = weekValues
+        return weekValues
+    
+    def weekToYear(self, weekValues, yearValues = None, startDay = 1, endDay = 365):
+        if yearValues == None: yearValues = [0] * (8760 * self.timestep)
+        dayLength = 24 * self.timestep
+        for day in range(startDay - 1, endDay):
+            dayOfWeek = (day + self.startDayOfTheWeek)%7
+            yearValues[day * dayLength: (day + 1) * dayLength] = weekValues[dayOfWeek]
+        return yearValues
+    
+    def compileYear(self, values):
+        # type, type limits, [week name, start month, start day, end month, end day]
+        yearValues = [0] * (8760 * self.timestep)
+        for count in range(2, len(values) - 4, 5):
+            weekValues = self.compileWeek(values[count])
+            startDay = self.getDayOfYear(values[count + 1], values[count + 2])
+            endDay = self.getDayOfYear(values[count + 3], values[count + 4])
+            self.weekToYear(weekValues, yearValues, startDay, endDay)
+        return yearValues
+    
+    def compileCompact(self, values):
+        # type, type limits, Through: mm/dd, For: days, Until: hh:mm, value, ...
+        yearValues = [0] * (8760 * self.timestep)
+        startDay = 1
+        dayTypes = []
+        untilValues = []
+        endDay = 365
+        
+        def closeDayType():
+            if len(dayTypes) != 0 and len(untilValues) != 0:
+                dayTypes[-1] = (dayTypes[-1][0], self.untilValuesToDay(untilValues))
+        
+        def closePeriod():
+            closeDayType()
+            if len(dayTypes) != 0:
+                weekValues = self.matchDayTypes(dayTypes, [None] * 7)
+                self.weekToYear(weekValues, yearValues, startDay, endDay)
+        
+        for value in values[2:]:
+            field = value.lower()
+            if field.startswith("through:"):
+                closePeriod()
+                if len(dayTypes) != 0: startDay = endDay + 1
+                month, day = value.split(":")[-1].strip().split("/")
+                endDay = self.getDayOfYear(month, day)
+                dayTypes = []
+                untilValues = []
+            elif field.startswith("for:"):
+                closeDayType()
+                dayTypes.append((value, None))
+                untilValues = []
+            elif field.startswith("interpolate:"):
+                continue
+            elif len(dayTypes) != 0:
+                untilValues.append(value)
+        
+        closePeriod()
+        return yearValues
+
+
 class ReadEPSchedules(object):
     
     def __init__(self, schName, startDayOfTheWeek):
@@ -4360,6 +6971,7 @@ class ReadEPSchedules(object):
         self.lb_preparation = sc.sticky["ladybug_Preparation"]()
         self.schName = schName
         self.startDayOfTheWeek = startDayOfTheWeek
+        self.compiler = hb_EPScheduleCompiler(startDayOfTheWeek, component = ghenv.Component)
         self.count = 0
         self.startHOY = 1
         self.endHOY = 24
@@ -4470,11 +7082,14 @@ class ReadEPSchedules(object):
         lowerLimit, upperLimit, numericType, unitType = \
                 self.getScheduleTypeLimitsData(typeLimitName)
         
-        hourlyValues = [float(values[2])]
+        # update last day of schedule
+        self.endHOY = 8760
+        
+        hourlyValues = list(self.compiler.compile(schName))
         
         if numericType.strip().lower() == "district":
             hourlyValues = map(int, hourlyValues)
-        return scheduleConstant
+        return hourlyValues
     
     
     def getCompactEPScheduleValues(self, schName):
@@ -4486,86 +7101,15 @@ class ReadEPSchedules(object):
         lowerLimit, upperLimit, numericType, unitType = \
                 self.getScheduleTypeLimitsData(typeLimitName)
         
-        #Separate out the different periods.
-        totalValues = []
-        periodValues = []
-        headerDone = False
-        for val in values:
-            newPeriod = False
-            for word in self.comapctKeywords:
-                if word in val: newPeriod = True
-            if newPeriod == True:
-                if headerDone == True:
-                    totalValues.append(periodValues)
-                periodValues = [val]
-                headerDone = True
-            elif headerDone == True:
-                periodValues.append(val)
-        totalValues.append(periodValues)
-        
-        #For each day period, construct a day schedule.
-        dayType = []
-        dayValues = []
-        for dayVals in totalValues:
-            dayType.append(dayVals[0].title().split('For: ')[-1])
-            numberOfDaySch = int((len(dayVals) - 1) /2)
-            
-            hourlyValues = range(24)
-            startHour = 0
-            for i in range(numberOfDaySch):
-                value = float(dayVals[2 * i + 2])
-                untilTime = map(int, dayVals[2 * i + 1].split(":")[1:])
-                endHour = int(untilTime[0] +  untilTime[1]/60)
-                for hour in range(startHour, endHour):
-                    hourlyValues[hour] = value
-                
-                startHour = endHour
-            dayValues.append(hourlyValues)
-        
-        #Construct a week schedule from the day schedules.
-        #Map the dayTypes to the days of the week.
-        ['Weekdays', 'Weekends', 'Alldays', 'AllOtherDays', 'Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
-        weekVals = [-1, -1, -1, -1, -1, -1, -1]
-        for typeCount, type in enumerate(dayType):
-            if type == 'Alldays':
-                for count, val in enumerate(weekVals):
-                    weekVals[count] = typeCount
-            elif type == 'Weekdays':
-                for count, val in enumerate(weekVals):
-                    if count < 6 and count != 0: weekVals[count] = typeCount
-            elif type == 'Weekends':
-                weekVals[0] = typeCount
-                weekVals[-1] = typeCount
-            elif type == 'Sunday': weekVals[0] = typeCount
-            elif type == 'Monday': weekVals[1] = typeCount
-            elif type == 'Tuesday': weekVals[2] = typeCount
-            elif type == 'Wednesday': weekVals[3] = typeCount
-            elif type == 'Thursday': weekVals[4] = typeCount
-            elif type == 'Friday': weekVals[5] = typeCount
-            elif type == 'Saturday': weekVals[6] = typeCount
-            elif type == 'Allotherdays':
-                for count, val in enumerate(weekVals):
-                    if val == -1: weekVals[count] = typeCount
-        
-        #Turn the week schedule into a year schedule.
-        hourlyValues = []
-        dayVals = []
-        dayofWeek = -1
-        for day in range(365):
-            if dayofWeek == 6: dayofWeek = 0
-            else: dayofWeek += 1
-            dayVals.append(weekVals[dayofWeek])
-        for day in dayVals:
-            hourlyValues.extend(dayValues[day])
-        
-        print hourlyValues
+        # update last day of schedule
+        self.endHOY = 8760
+        
+        hourlyValues = list(self.compiler.compile(schName))
+        
         return hourlyValues
     
     
     def getYearlyEPScheduleValues(self, schName = None):
-        # place holder for 365 days
-        hourlyValues = range(365)
-        
         # update last day of schedule
         self.endHOY = 8760
         
@@ -4573,24 +7117,28 @@ class ReadEPSchedules(object):
             schName = self.schName
         
         values, comments = self.hb_EPScheduleAUX.getScheduleDataByName(schName.upper(), ghenv.Component)
+        self.getScheduleTypeLimitsData(values[1])
         
-        # generate weekly schedules
-        numOfWeeklySchedules = int((len(values)-2)/5)
+        # the compiled schedule is cached so the weekly and daily schedules
+        # are only resolved once
+        yearValues = self.compiler.compile(schName)
+        
+        # a list of hourly values for each day of the year
+        hourlyValues = [yearValues[day * 24: (day + 1) * 24] for day in range(365)]
         
-        for i in range(numOfWeeklySchedules):
-            weekDayScheduleName = values[5 * i + 2]
-            
-            startDay = int(self.lb_preparation.getJD(int(values[5 * i + 3]), int(values[5 * i + 4])))
-            endDay = int(self.lb_preparation.getJD(int(values[5 * i + 5]), int(values[5 * i + 6])))
-            
-            # 7 list for 7 days of the week
-            hourlyValuesForTheWeek = self.getScheduleValues(weekDayScheduleName)
-            
-            for day in range(startDay-1, endDay):
-                hourlyValues[day] = hourlyValuesForTheWeek[day%7]
-            
         return hourlyValues
     
+    def getCompiledScheduleValues(self, schName = None, timestep = 1):
+        """Return a flat list of 8760 * timestep values for any supported schedule."""
+        if schName == None:
+            schName = self.schName
+        
+        if timestep == 1:
+            return list(self.compiler.compile(schName))
+        
+        compiler = hb_EPScheduleCompiler(self.startDayOfTheWeek, timestep, ghenv.Component)
+        return list(compiler.compile(schName))
+    
     
     def getScheduleValues(self, schName = None):
         if schName == None:
@@ -4604,20 +7152,21 @@ class ReadEPSchedules(object):
             
             self.count += 1
             
-            if scheduleType == "schedule:year":
-                hourlyValues = self.getYearlyEPScheduleValues(schName)
-            elif scheduleType == "schedule:day:interval":
-                hourlyValues = self.getDayEPScheduleValues(schName)
-            elif scheduleType == "schedule:week:daily":
-                hourlyValues = self.getWeeklyEPScheduleValues(schName)
-            elif scheduleType == "schedule:constant":
-                hourlyValues = self.getConstantEPScheduleValues(schName)
-            elif scheduleType == "schedule:compact":
-                hourlyValues = self.getCompactEPScheduleValues(schName)
-            else:
-                print "Honeybee doesn't support " + scheduleType + " currently." + \
-                      "Email us the type and we will try to add it to Honeybee."
-                      
+            try:
+                if scheduleType == "schedule:year":
+                    hourlyValues = self.getYearlyEPScheduleValues(schName)
+                elif scheduleType == "schedule:day:interval":
+                    hourlyValues = self.getDayEPScheduleValues(schName)
+                elif scheduleType == "schedule:week:daily":
+                    hourlyValues = self.getWeeklyEPScheduleValues(schName)
+                elif scheduleType == "schedule:constant":
+                    hourlyValues = self.getConstantEPScheduleValues(schName)
+                elif scheduleType == "schedule:compact":
+                    hourlyValues = self.getCompactEPScheduleValues(schName)
+                else:
+                    raise ValueError("Honeybee doesn't support " + scheduleType + " currently.")
+            except ValueError, e:
+                print str(e) + " Email us the type and we will try to add it to Honeybee."
                 hourlyValues = []
             
             return hourlyValues
@@ -6009,6 +8558,199 @@ class hb_reEvaluateHBZones(object):
                     
             return newSurfaces
 
+class hb_ZoneMultipliers(object):
+    """
+    Collapse identical HBZones into a single zone with an EnergyPlus multiplier
+    
+    Zones are fingerprinted by their program, schedules, loads, settings, HVAC system,
+    constructions and the coordinates of their surfaces relative to the lowest corner
+    of the zone. Coordinates are not rotated so two zones only match if they also have
+    the same orientation. The first zone of each group is written with the number of
+    zones in the group as its multiplier and the rest of the zones are removed. Interzone
+    surfaces of the written zones that are adjacent to a removed zone are set to adiabatic.
+    
+    Zones with air mixing, earth tubes, PV generators, interzone windows or a multiplier
+    other than 1 are always written as they are.
+    
+    The groups are saved to zoneMultipliers.json next to the idf file so the result readers
+    can expand the results of each written zone back to the zones that it represents.
+    
+    Usage:
+        zoneMultipliers = hb_ZoneMultipliers(HBZones)
+        HBZones = zoneMultipliers.collapse()
+        zoneMultipliers.writeMultipliersFile(workingDir)
+    """
+    
+    FILENAME = "zoneMultipliers.json"
+    VERSION = 1
+    
+    # zone attributes that don't change the energy model of the zone
+    IGNOREDATTRIBUTES = set(["name", "ID", "num", "objectType", "geometry", "origin", "cenPt",
+                             "surfaces", "multiplier", "isClosed", "hasNonPlanarSrf",
+                             "hasInternalEdge", "isThisTheTopZone", "isThisTheFirstZone"])
+    
+    def __init__(self, HBZones, tolerance = None):
+        self.HBZones = HBZones
+        if tolerance == None:
+            # zones are in meters after they are re-evaluated
+            tolerance = sc.doc.ModelAbsoluteTolerance * sc.sticky["honeybee_ConversionFactor"]
+        self.tolerance = tolerance
+        # name of the written zone: names of the removed zones that it represents
+        self.groups = collections.OrderedDict()
+    
+    def getValueKey(self, value, basePoint):
+        """Return a hashable key for a zone attribute or None if the attribute can't be compared."""
+        if value == None or isinstance(value, (str, unicode, bool, int, long, float)):
+            return value
+        elif isinstance(value, rc.Geometry.Point3d):
+            return self.getPointKey(value, basePoint)
+        elif isinstance(value, (list, tuple)):
+            return tuple(self.getValueKey(item, basePoint) for item in value)
+    
+    def getObjectKey(self, obj):
+        if obj == None: return None
+        return tuple(sorted((key, self.getValueKey(value, None)) for key, value in vars(obj).items() \
+                            if key not in ("ID", "geometry")))
+    
+    def getPointKey(self, pt, basePoint):
+        return (int(round((pt.X - basePoint.X) / self.tolerance)),
+                int(round((pt.Y - basePoint.Y) / self.tolerance)),
+                int(round((pt.Z - basePoint.Z) / self.tolerance)))
+    
+    @staticmethod
+    def getConstruction(surface):
+        if surface.EPConstruction != None: return surface.EPConstruction.upper()
+        return surface.construction.upper()
+    
+    def getSurfaceKey(self, surface, basePoint):
+        childSrfsKeys = []
+        if surface.hasChild:
+            for childSrf in surface.childSrfs:
+                childSrfsKeys.append((childSrf.type, self.getConstruction(childSrf),
+                                      tuple(childSrf.shadingControlName), childSrf.frameName,
+                                      childSrf.Multiplier, childSrf.groundViewFactor,
+                                      tuple(self.getPointKey(pt, basePoint) for pt in childSrf.coordinates)))
+        
+        return (int(surface.type), self.getConstruction(surface), surface.BC.upper(),
+                surface.sunExposure, surface.windExposure, surface.groundViewFactor,
+                tuple(self.getPointKey(pt, basePoint) for pt in surface.coordinates),
+                tuple(sorted(childSrfsKeys)))
+    
+    def getFingerprint(self, zone):
+        """Return a key which is the same for zones with the same energy model."""
+        points = [pt for surface in zone.surfaces for pt in surface.coordinates]
+        basePoint = rc.Geometry.Point3d(min(pt.X for pt in points),
+                                        min(pt.Y for pt in points),
+                                        min(pt.Z for pt in points))
+        
+        attributes = []
+        for key, value in sorted(vars(zone).items()):
+            if key in self.IGNOREDATTRIBUTES: continue
+            valueKey = self.getValueKey(value, basePoint)
+            if valueKey != None: attributes.append((key, valueKey))
+        
+        HVACSystem = zone.HVACSystem
+        HVACKey = (HVACSystem.GroupID, HVACSystem.Index, self.getObjectKey(HVACSystem.airDetails),
+                   self.getObjectKey(HVACSystem.heatingDetails), self.getObjectKey(HVACSystem.coolingDetails))
+        
+        schedules = zone.getCurrentSchedules(True)
+        loads = zone.getCurrentLoads(True)
+        
+        return (tuple(attributes), HVACKey, tuple(sorted(schedules.items())), tuple(sorted(loads.items())),
+                tuple(sorted(self.getSurfaceKey(surface, basePoint) for surface in zone.surfaces)))
+    
+    def isCollapsible(self, zone, mixingZones):
+        """Check if the zone can be represented by another zone or represent other zones."""
+        if zone.multiplier != 1 or zone.mixAir or zone.earthtube: return False
+        if zone.name.upper() in mixingZones: return False
+        
+        for surface in zone.surfaces:
+            if getattr(surface, "containsPVgen", False): return False
+            # windows can't be moved to an adiabatic surface
+            if surface.BC.upper() == 'SURFACE' and surface.hasChild: return False
+        
+        return True
+    
+    @staticmethod
+    def setAdiabatic(surface):
+        surface.BC = 'Adiabatic'
+        surface.setBCObjectToOutdoors()
+        surface.sunExposure = 'NoSun'
+        surface.windExposure = 'NoWind'
+    
+    def collapse(self):
+        """Group identical zones and return the zones that should be written to the model."""
+        mixingZones = set()
+        for zone in self.HBZones:
+            if zone.mixAir:
+                mixingZones.update(name.upper() for name in zone.mixAirZoneList)
+        
+        groups = collections.OrderedDict()
+        for zone in self.HBZones:
+            if self.isCollapsible(zone, mixingZones):
+                key = self.getFingerprint(zone)
+            else:
+                key = zone.ID
+            
+            if key not in groups: groups[key] = []
+            groups[key].append(zone)
+        
+        self.groups = collections.OrderedDict()
+        removedZones = set()
+        HBZones = []
+        for group in groups.values():
+            zone = group[0]
+            HBZones.append(zone)
+            if len(group) == 1: continue
+            
+            zone.multiplier = len(group)
+            self.groups[zone.name] = [removedZone.name for removedZone in group[1:]]
+            removedZones.update(self.groups[zone.name])
+        
+        # written zones shouldn't be adjacent to the zones that are removed
+        for zone in HBZones:
+            for surface in zone.surfaces:
+                if surface.BC.upper() == 'SURFACE' and surface.BCObject.parent.name in removedZones:
+                    self.setAdiabatic(surface)
+        
+        return HBZones
+    
+    def writeMultipliersFile(self, folder):
+        """Write the groups to the folder. An old file is removed if there are no groups."""
+        filePath = os.path.join(folder, self.FILENAME)
+        if len(self.groups) == 0:
+            if os.path.isfile(filePath): os.remove(filePath)
+            return None
+        
+        with open(filePath, "w") as outf:
+            json.dump({"version": self.VERSION,
+                       "zones": [[name, len(removedZones) + 1, removedZones] \
+                                 for name, removedZones in self.groups.items()]}, outf)
+        return filePath
+    
+    @classmethod
+    def readMultipliersFile(cls, folder):
+        """Return an OrderedDict of written zone name and the names of the removed zones."""
+        groups = collections.OrderedDict()
+        filePath = os.path.join(folder, cls.FILENAME)
+        if not os.path.isfile(filePath): return groups
+        
+        try:
+            with open(filePath, "r") as inf:
+                multipliers = json.load(inf)
+        except ValueError:
+            return groups
+        
+        if multipliers.get("version") != cls.VERSION: return groups
+        for name, multiplier, removedZones in multipliers["zones"]:
+            groups[str(name)] = [str(removedZone) for removedZone in removedZones]
+        return groups
+    
+    def __str__(self):
+        removedZonesCount = sum(len(removedZones) for removedZones in self.groups.values())
+        return "%d zones are represented by %d zones with a multiplier."%(
+            removedZonesCount + len(self.groups), len(self.groups))
+
 class hb_EPSurface(object):
     
     def __init__(self, surface, srfNumber, srfID, *arg):
@@ -8236,6 +10978,279 @@ class viewFactorInfo(object):
         return 'View Factor Info' + '\nNumber of Points: ' + str(self.NumPts)
 
 
+class hb_BoundingBoxIndex(object):
+    """
+    Uniform grid index for axis aligned bounding boxes
+    
+    Each box is added to all the grid cells that it overlaps and a query only checks the
+    boxes in the cells of the input box. Boxes that cover too many cells (e.g. a large
+    ground surface) are kept in a separate list and are checked for every query.
+    It is used to find candidate pairs between a large number of objects without testing
+    every object against all the others.
+    
+    Args:
+        boxes: List of (minPoint, maxPoint) tuples. Points are (x, y, z) tuples.
+        tolerance: Boxes will be inflated by tolerance before indexing.
+        cellSize: Size of the grid cells. Default is the average of the largest
+            dimension of the boxes.
+    
+    Usage:
+        index = hb_BoundingBoxIndex(boxes, tol)
+        for boxIndex in index.query(boxes[0]): ...
+    """
+    
+    MAXCELLS = 512
+    
+    def __init__(self, boxes, tolerance = 0, cellSize = None):
+        self.tolerance = tolerance
+        self.boxes = [self.inflate(box, tolerance) for box in boxes]
+        
+        if not cellSize:
+            sizes = [max(maxPt[i] - minPt[i] for i in range(3)) for minPt, maxPt in self.boxes]
+            cellSize = sum(sizes) / len(sizes) if sizes else 1
+        self.cellSize = max(cellSize, 2 * tolerance, 1e-6)
+        
+        self.cells = {}
+        self.largeBoxes = []
+        for boxIndex, box in enumerate(self.boxes):
+            cellKeys = self.getCellKeys(box)
+            if cellKeys == None:
+                self.largeBoxes.append(boxIndex)
+                continue
+            for key in cellKeys:
+                try: self.cells[key].append(boxIndex)
+                except KeyError: self.cells[key] = [boxIndex]
+    
+    @staticmethod
+    def inflate(box, tolerance):
+        minPt, maxPt = box
+        return tuple(v - tolerance for v in minPt), tuple(v + tolerance for v in maxPt)
+    
+    @staticmethod
+    def isOverlapping(box1, box2):
+        (min1, max1), (min2, max2) = box1, box2
+        return min1[0] <= max2[0] and min2[0] <= max1[0] and \
+               min1[1] <= max2[1] and min2[1] <= max1[1] and \
+               min1[2] <= max2[2] and min2[2] <= max1[2]
+    
+    def getCellKeys(self, box):
+        """Return the keys of the cells for a box or None if the box is larger than MAXCELLS."""
+        minPt, maxPt = box
+        ranges = [range(int(math.floor(minPt[i] / self.cellSize)), \
+                        int(math.floor(maxPt[i] / self.cellSize)) + 1) for i in range(3)]
+        
+        if len(ranges[0]) * len(ranges[1]) * len(ranges[2]) > self.MAXCELLS:
+            return None
+        
+        return itertools.product(*ranges)
+    
+    def query(self, box):
+        """Return sorted indices of the indexed boxes that overlap the input box."""
+        candidates = set(self.largeBoxes)
+        cellKeys = self.getCellKeys(box)
+        if cellKeys == None:
+            # input box is larger than most of the boxes. Check them all
+            candidates = range(len(self.boxes))
+        else:
+            for key in cellKeys:
+                candidates.update(self.cells.get(key, ()))
+        
+        return sorted(boxIndex for boxIndex in candidates \
+                      if self.isOverlapping(box, self.boxes[boxIndex]))
+
+class hb_MeshRayCaster(object):
+    """
+    Triangle BVH ray caster for a list of meshes
+    
+    Meshes are triangulated and indexed in a bounding volume hierarchy once, and then
+    each ray is only tested against the triangles in the boxes that it passes through.
+    The caster only uses plain Python types so it doesn't need RhinoCommon and the same
+    instance can be used from multiple threads.
+    
+    Triangles are two-sided and a hit is only counted in front of the ray origin.
+    If a ray hits two meshes at the same distance the mesh with the lower index is returned.
+    
+    Args:
+        meshes: A list of meshes. Each mesh is a (vertices, faces) tuple. Vertices are
+            (x, y, z) tuples and faces are tuples of 3 or 4 vertex indices.
+            Use meshToData to convert a Rhino mesh.
+    
+    Usage:
+        rayCaster = hb_MeshRayCaster([hb_MeshRayCaster.meshToData(mesh) for mesh in meshes])
+        directions = hb_MeshRayCaster.prepareDirections(vectors)
+        # index of the nearest mesh for each direction from each point. -1 if nothing is hit.
+        hits = rayCaster.castRays(points, directions)
+    """
+    
+    LEAFSIZE = 4
+    EPSILON = 1e-9
+    
+    def __init__(self, meshes):
+        self.meshCount = len(meshes)
+        triangles = []
+        for meshIndex, (vertices, faces) in enumerate(meshes):
+            for face in faces:
+                triangles.append((vertices[face[0]], vertices[face[1]], vertices[face[2]], meshIndex))
+                if len(face) == 4 and face[3] != face[2]:
+                    triangles.append((vertices[face[0]], vertices[face[2]], vertices[face[3]], meshIndex))
+        
+        self.triangles = []
+        self.meshIndices = []
+        self.nodes = []
+        if triangles: self.buildTree(triangles)
+    
+    @staticmethod
+    def meshToData(mesh):
+        """Convert a Rhino mesh to (vertices, faces)."""
+        vertices = [(v.X, v.Y, v.Z) for v in mesh.Vertices]
+        faces = []
+        for face in mesh.Faces:
+            if face.IsQuad: faces.append((face.A, face.B, face.C, face.D))
+            else: faces.append((face.A, face.B, face.C))
+        return vertices, faces
+    
+    @staticmethod
+    def prepareDirections(directions):
+        """Return direction and inverse of direction for each ray direction.
+        
+        Inverse values are calculated once for all the points that use the same directions.
+        Zero values are replaced with a large number to avoid invalid values in box tests.
+        """
+        prepared = []
+        for direction in directions:
+            try: dx, dy, dz = direction.X, direction.Y, direction.Z
+            except AttributeError: dx, dy, dz = direction
+            prepared.append((dx, dy, dz, \
+                             1.0 / dx if dx != 0 else 1e30, \
+                             1.0 / dy if dy != 0 else 1e30, \
+                             1.0 / dz if dz != 0 else 1e30))
+        return prepared
+    
+    def buildTree(self, triangles):
+        # bounding box and centroid of each triangle
+        items = []
+        for triangle in triangles:
+            xs, ys, zs = zip(*triangle[:3])
+            box = (min(xs), min(ys), min(zs), max(xs), max(ys), max(zs))
+            centroid = (sum(xs) / 3.0, sum(ys) / 3.0, sum(zs) / 3.0)
+            items.append((box, centroid, triangle))
+        
+        # nodes are (minX, minY, minZ, maxX, maxY, maxZ, left, right, start, count)
+        # count is 0 for inner nodes
+        self.nodes = [None]
+        stack = [(0, items)]
+        while stack:
+            nodeIndex, nodeItems = stack.pop()
+            box = (min(item[0][0] for item in nodeItems), min(item[0][1] for item in nodeItems),
+                   min(item[0][2] for item in nodeItems), max(item[0][3] for item in nodeItems),
+                   max(item[0][4] for item in nodeItems), max(item[0][5] for item in nodeItems))
+            
+            if len(nodeItems) <= self.LEAFSIZE:
+                self.nodes[nodeIndex] = box + (0, 0, len(self.triangles), len(nodeItems))
+                for item in nodeItems:
+                    (v0, v1, v2, meshIndex) = item[2]
+                    self.triangles.append((v0[0], v0[1], v0[2],
+                                           v1[0] - v0[0], v1[1] - v0[1], v1[2] - v0[2],
+                                           v2[0] - v0[0], v2[1] - v0[1], v2[2] - v0[2]))
+                    self.meshIndices.append(meshIndex)
+                continue
+            
+            # split in the middle of the longest axis of centroids
+            axis = max(range(3), key = lambda i: max(item[1][i] for item in nodeItems) - \
+                                                 min(item[1][i] for item in nodeItems))
+            nodeItems.sort(key = lambda item: item[1][axis])
+            middle = len(nodeItems) // 2
+            
+            left, right = len(self.nodes), len(self.nodes) + 1
+            self.nodes.extend((None, None))
+            self.nodes[nodeIndex] = box + (left, right, 0, 0)
+            stack.append((left, nodeItems[:middle]))
+            stack.append((right, nodeItems[middle:]))
+    
+    def traverse(self, ox, oy, oz, direction, findAll = False, anyHit = False):
+        """Return (meshIndex, t) for the nearest hit, or a set of all the mesh indices if findAll is True."""
+        dx, dy, dz, ix, iy, iz = direction
+        nodes, triangles, meshIndices = self.nodes, self.triangles, self.meshIndices
+        eps = self.EPSILON
+        
+        bestT = float("inf")
+        bestMesh = -1
+        hitMeshes = set()
+        
+        stack = [0] if nodes else []
+        while stack:
+            minX, minY, minZ, maxX, maxY, maxZ, left, right, start, count = nodes[stack.pop()]
+            
+            # slab test
+            t1 = (minX - ox) * ix; t2 = (maxX - ox) * ix
+            if t1 > t2: t1, t2 = t2, t1
+            t3 = (minY - oy) * iy; t4 = (maxY - oy) * iy
+            if t3 > t4: t3, t4 = t4, t3
+            if t3 > t1: t1 = t3
+            if t4 < t2: t2 = t4
+            t3 = (minZ - oz) * iz; t4 = (maxZ - oz) * iz
+            if t3 > t4: t3, t4 = t4, t3
+            if t3 > t1: t1 = t3
+            if t4 < t2: t2 = t4
+            if t2 < 0 or t1 > t2 or t1 > bestT: continue
+            
+            if not count:
+                stack.append(left)
+                stack.append(right)
+                continue
+            
+            for triangleIndex in xrange(start, start + count):
+                v0x, v0y, v0z, e1x, e1y, e1z, e2x, e2y, e2z = triangles[triangleIndex]
+                # Moller-Trumbore
+                px = dy * e2z - dz * e2y; py = dz * e2x - dx * e2z; pz = dx * e2y - dy * e2x
+                det = e1x * px + e1y * py + e1z * pz
+                if -eps < det < eps: continue
+                invDet = 1.0 / det
+                tx = ox - v0x; ty = oy - v0y; tz = oz - v0z
+                u = (tx * px + ty * py + tz * pz) * invDet
+                if u < 0 or u > 1: continue
+                qx = ty * e1z - tz * e1y; qy = tz * e1x - tx * e1z; qz = tx * e1y - ty * e1x
+                v = (dx * qx + dy * qy + dz * qz) * invDet
+                if v < 0 or u + v > 1: continue
+                t = (e2x * qx + e2y * qy + e2z * qz) * invDet
+                if t <= eps: continue
+                
+                meshIndex = meshIndices[triangleIndex]
+                if findAll:
+                    hitMeshes.add(meshIndex)
+                elif t < bestT or (t == bestT and meshIndex < bestMesh):
+                    bestT, bestMesh = t, meshIndex
+                    if anyHit: return bestMesh, bestT
+        
+        if findAll: return hitMeshes
+        return bestMesh, bestT
+    
+    def intersect(self, origin, direction):
+        """Return index of the nearest mesh and the ray parameter. Index is -1 if nothing is hit."""
+        return self.traverse(origin[0], origin[1], origin[2], self.prepareDirections([direction])[0])
+    
+    def castRays(self, origins, directions):
+        """Return index of the nearest mesh for each direction from each origin.
+        
+        Args:
+            origins: A list of points as (x, y, z) tuples or Rhino points.
+            directions: Output of prepareDirections.
+        """
+        results = []
+        for origin in origins:
+            try: ox, oy, oz = origin.X, origin.Y, origin.Z
+            except AttributeError: ox, oy, oz = origin
+            results.append([self.traverse(ox, oy, oz, direction)[0] for direction in directions])
+        return results
+    
+    def isBlocked(self, origin, direction):
+        """Check if a ray with a prepared direction hits any of the meshes."""
+        return self.traverse(origin[0], origin[1], origin[2], direction, anyHit = True)[0] != -1
+    
+    def getHitMeshes(self, origin, direction):
+        """Return sorted indices of all the meshes that a ray with a prepared direction hits."""
+        return sorted(self.traverse(origin[0], origin[1], origin[2], direction, findAll = True))
+
 class hb_Hive(object):
     
     class CopyClass(object):
@@ -8261,6 +11276,236 @@ class hb_Hive(object):
         elif bb1.Max.DistanceTo(bb2.Max) > 5 * sc.doc.ModelAbsoluteTolerance:
             raise Exception(msg)
     
+    # number of Honeybee surfaces (including zones and child surfaces) in the
+    # hive of a Grasshopper document that will add a warning to the components
+    MAXSURFACESPERDOCUMENT = 250000
+    # maximum number of joined display geometries that are kept for reuse
+    MAXDISPLAYGEOMETRIES = 2000
+    
+    @staticmethod
+    def getHiveIndex():
+        """Return the index of the hive.
+        
+        The index has a dictionary for each component generation (document id
+        and component id) with last use, number of surfaces and name and type
+        indices for the objects of that generation.
+        """
+        if not sc.sticky.has_key('HBHive'):
+            sc.sticky['HBHive'] = {}
+        if not sc.sticky.has_key('HBHiveIndex'):
+            sc.sticky['HBHiveIndex'] = {}
+            sc.sticky['HBHiveClock'] = 0
+        
+        # generations that are added by older versions of the hive
+        index = sc.sticky['HBHiveIndex']
+        for baseKey in sc.sticky['HBHive'].keys():
+            if baseKey not in index:
+                hb_Hive.indexGeneration(baseKey)
+                for HBObject in sc.sticky['HBHive'][baseKey].values():
+                    hb_Hive.indexObject(baseKey, HBObject)
+        return index
+    
+    @staticmethod
+    def indexGeneration(baseKey):
+        docId, _, componentId = baseKey.partition('_')
+        sc.sticky['HBHiveIndex'][baseKey] = {'docId': docId, 'componentId': componentId,
+                                              'lastUsed': 0, 'size': 0,
+                                              'names': {}, 'types': {}}
+        hb_Hive.touch(baseKey)
+    
+    @staticmethod
+    def addGeneration(baseKey):
+        """Add an empty generation to the hive and the index. Current objects will be removed."""
+        sc.sticky['HBHive'][baseKey] = {}
+        hb_Hive.indexGeneration(baseKey)
+    
+    @staticmethod
+    def touch(baseKey):
+        """Mark the generation as the most recently used one."""
+        index = sc.sticky.get('HBHiveIndex', {})
+        if baseKey not in index: return
+        sc.sticky['HBHiveClock'] += 1
+        index[baseKey]['lastUsed'] = sc.sticky['HBHiveClock']
+    
+    @staticmethod
+    def countSurfaces(HBObject):
+        try:
+            if HBObject.objectType == "HBZone":
+                return 1 + sum(1 + len(srf.childSrfs) for srf in HBObject.surfaces)
+            return 1 + len(HBObject.childSrfs)
+        except AttributeError:
+            return 1
+    
+    @staticmethod
+    def indexObject(baseKey, HBObject):
+        info = sc.sticky['HBHiveIndex'][baseKey]
+        info['size'] += hb_Hive.countSurfaces(HBObject)
+        try:
+            info['names'].setdefault(HBObject.name.upper(), []).append(HBObject.ID)
+        except AttributeError:
+            pass
+        info['types'].setdefault(getattr(HBObject, 'objectType', None), []).append(HBObject.ID)
+    
+    @staticmethod
+    def removeGeneration(baseKey):
+        if baseKey in sc.sticky['HBHive']:
+            del(sc.sticky['HBHive'][baseKey])
+        if baseKey in sc.sticky['HBHiveIndex']:
+            del(sc.sticky['HBHiveIndex'][baseKey])
+    
+    @staticmethod
+    def cleanHoneybeeHive(currentKey = None):
+        """Remove stale generations from the hive.
+        
+        Generations of closed documents and deleted components are removed.
+        Generations of the components in the open documents are never removed
+        since their outputs can still be connected to other components.
+        
+        Returns:
+            Number of removed generations.
+        """
+        index = hb_Hive.getHiveIndex()
+        removed = []
+        
+        try:
+            openDocuments = dict((str(doc.DocumentID), doc) \
+                                 for doc in Grasshopper.Instances.DocumentServer)
+        except Exception:
+            # document server is not available
+            return 0
+        
+        for baseKey, info in index.items():
+            if baseKey == currentKey: continue
+            doc = openDocuments.get(info['docId'])
+            try:
+                if doc == None or doc.FindObject(System.Guid(info['componentId']), True) == None:
+                    removed.append(baseKey)
+            except Exception:
+                # the generation is not created by a component
+                pass
+        
+        for baseKey in removed: hb_Hive.removeGeneration(baseKey)
+        
+        return len(removed)
+    
+    @staticmethod
+    def getHiveSize(docId = None):
+        """Return number of stored generations and surfaces for a document or for the whole hive."""
+        infos = [info for info in hb_Hive.getHiveIndex().itervalues() \
+                 if docId == None or info['docId'] == str(docId)]
+        return len(infos), sum(info['size'] for info in infos)
+    
+    @staticmethod
+    def findInHoneybeeHive(names = None, objectTypes = None, docId = None):
+        """Find Honeybee objects in the hive by name and/or object type.
+        
+        Returns:
+            A list of the original objects. Use callFromHoneybeeHive to get copies
+            that can be modified.
+        """
+        if names != None: names = [name.upper() for name in names]
+        HBObjects = []
+        for baseKey, info in hb_Hive.getHiveIndex().iteritems():
+            if docId != None and info['docId'] != str(docId): continue
+            
+            ids = None
+            if names != None:
+                ids = set(id for name in names for id in info['names'].get(name, []))
+            if objectTypes != None:
+                typeIds = set(id for objectType in objectTypes for id in info['types'].get(objectType, []))
+                ids = typeIds if ids == None else ids & typeIds
+            if ids == None:
+                ids = sc.sticky['HBHive'][baseKey].keys()
+            
+            HBObjects.extend(sc.sticky['HBHive'][baseKey][id] for id in ids)
+        return HBObjects
+    
+    @staticmethod
+    def getDisplayKey(HBObject):
+        """A key for geometries that should be joined for display.
+        
+        The key has the vertices and the mid point of the edges (see
+        hb_RADExportCache.getGeometryKey) and the normal of the faces of the
+        surfaces and their child surfaces so a flipped surface or a different
+        shape or opening won't reuse the joined geometry of another object.
+        """
+        def geometryKey(brep):
+            normals = []
+            for face in brep.Faces:
+                normal = face.NormalAt(face.Domain(0).Mid, face.Domain(1).Mid)
+                if face.OrientationIsReversed: normal.Reverse()
+                normals.extend((normal.X, normal.Y, normal.Z))
+            return hb_RADExportCache.getGeometryKey(brep) + array.array("d", normals).tostring()
+        
+        def srfKey(HBSrf):
+            return geometryKey(HBSrf.geometry), tuple(geometryKey(child.geometry) for child in HBSrf.childSrfs)
+        
+        if HBObject.objectType == "HBZone":
+            return tuple(srfKey(HBSrf) for HBSrf in HBObject.surfaces)
+        return srfKey(HBObject)
+    
+    @staticmethod
+    def joinDisplayGeometry(HBObject):
+        if HBObject.objectType == "HBZone":
+            HBSurfaces = HBObject.surfaces
+        else:
+            HBSurfaces = [HBObject]
+        
+        srfs = []
+        for HBSrf in HBSurfaces:
+            if HBSrf.hasChild:
+                # punched geometry is only calculated when it is needed
+                if HBSrf.punchedGeometry == None:
+                    HBSrf.calculatePunchedSurface()
+                srfs.append(HBSrf.punchedGeometry)
+                for childObject in HBSrf.childSrfs:
+                    srfs.append(childObject.geometry)
+            else:
+                srfs.append(HBSrf.geometry)
+        # join geometries into a single brep
+        return rc.Geometry.Brep.JoinBreps(srfs, sc.doc.ModelAbsoluteTolerance)[0]
+    
+    @staticmethod
+    def getDisplayGeometry(HBObject):
+        """Return the geometry that represents the HBObject in Grasshopper.
+        
+        Zones and surfaces with openings are displayed as joined punched surfaces
+        and openings. Grasshopper outputs need the geometry once the object is
+        added to the hive so the joined geometry is built then, and it is reused
+        for objects with the same surfaces.
+        """
+        if HBObject.objectType == "HBZone":
+            hasChild = any(HBSrf.hasChild for HBSrf in HBObject.surfaces)
+        else:
+            hasChild = HBObject.hasChild
+        
+        # if there is no child object use the geometry as it is
+        if not hasChild: return HBObject.geometry
+        
+        if not sc.sticky.has_key('HBHiveDisplayGeometries'):
+            sc.sticky['HBHiveDisplayGeometries'] = collections.OrderedDict()
+        displayGeometries = sc.sticky['HBHiveDisplayGeometries']
+        
+        key = hb_Hive.getDisplayKey(HBObject)
+        if key in displayGeometries:
+            geometry = displayGeometries.pop(key)
+        else:
+            geometry = hb_Hive.joinDisplayGeometry(HBObject)
+            if len(displayGeometries) >= hb_Hive.MAXDISPLAYGEOMETRIES:
+                displayGeometries.popitem(last = False)
+        displayGeometries[key] = geometry
+        
+        # each object needs its own copy for the HBID
+        return geometry.DuplicateBrep()
+    
+    @staticmethod
+    def parseHBID(hbkey):
+        """Split a Honeybee id to generation key and object id."""
+        if '#' not in hbkey:
+            raise Exception('Honeybee version mismatch! Update the input component.')
+        baseKey, _, key = hbkey.partition('#')
+        return baseKey, key
+    
     @staticmethod
     def addToHoneybeeHive(HBObjects, Component, removeCurrent=True):
         """Add honeybee objects to memory so they can be passed between the components.
@@ -8268,8 +11513,7 @@ class hb_Hive(object):
         removeCurrent: Set false if the same component generates honeybee objects
             multiple times in the same component, except for the first time.
         """
-        if not sc.sticky.has_key('HBHive'):
-            sc.sticky['HBHive'] = {}
+        hb_Hive.getHiveIndex()
         
         try:
             # get document ID
@@ -8285,9 +11529,19 @@ class hb_Hive(object):
         
         # clean the dictionary if it's the first run
         if removeCurrent and Component.RunCount == 1:
-            if baseKey in sc.sticky['HBHive']:
-                del(sc.sticky['HBHive'][baseKey])
-            sc.sticky['HBHive'][baseKey] = {}
+            hb_Hive.removeGeneration(baseKey)
+            hb_Hive.addGeneration(baseKey)
+            hb_Hive.cleanHoneybeeHive(baseKey)
+            generationsCount, surfacesCount = hb_Hive.getHiveSize(docId)
+            if surfacesCount > hb_Hive.MAXSURFACESPERDOCUMENT:
+                warning = "Honeybee hive has %d surfaces from %d components in this document.\n"%(surfacesCount, generationsCount) + \
+                          "Memory use can be reduced by disabling or removing the components that are not needed."
+                print warning
+                Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
+        elif baseKey not in sc.sticky['HBHive']:
+            hb_Hive.addGeneration(baseKey)
+        else:
+            hb_Hive.touch(baseKey)
     
         # create an empty dictionary for this component
         outGeometry = []
@@ -8297,38 +11551,10 @@ class hb_Hive(object):
             
             key = '{}'.format(HBObject.ID)
             sc.sticky['HBHive'][baseKey][key] = HBObject
+            hb_Hive.indexObject(baseKey, HBObject)
             
-            # calculate punched geometry if HBobject has a child surface
             try:
-                if HBObject.objectType != "HBZone" and HBObject.hasChild:
-                    # Honeybee surface with openings
-                    if HBObject.punchedGeometry == None:
-                        HBObject.calculatePunchedSurface()
-                    
-                    geometries = [childObject.geometry for childObject in HBObject.childSrfs]
-                    geometries.append(HBObject.punchedGeometry)
-                    # join geometries into a single surface
-                    geometry = rc.Geometry.Brep.JoinBreps(geometries, sc.doc.ModelAbsoluteTolerance)[0]
-                
-                elif HBObject.objectType == "HBZone":
-                    srfs = []
-                    zoneHasChildSrf = False
-                    for HBSrf in HBObject.surfaces:
-                        if HBSrf.hasChild:
-                            zoneHasChildSrf = True
-                            srfs.append(HBSrf.punchedGeometry)
-                            for childObject in HBSrf.childSrfs:
-                                srfs.append(childObject.geometry)
-                        else:
-                            srfs.append(HBSrf.geometry)
-                            
-                    if zoneHasChildSrf:
-                        geometry = rc.Geometry.Brep.JoinBreps(srfs, sc.doc.ModelAbsoluteTolerance)[0]
-                    else:
-                        geometry = HBObject.geometry
-                else:
-                    # if there is not child object use the geometry as it is
-                    geometry = HBObject.geometry
+                geometry = hb_Hive.getDisplayGeometry(HBObject)
                 
                 # assign the key to surface
                 geometry.UserDictionary.Set('HBID', '{}#{}'.format(baseKey, key))
@@ -8340,11 +11566,13 @@ class hb_Hive(object):
         return outGeometry
     
     def addNonGeoObjToHive(self, HBObject, Component):
+        hb_Hive.getHiveIndex()
         docId = Component.OnPingDocument().DocumentID
         baseKey = '{}_{}'.format(docId, Component.InstanceGuid)
-        sc.sticky['HBHive'][baseKey] = {}
+        hb_Hive.addGeneration(baseKey)
         key = '{}'.format(HBObject.ID)
         sc.sticky['HBHive'][baseKey][key] = HBObject
+        hb_Hive.indexObject(baseKey, HBObject)
         HBID = '{}#{}'.format(baseKey, key)
         return 'Honeybee View Factor Info - ' + HBID
     
@@ -8356,12 +11584,10 @@ class hb_Hive(object):
             except:
                 hbkey = geometry.split(' ')[-1]
             
-            if '#' not in hbkey:
-                raise Exception('Honeybee version mismatch! Update the input component.')
-                
-            baseKey, key = hbkey.split('#')[0], '#'.join(hbkey.split('#')[1:])
+            baseKey, key = self.parseHBID(hbkey)
             
             if sc.sticky['HBHive'].has_key(baseKey):
+                self.touch(baseKey)
                 HBObject = sc.sticky['HBHive'][baseKey][key]
                 
                 # make sure Honeybee object is not moved or rotated
@@ -8445,12 +11671,10 @@ class hb_Hive(object):
             except:
                 hbkey = geometry.split(' ')[-1]
             
-            if '#' not in hbkey:
-                raise Exception('Honeybee version mismatch! Update the input component.')
-                
-            baseKey, key = hbkey.split('#')[0], '#'.join(hbkey.split('#')[1:])
+            baseKey, key = self.parseHBID(hbkey)
             
             if sc.sticky['HBHive'].has_key(baseKey):
+                self.touch(baseKey)
                 HBObjects.append(sc.sticky['HBHive'][baseKey][key])
             else:
                 raise Exception('HoneybeeKeyMismatch: Failed to call the object from Honeybee hive.')
@@ -8536,51 +11760,95 @@ class CalculateGridBasedDLAnalysisResults(object):
     """
     calculate results of any grid based analysis
     analysisType: [0] illuminance, [1] radiation, [2] luminance, [3] daylight factor, [4] vertical sky component
+    
+    Each result file is read in a single pass and the values are converted for all the
+    points at once. Result files (one for each cpu) are read in parallel.
     """
     def __init__(self, resultFiles, analysisType):
         self.analysisType = analysisType
         self.resultFiles = resultFiles
         
-    def getResults(self):
-        resultValues = []
+    def getResults(self, parallel = True):
         studyType= self.analysisType
-        for fileCount, resultFile in enumerate(self.resultFiles):
-            if studyType == 0 or studyType == 2:
-                #illuminance / luminance
-                resultValues.extend(self.readDLResult(resultFile))
-            elif studyType == 1:
-                # radiation
-                resultValues.extend(self.readRadiationResult(resultFile))
-            elif studyType == 3 or studyType == 4:
-                resultValues.extend(self.readDFResult(resultFile))
+        if studyType == 0 or studyType == 2:
+            #illuminance / luminance
+            readResult = self.readDLResult
+        elif studyType == 1:
+            # radiation
+            readResult = self.readRadiationResult
+        elif studyType == 3 or studyType == 4:
+            readResult = self.readDFResult
+        else:
+            return []
+        
+        results = self.readResultFiles(self.resultFiles, readResult, parallel)
+        
+        resultValues = []
+        for result in results:
+            resultValues.extend(result)
         
         return resultValues
     
+    @staticmethod
+    def readResultFiles(resultFiles, readResult, parallel = True):
+        """Read a list of result files with readResult and return the results in the same order."""
+        results = [None] * len(resultFiles)
+        errors = []
+        
+        def readFile(fileCount):
+            try:
+                results[fileCount] = readResult(resultFiles[fileCount])
+            except Exception, e:
+                errors.append(e)
+        
+        if parallel and len(resultFiles) > 1:
+            threads = [threading.Thread(target = readFile, args = (fileCount,)) for fileCount in range(len(resultFiles))]
+            for thread in threads: thread.start()
+            for thread in threads: thread.join()
+        else:
+            for fileCount in range(len(resultFiles)): readFile(fileCount)
+        
+        if len(errors) != 0: raise errors[0]
+        return results
+    
+    @staticmethod
+    def readColumns(resultFile, columnsCount = 3):
+        """Read a Radiance result file in a single pass and return the values as a list for each column.
+        
+        Only the first columnsCount columns will be converted to float.
+        """
+        with open(resultFile, "r") as inf:
+            firstLine = inf.readline()
+            valuesInLine = len(firstLine.split())
+            values = (firstLine + inf.read()).split()
+        
+        if valuesInLine == 0: return []
+        if len(values) % valuesInLine != 0:
+            raise ValueError("Number of values in each line of %s is not the same."%resultFile)
+        
+        return [map(float, values[columnCount::valuesInLine]) for columnCount in range(min(columnsCount, valuesInLine))]
+    
+    @staticmethod
+    def RGBToIlluminance(R, G, B):
+        """Convert lists of R, G and B values to illuminance/luminance using the luminous efficacy of 179."""
+        return array.array("d", [179*(.265 * r + .67 * g + .065 * b) for r, g, b in itertools.izip(R, G, B)])
+    
     def readRadiationResult(self, resultFile):
-        result = []
-        resultFile = open(resultFile,"r")
-        for line in resultFile:
-            result.append(float(line.split('	')[0]))
-        return result
+        columns = self.readColumns(resultFile, 1)
+        if len(columns) == 0: return array.array("d")
+        return array.array("d", columns[0])
     
     def readDLResult(self, resultFile):
-        result = []
-        resultFile = open(resultFile,"r")
-        for line in resultFile:
-            R, G, B = line.split('	')[0:3]
-            result.append(179*(.265 * float(R) + .67 * float(G) + .065 * float(B)))
-        return result
+        columns = self.readColumns(resultFile)
+        if len(columns) == 0: return array.array("d")
+        return self.RGBToIlluminance(*columns[0:3])
     
     def readDFResult(self, resultFile):
-        result = []
-        resultFile = open(resultFile,"r")
-        for line in resultFile:
-            R, G, B = line.split('	')[0:3]
-            # divide by the sky horizontal illuminance = 1000
-            res = 17900*(.265 * float(R) + .67 * float(G) + .065 * float(B))/1000
-            if res > 100: res = 100
-            result.append(res)
-        return result
+        columns = self.readColumns(resultFile)
+        if len(columns) == 0: return array.array("d")
+        R, G, B = columns[0:3]
+        # divide by the sky horizontal illuminance = 1000
+        return array.array("d", [min(17900*(.265 * r + .67 * g + .065 * b)/1000, 100) for r, g, b in itertools.izip(R, G, B)])
 
 class SerializeObjects(object):
     
@@ -8598,6 +11866,264 @@ class SerializeObjects(object):
 
 
 
+class hb_HBObjectsFile(object):
+    """
+    Read and write dumped Honeybee objects
+    
+    The dump component collects Honeybee objects as dictionaries where every
+    reference to another object is replaced by its ID. This class writes those
+    dictionaries as separate records so they can be loaded partially. Planar
+    Brep geometries are stored as packed float64 vertex loops and are rebuilt on
+    load; other geometries are pickled with the rest of the object. Files that
+    are written with cPickle by older versions of Honeybee are still supported.
+    
+    File structure:
+        MAGIC, version, index offset,
+        records (pickled dictionary followed by float64 geometry values),
+        json index (root ids, byteorder and one entry per record)
+    
+    Each index entry is:
+        [id, objectType, name, offset, pickle length, number of geometry values,
+        dependent ids, adjacent ids, elevation]
+    """
+    
+    MAGIC = "HBOBJDMP"
+    VERSION = 1
+    # object types that are written by the dump component for EnergyPlus and Radiance libraries
+    LIBRARYTYPES = ("HBConstr", "HBMat", "HBsched", "HBShdCntrl", "HBRadMat")
+    
+    def __init__(self, filePath):
+        self.filePath = filePath
+        self.tolerance = sc.doc.ModelAbsoluteTolerance
+    
+    @classmethod
+    def isBinary(cls, filePath):
+        """Check if the file is written in the indexed binary format."""
+        try:
+            with open(filePath, "rb") as inf:
+                return inf.read(len(cls.MAGIC)) == cls.MAGIC
+        except Exception:
+            return False
+    
+    def packBrep(self, brep, values):
+        """Add brep faces to values as planar vertex loops.
+        
+        Returns False if brep has a non-planar face or a curved edge.
+        """
+        if not isinstance(brep, rc.Geometry.Brep): return False
+        packed = array.array("d", [brep.Faces.Count])
+        for face in brep.Faces:
+            if not face.IsPlanar(self.tolerance): return False
+            normal = face.NormalAt(face.Domain(0).Mid, face.Domain(1).Mid)
+            loops = [face.OuterLoop] + [loop for loop in face.Loops \
+                if loop.LoopType == rc.Geometry.BrepLoopType.Inner]
+            packed.extend((normal.X, normal.Y, normal.Z, len(loops)))
+            for loop in loops:
+                success, polyline = loop.To3dCurve().TryGetPolyline()
+                if not success: return False
+                pts = list(polyline)
+                if polyline.IsClosed: pts = pts[:-1]
+                packed.append(len(pts))
+                for pt in pts:
+                    packed.extend((pt.X, pt.Y, pt.Z))
+        values.extend(packed)
+        return True
+    
+    def unpackBrep(self, values):
+        """Rebuild a brep from values that are written by packBrep."""
+        faceCount = int(values[0])
+        i = 1
+        faces = []
+        for faceNumber in xrange(faceCount):
+            normal = rc.Geometry.Vector3d(values[i], values[i + 1], values[i + 2])
+            loopCount = int(values[i + 3])
+            i += 4
+            curves = []
+            for loopNumber in xrange(loopCount):
+                ptCount = int(values[i])
+                i += 1
+                pts = [rc.Geometry.Point3d(values[j], values[j + 1], values[j + 2]) \
+                       for j in xrange(i, i + 3 * ptCount, 3)]
+                i += 3 * ptCount
+                pts.append(pts[0])
+                curves.append(rc.Geometry.PolylineCurve(pts))
+            
+            face = rc.Geometry.Brep.CreatePlanarBreps(curves)[0]
+            faceNormal = face.Faces[0].NormalAt(face.Faces[0].Domain(0).Mid, face.Faces[0].Domain(1).Mid)
+            if faceNormal * normal < 0: face.Flip()
+            faces.append(face)
+        
+        if len(faces) == 1: return faces[0]
+        
+        joined = rc.Geometry.Brep.JoinBreps(faces, self.tolerance)
+        if joined != None and len(joined) == 1:
+            brep = joined[0]
+        else:
+            brep = rc.Geometry.Brep()
+            for face in faces: brep.Append(face)
+            brep.JoinNakedEdges(self.tolerance)
+        
+        if brep.IsSolid and brep.SolidOrientation == rc.Geometry.BrepSolidOrientation.Inward:
+            brep.Flip()
+        return brep
+    
+    @staticmethod
+    def getDependencies(obj):
+        """Return ids of the objects that are needed to load this object and ids of the adjacent surfaces."""
+        objectType = obj['objectType']
+        if objectType == 'HBZone':
+            return list(obj['surfaces']) + [obj['HVACSystem']], []
+        elif objectType == 'HBHvac':
+            return [obj[key] for key in ('airDetails', 'heatingDetails', 'coolingDetails') \
+                    if obj[key] != None], []
+        elif objectType == 'HBSurface':
+            deps = []
+            if obj.get('parent') != None: deps.append(obj['parent'])
+            if isinstance(obj.get('childSrfs'), list): deps.extend(obj['childSrfs'])
+            adjacent = []
+            if obj['type'] != 6 and str(obj.get('BC', '')).lower() == 'surface':
+                adjacent.append(obj['BCObject'])
+            return deps, adjacent
+        return [], []
+    
+    def getElevation(self, obj):
+        if obj['objectType'] != 'HBZone': return None
+        try:
+            return obj['geometry'].GetBoundingBox(True).Min.Z
+        except Exception:
+            return None
+    
+    def write(self, ids, objs):
+        """Write the objects to the file.
+        
+        Args:
+            ids: Ids of the objects that were dumped by the user.
+            objs: A dictionary of dumped objects as dictionaries. References to
+                other objects should already be replaced by their ids.
+        """
+        index = []
+        with open(self.filePath, "wb") as outf:
+            outf.write(self.MAGIC)
+            # the index offset will be written once all the records are written
+            outf.write(struct.pack("<iq", self.VERSION, 0))
+            
+            for id, obj in objs.iteritems():
+                deps, adjacent = self.getDependencies(obj)
+                values = array.array("d")
+                record = obj
+                if 'geometry' in obj and self.packBrep(obj['geometry'], values):
+                    record = dict(obj)
+                    record['geometry'] = None
+                else:
+                    values = array.array("d")
+                
+                data = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+                index.append([id, obj['objectType'], obj.get('name'), outf.tell(), \
+                              len(data), len(values), deps, adjacent, self.getElevation(obj)])
+                outf.write(data)
+                outf.write(values.tostring())
+            
+            indexOffset = outf.tell()
+            outf.write(json.dumps({"ids": ids, "byteorder": sys.byteorder, "index": index}))
+            outf.seek(len(self.MAGIC))
+            outf.write(struct.pack("<iq", self.VERSION, indexOffset))
+        
+        return self.filePath
+    
+    def readIndex(self, inf):
+        if inf.read(len(self.MAGIC)) != self.MAGIC:
+            raise ValueError("%s is not a valid Honeybee objects file."%self.filePath)
+        version, indexOffset = struct.unpack("<iq", inf.read(12))
+        if version > self.VERSION:
+            raise ValueError("%s is written by a newer version of Honeybee (file version %d)."%(self.filePath, version))
+        inf.seek(indexOffset)
+        header = json.loads(inf.read())
+        header["version"] = version
+        return header
+    
+    def getIndex(self):
+        """Return the index of the file without loading any of the objects."""
+        with open(self.filePath, "rb") as inf:
+            return self.readIndex(inf)
+    
+    def selectRecords(self, header, objectTypes = None, zoneNames = None, elevationRange = None):
+        entries = dict((entry[0], entry) for entry in header["index"])
+        
+        def isSelected(entry):
+            if objectTypes != None and entry[1] not in objectTypes: return False
+            if entry[1] != 'HBZone': return True
+            if zoneNames != None and entry[2] not in zoneNames: return False
+            if elevationRange != None and entry[8] != None:
+                return elevationRange[0] - self.tolerance <= entry[8] <= elevationRange[1] + self.tolerance
+            return True
+        
+        rootIds = [id for id in header["ids"] if isSelected(entries[id])]
+        
+        # add library objects that are requested explicitly
+        selected = set()
+        if objectTypes != None:
+            selected.update(entry[0] for entry in header["index"] \
+                            if entry[1] in self.LIBRARYTYPES and entry[1] in objectTypes)
+        
+        # collect all the objects that the selected objects depend on
+        toBeChecked = list(rootIds)
+        while toBeChecked:
+            id = toBeChecked.pop()
+            if id in selected: continue
+            selected.add(id)
+            toBeChecked.extend(entries[id][6])
+        
+        # libraries are needed for any Honeybee geometry
+        if any(entries[id][1] in ('HBZone', 'HBSurface') for id in selected):
+            selected.update(entry[0] for entry in header["index"] if entry[1] in self.LIBRARYTYPES)
+        
+        return rootIds, sorted((entries[id] for id in selected), key = lambda entry: entry[3])
+    
+    def read(self, objectTypes = None, zoneNames = None, elevationRange = None):
+        """Read the objects from the file.
+        
+        Args:
+            objectTypes: An optional list of object types to be loaded (e.g. HBZone, HBConstr).
+            zoneNames: An optional list of zone names to be loaded.
+            elevationRange: An optional (min, max) tuple in meters to only load
+                zones with the lowest point in this range.
+        Returns:
+            A dictionary with 'ids' and 'objs' keys similar to the dictionary
+            that is created by the dump component. Surfaces that are adjacent
+            to surfaces that are not loaded will be set to adiabatic.
+        """
+        if not self.isBinary(self.filePath):
+            with open(self.filePath, "rb") as inf:
+                return pickle.load(inf)
+        
+        with open(self.filePath, "rb") as inf:
+            header = self.readIndex(inf)
+            needsByteSwap = header["byteorder"] != sys.byteorder
+            rootIds, entries = self.selectRecords(header, objectTypes, zoneNames, elevationRange)
+            
+            objs = {}
+            for id, objectType, name, offset, pickleLength, valuesCount, deps, adjacent, elevation in entries:
+                inf.seek(offset)
+                obj = pickle.loads(inf.read(pickleLength))
+                if valuesCount != 0:
+                    values = array.array("d")
+                    values.fromstring(inf.read(8 * valuesCount))
+                    if needsByteSwap: values.byteswap()
+                    obj['geometry'] = self.unpackBrep(values)
+                objs[id] = obj
+        
+        # adjacent surfaces that are not loaded are replaced with adiabatic boundary conditions
+        for id, objectType, name, offset, pickleLength, valuesCount, deps, adjacent, elevation in entries:
+            if adjacent and adjacent[0] not in objs:
+                obj = objs[id]
+                obj['BC'] = 'Adiabatic'
+                obj['BCObject'] = 'Outdoors'
+                obj['sunExposure'] = 'NoSun'
+                obj['windExposure'] = 'NoWind'
+        
+        return {'ids': rootIds, 'objs': objs}
+
+
 class hb_hvacProperties(object):
     def __init__(self):
         
@@ -9691,12 +13217,26 @@ if checkIn.letItFly:
         if "honeybee_Hive" not in sc.sticky:
             sc.sticky["honeybee_RADMaterialLib"] = dict()
         
+        # load the parsed libraries from the snapshot of the last run if the source files haven't changed
+        librarySnapshot = hb_LibrarySnapshot(sc.sticky["Honeybee_DefaultFolder"], ghenv.Component.Message)
+        
         # set up radiance materials
-        RADMaterialAux = RADMaterialAux(True, sc.sticky["honeybee_RADMaterialLib"], sc.sticky["Honeybee_DefaultFolder"])
+        RADLibraryFile = os.path.join(sc.sticky["Honeybee_DefaultFolder"], "HoneybeeRadMaterials.mat")
+        RADMaterials = librarySnapshot.getSection("RAD", [RADLibraryFile])
+        if RADMaterials == None:
+            RADMaterials = {}
+            RADMaterialAux(True, RADMaterials, sc.sticky["Honeybee_DefaultFolder"])
+            librarySnapshot.setSection("RAD", [RADLibraryFile], hb_LibrarySnapshot.radMaterialsToData(RADMaterials))
+        else:
+            RADMaterials = hb_LibrarySnapshot.dataToRadMaterials(RADMaterials)
+            print "Loading RAD default materials..." + \
+                  `len(RADMaterials)` + " RAD materials are loaded\n"
+        sc.sticky["honeybee_RADMaterialLib"].update(RADMaterials)
+        RADMaterialAux = RADMaterialAux(False, sc.sticky["honeybee_RADMaterialLib"], sc.sticky["Honeybee_DefaultFolder"])
         sc.sticky["honeybee_RADMaterialAUX"] = RADMaterialAux
         
         # Download EP libraries
-        templateFilesPrep = PrepareTemplateEPLibFiles(downloadTemplate)
+        templateFilesPrep = PrepareTemplateEPLibFiles(downloadTemplate, librarySnapshot = librarySnapshot)
         libFilePaths = templateFilesPrep.downloadTemplates()
         msg = "Failed to load EP constructions! You won't be able to run analysis with Honeybee!\n" + \
                   "Download the files from address below and copy them to: " + sc.sticky["Honeybee_DefaultFolder"] + \
@@ -9705,16 +13245,23 @@ if checkIn.letItFly:
             EPLibs = HB_GetEPLibraries()
             
             try:
-                for pathCount, path in enumerate(libFilePaths):
-                    if "honeybee_Hive" not in sc.sticky:
-                        # This is first time loading so clean the library
-                        cleanLibs = True if pathCount == 0 else False
-                    else:
-                        cleanLibs = False
-                    if path.endswith('.csv'): isMatFile = True
-                    else: isMatFile = False
+                EPLibraries = librarySnapshot.getSection("EP", libFilePaths)
+                if EPLibraries != None:
+                    print "Loading EP and THERM libraries from %s"%librarySnapshot.filePath
+                    EPLibs.libraries = hb_LibrarySnapshot.dataToEPLibraries(EPLibraries)
+                else:
+                    for pathCount, path in enumerate(libFilePaths):
+                        if "honeybee_Hive" not in sc.sticky:
+                            # This is first time loading so clean the library
+                            cleanLibs = True if pathCount == 0 else False
+                        else:
+                            cleanLibs = False
+                        if path.endswith('.csv'): isMatFile = True
+                        else: isMatFile = False
+                        
+                        EPLibs.importEPLibrariesFromFile(path, isMatFile, cleanLibs, False)                
                     
-                    EPLibs.importEPLibrariesFromFile(path, isMatFile, cleanLibs, False)                
+                    librarySnapshot.setSection("EP", libFilePaths, hb_LibrarySnapshot.EPLibrariesToData(EPLibs.libraries))
                 
                 EPLibs.report()
                 sc.sticky["honeybee_materialLib"].update(EPLibs.getEPMaterials())
@@ -9725,6 +13272,7 @@ if checkIn.letItFly:
                 sc.sticky["honeybee_thermMaterialLib"].update(EPLibs.getTHERMMaterials())
                 sc.sticky["honeybee_WindowPropLib"].update(EPLibs.getEPWindowProp())
                 sc.sticky["honeybee_SpectralDataLib"].update(EPLibs.getEPSpectralData())
+                hb_EPScheduleCompiler.invalidateCache()
             except:
                 print msg
                 ghenv.Component.AddRuntimeMessage(w, msg)
@@ -9732,16 +13280,23 @@ if checkIn.letItFly:
             print msg
             ghenv.Component.AddRuntimeMessage(w, msg)
         
+        librarySnapshot.save()
+        
         
         sc.sticky["honeybee_Hive"] = hb_Hive
+        sc.sticky["honeybee_BoundingBoxIndex"] = hb_BoundingBoxIndex
+        sc.sticky["honeybee_MeshRayCaster"] = hb_MeshRayCaster
         sc.sticky["honeybee_generationHive"] = generationhb_hive
         sc.sticky["honeybee_GetEPLibs"] = HB_GetEPLibraries
+        sc.sticky["honeybee_IDFTokenizer"] = hb_IDFTokenizer
+        sc.sticky["honeybee_LibrarySnapshot"] = hb_LibrarySnapshot
         sc.sticky["honeybee_DefaultMaterialLib"] = materialLibrary
         sc.sticky["honeybee_DefaultSurfaceLib"] = EPSurfaceLib
         sc.sticky["honeybee_EPMaterialAUX"] = EPMaterialAux
         sc.sticky["honeybee_EPScheduleAUX"] = EPScheduleAux
         sc.sticky["honeybee_EPObjectsAUX"] = EPObjectsAux
         sc.sticky["honeybee_ReadSchedules"] = ReadEPSchedules
+        sc.sticky["honeybee_EPScheduleCompiler"] = hb_EPScheduleCompiler
         sc.sticky["honeybee_BuildingProgramsLib"] = BuildingProgramsLib
         sc.sticky["honeybee_EPTypes"] = EPTypes()
         sc.sticky["honeybee_EPZone"] = EPZone
@@ -9760,6 +13315,7 @@ if checkIn.letItFly:
         sc.sticky["thermBCCount"] = 1
         sc.sticky["hBZoneCount"] = 0
         sc.sticky["honeybee_reEvaluateHBZones"] = hb_reEvaluateHBZones
+        sc.sticky["honeybee_ZoneMultipliers"] = hb_ZoneMultipliers
         sc.sticky["honeybee_hvacProperties"] = hb_hvacProperties
         sc.sticky["honeybee_hvacAirDetails"] = hb_airDetail
         sc.sticky["honeybee_hvacHeatingDetails"] = hb_heatingDetail
@@ -9772,13 +13328,25 @@ if checkIn.letItFly:
         sc.sticky["honeybee_DLAnalysisRecipe"] = DLAnalysisRecipe
         sc.sticky["honeybee_MeshToRAD"] = hb_MSHToRAD
         sc.sticky["honeybee_WriteRAD"] = hb_WriteRAD
+        sc.sticky["honeybee_RADExportCache"] = hb_RADExportCache
+        sc.sticky["honeybee_ProcessRunner"] = hb_ProcessRunner
+        sc.sticky["honeybee_JobScheduler"] = hb_JobScheduler
+        sc.sticky["honeybee_EPBatchRunner"] = hb_EPBatchRunner
         sc.sticky["honeybee_WriteRADAUX"] = hb_WriteRADAUX
         sc.sticky["honeybee_WriteDS"] = hb_WriteDS
         sc.sticky["honeybee_RADParameters"] = hb_RADParameters
         sc.sticky["honeybee_DSParameters"] = hb_DSParameters
         sc.sticky["honeybee_ReadAnnualResultsAux"] = hb_ReadAnnualResultsAux
+        sc.sticky["honeybee_IllResultStore"] = hb_IllResultStore
+        sc.sticky["honeybee_EPResultReader"] = hb_EPResultReader
+        sc.sticky["honeybee_EPSQLResultReader"] = hb_EPSQLResultReader
+        sc.sticky["honeybee_ComfortMatrixFile"] = hb_ComfortMatrixFile
+        sc.sticky["honeybee_ComfortMatrixAggregator"] = hb_ComfortMatrixAggregator
+        sc.sticky["honeybee_PointZoneCache"] = hb_PointZoneCache
         sc.sticky["honeybee_EPParameters"] = hb_EnergySimulatioParameters
         sc.sticky["honeybee_SerializeObjects"] = SerializeObjects
+        sc.sticky["honeybee_IDFWriter"] = hb_IDFWriter
+        sc.sticky["honeybee_HBObjectsFile"] = hb_HBObjectsFile
         sc.sticky["honeybee_GridBasedDLResults"] = CalculateGridBasedDLAnalysisResults
         sc.sticky["honeybee_DLAnalaysisTypes"] = {0: ["0: illuminance" , "lux"],
                                                   1: ["1: radiation" , "wh/m2"],
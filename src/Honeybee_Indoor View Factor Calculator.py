@@ -58,11 +58,11 @@ Provided by Honeybee 0.0.63
 
 ghenv.Component.Name = "Honeybee_Indoor View Factor Calculator"
 ghenv.Component.NickName = 'IndoorViewFactor'
-ghenv.Component.Message = 'VER 0.0.63\nJUN_04_2018'
+ghenv.Component.Message = 'VER 0.0.63\nOCT_18_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "10 | Energy | Energy"
-#compatibleHBVersion = VER 0.0.56\nDEC_15_2017
+#compatibleHBVersion = VER 0.0.63\nOCT_18_2026
 #compatibleLBVersion = VER 0.0.59\nJUN_25_2015
 try: ghenv.Component.AdditionalHelpFromDocStrings = "6"
 except: pass
@@ -76,7 +76,6 @@ from Grasshopper.Kernel.Data import GH_Path
 import Rhino as rc
 import rhinoscriptsyntax as rs
 import scriptcontext as sc
-import operator
 import System.Threading.Tasks as tasks
 import time
 
@@ -1257,118 +1256,6 @@ def checkViewResolution(viewResolution, lb_preparation):
     
     return newVecs, skyViewVecs, newVecsAreas, skyViewVecsAreas
 
-def allSame(items):
-    return all(x == items[0] for x in items)
-
-def parallel_projection(zoneSrfsMesh, viewVectors, pointList):
-    #Placeholder for the outcome of the parallel projection.
-    pointIntList = []
-    for point in pointList: pointIntList.append([])
-    
-    #Keep track of the divisor.
-    divisor = len(viewVectors)
-    
-    def intersect(i):
-        point = pointList[i]
-        #Create the rays to be projected from each point.
-        pointRays = []
-        for vec in viewVectors: pointRays.append(rc.Geometry.Ray3d(point, vec))
-        
-        #Create a list that will hold the intersection hits of each surface
-        srfHits = []
-        for srf in zoneSrfsMesh: srfHits.append([])
-        
-        #Perform the intersection of the rays with the mesh.
-        pointIntersectList = []
-        for rayCount, ray in enumerate(pointRays):
-            pointIntersectList.append([])
-            for srf in zoneSrfsMesh:
-                intersect = rc.Geometry.Intersect.Intersection.MeshRay(srf, ray)
-                if intersect == -1: intersect = "N"
-                pointIntersectList[rayCount].append(intersect)
-        
-        #Find the intersection that was the closest for each ray.
-        for list in pointIntersectList:
-            if allSame(list) == False:
-                minIndex, minValue = min(enumerate(list), key=operator.itemgetter(1))
-                srfHits[minIndex].append(1)
-        
-        #Sum up the lists and divide by the total rays to get the view factor.
-        for hitList in srfHits:
-            pointIntList[i].append(sum(hitList)/divisor)
-    
-    tasks.Parallel.ForEach(range(len(pointList)), intersect)
-    
-    return pointIntList
-
-
-def parallel_skyProjection(zoneOpaqueMesh, skyViewVecs, skyViewVecsAreas, pointList, zoneWindowMesh, zoneWindowTransmiss, zoneHasWindows, zoneWindowNames):
-    #Placeholder for the outcome of the parallel projection.
-    pointIntList = []
-    skyBlockedList = []
-    skyBlockWindowNameCount = []
-    for num in range(len(pointList)):
-        pointIntList.append(0.0)
-        skyBlockedList.append([])
-        skyBlockWindowNameCount.append([])
-    
-    #Keep track of the divisor.
-    divisor = len(skyViewVecs)
-    
-    def intersect(i):
-        point = pointList[i]
-        #Create the rays to be projected from each point.
-        pointRays = []
-        for vec in skyViewVecs: pointRays.append(rc.Geometry.Ray3d(point, vec))
-        
-        #Perform the intersection of the rays with the opaque mesh.
-        pointIntersectList = []
-        for rayCount, ray in enumerate(pointRays):
-            pointIntersectList.append([])
-            for srf in zoneOpaqueMesh:
-                intersect = rc.Geometry.Intersect.Intersection.MeshRay(srf, ray)
-                if intersect == -1: pass
-                else: pointIntersectList[rayCount].append(1)
-        
-        #See if the ray passed all of the context meshes.
-        finalIntersectList = []
-        for ray in pointRays:
-            finalIntersectList.append([])
-        for listCt, rayList in enumerate(pointIntersectList):
-            for intersect in rayList:
-                finalIntersectList[listCt].append(intersect)
-        
-        finalViewCount = []
-        finalWindowNameCount = []
-        for rayListCount, rayList in enumerate(finalIntersectList):
-            if sum(rayList) == 0:
-                if zoneHasWindows == 2:
-                    finalViewCount.append(1)
-                    finalWindowNameCount.append(0)
-                else:
-                    transmiss = 1
-                    winNameList = []
-                    for winCount, winMesh in enumerate(zoneWindowMesh):
-                        intersect = rc.Geometry.Intersect.Intersection.MeshRay(winMesh, pointRays[rayListCount])
-                        if intersect == -1: pass
-                        else:
-                            transmiss = transmiss * zoneWindowTransmiss[winCount]
-                            winNameList.append(zoneWindowNames[winCount].upper())
-                    finalViewCount.append(transmiss)
-                    finalWindowNameCount.append(winNameList)
-            else:
-                finalViewCount.append(0)
-                finalWindowNameCount.append(0)
-        
-        #Sum up the lists and divide by the total rays to get the view factor.
-        skyBlockedList[i] = finalViewCount
-        skyBlockWindowNameCount[i] = finalWindowNameCount
-        pointIntList[i] = sum(finalViewCount)/divisor
-    
-    tasks.Parallel.ForEach(range(len(pointList)), intersect)
-    
-    return pointIntList, skyBlockedList, skyBlockWindowNameCount
-
 def checkOutdoorViewFac(outdoorTestPtViewFactor, testPtSkyView):
     outdoorNonSrfViewFac = []
     for ptCount, viewFac in enumerate(outdoorTestPtViewFactor):
@@ -1376,126 +1263,104 @@ def checkOutdoorViewFac(outdoorTestPtViewFactor, testPtSkyView):
     return outdoorNonSrfViewFac
 
 
+
+def runInParallel(count, function):
+    # run the function for all the items in parallel or one by one based on parallel_
+    if parallel_ == True or parallel_ == None:
+        tasks.Parallel.ForEach(range(count), function)
+    else:
+        for i in range(count): function(i)
+
+
 def skyViewCalc(testPts, zoneOpaqueMesh, skyViewVecs, skyViewVecsAreas, zoneHasWindows, zoneWindowMesh, zoneWindowTransmiss, zoneWindowNames):
+    meshRayCaster = sc.sticky["honeybee_MeshRayCaster"]
+    directions = meshRayCaster.prepareDirections(skyViewVecs)
+    divisor = float(len(skyViewVecs))
+    
     testPtSkyView = []
     testPtSkyBlockedList = []
     testPtBlockName = []
+    opaqueRayCasters = []
+    windowRayCasters = []
     
+    #Build the ray casters once for each zone and collect all the points of all the zones.
+    points = []
     for zoneCount, pointList in enumerate(testPts):
         if zoneHasWindows[zoneCount] > 0:
-            if parallel_ == True or parallel_ == None:
-                skyViewFactors, skyBlockedList, finalWindowNameCount = parallel_skyProjection(zoneOpaqueMesh[zoneCount], skyViewVecs, skyViewVecsAreas, testPts[zoneCount], zoneWindowMesh[zoneCount], zoneWindowTransmiss[zoneCount], zoneHasWindows[zoneCount], zoneWindowNames[zoneCount])
-                testPtSkyView.append(skyViewFactors)
-                testPtSkyBlockedList.append(skyBlockedList)
-                testPtBlockName.append(finalWindowNameCount)
-            else:
-                testPtSkyView.append([])
-                testPtSkyBlockedList.append([])
-                testPtBlockName.append([])
-                for pointCount, point in enumerate(pointList):
-                    #Make the list that will eventually hold the view factors of each surface.
-                    divisor = len(skyViewVecs)
-                    
-                    #Create the rays to be projected from each point.
-                    pointRays = []
-                    for vec in skyViewVecs: pointRays.append(rc.Geometry.Ray3d(point, vec))
-                    
-                    #Perform the intersection of the rays with the opaque mesh.
-                    pointIntersectList = []
-                    for rayCount, ray in enumerate(pointRays):
-                        pointIntersectList.append([])
-                        for srf in zoneOpaqueMesh[zoneCount]:
-                            intersect = rc.Geometry.Intersect.Intersection.MeshRay(srf, ray)
-                            if intersect == -1: pointIntersectList[rayCount].append(0)
-                            else: pointIntersectList[rayCount].append(1)
-                    
-                    #See if the ray passed all of the context meshes.
-                    finalIntersectList = []
-                    for ray in pointRays:
-                        finalIntersectList.append([])
-                    for listCt, rayList in enumerate(pointIntersectList):
-                        for intersect in rayList:
-                            finalIntersectList[listCt].append(intersect)
-                    
-                    finalViewCount = []
-                    finalWindowNameCount = []
-                    for rayListCount, rayList in enumerate(finalIntersectList):
-                        if sum(rayList) == 0:
-                            if zoneHasWindows[zoneCount] == 2:
-                                finalViewCount.append(1) #This is the code to indicate that the point is outside and there is no need to calculate a window transmissivity.
-                                finalWindowNameCount.append(0)
-                            else:
-                                #The ray is not blocked but it is hitting a window and so we need to factor in the window transmissivity.
-                                transmiss = 1
-                                winNameList = []
-                                for winCount, winMesh in enumerate(zoneWindowMesh[zoneCount]):
-                                    intersect = rc.Geometry.Intersect.Intersection.MeshRay(winMesh, pointRays[rayListCount])
-                                    if intersect == -1: pass
-                                    else:
-                                        transmiss = transmiss * zoneWindowTransmiss[zoneCount][winCount]
-                                        winNameList.append(zoneWindowNames[zoneCount][winCount].upper())
-                                finalViewCount.append(transmiss)
-                                finalWindowNameCount.append(winNameList)
-                        else:
-                            #The ray has been blocked by an opaque surface.
-                            finalViewCount.append(0)
-                            finalWindowNameCount.append(0)
-                    
-                    #Sum up the lists and divide by the total rays to get the view factor.
-                    testPtSkyBlockedList[zoneCount].append(finalViewCount)
-                    testPtSkyView[zoneCount].append(sum(finalViewCount)/divisor)
-                    testPtBlockName[zoneCount].append(finalWindowNameCount)
+            testPtSkyView.append([0] * len(pointList))
+            testPtSkyBlockedList.append([None] * len(pointList))
+            testPtBlockName.append([None] * len(pointList))
+            opaqueRayCasters.append(meshRayCaster([meshRayCaster.meshToData(mesh) for mesh in zoneOpaqueMesh[zoneCount]]))
+            if zoneHasWindows[zoneCount] == 2: windowRayCasters.append(None)
+            else: windowRayCasters.append(meshRayCaster([meshRayCaster.meshToData(mesh) for mesh in zoneWindowMesh[zoneCount]]))
+            points.extend((zoneCount, pointCount, (point.X, point.Y, point.Z)) for pointCount, point in enumerate(pointList))
         else:
             testPtSkyView.append(0)
             testPtSkyBlockedList.append([range(len(skyViewVecs))])
             testPtBlockName.append([range(len(skyViewVecs))])
+            opaqueRayCasters.append(None)
+            windowRayCasters.append(None)
+    
+    def intersect(i):
+        zoneCount, pointCount, point = points[i]
+        finalViewCount = []
+        finalWindowNameCount = []
+        for direction in directions:
+            if opaqueRayCasters[zoneCount].isBlocked(point, direction):
+                #The ray has been blocked by an opaque surface.
+                finalViewCount.append(0)
+                finalWindowNameCount.append(0)
+            elif zoneHasWindows[zoneCount] == 2:
+                finalViewCount.append(1) #This is the code to indicate that the point is outside and there is no need to calculate a window transmissivity.
+                finalWindowNameCount.append(0)
+            else:
+                #The ray is not blocked but it is hitting a window and so we need to factor in the window transmissivity.
+                transmiss = 1
+                winNameList = []
+                for winCount in windowRayCasters[zoneCount].getHitMeshes(point, direction):
+                    transmiss = transmiss * zoneWindowTransmiss[zoneCount][winCount]
+                    winNameList.append(zoneWindowNames[zoneCount][winCount].upper())
+                finalViewCount.append(transmiss)
+                finalWindowNameCount.append(winNameList)
+        
+        #Sum up the lists and divide by the total rays to get the view factor.
+        testPtSkyBlockedList[zoneCount][pointCount] = finalViewCount
+        testPtSkyView[zoneCount][pointCount] = sum(finalViewCount)/divisor
+        testPtBlockName[zoneCount][pointCount] = finalWindowNameCount
+    
+    #Points of all the zones are calculated together.
+    runInParallel(len(points), intersect)
     
     return testPtSkyView, testPtSkyBlockedList, testPtBlockName
 
 
 def main(testPts, zoneSrfsMesh, viewVectors, includeOutdoor):
-    testPtViewFactor = []
+    meshRayCaster = sc.sticky["honeybee_MeshRayCaster"]
+    directions = meshRayCaster.prepareDirections(viewVectors)
+    divisor = float(len(viewVectors))
     
+    #Build the ray caster once for each zone and collect all the points of all the zones.
+    testPtViewFactor = []
+    rayCasters = []
+    points = []
     for zoneCount, pointList in enumerate(testPts):
-        if parallel_ == True  or parallel_ == None:
-            viewFactors = parallel_projection(zoneSrfsMesh[zoneCount], viewVectors, testPts[zoneCount])
-            testPtViewFactor.append(viewFactors)
-        else:
-            testPtViewFactor.append([])
-            for pointCount, point in enumerate(pointList):
-                #Make the list that will eventually hold the view factors of each surface.
-                testPtViewFactor[zoneCount].append([])
-                divisor = len(viewVectors)
-                
-                #Create the rays to be projected from each point.
-                pointRays = []
-                for vec in viewVectors: pointRays.append(rc.Geometry.Ray3d(point, vec))
-                
-                #Create a list that will hold the intersection hits of each surface
-                srfHits = []
-                for srf in zoneSrfsMesh[zoneCount]: srfHits.append([])
-                
-                #Perform the intersection of the rays with the mesh.
-                pointIntersectList = []
-                for rayCount, ray in enumerate(pointRays):
-                    pointIntersectList.append([])
-                    for srf in zoneSrfsMesh[zoneCount]:
-                        intersect = rc.Geometry.Intersect.Intersection.MeshRay(srf, ray)
-                        if intersect == -1: intersect = "N"
-                        pointIntersectList[rayCount].append(intersect)
-                
-                #Find the intersection that was the closest for each ray.
-                for list in pointIntersectList:
-                    try:
-                        if allSame(list) == False:
-                            minIndex, minValue = min(enumerate(list), key=operator.itemgetter(1))
-                            srfHits[minIndex].append(1)
-                    except: pass
-                
-                #Sum up the lists and divide by the total rays to get the view factor.
-                for hitList in srfHits:
-                    testPtViewFactor[zoneCount][pointCount].append(sum(hitList)/divisor)
+        testPtViewFactor.append([None] * len(pointList))
+        rayCasters.append(meshRayCaster([meshRayCaster.meshToData(mesh) for mesh in zoneSrfsMesh[zoneCount]]))
+        points.extend((zoneCount, pointCount, (point.X, point.Y, point.Z)) for pointCount, point in enumerate(pointList))
     
+    def intersect(i):
+        zoneCount, pointCount, point = points[i]
+        
+        #Find the surface that was the closest for each ray.
+        srfHits = [0] * len(zoneSrfsMesh[zoneCount])
+        for srfIndex in rayCasters[zoneCount].castRays([point], directions)[0]:
+            if srfIndex != -1: srfHits[srfIndex] += 1
+        
+        #Sum up the hits and divide by the total rays to get the view factor.
+        testPtViewFactor[zoneCount][pointCount] = [hitCount/divisor for hitCount in srfHits]
+    
+    #Points of all the zones are calculated together.
+    runInParallel(len(points), intersect)
     
     return testPtViewFactor
 
@@ -1582,6 +1447,11 @@ else:
         "If you have already updated userObjects drag Honeybee_Honeybee component " + \
         "into canvas and try again."
         ghenv.Component.AddRuntimeMessage(w, warning)
+    
+    if not sc.sticky.has_key('honeybee_MeshRayCaster'):
+        initCheck = False
+        print "You should first let the latest version of Honeybee to fly..."
+        ghenv.Component.AddRuntimeMessage(w, "You should first let the latest version of Honeybee to fly...")
 
 
 
@@ -1615,6 +1485,16 @@ if checkData == True and buildMesh == True:
     goodGeo = prepareGeometry(gridSize, distFromFloor, removeInt, sectionMethod, sectionBreps, includeOutdoor, constantTransmis, addShdTransmiss, hb_zoneData)
     if goodGeo != -1:
         geoCheck, testPtsInit, viewFactorBrep, viewFactorMeshActual, zoneWireFrame, zoneSrfsMesh, zoneSrfNames, zoneOpaqueMesh, testPtZoneNames, testPtZoneWeights, ptHeightWeights, zoneInletInfo, zoneHasWindows, zoneBrepsNonSolid, includeOutdoor, zoneWindowMesh, zoneWindowTransmiss, outdoorPtHeightWeights, zoneWindowNames, flrRefList, zoneSrfTypes, finalAddShdTransmiss = goodGeo
+        
+        #Remember which zone each test point is in so that other components don't need to test the points against the zones again.
+        #Zones that are joined by air walls have test points in several zones so they are left to be tested later.
+        if removeInt == False:
+            pointZoneNames = []
+            for brCount, branch in enumerate(testPtsInit):
+                if brCount < len(testPtZoneNames): pointZoneNames.extend([testPtZoneNames[brCount]] * len(branch))
+                else: pointZoneNames.extend([None] * len(branch))
+            flatMeshes = [mesh for branch in viewFactorMeshActual for mesh in branch]
+            sc.sticky["honeybee_PointZoneCache"]().register(flatMeshes, hb_zoneData[0], hb_zoneData[6], pointZoneNames)
     total_ms = time.clock() - start
     
     #Unpack the data trees of test pts and mesh breps so that the user can see them and get a sense of what to expect from the view factor calculation.
@@ -31,6 +31,11 @@ Provided by Honeybee 0.0.63
     Args:
         _HBObjects: A list of Honeybee objects
         _filePath: A valid path to a file on your drive (e.g. c:\ladybug\20ZonesExample.HB)
+        objectTypes_: An optional list of object types to be loaded from the file (e.g. HBZone, HBSurface, HBConstr). Default is all the objects.
+        zoneNames_: An optional list of zone names to be loaded from the file. Default is all the zones.
+        elevationRange_: An optional domain to only load the zones with the lowest point inside the domain (e.g. zones of a single floor).
+            Surfaces that are adjacent to a zone that is not loaded will be set to adiabatic.
+            Filters only work for files that are written by this version of the dump component.
         _load: Set to True to load the objects from the file
     Returns:
         readMe!: ...
@@ -47,7 +52,6 @@ ghenv.Component.SubCategory = "00 | Honeybee"
 try: ghenv.Component.AdditionalHelpFromDocStrings = "6"
 except: pass
 
-import cPickle as pickle
 import scriptcontext as sc
 import Grasshopper.Kernel as gh
 import os
@@ -235,6 +239,9 @@ def loadHBObjects(HBData):
             elif HBObjects[obj].objectType == 'HBZone':
                 HBObjects[obj].transform(NUscale, "", False)
     
+    # only library objects are loaded
+    if len(ids) == 0: return []
+    
     # return new Honeybee objects
     try:
         return hb_hive.addToHoneybeeHive([HBObjects[id] for id in HBData["ids"]], ghenv.Component)
@@ -242,14 +249,33 @@ def loadHBObjects(HBData):
         return hb_hive.addNonGeoObjToHive([HBObjects[id] for id in HBData["ids"]][0], ghenv.Component)
 
 
-def main(filePath):
+def main(filePath, objectTypes, zoneNames, elevationRange):
     if not os.path.isfile(filePath):
         raise ValueError("Can't find %s"%filePath)
     
-    with open(filePath, "rb") as inf:
-        return loadHBObjects(pickle.load(inf))
+    hb_HBObjectsFile = sc.sticky["honeybee_HBObjectsFile"]
+    
+    if (objectTypes or zoneNames or elevationRange != None) and not hb_HBObjectsFile.isBinary(filePath):
+        warning = "%s is written by an older version of dump Honeybee objects.\n" % filePath + \
+                  "All the objects will be loaded."
+        ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
+    
+    if elevationRange != None:
+        # elevations are saved in meters
+        fac = sc.sticky["honeybee_ConversionFactor"]
+        elevationRange = (elevationRange.Min * fac, elevationRange.Max * fac)
+    
+    HBData = hb_HBObjectsFile(filePath).read(objectTypes or None, zoneNames or None, elevationRange)
+    return loadHBObjects(HBData)
 
 
+# filters until the inputs are added to the component. By default all the objects are loaded.
+try: objectTypes_
+except: objectTypes_ = []
+try: zoneNames_
+except: zoneNames_ = []
+try: elevationRange_
+except: elevationRange_ = None
 
 #Honeybee check.
 initCheck = True
@@ -270,5 +296,5 @@ else:
         ghenv.Component.AddRuntimeMessage(w, warning)
 
 if initCheck == True and _filePath != None and _load == True:
-    results = main(_filePath)
+    results = main(_filePath, objectTypes_, zoneNames_, elevationRange_)
     HBObjects = results if results!= -1 else None
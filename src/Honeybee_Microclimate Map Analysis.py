@@ -22,7 +22,7 @@
 
 
 """
-Use this component runs an annual comfort assessment off of EnergyPlus results and write all values into csv files.
+Use this component runs an annual comfort assessment off of EnergyPlus results and write all values into result files.
 The results in these files can be used for creating indoor comfort maps.
 -
 Provided by Honeybee 0.0.63
@@ -35,7 +35,8 @@ Provided by Honeybee 0.0.63
         =============: ...
         analysisPeriodOrHOY_: An analysis period from the 'Ladybug Analysis Period' component or an hour of the analysis between 1 and 8760 for which you want to conduct the analysis. If no value is connected here, the component will run for only noon on the winter solstice.  A single HOY is used by default as longer analysis periods can take a very long time.
         =============: ...
-        writeResultFile_: Set to 1 or 'True' to have the component write all results into CSV result files and set to 0 or 'False' to not have the component write these files.  The default is set to 'True' as these simulations can be long and you usually want a copy of your results.  You may want to set it to 'False' if you are just scrolling through key hours and want the fastest run possible.  Set to 2 if you want the component to only write the results of the last two matrices (comfort results and degFromTarget).
+        writeResultFile_: Set to 1 or 'True' to have the component write all results into result files and set to 0 or 'False' to not have the component write these files.  The default is set to 'True' as these simulations can be long and you usually want a copy of your results.  You may want to set it to 'False' if you are just scrolling through key hours and want the fastest run possible.  Set to 2 if you want the component to only write the results of the last two matrices (comfort results and degFromTarget).
+        writeCSV_: Set to "True" to write the result files as csv files instead of binary .hbmtx matrix files.  Binary matrix files are much smaller and much faster to write and read back with the 'Honeybee_Read Microclimate Matrix' component.  Use csv files if you want to open the results in other programs.  The default is set to "False".
         parallel_: Set to "True" to run the component using multiple CPUs.  This can dramatically decrease calculation time but can interfere with other intense computational processes that might be running on your machine.  For this reason, the default is set to 'False.'
         _runIt: Set boolean to "True" to run the component and generate files for an annual indoor comfort assessment.
     Returns:
@@ -47,17 +48,17 @@ Provided by Honeybee 0.0.63
         adaptComfMtx: A python matrix containing adaptive comfort data for every hour of the analysis to be plugged into the 'Honeybee_Visualize Annual Comfort Results' component.
         degFromTargetMtx: A python matrix containing degrees from tartget temperature data for every hour of the analysis to be plugged into the 'Honeybee_Visualize Annual Comfort Results' component.
         ===============: ...
-        radTempResult: A csv file address containing the radiant temperature resultsfor each point for every hour of the analysis.
-        airTempResult: A csv file address containing the air temperature results for each point for every hour of the analysis.
-        operativeTempResult: A csv file address containing the operative temperature results for each point for every hour of the analysis.
-        adaptComfResult: A csv file address containing the a series of 0's and 1's indicating whether a certain point is comfortable for every hour of the analysis.
-        degFromTargetResult: A csv file address containing the a series of numbers indicating the degrees that a certain point is from the neutral temperature for every hour of the analysis.
+        radTempResult: A result file address containing the radiant temperature resultsfor each point for every hour of the analysis.
+        airTempResult: A result file address containing the air temperature results for each point for every hour of the analysis.
+        operativeTempResult: A result file address containing the operative temperature results for each point for every hour of the analysis.
+        adaptComfResult: A result file address containing the a series of 0's and 1's indicating whether a certain point is comfortable for every hour of the analysis.
+        degFromTargetResult: A result file address containing the a series of numbers indicating the degrees that a certain point is from the neutral temperature for every hour of the analysis.
 
 """
 
 ghenv.Component.Name = "Honeybee_Microclimate Map Analysis"
 ghenv.Component.NickName = 'MicroclimateMap'
-ghenv.Component.Message = 'VER 0.0.63\nJAN_20_2018'
+ghenv.Component.Message = 'VER 0.0.63\nOCT_18_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "10 | Energy | Energy"
@@ -76,6 +77,7 @@ from Grasshopper.Kernel.Data import GH_Path
 import Rhino as rc
 import scriptcontext as sc
 import math
+import operator
 import os
 import System.Threading.Tasks as tasks
 
@@ -94,11 +96,11 @@ outputsDictAdapt = {
 5: ["adaptComfMtx", "A python matrix containing adaptive comfort data for every hour of the analysis to be plugged into the 'Honeybee_Visualize Annual Comfort Results' component."],
 6: ["degFromTargetMtx", "A python matrix containing degrees from tartget temperature data for every hour of the analysis to be plugged into the 'Honeybee_Visualize Annual Comfort Results' component."],
 7: ["===============", "..."],
-8: ["radTempResult", "A csv file address containing the radiant temperature resultsfor each point for every hour of the analysis."],
-9: ["airTempResult", "A csv file address containing the air temperature results for each point for every hour of the analysis."],
-10: ["operativeTempResult", "A csv file address containing the operative temperature results for each point for every hour of the analysis."],
-11: ["adaptComfResult", "A csv file address containing the a series of 0's and 1's indicating whether a certain point is comfortable for every hour of the analysis."],
-12: ["degFromTargetResult", "A csv file address containing the a series of numbers indicating the degrees that a certain point is from the neutral temperature for every hour of the analysis."]
+8: ["radTempResult", "A result file address containing the radiant temperature resultsfor each point for every hour of the analysis."],
+9: ["airTempResult", "A result file address containing the air temperature results for each point for every hour of the analysis."],
+10: ["operativeTempResult", "A result file address containing the operative temperature results for each point for every hour of the analysis."],
+11: ["adaptComfResult", "A result file address containing the a series of 0's and 1's indicating whether a certain point is comfortable for every hour of the analysis."],
+12: ["degFromTargetResult", "A result file address containing the a series of numbers indicating the degrees that a certain point is from the neutral temperature for every hour of the analysis."]
 }
 
 outputsDictPMV = {
@@ -111,11 +113,11 @@ outputsDictPMV = {
 5: ["PMVComfMtx", "A python matrix containing PMV comfort data for every hour of the analysis to be plugged into the 'Honeybee_Visualize Annual Comfort Results' component."],
 6: ["PMV_Mtx", "A python matrix containing predicted mean vote (PMV) data for every hour of the analysis to be plugged into the 'Honeybee_Visualize Annual Comfort Results' component."],
 7: ["===============", "..."],
-8: ["radTempResult", "A csv file address containing the radiant temperature resultsfor each point for every hour of the analysis."],
-9: ["airTempResult", "A csv file address containing the air temperature results for each point for every hour of the analysis."],
-10: ["SET_Result", "A csv file address containing the standard effective temperature (SET) results for each point for every hour of the analysis."],
-11: ["PMVComfResult", "A csv file address containing the a series of 0's and 1's indicating whether a certain point is comfortable for every hour of the analysis."],
-12: ["PMV_Result", "A csv file address containing predicted mean vote (PMV) results indicating the distance that a certain point is from the neutral temperature for every hour of the analysis."]
+8: ["radTempResult", "A result file address containing the radiant temperature resultsfor each point for every hour of the analysis."],
+9: ["airTempResult", "A result file address containing the air temperature results for each point for every hour of the analysis."],
+10: ["SET_Result", "A result file address containing the standard effective temperature (SET) results for each point for every hour of the analysis."],
+11: ["PMVComfResult", "A result file address containing the a series of 0's and 1's indicating whether a certain point is comfortable for every hour of the analysis."],
+12: ["PMV_Result", "A result file address containing predicted mean vote (PMV) results indicating the distance that a certain point is from the neutral temperature for every hour of the analysis."]
 }
 
 outputsDictUTCI = {
@@ -128,11 +130,11 @@ outputsDictUTCI = {
 5: ["OutdoorComfMtx", "A python matrix containing outdoor (UTCI) comfort data for every hour of the analysis to be plugged into the 'Honeybee_Visualize Annual Comfort Results' component."],
 6: ["DegFromNeutralMtx", "A python matrix containing the degrees from the neutral UTCI value of 20 C for every hour of the analysis to be plugged into the 'Honeybee_Visualize Annual Comfort Results' component."],
 7: ["===============", "..."],
-8: ["radTempResult", "A csv file address containing the radiant temperature resultsfor each point for every hour of the analysis."],
-9: ["airTempResult", "A csv file address containing the air temperature results for each point for every hour of the analysis."],
-10: ["UTCI_Result", "A csv file address containing universal thermal climate index (UTCI) results for each point for every hour of the analysis."],
-11: ["OutdoorComfResult", "A csv file address containing the a series of 0's and 1's indicating whether a certain point is comfortable for every hour of the analysis."],
-12: ["DegFromNeutralResult", "A csv file address containing the degrees from the neutral UTCI value of 20 C indicating the distance that a certain point is from the neutral temperature for every hour of the analysis."]
+8: ["radTempResult", "A result file address containing the radiant temperature resultsfor each point for every hour of the analysis."],
+9: ["airTempResult", "A result file address containing the air temperature results for each point for every hour of the analysis."],
+10: ["UTCI_Result", "A result file address containing universal thermal climate index (UTCI) results for each point for every hour of the analysis."],
+11: ["OutdoorComfResult", "A result file address containing the a series of 0's and 1's indicating whether a certain point is comfortable for every hour of the analysis."],
+12: ["DegFromNeutralResult", "A result file address containing the degrees from the neutral UTCI value of 20 C indicating the distance that a certain point is from the neutral temperature for every hour of the analysis."]
 }
 
 outputsDictPET = {
@@ -145,11 +147,11 @@ outputsDictPET = {
 5: ["PET_ComfMtx", "A python matrix containing PET comfort data for every hour of the analysis to be plugged into the 'Honeybee_Visualize Annual Comfort Results' component."],
 6: ["PET_CategoryMtx", "A python matrix containing the categories of PET. These are either: -4 = Very Cold, -3 = Cold, -2 = Cool, -1 = Slightly Cool, 0 = Comfortable, 1 = Slightly Warm, 2 = Warm, 3 = Hot, 4 = Very Hot"],
 7: ["===============", "..."],
-8: ["radTempResult", "A csv file address containing the radiant temperature resultsfor each point for every hour of the analysis."],
-9: ["airTempResult", "A csv file address containing the air temperature results for each point for every hour of the analysis."],
-10: ["PET_Result", "A csv file address containing physiological equivalent temperature (PET) results for each point for every hour of the analysis."],
-11: ["PETComfResult", "A csv file address containing the a series of 0's and 1's indicating whether a certain point is comfortable for every hour of the analysis."],
-12: ["PETCategoryResult", "A csv file address containing the categories of PET.   These are either: -4 = Very Cold, -3 = Cold, -2 = Cool, -1 = Slightly Cool, 0 = Comfortable, 1 = Slightly Warm, 2 = Warm, 3 = Hot, 4 = Very Hot"]
+8: ["radTempResult", "A result file address containing the radiant temperature resultsfor each point for every hour of the analysis."],
+9: ["airTempResult", "A result file address containing the air temperature results for each point for every hour of the analysis."],
+10: ["PET_Result", "A result file address containing physiological equivalent temperature (PET) results for each point for every hour of the analysis."],
+11: ["PETComfResult", "A result file address containing the a series of 0's and 1's indicating whether a certain point is comfortable for every hour of the analysis."],
+12: ["PETCategoryResult", "A result file address containing the categories of PET.   These are either: -4 = Very Cold, -3 = Cold, -2 = Cool, -1 = Slightly Cool, 0 = Comfortable, 1 = Slightly Warm, 2 = Warm, 3 = Hot, 4 = Very Hot"]
 }
 
 
@@ -282,32 +284,40 @@ def processPrevailOutdoorTemp(prevailingOutdoorTemp, avgMonthOrRunMean):
     return prevailTemp, coldTimes
 
 
-def calculatePointMRT(srfTempDict, testPtsViewFactor, hour, originalHour, outdoorClac, outSrfTempDict, outdoorNonSrfViewFac, prevailingOutdoorTemp):
-    #Calculate the MRT for each point.
+def computeMRTMatrices(srfTempDict, testPtsViewFactor, HOYs, originalHOYs, outdoorClac, outSrfTempDict, outdoorNonSrfViewFac, prevailingOutdoorTemp):
+    #Calculate (T+273.15)^4 of every surface for all the hours once as an hours x surfaces matrix for each zone.
+    srfTempPowMtx = []
+    outdoorTempPow = []
+    outdoorDivisors = []
+    for zoneCount, pointList in enumerate(testPtsViewFactor):
+        srfCount = len(pointList[0]) if len(pointList) != 0 else 0
+        if outdoorClac == False or zoneCount != len(testPtsViewFactor)-1: tempDict = srfTempDict
+        else: tempDict = outSrfTempDict
+        
+        srfTemps = [tempDict[str([zoneCount,srfIndex])]["srfTemp"] for srfIndex in range(srfCount)]
+        srfTempPowMtx.append([[math.pow((srfTemp[hour-1] + 273.15),4) for srfTemp in srfTemps] for hour in HOYs])
+    
+    #The rest of the view for the outdoor points is the outdoor air.
+    if outdoorClac == True:
+        outdoorTempPow = [math.pow((prevailingOutdoorTemp[originalHour-1]+273.15),4) for originalHour in originalHOYs]
+        outdoorDivisors = [sum(pointViewFactor) + outdoorNonSrfViewFac[ptCount] for ptCount, pointViewFactor in enumerate(testPtsViewFactor[-1])]
+    
+    return srfTempPowMtx, outdoorTempPow, outdoorDivisors
+
+def calculatePointMRT(mrtMatrices, testPtsViewFactor, count, outdoorClac, outdoorNonSrfViewFac):
+    #Calculate the MRT for each point as the product of the view factors and the surface temperatures of the hour.
+    srfTempPowMtx, outdoorTempPow, outdoorDivisors = mrtMatrices
     pointMRTValues = []
     for zoneCount, pointList in enumerate(testPtsViewFactor):
+        srfTempPow = srfTempPowMtx[zoneCount][count]
         if outdoorClac == False or zoneCount != len(testPtsViewFactor)-1:
-            pointMRTValues.append([])
-            for pointViewFactor in pointList:
-                pointMRT = 0
-                for srfCount, srfView in enumerate(pointViewFactor):
-                    path  = str([zoneCount,srfCount])
-                    weightedSrfTemp = srfView*(math.pow((srfTempDict[path]["srfTemp"][hour] + 273.15),4))
-                    pointMRT = pointMRT+weightedSrfTemp
-                pointMRT = math.pow(pointMRT,0.25) - 273.15
-                pointMRTValues[zoneCount].append(round(pointMRT, 3))
+            pointMRTValues.append([round(math.pow(sum(map(operator.mul, pointViewFactor, srfTempPow)),0.25) - 273.15, 3) for pointViewFactor in pointList])
         else:
             pointMRTValues.append([])
             for ptCount, pointViewFactor in enumerate(pointList):
-                pointMRT = 0
-                for srfCount, srfView in enumerate(pointViewFactor):
-                    path  = str([zoneCount,srfCount])
-                    weightedSrfTemp = srfView*(math.pow((outSrfTempDict[path]["srfTemp"][hour]+273.15),4))
-                    pointMRT = pointMRT+weightedSrfTemp
-                
-                weightedSrfTemp = outdoorNonSrfViewFac[ptCount]*(math.pow((prevailingOutdoorTemp[originalHour]+273.15),4))
-                pointMRT = pointMRT+weightedSrfTemp
-                pointMRT = pointMRT / (sum(pointViewFactor) + outdoorNonSrfViewFac[ptCount])
+                pointMRT = sum(map(operator.mul, pointViewFactor, srfTempPow))
+                pointMRT = pointMRT + outdoorNonSrfViewFac[ptCount]*outdoorTempPow[count]
+                pointMRT = pointMRT / outdoorDivisors[ptCount]
                 pointMRT = math.pow(pointMRT,0.25) - 273.15
                 pointMRTValues[zoneCount].append(round(pointMRT, 3))
     
@@ -870,6 +880,9 @@ def mainAdapt(HOYs, analysisPeriod, srfTempNumbers, srfTempHeaders, airTempDataN
         #Run through every hour of the analysis to fill up the matrices.
         calcCancelled = False
         try:
+            #Compute the surface temperature matrices for all the hours.
+            mrtMatrices = computeMRTMatrices(srfTempDict, testPtsViewFactor, HOYs, originalHOYs, outdoorClac, outSrfTempDict, outdoorNonSrfViewFac, prevailingOutdoorTemp)
+            
             def climateMap(count):
                 #Ability to cancel with Esc
                 if gh.GH_Document.IsEscapeKeyDown(): assert False
@@ -885,7 +898,7 @@ def mainAdapt(HOYs, analysisPeriod, srfTempNumbers, srfTempHeaders, airTempDataN
                 for zoneVal in heatGainDataNumbers: heatGainValues.append(zoneVal[hour-1])
                 
                 #Compute the radiant temperature.
-                pointMRTValues = calculatePointMRT(srfTempDict, testPtsViewFactor, hour-1, originalHour-1, outdoorClac, outSrfTempDict, outdoorNonSrfViewFac, prevailingOutdoorTemp)
+                pointMRTValues = calculatePointMRT(mrtMatrices, testPtsViewFactor, count, outdoorClac, outdoorNonSrfViewFac)
                 if sum(zoneHasWindows) != 0:
                     if allWindowShadesSame == True: pointMRTValues = calculateSolarAdjustedMRT(pointMRTValues, hour, originalHour, diffSolarRad, directSolarRad, globHorizRad, count, sunVecInfo, testPtSkyView, testPtBlockedVec, winTrans, cloA, floorR, skyPatchMeshes, zoneHasWindows, outdoorClac, outHorizInfrared, lb_comfortModels)
                     else:
@@ -1066,6 +1079,9 @@ def mainPMV(HOYs, analysisPeriod, srfTempNumbers, srfTempHeaders, airTempDataNum
         #Run through every hour of the analysis to fill up the matrices.
         calcCancelled = False
         try:
+            #Compute the surface temperature matrices for all the hours.
+            mrtMatrices = computeMRTMatrices(srfTempDict, testPtsViewFactor, HOYs, originalHOYs, outdoorClac, outSrfTempDict, outdoorNonSrfViewFac, outDryBulbTemp)
+            
             def climateMapPMV(count):
                 #Ability to cancel with Esc
                 if gh.GH_Document.IsEscapeKeyDown(): assert False
@@ -1081,7 +1097,7 @@ def mainPMV(HOYs, analysisPeriod, srfTempNumbers, srfTempHeaders, airTempDataNum
                 for zoneVal in heatGainDataNumbers: heatGainValues.append(zoneVal[hour-1])
                 
                 #Compute the radiant temperature.
-                pointMRTValues = calculatePointMRT(srfTempDict, testPtsViewFactor, hour-1, originalHour-1, outdoorClac, outSrfTempDict, outdoorNonSrfViewFac, outDryBulbTemp)
+                pointMRTValues = calculatePointMRT(mrtMatrices, testPtsViewFactor, count, outdoorClac, outdoorNonSrfViewFac)
                 if sum(zoneHasWindows) != 0:
                     if allWindowShadesSame == True: pointMRTValues = calculateSolarAdjustedMRT(pointMRTValues, hour, originalHour, diffSolarRad, directSolarRad, globHorizRad, count, sunVecInfo, testPtSkyView, testPtBlockedVec, winTrans, cloA, floorR, skyPatchMeshes, zoneHasWindows, outdoorClac, horizInfraredRadiation, lb_comfortModels)
                     else:
@@ -1275,6 +1291,9 @@ def mainUTCI(HOYs, analysisPeriod, srfTempNumbers, srfTempHeaders, airTempDataNu
         #Run through every hour of the analysis to fill up the matrices.
         calcCancelled = False
         try:
+            #Compute the surface temperature matrices for all the hours.
+            mrtMatrices = computeMRTMatrices(srfTempDict, testPtsViewFactor, HOYs, originalHOYs, outdoorClac, outSrfTempDict, outdoorNonSrfViewFac, outDryBulbTemp)
+            
             def climateMapUTCI(count):
                 #Ability to cancel with Esc
                 if gh.GH_Document.IsEscapeKeyDown(): assert False
@@ -1290,7 +1309,7 @@ def mainUTCI(HOYs, analysisPeriod, srfTempNumbers, srfTempHeaders, airTempDataNu
                 for zoneVal in heatGainDataNumbers: heatGainValues.append(zoneVal[hour-1])
                 
                 #Compute the radiant temperature.
-                pointMRTValues = calculatePointMRT(srfTempDict, testPtsViewFactor, hour-1, originalHour-1, outdoorClac, outSrfTempDict, outdoorNonSrfViewFac, outDryBulbTemp)
+                pointMRTValues = calculatePointMRT(mrtMatrices, testPtsViewFactor, count, outdoorClac, outdoorNonSrfViewFac)
                 if sum(zoneHasWindows) != 0:
                     if allWindowShadesSame == True: pointMRTValues = calculateSolarAdjustedMRT(pointMRTValues, hour, originalHour, diffSolarRad, directSolarRad, globHorizRad, count, sunVecInfo, testPtSkyView, testPtBlockedVec, winTrans, cloA, floorR, skyPatchMeshes, zoneHasWindows, outdoorClac, horizInfraredRadiation, lb_comfortModels)
                     else:
@@ -1480,6 +1499,9 @@ def mainPET(HOYs, analysisPeriod, srfTempNumbers, srfTempHeaders, airTempDataNum
         #Run through every hour of the analysis to fill up the matrices.
         calcCancelled = False
         try:
+            #Compute the surface temperature matrices for all the hours.
+            mrtMatrices = computeMRTMatrices(srfTempDict, testPtsViewFactor, HOYs, originalHOYs, outdoorClac, outSrfTempDict, outdoorNonSrfViewFac, outDryBulbTemp)
+            
             def climateMapPET(count):
                 #Ability to cancel with Esc
                 if gh.GH_Document.IsEscapeKeyDown(): assert False
@@ -1495,7 +1517,7 @@ def mainPET(HOYs, analysisPeriod, srfTempNumbers, srfTempHeaders, airTempDataNum
                 for zoneVal in heatGainDataNumbers: heatGainValues.append(zoneVal[hour-1])
                 
                 #Compute the radiant temperature.
-                pointMRTValues = calculatePointMRT(srfTempDict, testPtsViewFactor, hour-1, originalHour-1, outdoorClac, outSrfTempDict, outdoorNonSrfViewFac, outDryBulbTemp)
+                pointMRTValues = calculatePointMRT(mrtMatrices, testPtsViewFactor, count, outdoorClac, outdoorNonSrfViewFac)
                 if sum(zoneHasWindows) != 0:
                     if allWindowShadesSame == True: pointMRTValues = calculateSolarAdjustedMRT(pointMRTValues, hour, originalHour, diffSolarRad, directSolarRad, globHorizRad, count, sunVecInfo, testPtSkyView, testPtBlockedVec, winTrans, cloA, floorR, skyPatchMeshes, zoneHasWindows, outdoorClac, horizInfraredRadiation, lb_comfortModels)
                     else:
@@ -1579,386 +1601,63 @@ def mainPET(HOYs, analysisPeriod, srfTempNumbers, srfTempHeaders, airTempDataNum
             return -1
 
 
-def writeCSVAdapt(lb_preparation, directory, fileName, radTempMtx, airTempMtx, operativeTempMtx, adaptComfMtx, degFromTargetMtx):
-    #Find out the number of values in each hour.
-    valLen = len(radTempMtx[-1])-1
-    
+def writeResultFiles(lb_preparation, directory, fileName, resultMtxs):
     #Set up a working directory.
     workingDir = lb_preparation.makeWorkingDir(os.path.join(directory)) 
     
-    #Create a csv Files.
-    radTempFile = fileName + "RadiantTemp.csv"
-    airTempFile = fileName + "AirTemp.csv"
-    opTempFile = fileName + "OperativeTemp.csv"
-    adaptComfFile = fileName + "AdaptComf.csv"
-    degFromTargetFile = fileName + "DegFromTarget.csv"
-    
-    #Write the radiant temperature result file.
-    if writeResultFile_ != 2:
-        radTempResult = os.path.join(workingDir, radTempFile)
-        radCSVfile = open(radTempResult, 'wb')
-        for lineCount, line in enumerate(radTempMtx):
-            lineStr = ''
-            if lineCount != 0:
-                for valCt, val in enumerate(line):
-                    if valCt != valLen: lineStr = lineStr + str(val) + ','
-                    else: lineStr = lineStr + str(val) + "\n"
-                radCSVfile.write(lineStr)
-            else: radCSVfile.write(line + "\n")
-        radCSVfile.close()
-    else:
-        radTempResult = None
-    
-    #Write the air temperature result file.
-    if writeResultFile_ != 2:
-        airTempResult = os.path.join(workingDir, airTempFile)
-        airCSVfile = open(airTempResult, 'wb')
-        for lineCount, line in enumerate(airTempMtx):
-            lineStr = ''
-            if lineCount != 0:
-                for valCt, val in enumerate(line):
-                    if valCt != valLen: lineStr = lineStr + str(val) + ','
-                    else: lineStr = lineStr + str(val) + "\n"
-                airCSVfile.write(lineStr)
-            else: airCSVfile.write(line + "\n")
-        airCSVfile.close()
-    else:
-        airTempResult = None
-    
-    #Write the operative temperature result file.
-    if writeResultFile_ != 2:
-        operativeTempResult = os.path.join(workingDir, opTempFile)
-        opCSVfile = open(operativeTempResult, 'wb')
-        for lineCount, line in enumerate(operativeTempMtx):
-            lineStr = ''
-            if lineCount != 0:
-                for valCt, val in enumerate(line):
-                    if valCt != valLen: lineStr = lineStr + str(val) + ','
-                    else: lineStr = lineStr + str(val) + "\n"
-                opCSVfile.write(lineStr)
-            else: opCSVfile.write(line + "\n")
-        opCSVfile.close()
-    else:
-        operativeTempResult = None
-    
-    #Write the adaptive comfort result file.
-    adaptComfResult = os.path.join(workingDir, adaptComfFile)
-    comfCSVfile = open(adaptComfResult, 'wb')
-    for lineCount, line in enumerate(adaptComfMtx):
-        lineStr = ''
-        if lineCount != 0:
-            for valCt, val in enumerate(line):
-                if valCt != valLen: lineStr = lineStr + str(val) + ','
-                else: lineStr = lineStr + str(val) + "\n"
-            comfCSVfile.write(lineStr)
-        else: comfCSVfile.write(line + "\n")
-    comfCSVfile.close()
-    
-    #Write the deg from target result file.
-    degFromTargetResult = os.path.join(workingDir, degFromTargetFile)
-    degCSVfile = open(degFromTargetResult, 'wb')
-    for lineCount, line in enumerate(degFromTargetMtx):
-        lineStr = ''
-        if lineCount != 0:
-            for valCt, val in enumerate(line):
-                if valCt != valLen: lineStr = lineStr + str(val) + ','
-                else: lineStr = lineStr + str(val) + "\n"
-            degCSVfile.write(lineStr)
-        else: degCSVfile.write(line + "\n")
-    degCSVfile.close()
-    
-    
-    return radTempResult, airTempResult, operativeTempResult, adaptComfResult, degFromTargetResult
+    #Write each matrix into a binary matrix file or into a csv file.
+    resultMtxs = [(fileName + fileSuffix, resultMtx) for fileSuffix, resultMtx in resultMtxs]
+    return hb_comfortMatrixFile.writeResultFiles(workingDir, resultMtxs, writeCSV_)
 
 
-def writeCSVPMV(lb_preparation, directory, fileName, radTempMtx, airTempMtx, SET_Mtx, PMVComfMtx, PMV_Mtx):
-    #Find out the number of values in each hour.
-    valLen = len(radTempMtx[-1])-1
-    
-    #Set up a working directory.
-    workingDir = lb_preparation.makeWorkingDir(os.path.join(directory)) 
-    
-    #Create a csv Files.
-    radTempFile = fileName + "RadiantTemp.csv"
-    airTempFile = fileName + "AirTemp.csv"
-    SETFile = fileName + "SET.csv"
-    PPDFile = fileName + "PPD.csv"
-    PMVFile = fileName + "PMV.csv"
-    
-    #Write the radiant temperature result file.
-    if writeResultFile_ != 2:
-        radTempResult = os.path.join(workingDir, radTempFile)
-        radCSVfile = open(radTempResult, 'wb')
-        for lineCount, line in enumerate(radTempMtx):
-            lineStr = ''
-            if lineCount != 0:
-                for valCt, val in enumerate(line):
-                    if valCt != valLen: lineStr = lineStr + str(val) + ','
-                    else: lineStr = lineStr + str(val) + "\n"
-                radCSVfile.write(lineStr)
-            else: radCSVfile.write(line + "\n")
-        radCSVfile.close()
-    else:
-        radTempResult = None
-    
-    #Write the air temperature result file.
-    if writeResultFile_ != 2:
-        airTempResult = os.path.join(workingDir, airTempFile)
-        airCSVfile = open(airTempResult, 'wb')
-        for lineCount, line in enumerate(airTempMtx):
-            lineStr = ''
-            if lineCount != 0:
-                for valCt, val in enumerate(line):
-                    if valCt != valLen: lineStr = lineStr + str(val) + ','
-                    else: lineStr = lineStr + str(val) + "\n"
-                airCSVfile.write(lineStr)
-            else: airCSVfile.write(line + "\n")
-        airCSVfile.close()
-    else:
-        airTempResult = None
-    
-    #Write the operative temperature result file.
-    if writeResultFile_ != 2:
-        SET_Result = os.path.join(workingDir, SETFile)
-        opCSVfile = open(SET_Result, 'wb')
-        for lineCount, line in enumerate(SET_Mtx):
-            lineStr = ''
-            if lineCount != 0:
-                for valCt, val in enumerate(line):
-                    if valCt != valLen: lineStr = lineStr + str(val) + ','
-                    else: lineStr = lineStr + str(val) + "\n"
-                opCSVfile.write(lineStr)
-            else: opCSVfile.write(line + "\n")
-        opCSVfile.close()
-    else:
-        SET_Result = None
-    
-    #Write the adaptive comfort result file.
-    PPD_Result = os.path.join(workingDir, PPDFile)
-    comfCSVfile = open(PPD_Result, 'wb')
-    for lineCount, line in enumerate(PMVComfMtx):
-        lineStr = ''
-        if lineCount != 0:
-            for valCt, val in enumerate(line):
-                if valCt != valLen: lineStr = lineStr + str(val) + ','
-                else: lineStr = lineStr + str(val) + "\n"
-            comfCSVfile.write(lineStr)
-        else: comfCSVfile.write(line + "\n")
-    comfCSVfile.close()
-    
-    #Write the deg from target result file.
-    PMV_Result = os.path.join(workingDir, PMVFile)
-    degCSVfile = open(PMV_Result, 'wb')
-    for lineCount, line in enumerate(PMV_Mtx):
-        lineStr = ''
-        if lineCount != 0:
-            for valCt, val in enumerate(line):
-                if valCt != valLen: lineStr = lineStr + str(val) + ','
-                else: lineStr = lineStr + str(val) + "\n"
-            degCSVfile.write(lineStr)
-        else: degCSVfile.write(line + "\n")
-    degCSVfile.close()
+def writeResultsAdapt(lb_preparation, directory, fileName, radTempMtx, airTempMtx, operativeTempMtx, adaptComfMtx, degFromTargetMtx):
+    #The radiant, air and operative temperature are not written if the user only wants the comfort results.
+    if writeResultFile_ == 2: radTempMtx, airTempMtx, operativeTempMtx = None, None, None
     
-    
-    return radTempResult, airTempResult, SET_Result, PPD_Result, PMV_Result
+    return writeResultFiles(lb_preparation, directory, fileName, [("RadiantTemp", radTempMtx), ("AirTemp", airTempMtx), \
+        ("OperativeTemp", operativeTempMtx), ("AdaptComf", adaptComfMtx), ("DegFromTarget", degFromTargetMtx)])
 
-def writeCSVUTCI(lb_preparation, directory, fileName, radTempMtx, airTempMtx, UTCI_Mtx, OutdoorComfMtx, DegFromNeutralMtx):
-    #Find out the number of values in each hour.
-    valLen = len(radTempMtx[-1])-1
-    
-    #Set up a working directory.
-    workingDir = lb_preparation.makeWorkingDir(os.path.join(directory)) 
-    
-    #Create a csv Files.
-    radTempFile = fileName + "RadiantTemp.csv"
-    airTempFile = fileName + "AirTemp.csv"
-    UTCIFile = fileName + "UTCI.csv"
-    OutdoorComfFile = fileName + "OutdoorComf.csv"
-    DegFromNeutralFile = fileName + "DegFromTarget.csv"
-    
-    #Write the radiant temperature result file.
-    if writeResultFile_ != 2:
-        radTempResult = os.path.join(workingDir, radTempFile)
-        radCSVfile = open(radTempResult, 'wb')
-        for lineCount, line in enumerate(radTempMtx):
-            lineStr = ''
-            if lineCount != 0:
-                for valCt, val in enumerate(line):
-                    if valCt != valLen: lineStr = lineStr + str(val) + ','
-                    else: lineStr = lineStr + str(val) + "\n"
-                radCSVfile.write(lineStr)
-            else: radCSVfile.write(line + "\n")
-        radCSVfile.close()
-    else:
-        radTempResult = None
-    
-    #Write the air temperature result file.
-    if writeResultFile_ != 2:
-        airTempResult = os.path.join(workingDir, airTempFile)
-        airCSVfile = open(airTempResult, 'wb')
-        for lineCount, line in enumerate(airTempMtx):
-            lineStr = ''
-            if lineCount != 0:
-                for valCt, val in enumerate(line):
-                    if valCt != valLen: lineStr = lineStr + str(val) + ','
-                    else: lineStr = lineStr + str(val) + "\n"
-                airCSVfile.write(lineStr)
-            else: airCSVfile.write(line + "\n")
-        airCSVfile.close()
-    else:
-        airTempResult = None
-    
-    #Write the operative temperature result file.
-    if writeResultFile_ != 2:
-        UTCI_Result = os.path.join(workingDir, UTCIFile)
-        opCSVfile = open(UTCI_Result, 'wb')
-        for lineCount, line in enumerate(UTCI_Mtx):
-            lineStr = ''
-            if lineCount != 0:
-                for valCt, val in enumerate(line):
-                    if valCt != valLen: lineStr = lineStr + str(val) + ','
-                    else: lineStr = lineStr + str(val) + "\n"
-                opCSVfile.write(lineStr)
-            else: opCSVfile.write(line + "\n")
-        opCSVfile.close()
-    else:
-        UTCI_Result = None
-    
-    #Write the adaptive comfort result file.
-    OutdoorComfResult = os.path.join(workingDir, OutdoorComfFile)
-    comfCSVfile = open(OutdoorComfResult, 'wb')
-    for lineCount, line in enumerate(OutdoorComfMtx):
-        lineStr = ''
-        if lineCount != 0:
-            for valCt, val in enumerate(line):
-                if valCt != valLen: lineStr = lineStr + str(val) + ','
-                else: lineStr = lineStr + str(val) + "\n"
-            comfCSVfile.write(lineStr)
-        else: comfCSVfile.write(line + "\n")
-    comfCSVfile.close()
-    
-    #Write the deg from target result file.
-    DegFromNeutralResult = os.path.join(workingDir, DegFromNeutralFile)
-    degCSVfile = open(DegFromNeutralResult, 'wb')
-    for lineCount, line in enumerate(DegFromNeutralMtx):
-        lineStr = ''
-        if lineCount != 0:
-            for valCt, val in enumerate(line):
-                if valCt != valLen: lineStr = lineStr + str(val) + ','
-                else: lineStr = lineStr + str(val) + "\n"
-            degCSVfile.write(lineStr)
-        else: degCSVfile.write(line + "\n")
-    degCSVfile.close()
-    
-    
-    return radTempResult, airTempResult, UTCI_Result, OutdoorComfResult, DegFromNeutralResult
 
-def writeCSVPET(lb_preparation, directory, fileName, radTempMtx, airTempMtx, PET_Mtx, PETComfMtx, PETCategoryMtx):
-    #Find out the number of values in each hour.
-    valLen = len(radTempMtx[-1])-1
-    
-    #Set up a working directory.
-    workingDir = lb_preparation.makeWorkingDir(os.path.join(directory)) 
-    
-    #Create a csv Files.
-    radTempFile = fileName + "RadiantTemp.csv"
-    airTempFile = fileName + "AirTemp.csv"
-    PETFile = fileName + "PET.csv"
-    PETComfFile = fileName + "PETComf.csv"
-    PETCategoryFile = fileName + "PETCategory.csv"
-    
-    #Write the radiant temperature result file.
-    if writeResultFile_ != 2:
-        radTempResult = os.path.join(workingDir, radTempFile)
-        radCSVfile = open(radTempResult, 'wb')
-        for lineCount, line in enumerate(radTempMtx):
-            lineStr = ''
-            if lineCount != 0:
-                for valCt, val in enumerate(line):
-                    if valCt != valLen: lineStr = lineStr + str(val) + ','
-                    else: lineStr = lineStr + str(val) + "\n"
-                radCSVfile.write(lineStr)
-            else: radCSVfile.write(line + "\n")
-        radCSVfile.close()
-    else:
-        radTempResult = None
-    
-    #Write the air temperature result file.
-    if writeResultFile_ != 2:
-        airTempResult = os.path.join(workingDir, airTempFile)
-        airCSVfile = open(airTempResult, 'wb')
-        for lineCount, line in enumerate(airTempMtx):
-            lineStr = ''
-            if lineCount != 0:
-                for valCt, val in enumerate(line):
-                    if valCt != valLen: lineStr = lineStr + str(val) + ','
-                    else: lineStr = lineStr + str(val) + "\n"
-                airCSVfile.write(lineStr)
-            else: airCSVfile.write(line + "\n")
-        airCSVfile.close()
-    else:
-        airTempResult = None
+def writeResultsPMV(lb_preparation, directory, fileName, radTempMtx, airTempMtx, SET_Mtx, PMVComfMtx, PMV_Mtx):
+    if writeResultFile_ == 2: radTempMtx, airTempMtx, SET_Mtx = None, None, None
     
-    #Write the operative temperature result file.
-    if writeResultFile_ != 2:
-        PET_Result = os.path.join(workingDir, PETFile)
-        opCSVfile = open(PET_Result, 'wb')
-        for lineCount, line in enumerate(PET_Mtx):
-            lineStr = ''
-            if lineCount != 0:
-                for valCt, val in enumerate(line):
-                    if valCt != valLen: lineStr = lineStr + str(val) + ','
-                    else: lineStr = lineStr + str(val) + "\n"
-                opCSVfile.write(lineStr)
-            else: opCSVfile.write(line + "\n")
-        opCSVfile.close()
-    else:
-        PET_Result = None
-    
-    #Write the adaptive comfort result file.
-    PET_ComfResult = os.path.join(workingDir, PETComfFile)
-    comfCSVfile = open(PET_ComfResult, 'wb')
-    for lineCount, line in enumerate(PETComfMtx):
-        lineStr = ''
-        if lineCount != 0:
-            for valCt, val in enumerate(line):
-                if valCt != valLen: lineStr = lineStr + str(val) + ','
-                else: lineStr = lineStr + str(val) + "\n"
-            comfCSVfile.write(lineStr)
-        else: comfCSVfile.write(line + "\n")
-    comfCSVfile.close()
-    
-    #Write the deg from target result file.
-    PET_CategoryResult = os.path.join(workingDir, PETCategoryFile)
-    degCSVfile = open(PET_CategoryResult, 'wb')
-    for lineCount, line in enumerate(PETCategoryMtx):
-        lineStr = ''
-        if lineCount != 0:
-            for valCt, val in enumerate(line):
-                if valCt != valLen: lineStr = lineStr + str(val) + ','
-                else: lineStr = lineStr + str(val) + "\n"
-            degCSVfile.write(lineStr)
-        else: degCSVfile.write(line + "\n")
-    degCSVfile.close()
+    return writeResultFiles(lb_preparation, directory, fileName, [("RadiantTemp", radTempMtx), ("AirTemp", airTempMtx), \
+        ("SET", SET_Mtx), ("PPD", PMVComfMtx), ("PMV", PMV_Mtx)])
+
+
+def writeResultsUTCI(lb_preparation, directory, fileName, radTempMtx, airTempMtx, UTCI_Mtx, OutdoorComfMtx, DegFromNeutralMtx):
+    if writeResultFile_ == 2: radTempMtx, airTempMtx, UTCI_Mtx = None, None, None
     
+    return writeResultFiles(lb_preparation, directory, fileName, [("RadiantTemp", radTempMtx), ("AirTemp", airTempMtx), \
+        ("UTCI", UTCI_Mtx), ("OutdoorComf", OutdoorComfMtx), ("DegFromTarget", DegFromNeutralMtx)])
+
+
+def writeResultsPET(lb_preparation, directory, fileName, radTempMtx, airTempMtx, PET_Mtx, PETComfMtx, PETCategoryMtx):
+    if writeResultFile_ == 2: radTempMtx, airTempMtx, PET_Mtx = None, None, None
     
-    return radTempResult, airTempResult, PET_Result, PET_ComfResult, PET_CategoryResult
+    return writeResultFiles(lb_preparation, directory, fileName, [("RadiantTemp", radTempMtx), ("AirTemp", airTempMtx), \
+        ("PET", PET_Mtx), ("PETComf", PETComfMtx), ("PETCategory", PETCategoryMtx)])
+
 
+# writeCSV_ is not an input of the component yet
+try: writeCSV_
+except: writeCSV_ = False
 
 #Import the classes, check the inputs, and generate default values for grid size if the user has given none.
 checkLB = True
-if sc.sticky.has_key('ladybug_release'):
+if sc.sticky.has_key('ladybug_release') and sc.sticky.has_key('honeybee_release') and sc.sticky.has_key('honeybee_ComfortMatrixFile'):
     lb_defaultFolder = sc.sticky["Ladybug_DefaultFolder"]
     lb_preparation = sc.sticky["ladybug_Preparation"]()
     lb_visualization = sc.sticky["ladybug_ResultVisualization"]()
     lb_sunpath = sc.sticky["ladybug_SunPath"]()
     lb_comfortModels = sc.sticky["ladybug_ComfortModels"]()
     lb_wind = sc.sticky["ladybug_WindSpeed"]()
+    hb_comfortMatrixFile = sc.sticky["honeybee_ComfortMatrixFile"]
 else:
     checkLB = False
-    print "You should let the Ladybug fly first..."
+    print "You should let the Ladybug and Honeybee fly first..."
     w = gh.GH_RuntimeMessageLevel.Warning
-    ghenv.Component.AddRuntimeMessage(w, "You should let the Ladybug fly first...")
+    ghenv.Component.AddRuntimeMessage(w, "You should let the Ladybug and Honeybee fly first...")
 
 
 #Check the type of comfort analysis recipe connected.
@@ -1996,22 +1695,22 @@ if checkData == True and _runIt == True:
         if result != -1:
             radTempMtx, airTempMtx, operativeTempMtx, adaptComfMtx, degFromTargetMtx = result
             if writeResultFile_ != 0:
-                radTempResult, airTempResult, operativeTempResult, adaptComfResult, degFromTargetResult = writeCSVAdapt(lb_preparation, directory, fileName, radTempMtx, airTempMtx, operativeTempMtx, adaptComfMtx, degFromTargetMtx)
+                radTempResult, airTempResult, operativeTempResult, adaptComfResult, degFromTargetResult = writeResultsAdapt(lb_preparation, directory, fileName, radTempMtx, airTempMtx, operativeTempMtx, adaptComfMtx, degFromTargetMtx)
     elif comfortModel == "PMV":
         result = mainPMV(HOYs, analysisPeriod, srfTempNumbers, srfTempHeaders, airTempDataNumbers, airTempDataHeaders, flowVolDataHeaders, flowVolDataNumbers, heatGainDataHeaders, heatGainDataNumbers, relHumidDataHeaders, relHumidDataNumbers, clothingLevel, metabolicRate, zoneSrfNames, testPtViewFactor, viewFactorMesh, latitude, longitude, timeZone, diffSolarRad, directSolarRad, globHorizRad, testPtSkyView, testPtBlockedVec, numSkyPatchDivs, winTrans, cloA, floorR, testPtZoneNames, testPtZoneWeights, ptHeightWeights, zoneInletInfo, inletHeightOverride, PPDComfortThresh, humidRatioUp, humidRatioLow, mixedAirOverride, zoneHasWindows, outdoorClac, outSrfTempHeaders, outSrfTempNumbers, outdoorNonSrfViewFac, outDryBulbTemp, outRelHumid, outWindSpeed, d, a, outdoorPtHeightWeights, allWindowShadesSame, winStatusHeaders, testPtBlockName, zoneWindowTransmiss, zoneWindowNames, allWindSpeedsSame, winSpeedNumbers, dataAnalysisPeriod, northAngle, horizInfraredRadiation, lb_preparation, lb_sunpath, lb_comfortModels, lb_wind)
         if result != -1:
             radTempMtx, airTempMtx, SET_Mtx, PMVComfMtx, PMV_Mtx = result
             if writeResultFile_ != 0:
-                radTempResult, airTempResult, SET_Result, PMVComfResult, PMV_Result = writeCSVPMV(lb_preparation, directory, fileName, radTempMtx, airTempMtx, SET_Mtx, PMVComfMtx, PMV_Mtx)
+                radTempResult, airTempResult, SET_Result, PMVComfResult, PMV_Result = writeResultsPMV(lb_preparation, directory, fileName, radTempMtx, airTempMtx, SET_Mtx, PMVComfMtx, PMV_Mtx)
     elif comfortModel == "UTCI":
         result = mainUTCI(HOYs, analysisPeriod, srfTempNumbers, srfTempHeaders, airTempDataNumbers, airTempDataHeaders, flowVolDataHeaders, flowVolDataNumbers, heatGainDataHeaders, heatGainDataNumbers, relHumidDataHeaders, relHumidDataNumbers, zoneSrfNames, testPtViewFactor, viewFactorMesh, latitude, longitude, timeZone, diffSolarRad, directSolarRad, globHorizRad, testPtSkyView, testPtBlockedVec, numSkyPatchDivs, winTrans, cloA, floorR, testPtZoneNames, testPtZoneWeights, ptHeightWeights, zoneInletInfo, inletHeightOverride, mixedAirOverride, zoneHasWindows, outdoorClac, outSrfTempHeaders, outSrfTempNumbers, outdoorNonSrfViewFac, outDryBulbTemp, outRelHumid, outWindSpeed, d, a, outdoorPtHeightWeights, allWindowShadesSame, winStatusHeaders, testPtBlockName, zoneWindowTransmiss, zoneWindowNames, allWindSpeedsSame, winSpeedNumbers, dataAnalysisPeriod, northAngle, horizInfraredRadiation, lb_preparation, lb_sunpath, lb_comfortModels, lb_wind)
         if result != -1:
             radTempMtx, airTempMtx, UTCI_Mtx, OutdoorComfMtx, DegFromNeutralMtx = result
             if writeResultFile_ != 0:
-                radTempResult, airTempResult, UTCI_Result, OutdoorComfResult, DegFromNeutralResult = writeCSVUTCI(lb_preparation, directory, fileName, radTempMtx, airTempMtx, UTCI_Mtx, OutdoorComfMtx, DegFromNeutralMtx)
+                radTempResult, airTempResult, UTCI_Result, OutdoorComfResult, DegFromNeutralResult = writeResultsUTCI(lb_preparation, directory, fileName, radTempMtx, airTempMtx, UTCI_Mtx, OutdoorComfMtx, DegFromNeutralMtx)
     elif comfortModel == "PET":
         result = mainPET(HOYs, analysisPeriod, srfTempNumbers, srfTempHeaders, airTempDataNumbers, airTempDataHeaders, flowVolDataHeaders, flowVolDataNumbers, heatGainDataHeaders, heatGainDataNumbers, relHumidDataHeaders, relHumidDataNumbers, zoneSrfNames, testPtViewFactor, viewFactorMesh, latitude, longitude, timeZone, diffSolarRad, directSolarRad, globHorizRad, testPtSkyView, testPtBlockedVec, numSkyPatchDivs, winTrans, cloA, floorR, testPtZoneNames, testPtZoneWeights, ptHeightWeights, zoneInletInfo, inletHeightOverride, mixedAirOverride, zoneHasWindows, outdoorClac, outSrfTempHeaders, outSrfTempNumbers, outdoorNonSrfViewFac, outDryBulbTemp, outRelHumid, outWindSpeed, d, a, outdoorPtHeightWeights, allWindowShadesSame, winStatusHeaders, testPtBlockName, zoneWindowTransmiss, zoneWindowNames, allWindSpeedsSame, winSpeedNumbers, dataAnalysisPeriod, northAngle, bodyCharacteristics, climate, horizInfraredRadiation, lb_preparation, lb_sunpath, lb_comfortModels, lb_wind)
         if result != -1:
             radTempMtx, airTempMtx, PET_Mtx, PET_ComfMtx, PET_CategoryMtx = result
             if writeResultFile_ != 0:
-                radTempResult, airTempResult, PET_Result, PET_ComfResult, PET_CategoryResult = writeCSVPET(lb_preparation, directory, fileName, radTempMtx, airTempMtx, PET_Mtx, PET_ComfMtx, PET_CategoryMtx)
+                radTempResult, airTempResult, PET_Result, PET_ComfResult, PET_CategoryResult = writeResultsPET(lb_preparation, directory, fileName, radTempMtx, airTempMtx, PET_Mtx, PET_ComfMtx, PET_CategoryMtx)
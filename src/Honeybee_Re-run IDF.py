@@ -31,6 +31,8 @@ Provided by Ladybug 0.0.45
         _idfFilePath: The full file path to the idf file on your system that you would like to run (e.g. C:\ladybug\sample1.idf).
         _epwFileAddress: The full file path to epw weather file that you would like the simulation to run with.
         parallel_: Set to "True" to run multiple IDFs using multiple CPUs.  Note that this input is only relevant when you have plugged in a list of IDF file addresses.
+            Multiple IDFs run in separate folders under a batchRuns folder next to the first IDF with one less simulation than the number of CPUs at a time.
+            A manifest.json file in that folder records each run and IDFs that have not changed since their last successful run will not be re-ran.
         runIt_: Set to 'True' to run the simulation.  You can also connect a 2 to run the simulation in the background.
     Returns:
         report: Report!
@@ -56,7 +58,6 @@ import shutil
 import Grasshopper.Kernel as gh
 import time
 import subprocess
-import System.Threading.Tasks as tasks
 
 def checkTheInputs(idfFileName, epwWeatherFile):
     w = gh.GH_RuntimeMessageLevel.Warning
@@ -152,37 +153,42 @@ def runBatchFile(batchFileAddress, runInBackground):
         os.system(batchFileAddress)
 
 def runParallelIDFs(idfFilePaths, epwFileAddress, runIt, parallel):
+    hb_EPBatchRunner = sc.sticky["honeybee_EPBatchRunner"]
+    
     # placeholders for final lists.
     resultFileAddress = [None for x in idfFilePaths]
     eioFileAddress = [None for x in idfFilePaths]
     rddFileAddress = [None for x in idfFilePaths]
     
-    reunInBackground = runIt
-    if parallel == True:
-        runInBackground = 2
+    epPath = -1
+    validIndices = []
+    for i, idfFilePath in enumerate(idfFilePaths):
+        checkResult = checkTheInputs(idfFilePath, epwFileAddress)
+        if checkResult != -1:
+            epPath = checkResult
+            validIndices.append(i)
     
-    def runEP(i):
-        epPath = checkTheInputs(idfFilePaths[i], _epwFileAddress)
-        if epPath != -1:
-            workingDir = "\\".join(idfFilePaths[i].split('\\')[:-1])
-            batchFileAddress, newIDFPath, idfFileName = writeBatchFile(workingDir, idfFilePaths[i], _epwFileAddress, epPath)
-            runBatchFile(batchFileAddress, runInBackground)
-            try:
-                os.remove(newIDFPath)
-            except:
-                pass
-            
-            shIdfFileName = idfFileName.replace('.idf', '')
-            resultFileAddress[i] = str(workingDir) + '\\' + str(shIdfFileName) + '.csv'
-            eioFileAddress[i] = resultFileAddress[i].replace('.csv', '.eio')
-            rddFileAddress[i] = resultFileAddress[i].replace('.csv', '.rdd')
+    if len(validIndices) == 0:
+        return resultFileAddress, eioFileAddress, rddFileAddress
     
-    if parallel == True:
-        tasks.Parallel.ForEach(range(len(idfFilePaths)), runEP)
-    else:
-        for x in range(len(idfFilePaths)):
-            runEP(x)
+    # each IDF runs in its own folder and the runs are recorded in a manifest
+    # so unchanged IDFs won't be re-ran. Identical IDFs share the same run.
+    batchFolder = os.path.join(os.path.dirname(idfFilePaths[validIndices[0]]), "batchRuns")
+    maxPRuns = None if parallel == True else 1
+    runInBackground = parallel == True or runIt > 1
+    runner = hb_EPBatchRunner(batchFolder, epPath, maxPRuns, shell = runInBackground)
+    
+    runs = [runner.addRun(idfFilePaths[i], epwFileAddress) for i in validIndices]
+    runner.run()
+    print runner
     
+    for i, run in zip(validIndices, runs):
+        if run["status"] not in ("done", "cached"):
+            warning = "%s has failed. Check the .err file in %s"%(run["name"], run["runFolder"])
+            ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
+        resultFileAddress[i] = run["results"].get("csv")
+        eioFileAddress[i] = run["results"].get("eio")
+        rddFileAddress[i] = run["results"].get("rdd")
     
     return resultFileAddress, eioFileAddress, rddFileAddress
 
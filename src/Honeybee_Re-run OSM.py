@@ -31,6 +31,8 @@ Provided by Ladybug 0.0.45
         _osmFilePath: A full file path to an OpenStdio Model (.osm) file.
         _epwFileAddress: A full file path to an epw weather file.
         parallel_: Set to "True" to run multiple IDFs using multiple CPUs.  Note that this input is only relevant when you have plugged in a list of OSM file addresses.
+            Multiple models run in separate folders under a batchRuns folder next to the first OSM with one less simulation than the number of CPUs at a time.
+            A manifest.json file in that folder records each run and models that have not changed since their last successful run will not be re-ran.
         _runIt: Set to "True" to have the component generate an IDF file from the OSM file and run the IDF through through EnergyPlus.  Set to "False" to not run the file (this is the default).  You can also connect an integer for the following options:
             0 = Do Not Run OSM and IDF thrrough EnergyPlus
             1 = Run the OSM and IDF through EnergyPlus with a command prompt window that displays the progress of the simulation
@@ -61,7 +63,6 @@ import shutil
 import Grasshopper.Kernel as gh
 import time
 import subprocess
-import System.Threading.Tasks as tasks
 
 def checkTheInputs(osmFileName, epwWeatherFile):
     w = gh.GH_RuntimeMessageLevel.Warning
@@ -209,41 +210,52 @@ def main(epwFile, osmFile, runEnergyPlus, openStudioLibFolder):
     return workingDir, os.path.join(idfFolder, "ModelToIdf", "in.idf"), resultFile, eioFile, rddFile
 
 def main_parallel(epwFile, osmFiles, runEnergyPlus, parallel, openStudioLibFolder):
+    hb_EPBatchRunner = sc.sticky["honeybee_EPBatchRunner"]
+    
     # placeholders.
     idfFileAddress = [None for x in osmFiles]
     resultFileAddress = [None for x in osmFiles]
     eioFileAddress = [None for x in osmFiles]
     rddFileAddress = [None for x in osmFiles]
     
-    runInBackground = False
-    if parallel == True:
-        runInBackground = True
-    elif runEnergyPlus > 1:
-        runInBackground = True
-    
-    def runOS(i):
-        fileCheck = checkTheInputs(osmFiles[i], epwFile)
+    # translate the models to idf files
+    projectNames = {}
+    for i, osmFile in enumerate(osmFiles):
+        fileCheck = checkTheInputs(osmFile, epwFile)
         if fileCheck != -1:
             # Preparation
-            workingDir, fileName = os.path.split(osmFiles[i])
+            workingDir, fileName = os.path.split(osmFile)
             projectName = (".").join(fileName.split(".")[:-1])
-            osmPath = ops.Path(osmFiles[i])
+            osmPath = ops.Path(osmFile)
             # create idf
             idfFolder, idfPath = osmToidf(workingDir, projectName, osmPath)
-            idfFileAddress[i] = idfFolder + "ModelToIdf\\in.idf"
-            
-            if runEnergyPlus < 3:
-                osmDirect = '/'.join(openStudioLibFolder.split('/')[:-3])
-                resultFile = writeBatchFile(idfFolder, "ModelToIdf\\in.idf", epwFile, getEPFolder(osmDirect), runInBackground)
-                resultFileAddress[i] = resultFile
-                eioFileAddress[i] = resultFile.replace('.csv', '.eio')
-                rddFileAddress[i] = resultFile.replace('.csv', '.rdd')
+            idfFileAddress[i] = os.path.join(idfFolder, "ModelToIdf", "in.idf")
+            projectNames[i] = projectName
     
-    if parallel == True:
-        tasks.Parallel.ForEach(range(len(osmFiles)), runOS)
-    else:
-        for x in range(len(osmFiles)):
-            runOS(x)
+    if runEnergyPlus >= 3 or len(projectNames) == 0:
+        return None, idfFileAddress, resultFileAddress, eioFileAddress, rddFileAddress
+    
+    # each model runs in its own folder and the runs are recorded in a manifest
+    # so unchanged models won't be re-ran.
+    osmDirect = '/'.join(openStudioLibFolder.split('/')[:-3])
+    firstIndex = min(projectNames.keys())
+    batchFolder = os.path.join(os.path.dirname(osmFiles[firstIndex]), "batchRuns")
+    maxPRuns = None if parallel == True else 1
+    runInBackground = parallel == True or runEnergyPlus > 1
+    runner = hb_EPBatchRunner(batchFolder, getEPFolder(osmDirect), maxPRuns, shell = runInBackground)
+    
+    runs = dict((i, runner.addRun(idfFileAddress[i], epwFile, projectName)) \
+                for i, projectName in projectNames.iteritems())
+    runner.run()
+    print runner
+    
+    for i, run in runs.iteritems():
+        if run["status"] not in ("done", "cached"):
+            warning = "%s has failed. Check the .err file in %s"%(run["name"], run["runFolder"])
+            ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
+        resultFileAddress[i] = run["results"].get("csv")
+        eioFileAddress[i] = run["results"].get("eio")
+        rddFileAddress[i] = run["results"].get("rdd")
     
     return None, idfFileAddress, resultFileAddress, eioFileAddress, rddFileAddress
 
@@ -46,11 +46,11 @@ Provided by Honeybee 0.0.63
 """
 ghenv.Component.Name = "Honeybee_Read Annual Result I"
 ghenv.Component.NickName = 'readAnnualResultsI'
-ghenv.Component.Message = 'VER 0.0.63\nJAN_20_2018'
+ghenv.Component.Message = 'VER 0.0.63\nOCT_18_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "04 | Daylight | Daylight"
-#compatibleHBVersion = VER 0.0.57\nNOV_03_2015
+#compatibleHBVersion = VER 0.0.63\nOCT_18_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 try: ghenv.Component.AdditionalHelpFromDocStrings = "2"
 except: pass
@@ -64,8 +64,6 @@ from Grasshopper.Kernel.Data import GH_Path
 import Rhino as rc
 import scriptcontext as sc
 import os
-import subprocess
-import time
 import shutil
 
 """
@@ -84,59 +82,6 @@ def getFilelength(fileName):
             pass
     return i + 1
 
-def executeBatchFiles(batchFileNames, maxPRuns = None, shell = False, waitingTime = 0.2):
-
-    """Run a number of batch files in parallel and
-        wait to end of the analysis.
-
-        Args:
-            batchFileNames: List of batch files
-            maxPRuns: max number of files to be ran in parallel (default = 0)
-            shell: set to True if you do NOT want to see the cmd window while the analysis is runnig
-    """
-
-    if not maxPRuns : maxPRuns = 1
-    maxPRuns = int(maxPRuns)
-    total = len(batchFileNames)
-    
-    if maxPRuns < 1: maxPRuns = 1
-    if maxPRuns > total: maxPRuns = total
-    
-    running = 0
-    done = False
-    jobs = []
-    pid = 0
-    
-    try:
-        while not done:
-            if running < maxPRuns and pid < total:
-                # execute the files
-                jobs.append(subprocess.Popen(batchFileNames[pid].replace("\\", "/") , shell = shell))
-                pid+=1
-                time.sleep(waitingTime)
-            
-            # count how many jobs are running and how many are done
-            running = 0
-            finished = 0
-            for job in jobs:
-                if job.poll() is None:
-                    #one job is still running
-                    running += 1
-                else:
-                    finished += 1
-    
-            if running == maxPRuns:
-                # wait for half a second
-                #print "waiting..."
-                time.sleep(waitingTime)
-    
-            if finished ==  total:
-                done = True
-    
-    except Exception, e:
-        print "Something went wrong: %s"%str(e) 
-
-
 def convertIllFileDaraTreeIntoSortedDictionary(illFilesAddress):
     
     # I should move this function into Honeybee_Honeybee #BadPractice!
@@ -806,7 +751,15 @@ def main(illFilesAddress, testPts, testVecs, occFiles, lightingControlGroups, SH
         batchFileName = os.path.join(filePath, fileName)
         fileNames.append(batchFileName)
 
-    executeBatchFiles(fileNames, ncpus - 1, shell=runInBackground)
+    jobScheduler = sc.sticky["honeybee_JobScheduler"](ncpus - 1, shell = runInBackground)
+    for batchFileName in fileNames:
+        jobScheduler.addJob(batchFileName, workingDir = filePath)
+    jobScheduler.run()
+    
+    for job in jobScheduler.jobs:
+        if job.status != "done":
+            warning = "%s %s after %d attempt(s)."%(job.name, job.status, job.attempts)
+            ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warning)
     
     # calculate sDA    
     
@@ -39,11 +39,11 @@ Provided by Honeybee 0.0.63
 """
 ghenv.Component.Name = "Honeybee_Read DS Result for a point"
 ghenv.Component.NickName = 'readDSHourlyResults'
-ghenv.Component.Message = 'VER 0.0.63\nJAN_20_2018'
+ghenv.Component.Message = 'VER 0.0.63\nOCT_18_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "04 | Daylight | Daylight"
-#compatibleHBVersion = VER 0.0.56\nFEB_01_2015
+#compatibleHBVersion = VER 0.0.63\nOCT_18_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 try: ghenv.Component.AdditionalHelpFromDocStrings = "0"
 except: pass
@@ -102,6 +102,13 @@ def convertIllFileDaraTreeIntoSortedDictionary(illFilesAddress):
 def main(illFilesAddress, testPoints, targetPoint, annualProfiles):
     msg = str.Empty
     
+    # check for Honeybee
+    if not sc.sticky.has_key('honeybee_release') or not sc.sticky.has_key('honeybee_IllResultStore'):
+        msg = "You should first let the latest version of Honeybee to fly..."
+        return msg, None, None
+    
+    hb_illResultStore = sc.sticky["honeybee_IllResultStore"]
+    
     shadingProfiles = []
     shadingGroupsCount = 0 # assume there in no shading groups
     
@@ -182,35 +189,9 @@ def main(illFilesAddress, testPoints, targetPoint, annualProfiles):
             targetPtIndex+=1
         if pointFound ==True: break
     
-    # check number of points in each of the ill files
-    # number of points should be the same in all the illfile lists
-    # that's why I just try the first list of the ill files
-    numOfPtsInEachFile = []
-    for illFile in illFileSets[0][0]:
-        with open(illFile, "r") as illInf:
-            for lineCount, line in enumerate(illInf):
-                if not line.startswith("#"):
-                    numOfPtsInEachFile.append(len(line.strip().split(" ")) - 4)
-                    break
-    
-    # find the right ill file(s) to look into and read the results
-    # print targetPtIndex
-    targetListNumber = None
-    targetIndexNumber = None
-    for listCount, numOfPts in enumerate(numOfPtsInEachFile):
-        if sum(numOfPtsInEachFile[:listCount]) >= targetPtIndex + 1:
-            targetListNumber = listCount - 1
-            targetIndexNumber = targetPtIndex - sum(numOfPtsInEachFile[:listCount-1])
-            #print "list number is: ", listCount - 1
-            #print "index number is:", targetPtIndex - sum(numOfPtsInEachFile[:listCount-1])
-            break
-    
-    # Probably this is not the best way but I really want to get it done tonight!
-    if targetListNumber == None:
-        targetListNumber = len(numOfPtsInEachFile)-1
-        targetIndexNumber = targetPtIndex - sum(numOfPtsInEachFile[:targetListNumber])
-    
-    if targetIndexNumber < 0:
+    # the binary store merges the .ill files of each state so the index of the
+    # point in the store is the same as the index of the point in the test points
+    if targetPtIndex >= sum(numOfPtsInEachSpace):
         msg = "The target point is not inside the point list"
         return msg, None, None
     
@@ -240,12 +221,15 @@ def main(illFilesAddress, testPoints, targetPoint, annualProfiles):
     
     for shadingGroupCount in illFileSets.keys():
         for stateCount, targetIllFiles in enumerate(illFileSets[shadingGroupCount]):
-            targetIllFile = targetIllFiles[targetListNumber]
-            result = open(targetIllFile, 'r')
-            for lineCount, line in enumerate(result):
-                hourLuxValue = line.strip().split(" ")[targetIndexNumber + 4]
-                illuminanceValues[shadingGroupCount][stateCount].append(float(hourLuxValue))
-            result.close()
+            illStore = hb_illResultStore(targetIllFiles)
+            try:
+                if targetPtIndex >= illStore.ptsCount:
+                    msg = "Number of points in ill files: " + `illStore.ptsCount` + \
+                          " doesn't match the number of test points."
+                    return msg, None, None
+                illuminanceValues[shadingGroupCount][stateCount].extend(illStore.getPointValues(targetPtIndex))
+            finally:
+                illStore.close()
             
                 
     return msg, illuminanceValues, shadingProfiles[branch]
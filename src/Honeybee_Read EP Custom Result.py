@@ -37,11 +37,11 @@ Provided by Honeybee 0.0.63
 
 ghenv.Component.Name = "Honeybee_Read EP Custom Result"
 ghenv.Component.NickName = 'EPCustomResult'
-ghenv.Component.Message = 'VER 0.0.63\nJAN_20_2018'
+ghenv.Component.Message = 'VER 0.0.63\nOCT_18_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "10 | Energy | Energy"
-#compatibleHBVersion = VER 0.0.56\nFEB_01_2015
+#compatibleHBVersion = VER 0.0.63\nOCT_18_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 ghenv.Component.AdditionalHelpFromDocStrings = "4"
 
@@ -54,13 +54,14 @@ import scriptcontext as sc
 import copy
 import os
 
+w = gh.GH_RuntimeMessageLevel.Warning
 
 #Honeybee check.
 hbCheck = True
-if not sc.sticky.has_key('honeybee_release') == True:
+if not sc.sticky.has_key('honeybee_release') == True or not sc.sticky.has_key('honeybee_EPResultReader'):
     hbCheck = False
-    print "You should first let Honeybee fly..."
-    ghenv.Component.AddRuntimeMessage(w, "You should first let Honeybee fly...")
+    print "You should first let the latest version of Honeybee to fly..."
+    ghenv.Component.AddRuntimeMessage(w, "You should first let the latest version of Honeybee to fly...")
 else:
     try:
         if not sc.sticky['honeybee_release'].isCompatible(ghenv.Component): hbCheck = False
@@ -153,44 +154,36 @@ if hbCheck and _resultFileAddress and _keywords and _resultFileAddress != None:
             keywords.append(word)
     
     try:
-        result = open(_resultFileAddress, 'r')
+        reader = sc.sticky["honeybee_EPResultReader"](_resultFileAddress)
         
-        for lineCount, line in enumerate(result):
-            if lineCount == 0:
-                # PARSE THE FILE HEADING
-                colHeaders = []
-                for column in line.split(','):
-                    colHeaders.append(column)
-                # SEARCH THROUGH THE FILE HEADING
-                simOutputs = hb_EPMaterialAUX.searchListByKeyword(colHeaders, keywords)
-                simOutLower = []
-                for outp in simOutputs:
-                    simOutLower.append(outp.lower())
-                key = []
-                path = []
-                for outp in colHeaders:
-                    if outp.lower() in simOutLower:
-                        outpName = outp.split(' [')[0]
-                        timestep = outp.split('(')[-1].split(')')[0]
-                        units = outp.split('[')[-1].split(']')[0]
-                        makeHeader(results, resultCount, timestep, outpName, units)
-                        key.append(0)
-                        path.append(resultCount)
-                        resultCount += 1
-                    else:
-                        key.append(-1)
-                        path.append(-1)
+        # SEARCH THROUGH THE FILE HEADING
+        colHeaders = reader.header
+        simOutputs = hb_EPMaterialAUX.searchListByKeyword(colHeaders, keywords)
+        simOutLower = []
+        for outp in simOutputs:
+            simOutLower.append(outp.lower())
+        key = []
+        path = []
+        for outp in colHeaders:
+            if outp.lower() in simOutLower:
+                outpName = outp.split(' [')[0]
+                timestep = outp.split('(')[-1].split(')')[0]
+                units = outp.split('[')[-1].split(']')[0]
+                makeHeader(results, resultCount, timestep, outpName, units)
+                key.append(0)
+                path.append(resultCount)
+                resultCount += 1
             else:
-                for columnCount, column in enumerate(line.split(',')):
-                    p = GH_Path(int(path[columnCount]))
-                    
-                    if key[columnCount] != -1:
-                        results.Add(float(column), p)
-        result.close()
+                key.append(-1)
+                path.append(-1)
+        
+        # only read the columns that match the keywords
+        resultColumns = [columnCount for columnCount in range(len(key)) if key[columnCount] != -1]
+        for line in reader.iterRows(resultColumns):
+            for columnCount in resultColumns:
+                results.Add(float(line[columnCount]), GH_Path(int(path[columnCount])))
         parseSuccess = True
     except:
-        try: result.close()
-        except: pass
         parseSuccess = False
         warn = 'Failed to parse the result file.'
         print warn
@@ -40,11 +40,11 @@ Provided by Honeybee 0.0.63
 """
 ghenv.Component.Name = "Honeybee_Read Hourly Results from Annual Daylight Study"
 ghenv.Component.NickName = 'readDSHourlyResults'
-ghenv.Component.Message = 'VER 0.0.63\nJAN_20_2018'
+ghenv.Component.Message = 'VER 0.0.63\nOCT_18_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "04 | Daylight | Daylight"
-#compatibleHBVersion = VER 0.0.56\nFEB_01_2015
+#compatibleHBVersion = VER 0.0.63\nOCT_18_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 try: ghenv.Component.AdditionalHelpFromDocStrings = "0"
 except: pass
@@ -52,6 +52,7 @@ except: pass
 
 
 import os
+import scriptcontext as sc
 from System import Object
 import Grasshopper.Kernel as gh
 from Grasshopper import DataTree
@@ -97,6 +98,13 @@ def convertIllFileDaraTreeIntoSortedDictionary(illFilesAddress):
 def main(illFilesAddress, testPoints, HOY, annualProfiles):
     msg = str.Empty
     
+    # check for Honeybee
+    if not sc.sticky.has_key('honeybee_release') or not sc.sticky.has_key('honeybee_IllResultStore'):
+        msg = "You should first let the latest version of Honeybee to fly..."
+        return msg, None, None
+    
+    hb_illResultStore = sc.sticky["honeybee_IllResultStore"]
+    
     shadingProfiles = []
     shadingGroupsCount = 0 # assume there in no shading groups
     
@@ -190,16 +198,12 @@ def main(illFilesAddress, testPoints, HOY, annualProfiles):
         # each file represnts one state of shading
         for stateCount, resultFiles in enumerate(illFileSets[shadingGroupCount]):
             
-            for resultFile in resultFiles:
-                result = open(resultFile, 'r')
-                for lineCount, line in enumerate(result):
-                    if lineCount == int(HOY-1):
-                       line = line.replace('\n', '', 10)
-                       lineSeg = line.Split(' ')
-                       for hourLuxValue in lineSeg[4:]:
-                           illuminanceValues[shadingGroupCount][stateCount].append(float(hourLuxValue))
-                           
-                result.close()
+            # read the hour from the binary store instead of parsing the .ill files
+            illStore = hb_illResultStore(resultFiles)
+            try:
+                illuminanceValues[shadingGroupCount][stateCount].extend(illStore.getHourValues(int(HOY)))
+            finally:
+                illStore.close()
     
     return msg, illuminanceValues, shadingProfiles
 
@@ -21,7 +21,7 @@
 
 
 """
-This component reads the results of an Adaptive Indoor Comfort Analysis.  Note that this usually takes about a minute
+This component reads the results of an Adaptive Indoor Comfort Analysis.  Both binary .hbmtx matrix files and csv result files can be read.  Note that reading csv files usually takes about a minute
 -
 Provided by Honeybee 0.0.63
     
@@ -33,7 +33,7 @@ Provided by Honeybee 0.0.63
 
 ghenv.Component.Name = "Honeybee_Read Microclimate Matrix"
 ghenv.Component.NickName = 'readMicroclimateMtx'
-ghenv.Component.Message = 'VER 0.0.63\nJAN_20_2018'
+ghenv.Component.Message = 'VER 0.0.63\nOCT_18_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "10 | Energy | Energy"
@@ -41,28 +41,21 @@ ghenv.Component.AdditionalHelpFromDocStrings = "6"
 
 
 import Grasshopper.Kernel as gh
+import scriptcontext as sc
 
 
 comfResultsMtx = []
 
-if _comfResultFileAddress:
+if not sc.sticky.has_key('honeybee_release') or not sc.sticky.has_key('honeybee_ComfortMatrixFile'):
+    warn = "You should let the Honeybee fly first..."
+    print warn
+    ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warn)
+elif _comfResultFileAddress:
+    hb_comfortMatrixFile = sc.sticky["honeybee_ComfortMatrixFile"]
     try:
-        result = open(_comfResultFileAddress, 'r')
-        
-        for lineCount, line in enumerate(result):
-            if lineCount == 0: comfResultsMtx.append(line.split('\n')[0])
-            else:
-                #Pull out the data.
-                hourData = []
-                for columnCount, column in enumerate(line.split(',')):
-                    hourData.append(float(column))
-                comfResultsMtx.append(hourData)
-        result.close()
+        comfResultsMtx = hb_comfortMatrixFile(_comfResultFileAddress).read()
     except:
-        try: result.close()
-        except: pass
-        warn = 'Failed to parse the result file.  The csv file might not have existed when connected or the simulation did not run correctly.'+ \
+        warn = 'Failed to parse the result file.  The result file might not have existed when connected or the simulation did not run correctly.'+ \
                   'Try reconnecting the _resultfileAddress to this component or re-running your simulation.'
         print warn
         ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, warn)
-
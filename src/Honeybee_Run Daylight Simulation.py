@@ -54,11 +54,11 @@ Provided by Honeybee 0.0.63
 
 ghenv.Component.Name = "Honeybee_Run Daylight Simulation"
 ghenv.Component.NickName = 'runDaylightAnalysis'
-ghenv.Component.Message = 'VER 0.0.63\nJUN_29_2018'
+ghenv.Component.Message = 'VER 0.0.63\nOCT_18_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "04 | Daylight | Daylight"
-#compatibleHBVersion = VER 0.0.56\nDEC_21_2015
+#compatibleHBVersion = VER 0.0.63\nOCT_18_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 try: ghenv.Component.AdditionalHelpFromDocStrings = "1"
 except: pass
@@ -89,6 +89,11 @@ def main(north, originalHBObjects, analysisRecipe, runRad, numOfCPUs, workingDir
         ghenv.Component.AddRuntimeMessage(w, "You should first let both Ladybug and Honeybee to fly...")
         return -1
     
+    if not sc.sticky.has_key('honeybee_RADExportCache'):
+        print "You should first let the latest version of Honeybee to fly..."
+        ghenv.Component.AddRuntimeMessage(w, "You should first let the latest version of Honeybee to fly...")
+        return -1
+    
     try:
         if not sc.sticky['honeybee_release'].isCompatible(ghenv.Component): return -1
         if sc.sticky['honeybee_release'].isInputMissing(ghenv.Component): return -1
@@ -164,6 +169,9 @@ def main(north, originalHBObjects, analysisRecipe, runRad, numOfCPUs, workingDir
     # make working directory and/or clean the directory if needed
     subWorkingDir, radFileName = hb_writeRADAUX.prepareWorkingDir(workingDir, radFileName, overwriteResults)
     
+    # cache of the exported files from the last run of this study
+    exportCache = sc.sticky["honeybee_RADExportCache"](subWorkingDir)
+    
     # export mesh
     hb_writeRADAUX.exportTestMesh(subWorkingDir, radFileName)
     
@@ -188,13 +196,13 @@ def main(north, originalHBObjects, analysisRecipe, runRad, numOfCPUs, workingDir
     radFileFullName, materialFileName = \
         hb_writeRAD.writeRADAndMaterialFiles(originalHBObjects, subWorkingDir, \
                                              radFileName, analysisRecipe, \
-                                             meshParameters, exportAirWalls)
+                                             meshParameters, exportAirWalls, exportCache)
     
     
     ######################## GENERATE POINT FILES #######################
     # test points should be generated if the study is grid based
     # except image-based simulation
-    testPtsEachCPU, lenOfPts = hb_writeRAD.writeTestPtFile(subWorkingDir, radFileName, numOfCPUs, analysisRecipe)
+    testPtsEachCPU, lenOfPts = hb_writeRAD.writeTestPtFile(subWorkingDir, radFileName, numOfCPUs, analysisRecipe, exportCache)
     
     if len(testPtsEachCPU)!=0: # make sure it is a grid based analysis
         numOfCPUs = len(testPtsEachCPU) #in case number of CPUs are more than number of test points
@@ -205,12 +213,19 @@ def main(north, originalHBObjects, analysisRecipe, runRad, numOfCPUs, workingDir
                             hb_writeRAD.writeBatchFiles(subWorkingDir, radFileName, \
                             radSkyFileName, radFileFullName, materialFileName, \
                             numOfCPUs, testPtsEachCPU, lenOfPts, analysisRecipe, \
-                            additionalRadFiles)
+                            additionalRadFiles, exportCache = exportCache)
+    
+    print exportCache
+    exportCache.save()
     
     if runRad:
         hb_writeRAD.runBatchFiles(initBatchFileName, batchFilesName, \
                                   fileNames, pcompBatchFile, waitingTime, runRad > 1)
         
+        # keep the octree for the next run
+        exportCache.storePendingFiles()
+        exportCache.save()
+        
         results = hb_writeRAD.collectResults(subWorkingDir, radFileName, \
                                 numOfCPUs, analysisRecipe, expectedResultFiles)
         
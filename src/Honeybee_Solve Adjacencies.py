@@ -39,11 +39,11 @@ Provided by Honeybee 0.0.63
 """
 ghenv.Component.Name = "Honeybee_Solve Adjacencies"
 ghenv.Component.NickName = 'solveAdjc'
-ghenv.Component.Message = 'VER 0.0.63\nMAR_03_2018'
+ghenv.Component.Message = 'VER 0.0.63\nOCT_18_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "00 | Honeybee"
-#compatibleHBVersion = VER 0.0.56\nDEC_15_2017
+#compatibleHBVersion = VER 0.0.63\nOCT_18_2026
 #compatibleLBVersion = VER 0.0.59\nFEB_01_2015
 try: ghenv.Component.AdditionalHelpFromDocStrings = "3"
 except: pass
@@ -54,14 +54,44 @@ import scriptcontext as sc
 import Grasshopper.Kernel as gh
 import uuid
 
-def shootIt(rayList, geometry, tol = 0.01, bounce =1):
-   # shoot a list of rays from surface to geometry
-   # to find if geometry is adjacent to surface
-   for ray in rayList:
-        intPt = rc.Geometry.Intersect.Intersection.RayShoot(ray, geometry, bounce)
-        if intPt:
-            if ray.Position.DistanceTo(intPt[0]) <= tol:
-                return True #'Bang!'
+def getBoundingBox(surface):
+    bb = surface.geometry.GetBoundingBox(True)
+    return (bb.Min.X, bb.Min.Y, bb.Min.Z), (bb.Max.X, bb.Max.Y, bb.Max.Z)
+
+def isCandidate(srf, surface, tol):
+    # normals should be opposite
+    normalAngle = abs(rc.Geometry.Vector3d.VectorAngle(surface.normalVector, srf.normalVector))
+    revNormalAngle = abs(rc.Geometry.Vector3d.VectorAngle(surface.normalVector, -srf.normalVector))
+    if not (normalAngle==0  or revNormalAngle <= sc.doc.ModelAngleToleranceRadians):
+        return False
+    
+    # planar surfaces should be on the same plane
+    if srf.isPlanar and surface.isPlanar:
+        normal = rc.Geometry.Vector3d(srf.normalVector)
+        normal.Unitize()
+        distance = abs(rc.Geometry.Vector3d.Multiply(rc.Geometry.Vector3d(surface.cenPt - srf.cenPt), normal))
+        if distance > 2 * tol + sc.doc.ModelAbsoluteTolerance:
+            return False
+    
+    return True
+
+def getTestPoints(srf, tol):
+    #Create a mesh of surface to use center points as test points
+    meshPar = rc.Geometry.MeshingParameters.Default
+    BrepMesh = rc.Geometry.Mesh.CreateFromBrep(srf.geometry, meshPar)[0]
+    
+    # calculate face normals
+    BrepMesh.FaceNormals.ComputeFaceNormals()
+    BrepMesh.FaceNormals.UnitizeFaceNormals()
+    
+    testPts = []
+    for faceIndex in range(BrepMesh.Faces.Count):
+        srfNormal = (BrepMesh.FaceNormals)[faceIndex]
+        meshSrfCen = BrepMesh.Faces.GetFaceCenter(faceIndex)
+        # move testPt backward for half of tolerance
+        testPts.append(rc.Geometry.Point3d.Add(meshSrfCen, -rc.Geometry.Vector3d(srfNormal)* tol /2))
+    
+    return testPts
 
 def updateZoneMixing(surface1, zone1, zone2):
     #Change the air mixing between the zone and other zones to "True"
@@ -204,6 +234,12 @@ def main(HBZones, altConstruction, altWinConstr, altBC, tol, remCurrent):
         w = gh.GH_RuntimeMessageLevel.Warning
         ghenv.Component.AddRuntimeMessage(w, warning)
         return -1
+    
+    if not sc.sticky.has_key('honeybee_BoundingBoxIndex'):
+        print "You should first let the latest version of Honeybee to fly..."
+        w = gh.GH_RuntimeMessageLevel.Warning
+        ghenv.Component.AddRuntimeMessage(w, "You should first let the latest version of Honeybee to fly...")
+        return -1
             
     # extra check to be added later.
     # check altBC and altConstruction to be valid inputs
@@ -233,58 +269,54 @@ def main(HBZones, altConstruction, altWinConstr, altBC, tol, remCurrent):
                     srf.setBC('OUTDOORS')
                     srf.setBCObjectToOutdoors()
     
+    # index surfaces of all the zones by their bounding box so each surface
+    # is only tested against the surfaces that are close to it
+    zoneSurfaces = []
+    boxes = []
+    for zoneCount, HBZone in enumerate(HBZoneObjects):
+        for surface in HBZone.surfaces:
+            zoneSurfaces.append((zoneCount, surface))
+            boxes.append(getBoundingBox(surface))
+    
+    surfaceIndex = sc.sticky["honeybee_BoundingBoxIndex"](boxes, tol + sc.doc.ModelAbsoluteTolerance)
+    
     # solve it zone by zone
-    for testZone in HBZoneObjects:
-        # mesh each surface and test if it will be adjacent to any surface
-        # from other zones
-        for srf in testZone.surfaces:
-            #print srf.type, srf.BC 
-            if srf.BC.upper() == 'OUTDOORS' or srf.BC.upper() == 'GROUND' or srf.BC.upper() == 'ADIABATIC':
-                #Create a mesh of surface to use center points as test points
-                meshPar = rc.Geometry.MeshingParameters.Default
-                BrepMesh = rc.Geometry.Mesh.CreateFromBrep(srf.geometry, meshPar)[0]
-                
-                # calculate face normals
-                BrepMesh.FaceNormals.ComputeFaceNormals()
-                BrepMesh.FaceNormals.UnitizeFaceNormals()
-                
-                # dictionary to collect center points and rays
-                raysDict = {}
-                for faceIndex in range(BrepMesh.Faces.Count):
-                    srfNormal = (BrepMesh.FaceNormals)[faceIndex]
-                    meshSrfCen = BrepMesh.Faces.GetFaceCenter(faceIndex)
-                    # move testPt backward for half of tolerance
-                    meshSrfCen = rc.Geometry.Point3d.Add(meshSrfCen, -rc.Geometry.Vector3d(srfNormal)* tol /2)
+    for srfCount, (zoneCount, srf) in enumerate(zoneSurfaces):
+        #print srf.type, srf.BC 
+        if srf.BC.upper() != 'OUTDOORS' and srf.BC.upper() != 'GROUND' and srf.BC.upper() != 'ADIABATIC':
+            continue
+        
+        testZone = HBZoneObjects[zoneCount]
+        
+        # find surfaces from other zones which overlap with this surface
+        # and are on the same plane with an opposite normal
+        candidates = []
+        for candidateCount in surfaceIndex.query(boxes[srfCount]):
+            targetZoneCount, surface = zoneSurfaces[candidateCount]
+            if targetZoneCount == zoneCount: continue
+            if not notTheSameZone(HBZoneObjects[targetZoneCount], testZone): continue
+            if isCandidate(srf, surface, tol): candidates.append((targetZoneCount, surface))
+        
+        if len(candidates) == 0: continue
+        
+        # mesh the surface and test if it will be adjacent to any of the candidates
+        testPts = getTestPoints(srf, tol)
+        
+        for targetZoneCount, surface in candidates:
+            targetZone = HBZoneObjects[targetZoneCount]
+            # check distance with the nearest point on each surface
+            for pt in testPts:
+                if surface.geometry.ClosestPoint(pt).DistanceTo(pt) <= tol:
+                    print 'Surface ' + srf.name + ' which is a ' + srf.srfType[srf.type] + \
+                          '\t-> is adjacent to <-\t' + surface.name + ' which is a ' + \
+                          surface.srfType[surface.type] + '.'
+                    
+                    updateAdj(srf, surface, altConstruction, altBC, altWinConstr, tol)
+                    if surface.type == 4:
+                        flowRate = updateZoneMixing(surface, testZone, targetZone)
+                        print "Air has been mixed between " + testZone.name + " and " + targetZone.name + " with a flow rate of " + str(flowRate) + " m3/s."
                     
-                    raysDict[meshSrfCen] = rc.Geometry.Ray3d(meshSrfCen, srfNormal)
-                
-                for targetZone in HBZoneObjects:
-                    if notTheSameZone(targetZone, testZone):
-                        # check ray intersection to see if this zone is next to the surface
-                        if shootIt(raysDict.values(), [targetZone.geometry], tol + sc.doc.ModelAbsoluteTolerance):
-                            for surface in targetZone.surfaces:
-                                # check if z value of center points matches
-                                #print abs(surface.cenPt.Z - srf.cenPt.Z)
-                                #if abs(surface.cenPt.Z - srf.cenPt.Z) < tol:
-                                # check distance with the nearest point on each surface
-                                for pt in raysDict.keys():
-                                    if surface.geometry.ClosestPoint(pt).DistanceTo(pt) <= tol:
-                                        # extra check for normal direction
-                                        normalAngle = abs(rc.Geometry.Vector3d.VectorAngle(surface.normalVector, srf.normalVector))
-                                        revNormalAngle = abs(rc.Geometry.Vector3d.VectorAngle(surface.normalVector, -srf.normalVector))
-                                        #print normalAngle
-                                        #print revNormalAngle
-                                        if normalAngle==0  or revNormalAngle <= sc.doc.ModelAngleToleranceRadians:
-                                            print 'Surface ' + srf.name + ' which is a ' + srf.srfType[srf.type] + \
-                                                  '\t-> is adjacent to <-\t' + surface.name + ' which is a ' + \
-                                                  surface.srfType[surface.type] + '.'
-                                            
-                                            updateAdj(srf, surface, altConstruction, altBC, altWinConstr, tol)                                        
-                                            if surface.type == 4:
-                                                flowRate = updateZoneMixing(surface, testZone, targetZone)
-                                                print "Air has been mixed between " + testZone.name + " and " + targetZone.name + " with a flow rate of " + str(flowRate) + " m3/s."
-                                            
-                                            break
+                    break
     
     # add zones to memory
     ModifiedHBZones  = hb_hive.addToHoneybeeHive(HBZoneObjects, ghenv.Component)
@@ -44,8 +44,10 @@ Provided by Honeybee 0.0.63
         occupancyThreshold_: An optional number between 0 and 1 that sets the minimum occupancy at which a zone is considered occupied.  This is done as the default occupancy is taken from the HBZone's occupancy schedules and, in some cases this value is low enough to ignore for the sake of calculating thermal autonomy.  The default is set to 0 such that any time when the zones are occpied count towards the values calculated by this component.
         workingDir_: An optional working directory on your system. Default is set to C:\Ladybug
         fileName_: An optional file name for the result files as a string.
-        writeResultFile_: Set to 1 or 'True' to have the component write all results into CSV result files and set to 0 or 'False' to not have the component write these files.  The default is set to 'True' as these simulations can be long and you usually want a copy of your results.  You may want to set it to 'False' if you are just scrolling through key hours and want the fastest run possible.  Set to 2 if you want the component to only write the results for the TCPocc and TCA matrices.
+        writeResultFile_: Set to 1 or 'True' to have the component write all results into result files and set to 0 or 'False' to not have the component write these files.  The default is set to 'True' as these simulations can be long and you usually want a copy of your results.  You may want to set it to 'False' if you are just scrolling through key hours and want the fastest run possible.  Set to 2 if you want the component to only write the results for the TCPocc and TCA matrices.
+        writeCSV_: Set to "True" to write the result files as csv files instead of binary .hbmtx matrix files.  Binary matrix files are much smaller and much faster to write and read back with the 'Honeybee_Read Microclimate Matrix' component.  Use csv files if you want to open the results in other programs.  The default is set to "False".
         parallel_: Set to 'True' to have the operation run with multiple cores and 'False' to run it with a single core.  Note that, because the calculation performed by this component is fairly simple, setting parallel to 'True' can sometimes increase the calculation time so it should only be used in cases where there are a large number of test points.  Because of the possibility of increaseing calculation time, the default is set to 'False' to run the operation as single-core.
+        summaryOnly_: Set to 'True' to only output the total of each metric over the analysis period instead of a value for every hour.  The resulting matrices are much smaller and can still be visualized with the 'Honeybee_Visualize Microclimate Map' component but they can't be sliced by analysis period or step of the simulation.  The default is set to 'False' to output values for every hour.
         _runIt: Set boolean to "True" to run the component and calculate comfort autonomy.
     Returns:
         readMe!: ...
@@ -55,16 +57,16 @@ Provided by Honeybee 0.0.63
         OverHeatedMtx: A python matrix containing the overheated hours for each of the faces of the connected _viewFactorMesh.  Connect this to the 'Honeybee_Visualize Microclimate Map' component in order to display the data. Overheated hours are essentially the number of occupied hours that a point is warmer than that specified by a given set of thermal comfort acceptability criteria.
         UnderHeatedMtx: A python matrix containing the underheated hours for each of the faces of the connected _viewFactorMesh.  Connect this to the 'Honeybee_Visualize Microclimate Map' component in order to display the data. Underheated hours are essentially the number of occupied hours that a point is colder than that specified by a given set of thermal comfort acceptability criteria.
         ==========: ...
-        occTCP_Result: A csv file address containing the 'Themal Comfort Percent' (TCP) values for only the occupied period of the model.
-        TA_Result: A csv file address containing the 'Thermal Autonomy' (TA) values for each of the faces of the connected _viewFactorMesh.
-        OverHeatedResult: A csv file address containing the overheated hours for each of the faces of the connected _viewFactorMesh.
-        UnderHeatedResult: A csv file address containing the underheated hours for each of the faces of the connected _viewFactorMesh.
+        occTCP_Result: A result file address containing the 'Themal Comfort Percent' (TCP) values for only the occupied period of the model.
+        TA_Result: A result file address containing the 'Thermal Autonomy' (TA) values for each of the faces of the connected _viewFactorMesh.
+        OverHeatedResult: A result file address containing the overheated hours for each of the faces of the connected _viewFactorMesh.
+        UnderHeatedResult: A result file address containing the underheated hours for each of the faces of the connected _viewFactorMesh.
 
 """
 
 ghenv.Component.Name = "Honeybee_Thermal Autonomy Analysis"
 ghenv.Component.NickName = 'ThermalAutonomy'
-ghenv.Component.Message = 'VER 0.0.63\nJAN_20_2018'
+ghenv.Component.Message = 'VER 0.0.63\nOCT_18_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "10 | Energy | Energy"
@@ -81,6 +83,9 @@ import Rhino as rc
 import scriptcontext as sc
 import math
 import os
+import itertools
+import operator
+import System
 import System.Threading.Tasks as tasks
 
 
@@ -96,10 +101,10 @@ outputsDict = {
 4: ["OverHeatedMtx", "A python matrix containing the overheated hours for each of the faces of the connected _viewFactorMesh.  Connect this to the 'Honeybee_Visualize Microclimate Map' component in order to display the data. Overheated hours are essentially the number of occupied hours that a point is warmer than that specified by a given set of thermal comfort acceptability criteria."],
 5: ["UnderHeatedMtx", "A python matrix containing the underheated hours for each of the faces of the connected _viewFactorMesh.  Connect this to the 'Honeybee_Visualize Microclimate Map' component in order to display the data. Underheated hours are essentially the number of occupied hours that a point is colder than that specified by a given set of thermal comfort acceptability criteria."],
 6: ["===========", "..."],
-7: ["occTCP_Result", "A csv file address containing the 'Themal Comfort Percent' (TCP) values for only the occupied period of the model."],
-8: ["TA_Result", "A csv file address containing the 'Thermal Autonomy' (TA) values for each of the faces of the connected _viewFactorMesh."],
-9: ["OverHeatedResult", "A csv file address containing the overheated hours for each of the faces of the connected _viewFactorMesh."],
-10: ["UnderHeatedResult", "A csv file address containing the underheated hours for each of the faces of the connected _viewFactorMesh."]
+7: ["occTCP_Result", "A result file address containing the 'Themal Comfort Percent' (TCP) values for only the occupied period of the model."],
+8: ["TA_Result", "A result file address containing the 'Thermal Autonomy' (TA) values for each of the faces of the connected _viewFactorMesh."],
+9: ["OverHeatedResult", "A result file address containing the overheated hours for each of the faces of the connected _viewFactorMesh."],
+10: ["UnderHeatedResult", "A result file address containing the underheated hours for each of the faces of the connected _viewFactorMesh."]
 }
 
 
@@ -413,20 +418,29 @@ def checkTheInputs():
     return checkData, fileName, workingDir, _viewFactorMesh, analysisPeriod, totEnergyHeaders, totEnergyNumbersFinal, zoneNames, occupancySchList, comfortType, occupancyThreshold
 
 
-def main(viewFactorMesh, analysisPeriod, totEnergyHeaders, totEnergyNumbers, zoneNames, occupancySchList, comfortType, occupancyThreshold):
+def getPointZones(viewFactorMesh, zoneNames):
+    #Get the zone of each test point from the cache that the view factor calculator fills.
+    hb_pointZoneCache = sc.sticky["honeybee_PointZoneCache"]()
+    pointZoneNames = hb_pointZoneCache.getPointZones(viewFactorMesh, _HBZones, zoneNames, tol)
+    
+    #Points that are not inside any zone are outdoor points and get the index after the last zone.
+    zoneIndices = {}
+    for zoneCount, name in enumerate(zoneNames):
+        if name not in zoneIndices: zoneIndices[name] = zoneCount
+    return [zoneIndices.get(name, len(_HBZones)) for name in pointZoneNames]
+
+
+def main(viewFactorMesh, analysisPeriod, totEnergyHeaders, totEnergyNumbers, zoneNames, occupancySchList, comfortType, occupancyThreshold, summaryOnly):
     #Set up matrices to be filled.
-    occTCP_Mtx = [comfortType + ' Occupied Thermal Comfort Percent;' + str(analysisPeriod[0]) + ";" + str(analysisPeriod[1])]
-    TA_Mtx = [comfortType + ' Thermal Autonomy;' + str(analysisPeriod[0]) + ";" + str(analysisPeriod[1])]
-    OverHeatedMtx = [comfortType + ' Over-Heated Percent;' + str(analysisPeriod[0]) + ";" + str(analysisPeriod[1])]
-    UnderHeatedMtx = [comfortType + ' Under-Heated Percent;' + str(analysisPeriod[0]) + ";" + str(analysisPeriod[1])]
-    
-    #Create placeholders for all of the hours.
-    for hour in occupancySchList[0]:
-        occTCP_Mtx.append(0)
-        TA_Mtx.append(0)
-        OverHeatedMtx.append(0)
-        UnderHeatedMtx.append(0)
-   
+    #Summary matrices are tagged so that they are not sliced by analysis period or step of the simulation.
+    tag = hb_comfortMatrixFile.SUMMARYTAG if summaryOnly else ''
+    occTCP_Mtx = [comfortType + ' Occupied Thermal Comfort Percent' + tag + ';' + str(analysisPeriod[0]) + ";" + str(analysisPeriod[1])]
+    TA_Mtx = [comfortType + ' Thermal Autonomy' + tag + ';' + str(analysisPeriod[0]) + ";" + str(analysisPeriod[1])]
+    OverHeatedMtx = [comfortType + ' Over-Heated Percent' + tag + ';' + str(analysisPeriod[0]) + ";" + str(analysisPeriod[1])]
+    UnderHeatedMtx = [comfortType + ' Under-Heated Percent' + tag + ';' + str(analysisPeriod[0]) + ";" + str(analysisPeriod[1])]
+    
+    hoursCount = len(occupancySchList[0])
+    
     #Match the totalEnergy values to the HBZones.
     totEnergyNumbersMatched = []
     for name in zoneNames:
@@ -438,91 +452,78 @@ def main(viewFactorMesh, analysisPeriod, totEnergyHeaders, totEnergyNumbers, zon
                     totEnergyNumbersMatched.append(totEnergyNumbers[headCount])
             except: pass
         if eFound == False:
-            additionalENumList = []
-            for count in occupancySchList[0]: additionalENumList.append(0)
-            totEnergyNumbersMatched.append(additionalENumList)
+            totEnergyNumbersMatched.append([0] * hoursCount)
     
     #Match each of the test points with a zone using the viewFacorMesh.
-    pointZoneList = []
-    outDoorPtsCount = 0
-    for mesh in viewFactorMesh:
-        for face in mesh.Faces:
-            zoneFound = False
-            if face.IsQuad:
-                faceBrep = rc.Geometry.Brep.CreateFromCornerPoints(rc.Geometry.Point3d(mesh.Vertices[face.A]), rc.Geometry.Point3d(mesh.Vertices[face.B]), rc.Geometry.Point3d(mesh.Vertices[face.C]), rc.Geometry.Point3d(mesh.Vertices[face.D]), sc.doc.ModelAbsoluteTolerance)
-            if face.IsTriangle:
-                faceBrep = rc.Geometry.Brep.CreateFromCornerPoints(rc.Geometry.Point3d(mesh.Vertices[face.A]), rc.Geometry.Point3d(mesh.Vertices[face.B]), rc.Geometry.Point3d(mesh.Vertices[face.C]), sc.doc.ModelAbsoluteTolerance)
-            centPt = rc.Geometry.AreaMassProperties.Compute(faceBrep).Centroid
-            for zoneCount, zone in enumerate(_HBZones):
-                if zone.IsPointInside(centPt, tol, False) == True:
-                    zoneFound = True
-                    pointZoneList.append(zoneCount)
-            if zoneFound == False:
-                outDoorPtsCount += 1
-                pointZoneList.append(len(_HBZones))
+    pointZoneList = getPointZones(viewFactorMesh, zoneNames)
     
     #If there are outdoor points, append values for full-time occupancy and use of passive strategies.
-    if outDoorPtsCount > 0:
-        additionalENumList = []
-        additionalOccSchList = []
-        for count in occupancySchList[0]:
-            additionalENumList.append(0)
-            additionalOccSchList.append(1)
-        occupancySchList.append(additionalOccSchList)
-        totEnergyNumbersMatched.append(additionalENumList)
+    if len(_HBZones) in pointZoneList:
+        occupancySchList.append([1] * hoursCount)
+        totEnergyNumbersMatched.append([0] * hoursCount)
+    
+    #Find the occupied and the passive hours of each zone once.
+    zoneOccupied = [[val > occupancyThreshold for val in occSch] for occSch in occupancySchList]
+    zonePassive = [[not val > 0 for val in energyList] for energyList in totEnergyNumbersMatched]
     
     #Make a list that tracks the total occupied hours for each of the points.
-    occHrsNum = []
-    for point in pointZoneList: occHrsNum.append(0)
+    zoneOccHrs = [sum(occupied) for occupied in zoneOccupied]
+    occHrsNum = [zoneOccHrs[pointZone] for pointZone in pointZoneList]
     
-    #Finally, compute the matrices for each hour and point.
+    #Compute the values of all of the points for an hour.
+    #Occupied hours get integer values and unoccupied ones get 0.0 so the occupied hours of a slice can be counted later.
     def calcComf(count):
-        occTCP = []
-        TA = []
-        OverHeated = []
-        UnderHeated = []
-        for pointCount, pointZone in enumerate(pointZoneList):
-            try:
-                _comfResultsMtx[count + 1][pointCount]
-                #Check to see if the point's zone is occupied.  Otheriswe, it does not count for anything.
-                if occupancySchList[pointZone][count] > occupancyThreshold:
-                    occHrsNum[pointCount] += 1
-                    #Check to see if the point is comfortable.
-                    if _comfResultsMtx[count + 1][pointCount] > 0:
-                        occTCP.append(1)
-                        OverHeated.append(0)
-                        UnderHeated.append(0)
-                        #Check to see if the point's zone is being conditioned.
-                        if totEnergyNumbersMatched[pointZone][count] > 0: TA.append(0)
-                        else: TA.append(1)
-                    else:
-                        occTCP.append(0)
-                        TA.append(0)
-                        if _degOrPMVMtx[count + 1][pointCount] > 0:
-                            OverHeated.append(1)
-                            UnderHeated.append(0)
-                        else:
-                            OverHeated.append(0)
-                            UnderHeated.append(1)
-                else:
-                    occTCP.append(0.0)
-                    TA.append(0.0)
-                    OverHeated.append(0.0)
-                    UnderHeated.append(0.0)
-            except:
-                pass
+        if count + 1 >= len(_comfResultsMtx) or count + 1 >= len(_degOrPMVMtx): return [], [], [], []
         
-        occTCP_Mtx[count+1] = occTCP
-        TA_Mtx[count+1] = TA
-        OverHeatedMtx[count+1] = OverHeated
-        UnderHeatedMtx[count+1] = UnderHeated
+        hourOccupied = [occupied[count] for occupied in zoneOccupied]
+        hourPassive = [passive[count] for passive in zonePassive]
+        ptOccupied = [hourOccupied[pointZone] for pointZone in pointZoneList]
+        ptComf = [val > 0 for val in _comfResultsMtx[count + 1]]
+        ptHot = [val > 0 for val in _degOrPMVMtx[count + 1]]
+        
+        occTCP = [int(comf) if occ else 0.0 for occ, comf in itertools.izip(ptOccupied, ptComf)]
+        TA = [int(comf and hourPassive[pointZone]) if occ else 0.0 for occ, comf, pointZone in itertools.izip(ptOccupied, ptComf, pointZoneList)]
+        OverHeated = [int(not comf and hot) if occ else 0.0 for occ, comf, hot in itertools.izip(ptOccupied, ptComf, ptHot)]
+        UnderHeated = [int(not comf and not hot) if occ else 0.0 for occ, comf, hot in itertools.izip(ptOccupied, ptComf, ptHot)]
+        return occTCP, TA, OverHeated, UnderHeated
+    
+    #Split the hours into chunks so that each chunk can be run on a separate core.
+    chunksCount = min(System.Environment.ProcessorCount, hoursCount) if parallel_ == True else 1
+    chunksCount = max(chunksCount, 1)
+    chunkSize = int(math.ceil(hoursCount / float(chunksCount)))
+    chunkSums = [None] * chunksCount
+    hourlyRows = [None] * hoursCount if not summaryOnly else None
+    
+    def calcChunk(chunkCount):
+        sums = None
+        for hour in xrange(chunkCount * chunkSize, min((chunkCount + 1) * chunkSize, hoursCount)):
+            rows = calcComf(hour)
+            if not summaryOnly: hourlyRows[hour] = rows
+            #Skip the hours that are missing from the comfort matrices.
+            elif len(rows[0]) != len(pointZoneList): continue
+            elif sums == None: sums = [list(row) for row in rows]
+            else: sums = [map(operator.add, total, row) for total, row in zip(sums, rows)]
+        chunkSums[chunkCount] = sums
     
     #Run through every hour of the analysis to fill up the matrices.
-    #if parallel_ == True and len(occupancySchList[0]) != 1:
-    #    tasks.Parallel.ForEach(range(len(occupancySchList[0])), calcComf)
-    #else:
-    for hour in range(len(occupancySchList[0])):
-        calcComf(hour)
+    if chunksCount > 1: tasks.Parallel.ForEach(range(chunksCount), calcChunk)
+    else: calcChunk(0)
+    
+    if not summaryOnly:
+        for occTCP, TA, OverHeated, UnderHeated in hourlyRows:
+            occTCP_Mtx.append(occTCP)
+            TA_Mtx.append(TA)
+            OverHeatedMtx.append(OverHeated)
+            UnderHeatedMtx.append(UnderHeated)
+    else:
+        #Only keep the total of each point over the analysis period.
+        totals = None
+        for sums in chunkSums:
+            if sums == None: continue
+            if totals == None: totals = sums
+            else: totals = [map(operator.add, total, row) for total, row in zip(totals, sums)]
+        if totals == None: totals = [[], [], [], []]
+        for mtx, total in zip([occTCP_Mtx, TA_Mtx, OverHeatedMtx, UnderHeatedMtx], totals): mtx.append(total)
     
     # Add the total occupied hours to the matrix (to be used to help calculate comfort autonomy).
     occTCP_Mtx.append(occHrsNum)
@@ -533,105 +534,36 @@ def main(viewFactorMesh, analysisPeriod, totEnergyHeaders, totEnergyNumbers, zon
     
     return occTCP_Mtx, TA_Mtx, OverHeatedMtx, UnderHeatedMtx
 
-def writeCSV(comfortType, fileName, directory, occTCP_Mtx, TA_Mtx, OverHeatedMtx, UnderHeatedMtx):
+def writeResultFiles(comfortType, fileName, directory, occTCP_Mtx, TA_Mtx, OverHeatedMtx, UnderHeatedMtx):
     #Find out the number of values in each hour.
-    valLen = len(occTCP_Mtx[1])-1
+    valuesCount = len(occTCP_Mtx[1])
     
     #Set up a working directory.
     workingDir = lb_preparation.makeWorkingDir(os.path.join(directory)) 
     
-    #Create csv files.
-    occTCPFile = fileName + comfortType + "occTCP.csv"
-    TAFile = fileName + comfortType + "TA.csv"
-    OverHeatedFile = fileName + comfortType + "OverHeated.csv"
-    UnderHeatedFile = fileName + comfortType + "UnderHeated.csv"
-    
-    #Write the occTCP result file.
-    occTCP_Result = os.path.join(workingDir, occTCPFile)
-    occTCPCSVfile = open(occTCP_Result, 'wb')
-    
-    for lineCount, line in enumerate(occTCP_Mtx):
-        lineStr = ''
-        if lineCount != 0:
-            for valCt, val in enumerate(line):
-                if valCt == valLen:
-                    lineStr = lineStr + str(val) + "\n"
-                elif valCt < valLen:
-                    lineStr = lineStr + str(val) + ','
-                else:
-                    pass
-            occTCPCSVfile.write(lineStr)
-        else: occTCPCSVfile.write(line + "\n")
-    occTCPCSVfile.close()
-    
-    #Write the TA result file.
-    TA_Result = os.path.join(workingDir, TAFile)
-    TACSVfile = open(TA_Result, 'wb')
-    for lineCount, line in enumerate(TA_Mtx):
-        lineStr = ''
-        if lineCount != 0:
-            for valCt, val in enumerate(line):
-                if valCt == valLen:
-                    lineStr = lineStr + str(val) + "\n"
-                elif valCt < valLen:
-                    lineStr = lineStr + str(val) + ','
-                else:
-                    pass
-            TACSVfile.write(lineStr)
-        else: TACSVfile.write(line + "\n")
-    TACSVfile.close()
-    
-    #Write the OverHeated result file.
-    if writeResultFile_ != 2:
-        OverHeatedResult = os.path.join(workingDir, OverHeatedFile)
-        OverHeatedCSVfile = open(OverHeatedResult, 'wb')
-        for lineCount, line in enumerate(OverHeatedMtx):
-            lineStr = ''
-            if lineCount != 0:
-                for valCt, val in enumerate(line):
-                    if valCt == valLen:
-                        lineStr = lineStr + str(val) + "\n"
-                    elif valCt < valLen:
-                        lineStr = lineStr + str(val) + ','
-                    else:
-                        pass
-                OverHeatedCSVfile.write(lineStr)
-            else: OverHeatedCSVfile.write(line + "\n")
-        OverHeatedCSVfile.close()
-    else:
-        OverHeatedResult = None
-    
-    #Write the UnderHeated result file.
-    if writeResultFile_ != 2:
-        UnderHeatedResult = os.path.join(workingDir, UnderHeatedFile)
-        UnderHeatedCSVfile = open(UnderHeatedResult, 'wb')
-        for lineCount, line in enumerate(UnderHeatedMtx):
-            lineStr = ''
-            if lineCount != 0:
-                for valCt, val in enumerate(line):
-                    if valCt == valLen:
-                        lineStr = lineStr + str(val) + "\n"
-                    elif valCt < valLen:
-                        lineStr = lineStr + str(val) + ','
-                    else:
-                        pass
-                UnderHeatedCSVfile.write(lineStr)
-            else: UnderHeatedCSVfile.write(line + "\n")
-        UnderHeatedCSVfile.close()
-    else:
-        UnderHeatedResult = None
-    
+    #The OverHeated and UnderHeated results are not written if the user only wants the TCPocc and TA results.
+    resultMtxs = [("occTCP", occTCP_Mtx), ("TA", TA_Mtx), ("OverHeated", OverHeatedMtx), ("UnderHeated", UnderHeatedMtx)]
+    if writeResultFile_ == 2: resultMtxs = resultMtxs[:2] + [("OverHeated", None), ("UnderHeated", None)]
     
-    return occTCP_Result, TA_Result, OverHeatedResult, UnderHeatedResult
+    #Write each matrix into a binary matrix file or into a csv file.
+    resultMtxs = [(fileName + comfortType + fileSuffix, resultMtx) for fileSuffix, resultMtx in resultMtxs]
+    return hb_comfortMatrixFile.writeResultFiles(workingDir, resultMtxs, writeCSV_, valuesCount)
+
 
 
 
+# csv and summary outputs are off until writeCSV_ and summaryOnly_ are added to the component
+try: writeCSV_
+except: writeCSV_ = False
+try: summaryOnly_
+except: summaryOnly_ = False
 
 #Import the classes, check the inputs, and generate default values for grid size if the user has given none.
 checkLB = True
-if sc.sticky.has_key('ladybug_release') and sc.sticky.has_key('honeybee_release'):
+if sc.sticky.has_key('ladybug_release') and sc.sticky.has_key('honeybee_release') and sc.sticky.has_key('honeybee_ComfortMatrixFile'):
     lb_preparation = sc.sticky["ladybug_Preparation"]()
     lb_visualization = sc.sticky["ladybug_ResultVisualization"]()
+    hb_comfortMatrixFile = sc.sticky["honeybee_ComfortMatrixFile"]
 else:
     checkLB = False
     print "You should let the Ladybug and Honeybee fly first..."
@@ -649,6 +581,6 @@ if len(_comfResultsMtx) > 0 and len(_degOrPMVMtx) >0 and len(_viewFactorMesh) >
         checkData, fileName, workingDir, viewFactorMesh, analysisPeriod, totEnergyHeaders, totEnergyNumbers, zoneNames, occupancySchList, comfortType, occupancyThreshold = checkTheInputs()
     
     if checkData == True and _runIt == True:
-        occTCP_Mtx, TA_Mtx, OverHeatedMtx, UnderHeatedMtx = main(viewFactorMesh, analysisPeriod, totEnergyHeaders, totEnergyNumbers, zoneNames, occupancySchList, comfortType, occupancyThreshold)
+        occTCP_Mtx, TA_Mtx, OverHeatedMtx, UnderHeatedMtx = main(viewFactorMesh, analysisPeriod, totEnergyHeaders, totEnergyNumbers, zoneNames, occupancySchList, comfortType, occupancyThreshold, summaryOnly_ == True)
         if writeResultFile_ != 0: 
-            occTCP_Result, TA_Result, OverHeatedResult, UnderHeatedResult = writeCSV(comfortType, fileName, workingDir, occTCP_Mtx, TA_Mtx, OverHeatedMtx, UnderHeatedMtx)
\ No newline at end of file
+            occTCP_Result, TA_Result, OverHeatedResult, UnderHeatedResult = writeResultFiles(comfortType, fileName, workingDir, occTCP_Mtx, TA_Mtx, OverHeatedMtx, UnderHeatedMtx)
\ No newline at end of file
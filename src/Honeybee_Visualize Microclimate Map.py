@@ -49,7 +49,7 @@ Provided by Honeybee 0.0.63
 
 ghenv.Component.Name = "Honeybee_Visualize Microclimate Map"
 ghenv.Component.NickName = 'VisualizeMicroclimate'
-ghenv.Component.Message = 'VER 0.0.63\nJAN_20_2018'
+ghenv.Component.Message = 'VER 0.0.63\nOCT_18_2026'
 ghenv.Component.IconDisplayMode = ghenv.Component.IconDisplayMode.application
 ghenv.Component.Category = "Honeybee"
 ghenv.Component.SubCategory = "10 | Energy | Energy"
@@ -125,6 +125,10 @@ def checkTheInputs():
     if len(_comfResultsMtx[1:]) == 1: simStepPossible = False
     else: simStepPossible = True
     
+    #Summary matrices only have the totals of the analysis period and can't be sliced.
+    summaryData = hb_comfortMatrixFile.isSummary(_comfResultsMtx[0])
+    if summaryData: simStepPossible = False
+    
     #Check the HOY to be sure that it is in the counds of the matrix.
     checkData3 = True
     try:
@@ -148,7 +152,7 @@ def checkTheInputs():
     if checkData1 == True and checkData2 == True  and checkData3 == True: checkData = True
     else: checkData = False
     
-    return checkData, viewFactorMesh, dataType, annualData, simStepPossible, analysisPeriod, occDataType, totalAble
+    return checkData, viewFactorMesh, dataType, annualData, simStepPossible, analysisPeriod, occDataType, totalAble, summaryData
 
 
 def manageInputOutput(annualData, simStep, totalAble):
@@ -179,116 +183,46 @@ def restoreInputOutput():
 
 
 def computeComfValues(comfResultsMtx, analysisP, comfMtxAnalysisP, stepOfSimulation, annualData, simStepPossible, occDataType, percentOrTotal, totalAble, lb_preparation):
-    #Create a list to be filled with values of comfort.
-    comfortFactorVals = []
-    
     if stepOfSimulation != None and simStepPossible == True:
-        comfortFactorVals = comfResultsMtx[stepOfSimulation]
-    elif len(analysisP) > 0 and analysisP != comfMtxAnalysisP and annualData == True:
+        return comfResultsMtx[stepOfSimulation]
+    
+    #Find the rows of the matrix that should be aggregated.
+    #The last row of occupied data types is the number of occupied hours of each point.
+    occupiedHours = None
+    if len(analysisP) > 0 and analysisP != comfMtxAnalysisP and annualData == True:
         #Get the HOYs of the analysis period
         HOYS, months, days = lb_preparation.getHOYsBasedOnPeriod(analysisP, 1)
-        
-        #Pick out just the hours that are in the analysis period.
-        newcomfResultsMtx = []
-        for lineCount, line in enumerate(comfResultsMtx):
-            if lineCount in HOYS: newcomfResultsMtx.append(line)
-        
-        #Transpose the matrix
-        newcomfResultsMtx2 = zip(*newcomfResultsMtx)
-        
-        if percentOrTotal == False and totalAble == True:
-            for lineCount, line in enumerate(newcomfResultsMtx2):
-                comfortFactorVals.append(sum(line))
-        else:
-            #If the dataType is meant to be divided by occupie hours, recompute the occupied hours for the analysis period.
-            occMtxInit = []
-            for val in comfResultsMtx[1]: occMtxInit.append(0)
-            if occDataType == True:
-                for line in newcomfResultsMtx:
-                    for ptCt, pointVal in enumerate(line):
-                        if isinstance(pointVal, int): occMtxInit[ptCt] += 1
-            occMtx = [occMtxInit]
-            
-            #Compute the total percentage of comfortable hours.
-            if occDataType == False:
-                for lineCount, line in enumerate(newcomfResultsMtx2):
-                    comfortFactorVals.append(sum(line)/len(line))
-            else:
-                occMtx2 = zip(*occMtx)
-                for lineCount, line in enumerate(newcomfResultsMtx2):
-                    comfortFactorVals.append(sum(line)/occMtx2[lineCount][0])
+        rows = hb_comfortMatrixAggregator.getRowIndices(HOYS)
     elif len(analysisP) > 0 and analysisP != comfMtxAnalysisP and annualData == False and simStepPossible == True:
         #Check the data anlysis period and subtract the start day from each of the HOYs.
         HOYS, months, days = lb_preparation.getHOYsBasedOnPeriod(analysisP, 1)
         FinalHOYs, mon, days = lb_preparation.getHOYsBasedOnPeriod(comfMtxAnalysisP, 1)
-        for hCount, hour in enumerate(HOYS):
-            HOYS[hCount] = hour - FinalHOYs[0] + 1
+        rows = hb_comfortMatrixAggregator.getRowIndices(HOYS, FinalHOYs[0])
         
         #Check to see if the hours of the requested analysis period are in the comfResultsMtx.
-        periodsAlign = True
-        for hour in HOYS:
-            if hour < 0: periodsAlign = False
-            try: comfResultsMtx[hour]
-            except: periodsAlign = False
-        
-        if periodsAlign == False:
+        if len(rows) == 0 or rows[0] < 1 or rows[-1] >= len(comfResultsMtx):
             warning = 'The analysis period of the confResultsMtx and that which is plugged into this component do not align.'
             print warning
             ghenv.Component.AddRuntimeMessage(w, warning)
-        else:
-            
-            #Pick out just the hours that are in the analysis period.
-            newcomfResultsMtx = []
-            for lineCount, line in enumerate(comfResultsMtx):
-                if lineCount in HOYS:
-                    newcomfResultsMtx.append(line)
-            
-            #Transpose the matrix
-            newcomfResultsMtx2 = zip(*newcomfResultsMtx)
-            
-            if percentOrTotal == False and totalAble == True:
-                for lineCount, line in enumerate(newcomfResultsMtx2):
-                    comfortFactorVals.append(sum(line))
-            else:
-                #If the dataType is meant to be divided by occupie hours, recompute the occupied hours for the analysis period.
-                occMtxInit = []
-                for val in comfResultsMtx[1]: occMtxInit.append(0)
-                if occDataType == True:
-                    for line in newcomfResultsMtx:
-                        for ptCt, pointVal in enumerate(line):
-                            if isinstance(pointVal, int): occMtxInit[ptCt] += 1
-                occMtx = [occMtxInit]
-                
-                #Compute the total percentage of comfortable hours.
-                if occDataType == False:
-                    for lineCount, line in enumerate(newcomfResultsMtx2):
-                        comfortFactorVals.append(sum(line)/len(line))
-                else:
-                    occMtx2 = zip(*occMtx)
-                    for lineCount, line in enumerate(newcomfResultsMtx2):
-                        comfortFactorVals.append(sum(line)/occMtx2[lineCount][0])
+            return []
     else:
-        #Transpose the matrix
-        if occDataType == False: newcomfResultsMtx1 = comfResultsMtx[1:]
-        else: newcomfResultsMtx1 = comfResultsMtx[1:-1]
-        newcomfResultsMtx2 = zip(*newcomfResultsMtx1)
-        
-        if percentOrTotal == False and totalAble == True:
-            for lineCount, line in enumerate(newcomfResultsMtx2):
-                comfortFactorVals.append(sum(line))
+        if occDataType == False: rows = xrange(1, len(comfResultsMtx))
         else:
-            #Compute the average across the hours.
-            if occDataType == False:
-                for lineCount, line in enumerate(newcomfResultsMtx2):
-                    comfortFactorVals.append(sum(line)/len(line))
-            else:
-                occMtx = [comfResultsMtx[-1]]
-                occMtx2 = zip(*occMtx)
-                for lineCount, line in enumerate(newcomfResultsMtx2):
-                    comfortFactorVals.append(sum(line)/occMtx2[lineCount][0])
+            rows = xrange(1, len(comfResultsMtx) - 1)
+            occupiedHours = comfResultsMtx[-1]
     
+    #Stream the rows into the aggregator.
+    aggregator = hb_comfortMatrixAggregator(len(comfResultsMtx[1]))
+    aggregator.addRows(comfResultsMtx, rows)
     
-    return comfortFactorVals
+    if percentOrTotal == False and totalAble == True:
+        return aggregator.sum()
+    elif occDataType == False:
+        #Compute the average across the hours.
+        return aggregator.mean()
+    else:
+        #If the dataType is meant to be divided by occupied hours, use the occupied hours of the analysis period.
+        return aggregator.percentOfOccupied(occupiedHours)
 
 
 
@@ -462,22 +396,25 @@ def main(pointValues, viewFactorMesh, dataType, lb_preparation, lb_visualization
 
 #Import the classes, check the inputs, and generate default values for grid size if the user has given none.
 checkLB = True
-if sc.sticky.has_key('ladybug_release'):
+if sc.sticky.has_key('ladybug_release') and sc.sticky.has_key('honeybee_release') and sc.sticky.has_key('honeybee_ComfortMatrixFile'):
     lb_preparation = sc.sticky["ladybug_Preparation"]()
     lb_visualization = sc.sticky["ladybug_ResultVisualization"]()
+    hb_comfortMatrixAggregator = sc.sticky["honeybee_ComfortMatrixAggregator"]
+    hb_comfortMatrixFile = sc.sticky["honeybee_ComfortMatrixFile"]
 else:
     checkLB = False
-    print "You should let the Ladybug fly first..."
+    print "You should let the Ladybug and Honeybee fly first..."
     w = gh.GH_RuntimeMessageLevel.Warning
-    ghenv.Component.AddRuntimeMessage(w, "You should let the Ladybug fly first...")
+    ghenv.Component.AddRuntimeMessage(w, "You should let the Ladybug and Honeybee fly first...")
 
 checkData = False
 annualData = True
 simStepPossible = True
 totalAble = True
-if len(_comfResultsMtx) > 0 and len(_viewFactorMesh) > 0:
+summaryData = False
+if len(_comfResultsMtx) > 0 and len(_viewFactorMesh) > 0 and checkLB == True:
     if _comfResultsMtx[0] != None and _viewFactorMesh[0] != None:
-        checkData, viewFactorMesh, dataType, annualData, simStepPossible, analysisPeriod, occDataType, totalAble = checkTheInputs()
+        checkData, viewFactorMesh, dataType, annualData, simStepPossible, analysisPeriod, occDataType, totalAble, summaryData = checkTheInputs()
 
 if annualData == False or simStepPossible == False or totalAble == False:
     manageInputOutput(annualData, simStepPossible, totalAble)
@@ -491,6 +428,13 @@ try: stepOfSimulation_
 except: stepOfSimulation_ = None
 try: percentOrTotal_
 except: percentOrTotal_ = True
+if summaryData == True and (len(analysisPeriod_) > 0 or stepOfSimulation_ != None):
+    warning = "The _comfResultsMtx only has the totals of its analysis period so it can't be sliced.\n" + \
+        "analysisPeriod_ and stepOfSimulation_ are ignored."
+    print warning
+    ghenv.Component.AddRuntimeMessage(w, warning)
+    analysisPeriod_ = []
+    stepOfSimulation_ = None
 if runIt_ == None: runIt = True
 else: runIt = runIt_
 
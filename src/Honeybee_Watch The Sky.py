@@ -51,36 +51,25 @@ import scriptcontext as sc
 import os
 import shutil
 import Grasshopper.Kernel as gh
-import subprocess
 
-def runCmdAndGetTheResults(command, shellKey = True):
-    p = subprocess.Popen(["cmd", command], shell=shellKey, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    out, err = p.communicate()
-    # p.kill()
-    return out, err
-
-def rpictRenderSkyLine(viewSize, projectName, viewName):
+def rpictRenderSkyArgs(viewSize, projectName, viewName):
     octFile = projectName + "_" + viewName + ".oct"
     outputFile = projectName + "_" + viewName + ".HDR"
-    rpictLine = "rpict -i -t 10 -ab 1 -ad 1000 -as 20 -ar 300 -aa 0.1 " + \
-                "-vth -vp 0 0 0 -vd 0 0 1 -vu 0 1 0 -vh 180 -vv 180 " + \
-                "-x " + str(viewSize) + " -y " + str(viewSize) + " " + \
-                octFile + " > " + outputFile + "\n"
-    return rpictLine
+    rpictArgs = ["rpict", "-i", "-t", "10", "-ab", "1", "-ad", "1000", "-as", "20", "-ar", "300", "-aa", "0.1",
+                 "-vth", "-vp", "0", "0", "0", "-vd", "0", "0", "1", "-vu", "0", "1", "0", "-vh", "180", "-vv", "180",
+                 "-x", str(viewSize), "-y", str(viewSize), octFile]
+    return rpictArgs, outputFile
 
 
 
-def oconvLine(projectName, viewName, radFilesList):
+def oconvArgs(projectName, viewName, radFilesList):
     # sence files
-    senceFiles = ""
-    for address in radFilesList: senceFiles = senceFiles + address.replace("\\" , "/") + " "
-    
-    line = "oconv -f " +  senceFiles + " > " + projectName + "_" + viewName + ".oct\n"
+    senceFiles = [address.replace("\\" , "/") for address in radFilesList]
     
-    return line
+    return ["oconv", "-f"] + senceFiles, projectName + "_" + viewName + ".oct"
 
 
-def rtraceLine(projectName, viewName):
+def rtraceArgs(projectName, viewName):
     
     octFile = projectName + "_" + viewName + ".oct"
     resultFile = projectName + "_" + viewName + ".irr"
@@ -88,9 +77,10 @@ def rtraceLine(projectName, viewName):
     # Result will be in Wh/m^2
     # EPiSODE have a really good post on this if you want to read more:
     # http://episode-hopezh.blogspot.com/2012/05/viz-sky-generated-by-gendaylit.html?view=flipcard
-    line = "echo 0 0 0 0 0 1 | rtrace -w -h -I+ -ab 1 " + octFile + " | rcalc -e "'"$1 = $1 * 0.265 + $2 * 0.670 + $3*0.065"'" > " + resultFile + "\n"
+    pipeline = [["rtrace", "-w", "-h", "-I+", "-ab", "1", octFile],
+                ["rcalc", "-e", "$1 = $1 * 0.265 + $2 * 0.670 + $3*0.065"]]
     
-    return line, resultFile
+    return pipeline, resultFile
     
 def checkSky(skyFile):
     lines = []
@@ -134,11 +124,14 @@ def main(skyFilePath, imageSize):
         ghenv.Component.AddRuntimeMessage(w, "You should first let Honeybee to fly...")
         return None, None
     
-    fileNames = ["oconv.exe", "rpict.exe", "pcond.exe", "pflip.exe"]
+    hb_processRunner = sc.sticky["honeybee_ProcessRunner"]
+    fileNames = ["oconv", "rpict", "rtrace", "rcalc", "pcond", "pflip"]
     # check for files
+    executables = {}
     for fileName in fileNames:
-        if not os.path.isfile(hb_RADPath + "\\" + fileName):
-            msg = "Cannot find " + fileName + " at " + hb_RADPath + \
+        executables[fileName] = hb_processRunner.findExecutable(fileName, hb_RADPath)
+        if executables[fileName] == None:
+            msg = "Cannot find " + fileName + " at " + str(hb_RADPath) + \
                   "Make sure that RADIANCE is installed on your system and try again."
             ghenv.Component.AddRuntimeMessage(gh.GH_RuntimeMessageLevel.Warning, msg)
             return None, None
@@ -161,32 +154,28 @@ def main(skyFilePath, imageSize):
         try: shutil.remove(skyImageFile)
         except: "Failed to remove the old sky image. The result might be wrong"
     
-    # write the path string (I should check radiance to be installed on the system
-    pathStr = "SET RAYPATH=.;" + hb_RADLibPath + "\nPATH=" + hb_RADPath + ";$PATH\n"
+    # Radiance executables run directly with RAYPATH set for the processes
+    runner = hb_processRunner(os.path.dirname(skyFilePath) or None, \
+                              hb_processRunner.radianceEnvironment(hb_RADPath, hb_RADLibPath), \
+                              projectName + "_" + viewName + ".log")
+    
+    def withPath(args):
+        return [executables[args[0]]] + args[1:]
     
     # generate the rad file
-    oconvL = oconvLine(projectName, viewName, [skyFilePath])
+    oconvA, octFile = oconvArgs(projectName, viewName, [skyFilePath])
     
-    rpictL = rpictRenderSkyLine(imageSize, projectName, viewName)
+    rpictA, _ = rpictRenderSkyArgs(imageSize, projectName, viewName)
     
-    rtraceL, resultFile = rtraceLine(projectName, viewName)
+    rtraceA, resultFile = rtraceArgs(projectName, viewName)
     
     # run the study
-    command = "@echo off\n" + \
-              "echo Generating the sky view\n" + \
-              pathStr + "\n" + \
-              oconvL + "\n" + \
-              rpictL + "\n" + \
-              rtraceL + "\n" + \
-              "pcond -h+ " + skyImageFile + " > " + hSkyImageFile + "\n" + \
-              "pflip -h " + hSkyImageFile + " > " + flippedSkyImageFile + "\n" + \
-              "exit"
-
-    with open(projectName + ".bat", "w") as outf:
-        outf.write(command)
-        
-    #os.system(projectName + ".bat")
-    runCmdAndGetTheResults( "/c " + projectName + ".bat")
+    print "Generating the sky view"
+    runner.run(withPath(oconvA), stdout = octFile)
+    runner.run(withPath(rpictA), stdout = skyImageFile)
+    runner.run([withPath(args) for args in rtraceA], input = "0 0 0 0 0 1\n", stdout = resultFile)
+    runner.run(withPath(["pcond", "-h+", skyImageFile]), stdout = hSkyImageFile)
+    runner.run(withPath(["pflip", "-h", hSkyImageFile]), stdout = flippedSkyImageFile)
     
     # read the result of the global horizontal irradiance
     with open(resultFile, "r") as inf:
@@ -0,0 +1,52 @@
+"""
+Load classes from the Honeybee component sources without Rhino
+
+Honeybee_Honeybee.py is a Grasshopper component and imports Rhino, Grasshopper
+and scriptcontext at module level so it can't be imported outside Rhino. Classes
+that only use the standard library are executed on their own from the source of
+the component together with the imports of the component that are available.
+
+The components are written for IronPython 2 so the tests run with Python 2:
+    python2 -m unittest discover -s tests
+"""
+
+import ast
+import os
+import sys
+import unittest
+
+SRCFOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def isImport(node):
+    if isinstance(node, (ast.Import, ast.ImportFrom)): return True
+    # try: import x / except ImportError: x = None
+    return type(node).__name__ in ("TryExcept", "Try") and \
+        all(isinstance(child, (ast.Import, ast.ImportFrom)) for child in node.body)
+
+
+def loadClasses(classNames, fileName = "Honeybee_Honeybee.py"):
+    """Return a namespace with the classes from a component source file."""
+    if sys.version_info[0] != 2:
+        raise unittest.SkipTest("Honeybee components are written for IronPython 2.")
+
+    filePath = os.path.join(SRCFOLDER, fileName)
+    with open(filePath, "r") as inf:
+        tree = ast.parse(inf.read(), filePath)
+
+    namespace = {"__name__": os.path.splitext(fileName)[0].replace(" ", "_")}
+    for node in tree.body:
+        if not isImport(node): continue
+        try:
+            exec(compile(ast.Module(body = [node]), filePath, "exec"), namespace)
+        except ImportError:
+            # Rhino, Grasshopper and .NET
+            pass
+
+    classes = [node for node in tree.body if isinstance(node, ast.ClassDef) and node.name in classNames]
+    missing = set(classNames) - set(node.name for node in classes)
+    if missing:
+        raise ValueError("Can't find %s in %s."%(", ".join(sorted(missing)), fileName))
+
+    exec(compile(ast.Module(body = classes), filePath, "exec"), namespace)
+    return namespace
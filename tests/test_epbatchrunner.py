@@ -0,0 +1,122 @@
+"""Tests for hb_EPBatchRunner with a stub executable instead of EnergyPlus."""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import hbsource
+
+hb = hbsource.loadClasses(["hb_ProcessRunner", "hb_Job", "hb_JobScheduler", "hb_EPBatchRunner"])
+hb_EPBatchRunner = hb["hb_EPBatchRunner"]
+
+# writes the outputs that EnergyPlus writes and counts the runs
+STUB = """
+import sys
+idfPath, base, counterPath = sys.argv[1:4]
+with open(counterPath, "a") as counter: counter.write(idfPath + "\\n")
+failed = "FATAL" in open(idfPath).read()
+with open(base + ".err", "w") as errFile:
+    if failed: errFile.write("   **  Fatal  ** stub failure\\n")
+    else: errFile.write("   ************* EnergyPlus Completed Successfully.\\n")
+with open(base + ".csv", "w") as csvFile: csvFile.write("Date/Time,Value\\n")
+"""
+
+
+class EPBatchRunnerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.stubPath = os.path.join(self.folder, "stub_energyplus.py")
+        with open(self.stubPath, "w") as stubFile: stubFile.write(STUB)
+        self.counterPath = os.path.join(self.folder, "runs.txt")
+        self.epwPath = self.writeFile("weather.epw", "LOCATION,Test\n")
+        self.batchFolder = os.path.join(self.folder, "batchRuns")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors = True)
+
+    def writeFile(self, name, content):
+        path = os.path.join(self.folder, name)
+        if not os.path.isdir(os.path.dirname(path)): os.makedirs(os.path.dirname(path))
+        with open(path, "w") as outf: outf.write(content)
+        return path
+
+    def getRunner(self):
+        command = '"%s" "%s" "{idf}" "{base}" "%s"'%(sys.executable, self.stubPath, self.counterPath)
+        return hb_EPBatchRunner(self.batchFolder, "EnergyPlus", maxPRuns = 2, commandTemplate = command)
+
+    def getRunsCount(self):
+        if not os.path.isfile(self.counterPath): return 0
+        with open(self.counterPath) as counter: return len(counter.readlines())
+
+    def test_runs_are_recorded_in_manifest(self):
+        runner = self.getRunner()
+        runs = [runner.addRun(self.writeFile("model%d.idf"%count, "Version,8.9;\n! %d\n"%count), self.epwPath)
+                for count in range(3)]
+        runner.run()
+
+        self.assertEqual(self.getRunsCount(), 3)
+        self.assertEqual(len(set(run["runFolder"] for run in runs)), 3)
+        with open(os.path.join(self.batchFolder, "manifest.json")) as inf:
+            manifest = json.load(inf)
+        for run in runs:
+            self.assertEqual(run["status"], "done")
+            self.assertTrue(os.path.isfile(run["results"]["csv"]))
+            self.assertTrue(run["err"]["completed"])
+            self.assertEqual(manifest["runs"][run["hash"]]["status"], "done")
+        self.assertEqual(manifest["lastRun"], [run["hash"] for run in runs])
+
+    def test_unchanged_runs_are_not_rerun(self):
+        idfPath = self.writeFile("model.idf", "Version,8.9;\n")
+        runner = self.getRunner()
+        runner.addRun(idfPath, self.epwPath)
+        runner.run()
+
+        runner = self.getRunner()
+        run = runner.addRun(idfPath, self.epwPath)
+        runner.run()
+        self.assertEqual(run["status"], "cached")
+        self.assertEqual(self.getRunsCount(), 1)
+
+        # a changed IDF runs again
+        self.writeFile("model.idf", "Version,8.9;\n! changed\n")
+        runner = self.getRunner()
+        run = runner.addRun(idfPath, self.epwPath)
+        runner.run()
+        self.assertEqual(run["status"], "done")
+        self.assertEqual(self.getRunsCount(), 2)
+
+    def test_identical_idfs_share_a_run(self):
+        content = "Version,8.9;\n"
+        runner = self.getRunner()
+        run1 = runner.addRun(self.writeFile(os.path.join("a", "model.idf"), content), self.epwPath)
+        run2 = runner.addRun(self.writeFile(os.path.join("b", "model.idf"), content), self.epwPath)
+        runner.run()
+
+        self.assertTrue(run1 is run2)
+        self.assertEqual(len(runner.runs), 1)
+        self.assertEqual(self.getRunsCount(), 1)
+        self.assertEqual(run1["status"], "done")
+
+    def test_fatal_error_fails_the_run(self):
+        runner = self.getRunner()
+        failed = runner.addRun(self.writeFile("failed.idf", "FATAL\n"), self.epwPath)
+        passed = runner.addRun(self.writeFile("passed.idf", "Version,8.9;\n"), self.epwPath)
+        runner.run()
+
+        self.assertEqual(failed["status"], "failed")
+        self.assertEqual(failed["err"]["fatal"], 1)
+        self.assertEqual(passed["status"], "done")
+
+        # failed runs are not cached
+        runner = self.getRunner()
+        failed = runner.addRun(os.path.join(self.folder, "failed.idf"), self.epwPath)
+        runner.run()
+        self.assertEqual(self.getRunsCount(), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
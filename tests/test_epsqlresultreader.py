@@ -0,0 +1,90 @@
+"""Tests for hb_EPSQLResultReader with a small sql file in the EnergyPlus table structure."""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import hbsource
+
+hb = hbsource.loadClasses(["hb_EPSQLResultReader"])
+hb_EPSQLResultReader = hb["hb_EPSQLResultReader"]
+
+
+class EPSQLResultReaderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.sqlFile = os.path.join(self.folder, "test.sql")
+        connection = sqlite3.connect(self.sqlFile)
+        connection.executescript("""
+            CREATE TABLE Time (TimeIndex INTEGER PRIMARY KEY, WarmupFlag INTEGER);
+            CREATE TABLE ReportDataDictionary (ReportDataDictionaryIndex INTEGER PRIMARY KEY,
+                KeyValue TEXT, Name TEXT, Units TEXT, ReportingFrequency TEXT);
+            CREATE TABLE ReportData (ReportDataIndex INTEGER PRIMARY KEY, TimeIndex INTEGER,
+                ReportDataDictionaryIndex INTEGER, Value REAL);
+            CREATE TABLE Zones (ZoneIndex INTEGER PRIMARY KEY, ZoneName TEXT, FloorArea REAL);
+            INSERT INTO Zones VALUES (2, 'ZONE_B', 20.5);
+            INSERT INTO Zones VALUES (1, 'ZONE_A', 10.0);
+            INSERT INTO ReportDataDictionary VALUES (1, 'ZONE_A', 'Zone Mean Air Temperature', 'C', 'Hourly');
+            INSERT INTO ReportDataDictionary VALUES (2, 'ZONE_B', 'Zone Mean Air Temperature', 'C', 'Hourly');
+            INSERT INTO ReportDataDictionary VALUES (3, '', 'Electricity:Facility', 'J', 'Monthly');
+        """)
+        # one warmup hour and three hours of the run period
+        for timeIndex in range(4):
+            connection.execute("INSERT INTO Time VALUES (?, ?)", (timeIndex, 1 if timeIndex == 0 else 0))
+            for index in (1, 2):
+                connection.execute("INSERT INTO ReportData (TimeIndex, ReportDataDictionaryIndex, Value) " + \
+                                   "VALUES (?, ?, ?)", (timeIndex, index, index * 10 + timeIndex))
+        connection.commit()
+        connection.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors = True)
+
+    def getIndices(self):
+        connection = sqlite3.connect(self.sqlFile)
+        try:
+            return [row[0] for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'ReportData'")]
+        finally:
+            connection.close()
+
+    def test_readers_do_not_modify_the_file(self):
+        reader = hb_EPSQLResultReader(self.sqlFile)
+        reader.getValues("Zone Mean Air Temperature")
+        reader.getZones()
+        reader.close()
+        self.assertEqual(self.getIndices(), [])
+
+    def test_create_index(self):
+        self.assertTrue(hb_EPSQLResultReader.createIndex(self.sqlFile))
+        # the index is only created once
+        self.assertTrue(hb_EPSQLResultReader.createIndex(self.sqlFile))
+        self.assertEqual(self.getIndices(), ["hbReportDataIndex"])
+
+        connection = sqlite3.connect(self.sqlFile)
+        plan = " ".join(str(row) for row in connection.execute(
+            "EXPLAIN QUERY PLAN SELECT Value FROM ReportData WHERE ReportDataDictionaryIndex IN (1, 2)"))
+        connection.close()
+        self.assertTrue("hbReportDataIndex" in plan)
+
+    def test_values_skip_warmup(self):
+        hb_EPSQLResultReader.createIndex(self.sqlFile)
+        reader = hb_EPSQLResultReader(self.sqlFile)
+        values = reader.getValues("Zone Mean Air Temperature", frequency = "Hourly")
+        reader.close()
+        self.assertEqual(list(values["ZONE_A"]), [11, 12, 13])
+        self.assertEqual(list(values["ZONE_B"]), [21, 22, 23])
+
+    def test_zones(self):
+        reader = hb_EPSQLResultReader(self.sqlFile)
+        self.assertEqual(reader.getZones(), [("ZONE_A", 10.0), ("ZONE_B", 20.5)])
+        self.assertEqual(reader.getZoneNames(), ["ZONE_A", "ZONE_B"])
+        self.assertEqual(reader.getZoneFloorAreas(), [10.0, 20.5])
+        reader.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
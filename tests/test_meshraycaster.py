@@ -0,0 +1,133 @@
+"""Tests for hb_MeshRayCaster against brute force intersection of all the triangles."""
+
+import math
+import random
+import unittest
+
+import hbsource
+
+hb = hbsource.loadClasses(["hb_MeshRayCaster"])
+hb_MeshRayCaster = hb["hb_MeshRayCaster"]
+
+
+def intersectTriangle(origin, direction, v0, v1, v2):
+    """Return the ray parameter of the hit with a two-sided triangle or None."""
+    e1 = [b - a for a, b in zip(v0, v1)]
+    e2 = [b - a for a, b in zip(v0, v2)]
+    normal = (e1[1] * e2[2] - e1[2] * e2[1], e1[2] * e2[0] - e1[0] * e2[2], e1[0] * e2[1] - e1[1] * e2[0])
+    denominator = sum(n * d for n, d in zip(normal, direction))
+    if abs(denominator) < 1e-12: return None
+    t = sum(n * (a - o) for n, a, o in zip(normal, v0, origin)) / denominator
+    if t <= 1e-9: return None
+
+    # barycentric coordinates of the hit point
+    point = [o + t * d for o, d in zip(origin, direction)]
+    w = [p - a for p, a in zip(point, v0)]
+    d00 = sum(a * a for a in e1); d01 = sum(a * b for a, b in zip(e1, e2)); d11 = sum(b * b for b in e2)
+    d20 = sum(a * b for a, b in zip(w, e1)); d21 = sum(a * b for a, b in zip(w, e2))
+    det = d00 * d11 - d01 * d01
+    v = (d11 * d20 - d01 * d21) / det
+    u = (d00 * d21 - d01 * d20) / det
+    if v < 0 or u < 0 or u + v > 1: return None
+    return t
+
+
+def bruteForceHits(meshes, origin, direction):
+    """Return a sorted list of (t, meshIndex) for all the hits of a ray."""
+    hits = []
+    for meshIndex, (vertices, faces) in enumerate(meshes):
+        for face in faces:
+            triangles = [(face[0], face[1], face[2])]
+            if len(face) == 4: triangles.append((face[0], face[2], face[3]))
+            for a, b, c in triangles:
+                t = intersectTriangle(origin, direction, vertices[a], vertices[b], vertices[c])
+                if t != None: hits.append((t, meshIndex))
+    return sorted(hits)
+
+
+def randomMesh(rnd):
+    """A small random mesh of triangles and quads around a random center."""
+    center = [rnd.uniform(-10, 10) for i in range(3)]
+    vertices = []
+    faces = []
+    for count in range(rnd.randint(1, 6)):
+        start = len(vertices)
+        corners = 4 if rnd.random() < 0.5 else 3
+        for corner in range(corners):
+            vertices.append(tuple(c + rnd.uniform(-3, 3) for c in center))
+        faces.append(tuple(range(start, start + corners)))
+    return vertices, faces
+
+
+def randomDirection(rnd):
+    z = rnd.uniform(-1, 1)
+    angle = rnd.uniform(0, 2 * math.pi)
+    r = math.sqrt(1 - z * z)
+    return (r * math.cos(angle), r * math.sin(angle), z)
+
+
+class MeshRayCasterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.rnd = random.Random(11)
+
+    def test_nearest_hits_match_brute_force(self):
+        meshes = [randomMesh(self.rnd) for count in range(40)]
+        rayCaster = hb_MeshRayCaster(meshes)
+        origins = [tuple(self.rnd.uniform(-12, 12) for i in range(3)) for count in range(30)]
+        # axis-aligned directions check the zero components in the box test
+        directions = [randomDirection(self.rnd) for count in range(40)] + \
+                     [(1, 0, 0), (0, -1, 0), (0, 0, 1)]
+        results = rayCaster.castRays(origins, hb_MeshRayCaster.prepareDirections(directions))
+
+        hitsCount = 0
+        for origin, result in zip(origins, results):
+            for direction, meshIndex in zip(directions, result):
+                hits = bruteForceHits(meshes, origin, direction)
+                if len(hits) == 0:
+                    self.assertEqual(meshIndex, -1)
+                    continue
+                hitsCount += 1
+                nearestT = hits[0][0]
+                # the two implementations round differently for hits at the same distance
+                candidates = [index for t, index in hits if t - nearestT < 1e-7]
+                self.assertTrue(meshIndex in candidates, "%s != %s"%(meshIndex, candidates))
+                meshT = rayCaster.intersect(origin, direction)[1]
+                self.assertAlmostEqual(meshT, nearestT, 6)
+
+        # make sure the test is not only checking misses
+        self.assertTrue(hitsCount > 100)
+
+    def test_all_hits_match_brute_force(self):
+        meshes = [randomMesh(self.rnd) for count in range(25)]
+        rayCaster = hb_MeshRayCaster(meshes)
+        directions = [randomDirection(self.rnd) for count in range(60)]
+        prepared = hb_MeshRayCaster.prepareDirections(directions)
+        origin = (0.5, -0.25, 0.75)
+
+        for direction, preparedDirection in zip(directions, prepared):
+            expected = sorted(set(index for t, index in bruteForceHits(meshes, origin, direction)))
+            self.assertEqual(rayCaster.getHitMeshes(origin, preparedDirection), expected)
+            self.assertEqual(rayCaster.isBlocked(origin, preparedDirection), len(expected) != 0)
+
+    def test_hits_are_two_sided_and_in_front_of_the_origin(self):
+        square = ([(-1, -1, 0), (1, -1, 0), (1, 1, 0), (-1, 1, 0)], [(0, 1, 2, 3)])
+        rayCaster = hb_MeshRayCaster([square])
+        self.assertEqual(rayCaster.intersect((0, 0, 1), (0, 0, -1)), (0, 1.0))
+        self.assertEqual(rayCaster.intersect((0, 0, -2), (0, 0, 1)), (0, 2.0))
+        self.assertEqual(rayCaster.intersect((0, 0, 1), (0, 0, 1))[0], -1)
+        self.assertEqual(rayCaster.intersect((2, 0, 1), (0, 0, -1))[0], -1)
+
+    def test_same_distance_returns_lower_mesh_index(self):
+        square = ([(-1, -1, 0), (1, -1, 0), (1, 1, 0), (-1, 1, 0)], [(0, 1, 2, 3)])
+        far = ([(-1, -1, 5), (1, -1, 5), (1, 1, 5)], [(0, 1, 2)])
+        rayCaster = hb_MeshRayCaster([far, square, square])
+        self.assertEqual(rayCaster.intersect((0.2, 0.1, -1), (0, 0, 1))[0], 1)
+
+    def test_empty_caster(self):
+        rayCaster = hb_MeshRayCaster([])
+        self.assertEqual(rayCaster.castRays([(0, 0, 0)], hb_MeshRayCaster.prepareDirections([(0, 0, 1)])), [[-1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""Tests for hb_ProcessRunner and hb_CommandScript with small stub executables."""
+
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+import hbsource
+
+hb = hbsource.loadClasses(["hb_ProcessRunner", "hb_CommandScript", "hb_Job", "hb_JobScheduler", "hb_WriteRADAUX"])
+hb_ProcessRunner = hb["hb_ProcessRunner"]
+hb_CommandScript = hb["hb_CommandScript"]
+hb_JobScheduler = hb["hb_JobScheduler"]
+hb_WriteRADAUX = hb["hb_WriteRADAUX"]
+
+RADPARAMETERS = {"_ab_": 2, "_ad_": 512, "_as_": 128, "_ar_": 16, "_aa_": .25, "_ps_": 8,
+                 "_pt_": .15, "_pj_": .6, "_dj_": 0, "_ds_": .5, "_dt_": .5, "_dc_": .25,
+                 "_dr_": 0, "_dp_": 64, "_st_": .85, "_lr_": 4, "_lw_": .05,
+                 "additional": ["u+", "dv  -"]}
+
+
+@unittest.skipIf(os.name == "nt", "stub executables are shell scripts")
+class CommandScriptTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix = "hb run ")
+        self.binFolder = os.path.join(self.folder, "bin folder")
+        os.makedirs(self.binFolder)
+        # upper case the input and write RAYPATH to stderr
+        self.addExecutable("upper", '#!/bin/sh\necho "raypath=$RAYPATH" >&2\ntr a-z A-Z\n')
+        self.addExecutable("fail", "#!/bin/sh\nexit 3\n")
+        self.addExecutable("slow", "#!/bin/sh\nexec sleep 5\n")
+        self.writeFile("input file.txt", "hello world\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors = True)
+
+    def addExecutable(self, name, content):
+        path = os.path.join(self.binFolder, name)
+        with open(path, "w") as outf: outf.write(content)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+
+    def writeFile(self, name, content):
+        with open(os.path.join(self.folder, name), "w") as outf: outf.write(content)
+
+    def readFile(self, name):
+        with open(os.path.join(self.folder, name)) as inf: return inf.read()
+
+    def getScript(self):
+        env = hb_ProcessRunner.radianceEnvironment(self.binFolder, "/rad lib")
+        return hb_CommandScript(os.path.join(self.folder, "test.bat"), self.folder, env, [self.binFolder],
+                                "SET RAYPATH=.;/rad lib\n")
+
+    def test_commands_with_spaces_in_paths(self):
+        script = self.getScript()
+        script.addCommand(["upper"], stdin = "input file.txt", stdout = "output file.txt")
+        script.addCommand([["cat", "output file.txt"], ["upper"]], stdout = "piped.txt")
+        script.removeFile("input file.txt")
+        logFile = os.path.join(self.folder, "test.log")
+        returncode = hb_ProcessRunner(logFile = logFile).runScript(script)
+
+        self.assertEqual(returncode, 0)
+        self.assertEqual(self.readFile("output file.txt"), "HELLO WORLD\n")
+        self.assertEqual(self.readFile("piped.txt"), "HELLO WORLD\n")
+        self.assertFalse(os.path.exists(os.path.join(self.folder, "input file.txt")))
+        self.assertTrue("raypath=.%s/rad lib"%os.pathsep in self.readFile("test.log"))
+
+    def test_batch_file_is_written_from_the_commands(self):
+        script = self.getScript()
+        script.addCommand(["upper", "-x", "a b"], stdin = "input file.txt", stdout = "out.txt")
+        script.removeFile("out.txt")
+        script.write()
+        self.assertEqual(self.readFile("test.bat"),
+                         'SET RAYPATH=.;/rad lib\ncd %s\nupper -x "a b" < "input file.txt" > out.txt\ndel out.txt\n'%self.folder)
+
+    def test_all_commands_run_and_last_return_code_is_returned(self):
+        script = self.getScript()
+        script.addCommand(["fail"])
+        script.addCommand(["upper"], stdin = "input file.txt", stdout = "out.txt")
+        self.assertEqual(hb_ProcessRunner().runScript(script), 0)
+        self.assertEqual(self.readFile("out.txt"), "HELLO WORLD\n")
+
+        script.addCommand(["fail"])
+        self.assertEqual(hb_ProcessRunner().runScript(script), 3)
+
+    def test_scheduler_cancels_timed_out_scripts(self):
+        script = self.getScript()
+        script.addCommand(["slow"])
+        script.addCommand(["upper"], stdin = "input file.txt", stdout = "out.txt")
+        runner = hb_ProcessRunner()
+        scheduler = hb_JobScheduler(timeout = 0.5)
+        job = scheduler.addJob(lambda: runner.runScript(script), name = "slow", cancel = runner.cancel)
+        scheduler.run()
+
+        self.assertEqual(job.status, "timeout")
+        self.assertTrue(job.getDuration() < 4)
+        self.assertFalse(os.path.exists(os.path.join(self.folder, "out.txt")))
+
+
+class RadianceArgsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # __init__ reads the Radiance parameters from sc.sticky
+        self.writer = hb_WriteRADAUX.__new__(hb_WriteRADAUX)
+
+    def test_rtrace_args(self):
+        args, ptsFile, resFile = self.writer.rtraceArgs("study", "study_RAD", RADPARAMETERS, 0, 2)
+        self.assertEqual(args[:3], ["rtrace", "-I", "-h"])
+        self.assertEqual(args[-6:], ["-u+", "-dv", "-", "-e", "error.log", "study_RAD.oct"])
+        self.assertEqual((ptsFile, resFile), ("study_2.pts", "study_2.res"))
+        self.assertEqual(self.writer.rtraceLine("study", "study_RAD", RADPARAMETERS, 0, 2),
+                         hb_CommandScript.commandLine(args, ptsFile, resFile))
+
+    def test_rpict_args(self):
+        view = " -vtv -vp 0.000 1.000 2.000 -vd 0.000 1.000 0.000 -x 64 -y 64 "
+        args, unfFile = self.writer.rpictArgs(view, "study_IMG", "top", RADPARAMETERS, 2, 1)
+        self.assertEqual(args[:4], ["rpict", "-t", "10", "-vtv"])
+        self.assertEqual(args[-3:], ["-e", "error.log", "study_IMG.oct"])
+        self.assertEqual(unfFile, "study_IMG_top_1.unf")
+        self.assertTrue("-aa" in args and args[args.index("-aa") + 1] == "0.250")
+
+    def test_oconv_args(self):
+        args, octFile = self.writer.oconvArgs("scene", ["c:\\study\\mat.rad", "sky.rad"])
+        self.assertEqual(args, ["oconv", "-r", "2048", "-f", "c:/study/mat.rad", "sky.rad"])
+        self.assertEqual(octFile, "scene.oct")
+
+
+if __name__ == "__main__":
+    unittest.main()